@@ -0,0 +1,337 @@
+"""일괄 실행용 묶음 호출 에이전트.
+
+여러 상담을 ID와 함께 하나의 구조화 요청으로 묶어 번역/의도 추출/분류/검증을 수행한다.
+번역은 단건과 같은 줄 단위 언어 판정 + 번역 메모리를 거친 뒤, 남은 문장이 짧은 상담끼리 묶는다.
+응답은 ID 기준으로 상담별로 되돌리며, 누락·파싱 실패 항목은 단건 호출로 대체한다."""
+import asyncio
+import json
+import logging
+from typing import Awaitable, Callable
+
+from config import (
+    BATCH_PROMPT_SIZE,
+    BATCH_PROMPT_MAX_CHARS,
+    CLASSIFIER_LOCAL_ENABLED,
+    LOCAL_CLASSIFIER_ENABLED,
+    TRANSLATION_CHUNK_CHARS,
+)
+from services import metrics
+from services.gemini_client import generate_json, safe_parse_json
+from agents import translator, intent_extractor, classifier, validator
+
+logger = logging.getLogger(__name__)
+
+_BATCH_NOTE = """
+
+[일괄 처리 규칙]
+여러 건의 상담이 id와 함께 주어집니다. 각 상담을 서로 독립적으로 처리하고,
+입력된 모든 id에 대해 결과를 하나씩 반환하세요. id는 입력값을 그대로 사용하세요."""
+
+
+def _chunks(items: dict[str, str]) -> list[list[str]]:
+    """건수(BATCH_PROMPT_SIZE)와 글자 수(BATCH_PROMPT_MAX_CHARS) 한도 내에서 ID 묶음 생성"""
+    chunks, current, size = [], [], 0
+    for cid, text in items.items():
+        length = len(text)
+        if current and (len(current) >= BATCH_PROMPT_SIZE or size + length > BATCH_PROMPT_MAX_CHARS):
+            chunks.append(current)
+            current, size = [], 0
+        current.append(cid)
+        size += length
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _demux(data, ids: list[str], required_key: str) -> dict[str, dict]:
+    """{"results": [{"id": ..., ...}]} 응답을 ID별로 분리. 입력에 없는 ID/필수 키 누락 항목은 버림"""
+    if isinstance(data, dict):
+        data = data.get("results", [])
+    if not isinstance(data, list):
+        return {}
+
+    wanted = set(ids)
+    results = {}
+    for item in data:
+        if not isinstance(item, dict):
+            continue
+        cid = str(item.get("id", ""))
+        if cid in wanted and cid not in results and item.get(required_key) not in (None, ""):
+            results[cid] = item
+    return results
+
+
+async def _run_batched(
+    agent: str,
+    items: dict[str, str],
+    build_prompt: Callable[[list[str]], str],
+    system_instruction: str,
+    required_key: str,
+    single_call: Callable[[str], Awaitable],
+) -> dict:
+    """묶음 요청 실행 + ID 역다중화 + 누락 항목 단건 폴백.
+    items: {consultation_id: 프롬프트에 들어갈 텍스트} (묶음 크기 계산용)"""
+
+    async def _run_chunk(ids: list[str]) -> dict:
+        parsed = {}
+        if len(ids) > 1:
+            try:
+                result = await generate_json(build_prompt(ids), system_instruction + _BATCH_NOTE)
+                parsed = _demux(safe_parse_json(result), ids, required_key)
+            except Exception as e:
+                logger.warning(f"[Batch:{agent}] Batch call failed for {len(ids)} items: {str(e)[:100]}")
+            metrics.incr(f"batch_{agent}.calls")
+
+        missing = [cid for cid in ids if cid not in parsed]
+        if len(ids) > 1:
+            metrics.incr(f"batch_{agent}.hit", len(parsed))
+            if missing:
+                logger.warning(f"[Batch:{agent}] {len(missing)}/{len(ids)} items missing from batch response, falling back")
+                metrics.incr(f"batch_{agent}.miss", len(missing))
+        if missing:
+            singles = await asyncio.gather(*[single_call(cid) for cid in missing], return_exceptions=True)
+            for cid, single in zip(missing, singles):
+                parsed[cid] = single
+        return parsed
+
+    results = {}
+    for chunk_result in await asyncio.gather(*[_run_chunk(ids) for ids in _chunks(items)]):
+        results.update(chunk_result)
+    return results
+
+
+async def translate_batch(texts: dict[str, str]) -> dict[str, tuple[str, str] | Exception]:
+    """{id: 원문} → {id: (번역문, 입력 언어)}. 단건과 같은 줄 단위 언어 판정 + 번역 메모리를 적용하고,
+    메모리에 없는 문장이 TRANSLATION_CHUNK_CHARS 이내인 짧은 상담은 여러 건을 묶어 한 번에 번역한다.
+    긴 상담은 상담별 청크 번역. 실패한 상담은 단건 경로(translate_to_korean)로 다시 번역"""
+    results: dict = {}
+    plans = {}
+    for cid, text in texts.items():
+        plan = translator.plan_translation(text)
+        if plan.segments:
+            plans[cid] = plan
+        else:
+            results[cid] = (text, "ko")
+    if not plans:
+        return results
+
+    all_segments = list(dict.fromkeys(n for plan in plans.values() for n in plan.segments))
+    memory, references = await translator.lookup_memory(all_segments)
+    missing = {cid: [n for n in plan.segments if n not in memory] for cid, plan in plans.items()}
+    short = {
+        cid: "".join(segments) for cid, segments in missing.items()
+        if segments and sum(len(n) for n in segments) <= TRANSLATION_CHUNK_CHARS
+    }
+
+    def build_prompt(ids: list[str]) -> str:
+        payload = [
+            {"id": cid, "segments": translator.segment_payload(missing[cid], references)}
+            for cid in ids
+        ]
+        return f"""以下は複数件の相談内容から抜き出した文です（相談ごと・順番どおり）。
+相談ごとに前後の文脈を考慮しつつ、各文を韓国語に翻訳してください。
+"reference"は類似文の過去の翻訳です。用語や言い回しの参考にしてよいですが、原文との違い
+（否定、薬剤名・施術名、数値など）は必ず原文どおりに翻訳してください。
+
+JSON形式で返してください:
+{{"results": [{{"id": "入力のid", "translations": [{{"i": 入力のi, "translated_text": "翻訳結果"}}]}}]}}
+
+入力:
+{json.dumps(payload, ensure_ascii=False, indent=2)}"""
+
+    async def single_call(cid: str):
+        # 묶음 응답에서 빠진 상담: 아래에서 상담별 청크 번역으로 처리
+        return {"id": cid, "translations": []}
+
+    packed = await _run_batched(
+        "translator", short, build_prompt, translator.SYSTEM_INSTRUCTION, "translations", single_call,
+    ) if short else {}
+    # 상담별 청크 번역을 동시에 진행하는 상담 수
+    semaphore = asyncio.Semaphore(BATCH_PROMPT_SIZE)
+
+    async def _translate_item(cid: str) -> dict[str, str]:
+        """묶음 응답에 있는 문장은 사용하고, 나머지(긴 상담 포함)는 상담별 청크 번역"""
+        translated = {}
+        if cid in packed:
+            value = packed[cid]
+            if isinstance(value, Exception):
+                raise value
+            translated = translator.parse_segment_translations(value.get("translations"), missing[cid])
+        rest = [n for n in missing[cid] if n not in translated]
+        if rest:
+            async with semaphore:
+                translated.update(await translator.translate_missing(rest, references))
+        return translated
+
+    ids = list(plans)
+    outcomes = await asyncio.gather(*[_translate_item(cid) for cid in ids], return_exceptions=True)
+
+    new_translations = {}
+    retry = []
+    for cid, outcome in zip(ids, outcomes):
+        if isinstance(outcome, Exception):
+            logger.warning(f"[Batch:translator] {cid[:8]} failed, translating alone: {str(outcome)[:100]}")
+            retry.append(cid)
+            continue
+        new_translations.update(outcome)
+        results[cid] = (plans[cid].assemble({**memory, **outcome}), "ja")
+    await translator.store_memory(new_translations)
+
+    if retry:
+        singles = await asyncio.gather(*[translator.translate_to_korean(texts[cid]) for cid in retry], return_exceptions=True)
+        results.update(zip(retry, singles))
+    return results
+
+
+async def extract_intent_batch(texts: dict[str, str]) -> dict[str, dict | Exception]:
+    """{id: 한국어 상담} → {id: 의도 추출 결과}"""
+
+    def build_prompt(ids: list[str]) -> str:
+        payload = [{"id": cid, "text": texts[cid]} for cid in ids]
+        return f"""다음 각 상담 내용에서 환자의 의도를 추출해주세요.
+
+JSON 형식으로 반환:
+{{"results": [{{
+    "id": "입력 id",
+    "main_concerns": ["고민1", "고민2", "고민3"],
+    "desired_direction": "환자가 원하는 방향 설명",
+    "unwanted": "원하지 않는 것",
+    "mentioned_procedures": ["시술명1", "시술명2"],
+    "body_parts": ["부위1", "부위2"],
+    "keywords": ["키워드1", "키워드2", "키워드3"]
+}}]}}
+
+상담 목록 (한국어):
+{json.dumps(payload, ensure_ascii=False, indent=2)}"""
+
+    async def single_call(cid: str):
+        return await intent_extractor.extract_intent(texts[cid])
+
+    batched = await _run_batched(
+        "intent_extractor", texts, build_prompt, intent_extractor.SYSTEM_INSTRUCTION,
+        "keywords", single_call,
+    )
+    return {cid: _strip_id(value) for cid, value in batched.items()}
+
+
+async def classify_batch(items: dict[str, tuple[str, dict]]) -> dict[str, dict | Exception]:
+    """{id: (한국어 상담, 의도)} → {id: 분류 결과}. 사전 매칭으로 명확한 항목은 LLM 없이 분류"""
+    results: dict = {}
+    targets = {}
+    matches = {}
+    for cid, (text, intent) in items.items():
+        matches[cid] = classifier.match_keywords(text, intent)
+        local = classifier.classify_locally(matches[cid]) if CLASSIFIER_LOCAL_ENABLED else None
+        if not local and LOCAL_CLASSIFIER_ENABLED:
+            local = classifier.classify_with_model(text)
+        if local:
+            results[cid] = local
+        else:
+            targets[cid] = (text, intent)
+    keyword_hits = sum(1 for r in results.values() if r["method"] == "keyword")
+    if CLASSIFIER_LOCAL_ENABLED:
+        metrics.incr("classifier_local.hit", keyword_hits)
+        metrics.incr("classifier_local.miss", len(items) - keyword_hits)
+    if LOCAL_CLASSIFIER_ENABLED:
+        metrics.incr("classifier_model.hit", len(results) - keyword_hits)
+        metrics.incr("classifier_model.miss", len(targets))
+    if not targets:
+        return results
+
+    keyword_section = classifier.build_keyword_section()
+
+    def build_prompt(ids: list[str]) -> str:
+        payload = [
+            {
+                "id": cid,
+                "intent": targets[cid][1],
+                "keyword_matches": {
+                    "plastic_surgery": matches[cid]["plastic_surgery"],
+                    "dermatology": matches[cid]["dermatology"],
+                    "boundary": matches[cid]["boundary"],
+                },
+                "text": targets[cid][0],
+            }
+            for cid in ids
+        ]
+        return f"""다음 각 상담 내용을 피부과(dermatology) 또는 성형외과(plastic_surgery)로 분류하세요.
+
+{keyword_section}
+
+== 상담 목록 (의도 추출 결과 + 한국어 상담 내용) ==
+{json.dumps(payload, ensure_ascii=False, indent=2)}
+
+JSON 형식으로 반환:
+{{"results": [{{
+    "id": "입력 id",
+    "classification": "dermatology" 또는 "plastic_surgery" 또는 "unclassified",
+    "confidence": 0.0~1.0,
+    "reason": "분류 근거 설명 (한국어)"
+}}]}}"""
+
+    async def single_call(cid: str):
+        return await classifier.classify_consultation(targets[cid][0], targets[cid][1])
+
+    batched = await _run_batched(
+        "classifier", {cid: text for cid, (text, _) in targets.items()}, build_prompt,
+        classifier.SYSTEM_INSTRUCTION, "classification", single_call,
+    )
+    for cid, value in batched.items():
+        results[cid] = _strip_id(value)
+    return results
+
+
+async def validate_batch(items: dict[str, tuple[dict, str, dict]]) -> dict[str, dict | Exception]:
+    """{id: (분류 결과, 한국어 상담, 의도)} → {id: 검증 결과}. 고신뢰 항목은 LLM 없이 확정"""
+    results: dict = {}
+    targets = {}
+    for cid, (classification_result, text, intent) in items.items():
+        confirmed = validator.confirm_if_confident(classification_result)
+        if confirmed:
+            results[cid] = confirmed
+        else:
+            targets[cid] = (classification_result, text, intent)
+
+    def build_prompt(ids: list[str]) -> str:
+        payload = [
+            {
+                "id": cid,
+                "previous_classification": targets[cid][0].get("classification", "unclassified"),
+                "previous_confidence": targets[cid][0].get("confidence", 0.0),
+                "previous_reason": targets[cid][0].get("reason", ""),
+                "intent": targets[cid][2],
+                "text": targets[cid][1],
+            }
+            for cid in ids
+        ]
+        return f"""다음 각 상담의 이전 분류 결과를 검증해주세요.
+확실하지 않다면 "unclassified"로 반환하세요.
+
+검증 대상:
+{json.dumps(payload, ensure_ascii=False, indent=2)}
+
+JSON 형식:
+{{"results": [{{
+    "id": "입력 id",
+    "classification": "dermatology" 또는 "plastic_surgery" 또는 "unclassified",
+    "confidence": 0.0~1.0,
+    "reason": "검증 근거 설명",
+    "validated": true 또는 false
+}}]}}"""
+
+    async def single_call(cid: str):
+        return await validator.validate_classification(*targets[cid])
+
+    batched = await _run_batched(
+        "validator", {cid: text for cid, (_, text, _) in targets.items()}, build_prompt,
+        validator.SYSTEM_INSTRUCTION, "classification", single_call,
+    )
+    for cid, value in batched.items():
+        results[cid] = _strip_id(value)
+    return results
+
+
+def _strip_id(value):
+    if isinstance(value, dict):
+        return {k: v for k, v in value.items() if k != "id"}
+    return value
@@ -1,6 +1,18 @@
 import json
+import logging
+
+from config import (
+    CLASSIFIER_LOCAL_ENABLED,
+    CLASSIFIER_LOCAL_MIN_HITS,
+    LOCAL_CLASSIFIER_ENABLED,
+    LOCAL_CLASSIFIER_THRESHOLD,
+)
+from services import metrics
+from services.model_registry import get_loaded_model
 from services.gemini_client import generate_json, safe_parse_json
-from services.supabase_client import get_supabase
+from services.keyword_matcher import get_keyword_dictionary
+
+logger = logging.getLogger(__name__)
 
 SYSTEM_INSTRUCTION = """당신은 의료 상담 분류 전문가입니다.
 상담 내용을 분석하여 피부과(dermatology) 또는 성형외과(plastic_surgery)로 분류하세요.
@@ -12,32 +24,131 @@ SYSTEM_INSTRUCTION = """당신은 의료 상담 분류 전문가입니다.
 4. 맥락 단서 없으면 unclassified."""
 
 
+def build_keyword_section() -> str:
+    """분류 키워드 사전 + 경계 시술 규칙 프롬프트 섹션 (단건/일괄 분류 공용)"""
+    dictionary = get_keyword_dictionary()
+    plastic_keywords = dictionary.plastic
+    derma_keywords = dictionary.dermatology
+    boundary_keywords = list(dictionary.boundary)
+
+    return f"""== 분류 키워드 사전 ==
+성형외과 키워드: {', '.join(plastic_keywords)}
+피부과 키워드: {', '.join(derma_keywords)}
+경계 시술: {json.dumps(boundary_keywords, ensure_ascii=False)}
+
+== 경계 시술 분류 규칙 ==
+보톡스/필러가 언급된 경우:
+- 성형 맥락 동반 (코 높이기, 턱 끝, 윤곽, 이마 볼륨, 리프팅 실) → 성형외과
+- 피부 관리 맥락 동반 (레이저, 하이푸, 울쎄라, 피부결, 주름 개선, 탄력, 리쥬란) → 피부과
+- 맥락 단서 없음 → unclassified"""
+
+
+def match_keywords(translated_text: str, intent_extraction: dict) -> dict:
+    """상담 본문 + 의도 추출 결과의 사전 매칭 및 카테고리별 점수.
+    경계 시술(보톡스/필러)은 동반 키워드가 한쪽 맥락에만 있을 때 그 카테고리 점수로 계산"""
+    intent = intent_extraction if isinstance(intent_extraction, dict) else {}
+    intent_text = " ".join(
+        " ".join(v) if isinstance(v, list) else str(v or "")
+        for v in (
+            intent.get("main_concerns"), intent.get("mentioned_procedures"),
+            intent.get("body_parts"), intent.get("keywords"), intent.get("desired_direction"),
+        )
+    )
+    match = get_keyword_dictionary().match(f"{translated_text}\n{intent_text}")
+
+    scores = {
+        "plastic_surgery": len(match["plastic_surgery"]),
+        "dermatology": len(match["dermatology"]),
+    }
+    unresolved = []
+    for keyword in match["boundary"]:
+        contexts = [c for c in scores if match["context"][c]]
+        if len(contexts) == 1:
+            scores[contexts[0]] += 1
+        else:
+            unresolved.append(keyword)
+    return {**match, "scores": scores, "unresolved_boundary": unresolved}
+
+
+def classify_locally(match: dict) -> dict | None:
+    """사전 매칭만으로 판단이 명확하면 분류 결과, 애매하면 None (LLM 분류 대상).
+    명확 = 한쪽 점수가 CLASSIFIER_LOCAL_MIN_HITS 이상, 반대쪽 0, 맥락 없는 경계 시술 없음"""
+    scores = match["scores"]
+    winner = max(scores, key=scores.get)
+    loser = "dermatology" if winner == "plastic_surgery" else "plastic_surgery"
+    if scores[winner] < CLASSIFIER_LOCAL_MIN_HITS or scores[loser] > 0 or match["unresolved_boundary"]:
+        return None
+
+    evidence = match[winner] + [
+        f"{b}({', '.join(match['context'][winner])})" for b in match["boundary"]
+    ]
+    return {
+        "classification": winner,
+        "confidence": min(0.95, 0.75 + 0.05 * scores[winner]),
+        "reason": f"키워드 사전 매칭: {', '.join(evidence)}",
+        "method": "keyword",
+    }
+
+
+def classify_with_model(translated_text: str) -> dict | None:
+    """학습된 로컬 모델(TF-IDF + 선형 모델) 예측. 보정 확률이 임계값 미만이거나 모델이 없으면 None"""
+    loaded = get_loaded_model("classifier")
+    if not loaded or not translated_text:
+        return None
+    model, version = loaded
+    probabilities = model.predict_proba([translated_text])[0]
+    best = int(probabilities.argmax())
+    confidence = float(probabilities[best])
+    if confidence < LOCAL_CLASSIFIER_THRESHOLD:
+        return None
+    return {
+        "classification": str(model.classes_[best]),
+        "confidence": round(confidence, 4),
+        "reason": f"학습 분류 모델 예측 (확률 {confidence:.2f})",
+        "method": "model",
+        "model_version": version,
+    }
+
+
+def _match_summary(match: dict) -> str:
+    return f"""== 사전 매칭 결과 (참고) ==
+성형외과: {', '.join(match['plastic_surgery']) or '없음'}
+피부과: {', '.join(match['dermatology']) or '없음'}
+경계 시술: {', '.join(match['boundary']) or '없음'} (동반 맥락 - 성형: {', '.join(match['context']['plastic_surgery']) or '없음'}, 피부: {', '.join(match['context']['dermatology']) or '없음'})"""
+
+
 async def classify_consultation(
     translated_text: str, intent_extraction: dict
 ) -> dict:
-    db = get_supabase()
+    match = match_keywords(translated_text, intent_extraction)
+    if CLASSIFIER_LOCAL_ENABLED:
+        local = classify_locally(match)
+        if local:
+            metrics.incr("classifier_local.hit")
+            logger.info(f"[Classifier] Local verdict: {local['classification']} (scores={match['scores']})")
+            return local
+        metrics.incr("classifier_local.miss")
 
-    # DB에서 키워드 사전 조회
-    keywords_result = db.table("classification_keywords").select("*").execute()
-    keywords = keywords_result.data
+    if LOCAL_CLASSIFIER_ENABLED:
+        predicted = classify_with_model(translated_text)
+        if predicted:
+            metrics.incr("classifier_model.hit")
+            logger.info(f"[Classifier] Model verdict: {predicted['classification']} ({predicted['confidence']})")
+            return predicted
+        metrics.incr("classifier_model.miss")
 
-    # 키워드 목록 정리
-    plastic_keywords = [k["keyword"] for k in keywords if k["category"] == "plastic_surgery"]
-    derma_keywords = [k["keyword"] for k in keywords if k["category"] == "dermatology"]
-    boundary_keywords = [k for k in keywords if k["category"] == "boundary"]
+    return await classify_with_llm(translated_text, intent_extraction, match)
 
+
+async def classify_with_llm(translated_text: str, intent_extraction: dict, match: dict | None = None) -> dict:
+    """LLM 분류 (로컬 판단이 애매한 경우)"""
+    if match is None:
+        match = match_keywords(translated_text, intent_extraction)
     prompt = f"""다음 상담 내용을 피부과(dermatology) 또는 성형외과(plastic_surgery)로 분류하세요.
 
-== 분류 키워드 사전 ==
-성형외과 키워드: {', '.join(plastic_keywords)}
-피부과 키워드: {', '.join(derma_keywords)}
-경계 시술: {json.dumps([b['keyword'] for b in boundary_keywords], ensure_ascii=False)}
+{build_keyword_section()}
 
-== 경계 시술 분류 규칙 ==
-보톡스/필러가 언급된 경우:
-- 성형 맥락 동반 (코 높이기, 턱 끝, 윤곽, 이마 볼륨, 리프팅 실) → 성형외과
-- 피부 관리 맥락 동반 (레이저, 하이푸, 울쎄라, 피부결, 주름 개선, 탄력, 리쥬란) → 피부과
-- 맥락 단서 없음 → unclassified
+{_match_summary(match)}
 
 == 의도 추출 결과 ==
 {json.dumps(intent_extraction, ensure_ascii=False)}
@@ -1,4 +1,13 @@
+import logging
+import random
+
+from config import CTA_LOCAL_ENABLED, CTA_SHADOW_SAMPLE_RATE
+from services import metrics
 from services.gemini_client import generate_json, safe_parse_json
+from agents.cta_scorer import score_cta
+from agents.speaker_segmenter import Segmentation, segment_speakers
+
+logger = logging.getLogger(__name__)
 
 SYSTEM_INSTRUCTION_JA = """あなたはCRM分析の専門家です。カウンセリングの対話から以下を分析してください:
 
@@ -21,8 +30,113 @@ CTA 판정 기준:
 - Cool: 정보 탐색 단계 (예: "좀 궁금해서요", "아직 구체적으로는", "언젠가 기회가 되면")"""
 
 
+def _customer_utterances_ko(segmentation: Segmentation, translated_text: str, input_lang: str) -> str | None:
+    """고객 발화 (한국어). 번역은 줄 구조를 유지하므로 같은 분리를 번역문에 적용. 불가하면 None"""
+    if input_lang == "ko":
+        return "\n".join(segmentation.customer_texts())
+    projected = segmentation.project(translated_text)
+    if projected is None:
+        return None
+    return "\n".join(s["text"] for s in projected if s["speaker"] == "customer")
+
+
 async def analyze_cta(
     original_text: str, translated_text: str, input_lang: str = "ja"
+) -> dict:
+    # 1. 규칙 기반 화자 분리가 가능하면 고객 발화로 로컬 CTA 점수 계산
+    segmentation = segment_speakers(original_text)
+    if segmentation is None:
+        # 화자 분리부터 LLM에 맡기는 기존 경로
+        metrics.incr("cta_local.miss")
+        metrics.incr("cta_llm.full")
+        return await _analyze_with_llm(original_text, translated_text, input_lang)
+
+    customer = segmentation.customer_texts()
+    customer_ko = _customer_utterances_ko(segmentation, translated_text, input_lang)
+    local = score_cta(customer, input_lang)
+    result = {
+        "speaker_segments": segmentation.segments,
+        # 한국어 필드: 번역문에 화자 분리를 적용할 수 없으면 번역문 전체로 대체 (일본어 원문은 넣지 않음)
+        "customer_utterances": customer_ko if customer_ko is not None else translated_text,
+        "segmentation": segmentation.method,
+    }
+
+    if CTA_LOCAL_ENABLED and not local.uncertain:
+        metrics.incr("cta_local.hit")
+        logger.info(f"[CTA] Local verdict: {local.cta_level} (scores={local.scores}, segmentation={segmentation.method})")
+        result.update({
+            "cta_level": local.cta_level,
+            "cta_signals": local.signals,
+            "cta_signal_spans": local.spans,
+            "method": "lexicon",
+        })
+        # 확실 판정도 일부는 LLM으로 함께 판정해 시간에 따른 일치율 추적
+        if random.random() < CTA_SHADOW_SAMPLE_RATE:
+            try:
+                shadow = await _judge_customer_utterances(customer, input_lang, need_korean=False)
+                result["shadow_llm_cta"] = shadow.get("cta_level")
+                metrics.incr("cta_agreement.hit" if shadow.get("cta_level") == local.cta_level else "cta_agreement.miss")
+            except Exception as e:
+                logger.warning(f"[CTA] Shadow LLM check failed: {str(e)[:100]}")
+        return result
+
+    # 2. 불확실: 고객 발화만 LLM에 보내 CTA 판정 (화자 분리/상담사 발화/번역문 제외)
+    metrics.incr("cta_local.miss")
+    metrics.incr("cta_llm.customer_only")
+    judged = await _judge_customer_utterances(customer, input_lang, need_korean=customer_ko is None)
+    result.update({
+        "cta_level": judged.get("cta_level", "cool"),
+        "cta_signals": judged.get("cta_signals", []),
+        "method": "llm",
+        # 로컬 점수와 LLM 판정 일치율 기록 (agent_logs의 cta_analyzer 출력 + metrics)
+        "local_cta": {"cta_level": local.cta_level, "scores": local.scores, "uncertain": local.uncertain},
+    })
+    if customer_ko is None and judged.get("customer_utterances"):
+        result["customer_utterances"] = judged["customer_utterances"]
+    metrics.incr("cta_agreement.hit" if local.cta_level == result["cta_level"] else "cta_agreement.miss")
+    return result
+
+
+async def _judge_customer_utterances(customer: list[str], input_lang: str, need_korean: bool) -> dict:
+    """고객 발화만으로 CTA 판정. need_korean: 일본어 고객 발화의 한국어 번역도 함께 요청"""
+    utterances = "\n".join(f"- {u}" for u in customer)
+    if input_lang == "ko":
+        prompt = f"""다음은 상담 대화에서 고객 발화만 추출한 것입니다. 구매 의향 레벨을 판정해주세요.
+
+JSON 형식으로 반환:
+{{
+    "cta_level": "hot" or "warm" or "cool",
+    "cta_signals": ["근거가 되는 고객 발화1 (한국어)", "근거가 되는 고객 발화2 (한국어)"]
+}}
+
+고객 발화:
+{utterances}"""
+        system = SYSTEM_INSTRUCTION_KO
+    else:
+        korean_field = (
+            ',\n    "customer_utterances": "お客様の発話の韓国語翻訳 (改行区切り)"' if need_korean else ""
+        )
+        prompt = f"""以下はカウンセリングの対話からお客様の発話のみを抜き出したものです。購買意欲レベルを判定してください。
+
+JSON形式で返してください:
+{{
+    "cta_level": "hot" or "warm" or "cool",
+    "cta_signals": ["根拠となる日本語のお客様発話1", "根拠となる日本語のお客様発話2"]{korean_field}
+}}
+
+お客様の発話:
+{utterances}"""
+        system = SYSTEM_INSTRUCTION_JA
+
+    result = await generate_json(prompt, system)
+    data = safe_parse_json(result)
+    if isinstance(data, list):
+        data = data[0] if data else {}
+    return data
+
+
+async def _analyze_with_llm(
+    original_text: str, translated_text: str, input_lang: str = "ja"
 ) -> dict:
     if input_lang == "ko":
         # 한국어 입력: 한국어 대화를 직접 분석
@@ -0,0 +1,135 @@
+"""고객 발화 기반 로컬 CTA 점수 (사전/정규식).
+
+고객 발화에서 구매 의향 신호(Hot: 일정·비용·예약 질문 / Warm: 비교·고민 / Cool: 정보 탐색)를
+찾아 레벨과 근거 구간(span)을 밀리초 단위로 계산한다. 신호가 한쪽으로 충분히 모이지 않으면
+uncertain으로 표시하고, 이 경우에만 LLM 판정을 사용한다."""
+import re
+from dataclasses import dataclass
+
+# (신호 이름, 정규식) — 레벨별.
+# 단독으로 흔히 쓰이는 단어(予定, 카드, 얼마, 그냥, 날짜만 있는 "3月")는 의향 표현과 함께 나올 때만 신호로 본다
+_LEXICON: dict[str, dict[str, list[tuple[str, str]]]] = {
+    "ja": {
+        "hot": [
+            ("price", r"費用|料金|値段|価格|いくら|お見積|見積もり|支払い|分割|カード(払い|で(の)?(支払|払|決済))"),
+            ("schedule", r"\d+月(頃|中|末|上旬|中旬|下旬)?(に|で)?(行|伺|受け|手術|施術|来院|空き)|来月|今月|来週|日程|スケジュール|空いて|いつ(でき|から|頃)|予定を(立て|組|合わせ)"),
+            ("booking", r"予約|申し込|手術日|施術日|当日|カウンセリングの後"),
+            ("recovery", r"ダウンタイム|回復期間|腫れ.*(いつ|どれ)|抜糸|仕事.*休"),
+        ],
+        "warm": [
+            ("compare", r"他の(病院|クリニック)|比較|比べ"),
+            ("hesitate", r"迷って|悩んで|検討|考えて(み|い)|どうしよう|不安"),
+            ("consult_others", r"家族と|親と|夫と|彼と|相談して(から|み)"),
+            ("research", r"もう少し調べ|調べてみ"),
+        ],
+        "cool": [
+            ("curious", r"ちょっと気になって|なんとなく|興味本位|聞いてみたかった"),
+            ("not_yet", r"まだ具体的|まだ決めて|まだ先|今すぐでは|まだ予定は"),
+            ("someday", r"いつか|機会があれば|将来的に"),
+        ],
+    },
+    "ko": {
+        "hot": [
+            ("price", r"비용|가격|견적|결제|할부|얼마(예요|에요|인가요|죠|정도|나 (들|드|해|하|나와))|카드 ?(결제|할부|되|가능)"),
+            ("schedule", r"\d+월(쯤|중|말|초)?(에|에는)? ?(가|방문|받|수술|시술|예약)|다음 ?달|이번 ?달|다음 ?주|일정|스케줄|언제 ?(가능|되|부터)"),
+            ("booking", r"예약|신청|수술 ?날짜|시술 ?날짜|당일"),
+            ("recovery", r"다운타임|회복 ?기간|붓기.*(언제|얼마)|실밥|휴가"),
+        ],
+        "warm": [
+            ("compare", r"다른 병원|비교"),
+            ("hesitate", r"고민|망설|생각해 ?보|생각 ?중|걱정|불안"),
+            ("consult_others", r"가족(과|이랑|하고)|부모님|남편|남자친구|상의"),
+            ("research", r"좀 더 알아보|알아보고"),
+        ],
+        "cool": [
+            ("curious", r"궁금해서|그냥 (궁금|물어|알아|여쭤)|호기심"),
+            ("not_yet", r"아직 (구체적|정하|결정|생각)|당장은"),
+            ("someday", r"언젠가|기회가 되면|나중에"),
+        ],
+    },
+}
+
+# 부정/유보 표현. 같은 절(句読点/쉼표 단위)에 있으면 Hot/Warm 신호로 세지 않는다
+# ("まだ予定はありません", "카드 없어요", "불안하지 않아요")
+_NEGATION = {
+    "ja": r"ありません|ないです|ないので|ないけど|ないんです|ない$|しません|つもりはな|分かりません|わかりません|まだ(決|考|迷|わから|分から)",
+    "ko": r"없어|없습니다|없고|없는데|없$|않|안 ?(할|하|받)|아직|모르겠",
+}
+
+# 절 단위 분리 (부정 표현의 적용 범위)
+_CLAUSE = re.compile(r"[^。．.!?！？、,，\n]+")
+
+_COMPILED = {
+    lang: {
+        level: [(name, re.compile(pattern)) for name, pattern in signals]
+        for level, signals in levels.items()
+    }
+    for lang, levels in _LEXICON.items()
+}
+_NEGATION_COMPILED = {lang: re.compile(pattern) for lang, pattern in _NEGATION.items()}
+
+# 부정 표현이 있는 절에서 무시하는 레벨 (Cool 신호는 그 자체가 유보 표현)
+_NEGATABLE_LEVELS = {"hot", "warm"}
+
+# 레벨 동점 시 우선순위
+_LEVEL_ORDER = ["hot", "warm", "cool"]
+
+
+@dataclass
+class CTAScore:
+    cta_level: str
+    scores: dict[str, int]
+    spans: list[dict]
+    uncertain: bool
+
+    @property
+    def signals(self) -> list[str]:
+        """근거 고객 발화 (cta_signals 형식, 중복 제거)"""
+        return list(dict.fromkeys(span["utterance"] for span in self.spans if span["level"] == self.cta_level))
+
+    def to_dict(self) -> dict:
+        return {
+            "cta_level": self.cta_level,
+            "scores": self.scores,
+            "uncertain": self.uncertain,
+            "spans": self.spans,
+        }
+
+
+def score_cta(utterances: list[str], lang: str = "ja") -> CTAScore:
+    """고객 발화 목록의 CTA 점수. 점수 = 레벨별로 검출된 서로 다른 신호 종류 수"""
+    lang = lang if lang in _COMPILED else "ja"
+    lexicon = _COMPILED[lang]
+    negation = _NEGATION_COMPILED[lang]
+    spans = []
+    found: dict[str, set[str]] = {level: set() for level in _LEVEL_ORDER}
+    for index, utterance in enumerate(utterances):
+        for clause in _CLAUSE.finditer(utterance):
+            text = clause.group(0).strip()
+            negated = bool(negation.search(text))
+            for level, signals in lexicon.items():
+                if negated and level in _NEGATABLE_LEVELS:
+                    continue
+                for name, pattern in signals:
+                    m = pattern.search(clause.group(0))
+                    if m:
+                        found[level].add(name)
+                        spans.append({
+                            "utterance_index": index,
+                            "start": clause.start() + m.start(),
+                            "end": clause.start() + m.end(),
+                            "match": m.group(0),
+                            "signal": name,
+                            "level": level,
+                            "utterance": utterance.strip(),
+                        })
+
+    scores = {level: len(names) for level, names in found.items()}
+    ranked = sorted(_LEVEL_ORDER, key=lambda level: (-scores[level], _LEVEL_ORDER.index(level)))
+    top, second = ranked[0], ranked[1]
+
+    # 확실: 최상위 레벨 신호가 서로 다른 2종 이상이고 다른 레벨의 2배 이상.
+    # 신호 1종만으로는 (Hot 포함) 확실로 보지 않고 LLM 판정에 맡긴다
+    uncertain = not (scores[top] >= 2 and scores[top] >= 2 * scores[second])
+    level = top if scores[top] > 0 else "cool"
+    return CTAScore(cta_level=level, scores=scores, spans=spans, uncertain=uncertain)
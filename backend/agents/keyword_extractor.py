@@ -0,0 +1,297 @@
+"""로컬 한국어 키워드 추출 (형태소 분석 + 시술/부위 사전).
+
+의도 추출 LLM의 keywords는 비어 있거나 장황한 경우가 있어, 번역문에서 검색용 키워드를
+수 ms 안에 직접 뽑아 보완한다. LLM 응답 전에 RAG 검색(임베딩)을 시작하거나,
+짧고 단순한 상담은 의도 추출 호출을 생략하는 데에도 사용한다.
+- 사전(gazetteer): faq_vectors.procedure_name + classification_keywords + 기본 부위 목록
+- 형태소 분석: kiwipiepy가 설치되어 있으면 명사 추출, 없으면 정규식 토큰 + 조사/어미 제거"""
+import asyncio
+import logging
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass
+
+from config import GAZETTEER_REFRESH_SECONDS, GAZETTEER_MIN_REBUILD_SECONDS
+from services.keyword_matcher import AhoCorasick, get_keyword_dictionary
+from services.rag_cache import corpus_version
+from services.supabase_client import get_supabase
+from services.korean_text import content_stem
+
+logger = logging.getLogger(__name__)
+
+# 한 글자 부위("코", "눈", "턱")는 다른 단어 안에서도 매칭되므로 토큰 단위로만 인정
+_BODY_PARTS = [
+    "눈", "코", "입", "턱", "볼", "이마", "눈썹", "눈꺼풀", "눈밑", "쌍꺼풀", "콧대", "코끝", "콧볼",
+    "광대", "사각턱", "앞턱", "입술", "입꼬리", "인중", "팔자", "관자놀이", "얼굴", "얼굴형",
+    "피부", "모공", "목", "가슴", "복부", "허벅지", "팔뚝", "종아리", "두피", "헤어라인",
+]
+
+# 상담문에 흔하지만 검색 근거로는 의미 없는 명사
+_STOPWORDS = {
+    "상담", "고객", "환자", "선생님", "원장님", "실장님", "병원", "클리닉", "시술", "수술", "치료",
+    "정도", "생각", "부분", "느낌", "경우", "때문", "이번", "다음", "지금", "요즘", "처음", "정말",
+    "진짜", "조금", "많이", "그냥", "혹시", "문의", "질문", "말씀", "얘기", "이야기", "사람", "자신",
+    "저희", "우리", "제가", "저는", "이것", "그것", "무엇", "어떤", "어느", "여기", "거기", "예약",
+    "비용", "가격", "일정", "감사", "안녕", "안녕하세요", "네", "아니요",
+}
+
+_PROCEDURE_NAME_SPLIT = re.compile(r"[,/・·()（）\[\]]|\s+및\s+|\s+또는\s+")
+
+# 정규식 분리 시 술어로 보고 버리는 어말 (조사/어미 제거 후에도 남은 경우)
+_PREDICATE_ENDINGS = ("요", "다", "까", "죠", "네", "는데", "니까", "어서", "아서", "지만", "면서")
+
+try:
+    import kiwipiepy
+except ImportError:
+    kiwipiepy = None
+
+TOKENIZER = "kiwi" if kiwipiepy is not None else "regex"
+_kiwi = None
+
+
+def _compact(text: str) -> str:
+    return "".join(unicodedata.normalize("NFKC", text or "").casefold().split())
+
+
+@dataclass
+class Gazetteer:
+    """시술명/부위 사전. 시술명은 공백 제거 후 Aho-Corasick으로 본문 전체에서 검출"""
+    procedures: dict[str, str]   # compact → 표시형
+    body_parts: dict[str, str]
+    version: int = 0
+    corpus_version: int = 0
+
+    def __post_init__(self):
+        self._automaton = AhoCorasick(sorted(self.procedures))
+
+    def find_procedures(self, text: str) -> Counter:
+        """본문에 등장한 시술명 (표시형 → 등장 횟수). 긴 시술명에 포함된 짧은 시술명은 제외"""
+        found = Counter()
+        spans = []
+        for end, pattern in self._automaton.find_all(_compact(text)):
+            spans.append((end - len(pattern) + 1, end, pattern))
+        for start, end, pattern in spans:
+            if any(s <= start and end <= e and len(p) > len(pattern) for s, e, p in spans):
+                continue
+            found[self.procedures[pattern]] += 1
+        return found
+
+
+def _split_procedure_name(name: str) -> list[str]:
+    return [part.strip() for part in _PROCEDURE_NAME_SPLIT.split(name or "") if len(part.strip()) >= 2]
+
+
+def _fetch_procedure_names(db) -> list[str]:
+    names = []
+    offset = 0
+    while True:
+        page = (
+            db.table("faq_vectors").select("procedure_name")
+            .not_.is_("procedure_name", "null")
+            .range(offset, offset + 999)
+            .execute()
+        )
+        names.extend(row["procedure_name"] for row in page.data)
+        if len(page.data) < 1000:
+            break
+        offset += 1000
+    return names
+
+
+def _build_gazetteer() -> Gazetteer:
+    dictionary = get_keyword_dictionary()
+    corpus = corpus_version()
+    procedures: dict[str, str] = {}
+    for name in set(_fetch_procedure_names(get_supabase())):
+        for term in _split_procedure_name(name):
+            procedures.setdefault(_compact(term), term)
+    for keyword in [*dictionary.plastic, *dictionary.dermatology, *dictionary.boundary]:
+        if len(_compact(keyword)) >= 2:
+            procedures.setdefault(_compact(keyword), keyword)
+    # 부위명은 시술명 검출에서 제외 (토큰 단위로 따로 처리)
+    body_parts = {_compact(p): p for p in _BODY_PARTS}
+    for key in body_parts:
+        procedures.pop(key, None)
+    return Gazetteer(procedures, body_parts, version=dictionary.version, corpus_version=corpus)
+
+
+_gazetteer: Gazetteer | None = None
+_loaded_at = 0.0
+_checked_at = 0.0
+_refreshing = False
+_refresh_tasks: set[asyncio.Task] = set()
+_lock = threading.Lock()
+
+
+def _is_stale(gazetteer: Gazetteer | None) -> bool:
+    if gazetteer is None or time.time() - _loaded_at >= GAZETTEER_REFRESH_SECONDS:
+        return True
+    return (
+        get_keyword_dictionary().version != gazetteer.version
+        or corpus_version() != gazetteer.corpus_version
+    )
+
+
+def _refresh():
+    """버전 확인 후 바뀌었으면 사전 재구성 (전체 스캔이므로 이벤트 루프 밖에서 실행)"""
+    global _gazetteer, _loaded_at, _refreshing
+    try:
+        if not _is_stale(_gazetteer):
+            return
+        gazetteer = _build_gazetteer()
+        with _lock:
+            _gazetteer = gazetteer
+            _loaded_at = time.time()
+        logger.info(
+            f"[KeywordExtractor] Gazetteer loaded: {len(gazetteer.procedures)} procedures, "
+            f"{len(gazetteer.body_parts)} body parts (tokenizer={TOKENIZER})"
+        )
+    except Exception as e:
+        logger.warning(f"[KeywordExtractor] Gazetteer refresh failed: {str(e)[:100]}")
+    finally:
+        with _lock:
+            _refreshing = False
+
+
+def _claim_refresh(force: bool = False) -> bool:
+    """재구성은 한 번에 하나, 최소 간격(GAZETTEER_MIN_REBUILD_SECONDS)마다 한 번만"""
+    global _checked_at, _refreshing
+    with _lock:
+        now = time.time()
+        if _refreshing or (not force and now - _checked_at < GAZETTEER_MIN_REBUILD_SECONDS):
+            return False
+        _refreshing = True
+        _checked_at = now
+        return True
+
+
+def _schedule_refresh():
+    if not _claim_refresh():
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # 이벤트 루프 밖(스크립트/워커 스레드)에서는 그 자리에서 재구성
+        _refresh()
+        return
+    task = loop.create_task(asyncio.to_thread(_refresh))
+    _refresh_tasks.add(task)
+    task.add_done_callback(_refresh_tasks.discard)
+
+
+def _empty_gazetteer() -> Gazetteer:
+    """사전 구성 전(기동 직후) 임시 사전: 부위명만"""
+    return Gazetteer({}, {_compact(p): p for p in _BODY_PARTS})
+
+
+def get_gazetteer() -> Gazetteer:
+    """캐시된 사전을 바로 반환. 분류 키워드/FAQ 코퍼스 버전 확인과 재구성은 백그라운드에서
+    최소 간격마다 한 번만 하고, 재구성이 끝날 때까지 기존 사전을 계속 사용"""
+    _schedule_refresh()
+    return _gazetteer or _empty_gazetteer()
+
+
+def load_gazetteer():
+    """앱 기동 시 사전 미리 구성 (실패하면 이후 요청에서 최소 간격마다 다시 시도)"""
+    if _claim_refresh(force=True):
+        _refresh()
+
+
+def _get_kiwi():
+    global _kiwi
+    if _kiwi is None:
+        _kiwi = kiwipiepy.Kiwi()
+    return _kiwi
+
+
+def _nouns(text: str) -> list[str]:
+    """명사 목록 (연속된 명사/외국어는 복합명사 하나로 결합)"""
+    if kiwipiepy is not None:
+        nouns = []
+        compound: list[str] = []
+        for token in _get_kiwi().tokenize(text):
+            if token.tag in ("NNG", "NNP", "SL") or (token.tag == "XSN" and compound):
+                compound.append(token.form)
+                continue
+            if compound:
+                nouns.append("".join(compound))
+                compound = []
+        if compound:
+            nouns.append("".join(compound))
+        return nouns
+
+    nouns = []
+    for token in re.findall(r"[가-힣A-Za-z0-9]+", text):
+        token = content_stem(token)
+        if token is None or token.endswith(_PREDICATE_ENDINGS):
+            continue
+        nouns.append(token)
+    return nouns
+
+
+def extract_keywords(text: str, limit: int = 10) -> dict:
+    """검색용 키워드 추출.
+    반환: {"keywords": [...], "procedures": [...], "body_parts": [...], "tokenizer": "kiwi"|"regex"}
+    순서: 사전 시술명(등장 횟수순) → 부위 → 빈도 높은 일반 명사"""
+    gazetteer = get_gazetteer()
+    procedures = [term for term, _ in gazetteer.find_procedures(text).most_common()]
+
+    nouns = _nouns(text)
+    body_parts = list(dict.fromkeys(
+        gazetteer.body_parts[_compact(noun)] for noun in nouns if _compact(noun) in gazetteer.body_parts
+    ))
+
+    covered = " ".join(_compact(term) for term in procedures + body_parts)
+    counts = Counter(
+        noun for noun in nouns
+        if len(noun) >= 2 and not noun.isdigit() and noun not in _STOPWORDS
+        and _compact(noun) not in covered
+    )
+    # 두 번 이상 나온 일반 명사 우선. 한 번만 나온 명사는 형태소 분석 결과일 때만 자리가 남으면 포함
+    # (정규식 분리는 "받고" 같은 용언 활용형이 섞이므로 제외)
+    general = [noun for noun, count in counts.most_common() if count >= 2]
+    if TOKENIZER == "kiwi":
+        general += [noun for noun, count in counts.most_common() if count == 1]
+
+    keywords = list(dict.fromkeys(procedures + body_parts + general))[:limit]
+    return {
+        "keywords": keywords,
+        "procedures": procedures,
+        "body_parts": body_parts,
+        "tokenizer": TOKENIZER,
+    }
+
+
+def merge_keywords(primary: list[str], extra: list[str], limit: int = 10) -> list[str]:
+    """primary 우선으로 합치고 공백/대소문자 차이만 있는 중복은 제거"""
+    merged, seen = [], set()
+    for keyword in [*(primary or []), *(extra or [])]:
+        if not isinstance(keyword, str) or not keyword.strip():
+            continue
+        key = _compact(keyword)
+        if key in seen:
+            continue
+        seen.add(key)
+        merged.append(keyword.strip())
+    return merged[:limit]
+
+
+def is_simple_consultation(text: str, extraction: dict, max_chars: int) -> bool:
+    """짧고 시술명이 분명한 상담: LLM 의도 추출 없이 로컬 결과만으로 진행 가능"""
+    return 0 < len(text) <= max_chars and len(extraction["procedures"]) >= 1
+
+
+def build_local_intent(extraction: dict) -> dict:
+    """LLM 의도 추출과 같은 구조의 로컬 결과 (서술형 항목은 비워 둠)"""
+    return {
+        "main_concerns": extraction["procedures"][:5],
+        "desired_direction": "",
+        "unwanted": "",
+        "mentioned_procedures": extraction["procedures"],
+        "body_parts": extraction["body_parts"],
+        "keywords": extraction["keywords"],
+        "source": "local",
+    }
@@ -1,5 +1,14 @@
+import asyncio
+import hashlib
 import json
+import logging
+
+from config import REPORT_TRANSLATION_CONCURRENCY, REPORT_TRANSLATION_EAGER
+from services import metrics
 from services.gemini_client import generate_json, safe_parse_json
+from services.supabase_client import get_supabase
+
+logger = logging.getLogger(__name__)
 
 SYSTEM_INSTRUCTION = """당신은 일본어→한국어 의료 문서 번역 전문가입니다.
 일본어 리포트 JSON을 동일한 구조의 한국어 버전으로 번역하세요.
@@ -12,17 +21,148 @@ SYSTEM_INSTRUCTION = """당신은 일본어→한국어 의료 문서 번역 전
 - 날짜, 숫자는 원문 그대로 유지"""
 
 
-async def translate_report_to_korean(report_data: dict) -> dict:
-    prompt = f"""다음 일본어 리포트 JSON을 한국어로 번역하세요.
-JSON 구조는 그대로 유지하고 텍스트만 한국어로 번역하세요.
+def section_hash(key: str, value) -> str:
+    canonical = json.dumps(value, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(f"{key}\n{canonical}".encode("utf-8")).hexdigest()
+
+
+async def _translate_section(key: str, value):
+    prompt = f"""다음은 일본어 리포트의 "{key}" 섹션입니다. 한국어로 번역하세요.
+JSON 구조(키 이름 포함)는 그대로 유지하고 텍스트 값만 한국어로 번역하세요.
 
 원본 JSON:
-{json.dumps(report_data, ensure_ascii=False, indent=2)}
+{json.dumps({key: value}, ensure_ascii=False, indent=2)}
 
-한국어 번역된 동일 구조의 JSON을 반환하세요."""
+{{"{key}": 한국어 번역된 동일 구조의 값}} 형식의 JSON을 반환하세요."""
 
     result = await generate_json(prompt, SYSTEM_INSTRUCTION)
     data = safe_parse_json(result)
     if isinstance(data, list):
         data = data[0] if data else {}
-    return data
+    if not isinstance(data, dict) or key not in data:
+        raise ValueError(f"Section '{key}' translation missing from response")
+    return data[key]
+
+
+async def translate_report_to_korean(report_data: dict) -> dict:
+    """섹션(최상위 키) 단위로 번역. 내용 해시가 같은 섹션은 캐시를 재사용하고
+    바뀐 섹션만 동시에 번역한다"""
+    db = get_supabase()
+    hashes = {key: section_hash(key, value) for key, value in report_data.items()}
+
+    cached_rows = await asyncio.to_thread(
+        lambda: db.table("report_section_translations")
+        .select("section_hash, translated")
+        .in_("section_hash", list(set(hashes.values())))
+        .execute()
+    )
+    cached = {row["section_hash"]: row["translated"] for row in cached_rows.data or []}
+    missing = [key for key in report_data if hashes[key] not in cached]
+    metrics.incr("report_translation.hit", len(report_data) - len(missing))
+    metrics.incr("report_translation.miss", len(missing))
+    logger.info(f"[ReportTranslator] {len(report_data) - len(missing)}/{len(report_data)} sections cached, translating {len(missing)}")
+
+    semaphore = asyncio.Semaphore(REPORT_TRANSLATION_CONCURRENCY)
+
+    async def _run(key: str):
+        async with semaphore:
+            return await _translate_section(key, report_data[key])
+
+    translated = dict(zip(missing, await asyncio.gather(*[_run(key) for key in missing])))
+    if translated:
+        rows = [
+            {"section_hash": hashes[key], "section_key": key, "translated": value}
+            for key, value in translated.items()
+        ]
+        await asyncio.to_thread(
+            lambda: db.table("report_section_translations")
+            .upsert(rows, on_conflict="section_hash", ignore_duplicates=True)
+            .execute()
+        )
+
+    return {
+        key: translated[key] if key in translated else cached[hashes[key]]
+        for key in report_data
+    }
+
+
+# ========================================
+# 리포트 단위 번역 (동시 요청 1회로 합침 + 결과 저장)
+# ========================================
+# (report_id, report_data 해시) → 번역 작업. 수정/재생성 후 요청은 이전 내용의 작업에 합류하지 않음
+# (reports.updated_at은 report_data_ko 저장 시에도 트리거로 바뀌므로 내용 해시를 키로 사용)
+_inflight: dict[tuple[str, str], asyncio.Task] = {}
+_background: set[asyncio.Task] = set()
+
+# 번역 중 내용이 계속 바뀌는 경우 재시도 한도
+_MAX_ATTEMPTS = 3
+
+
+def report_hash(report_data: dict) -> str:
+    canonical = json.dumps(report_data, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+async def _load_report(report_id: str) -> dict:
+    db = get_supabase()
+    report = await asyncio.to_thread(
+        lambda: db.table("reports").select("report_data, report_data_ko, updated_at").eq("id", report_id).single().execute()
+    )
+    if not report.data:
+        raise LookupError(report_id)
+    return report.data
+
+
+async def _translate_and_store(report_id: str, report: dict) -> dict:
+    report_data_ko = await translate_report_to_korean(report["report_data"])
+
+    # 번역 중 리포트가 수정/재생성되었으면 저장하지 않음 (섹션 캐시는 이미 저장됨)
+    db = get_supabase()
+    await asyncio.to_thread(
+        lambda: db.table("reports")
+        .update({"report_data_ko": report_data_ko})
+        .eq("id", report_id)
+        .eq("updated_at", report["updated_at"])
+        .execute()
+    )
+    return report_data_ko
+
+
+async def get_report_korean(report_id: str) -> tuple[dict, bool]:
+    """리포트 한국어 번역 (report_data_ko, cached). 같은 내용에 대한 동시 요청은 한 번만 번역.
+    번역이 끝난 뒤 리포트 내용이 바뀌었으면 결과를 버리고 현재 내용으로 다시 번역"""
+    translated: tuple[str, dict] | None = None
+    for _ in range(_MAX_ATTEMPTS):
+        report = await _load_report(report_id)
+        content_hash = report_hash(report["report_data"])
+        if translated is not None and translated[0] == content_hash:
+            return translated[1], False
+        if report.get("report_data_ko"):
+            return report["report_data_ko"], True
+
+        key = (report_id, content_hash)
+        task = _inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(_translate_and_store(report_id, report))
+            _inflight[key] = task
+            task.add_done_callback(lambda _, key=key: _inflight.pop(key, None))
+        # 요청이 끊겨도 공유 작업은 계속 진행
+        translated = (content_hash, await asyncio.shield(task))
+
+    raise RuntimeError(f"Report {report_id} kept changing during translation")
+
+
+def schedule_report_translation(report_id: str):
+    """report_ready 시점에 백그라운드로 미리 번역 (관리자 화면 즉시 표시용)"""
+    if not REPORT_TRANSLATION_EAGER:
+        return
+
+    async def _precompute():
+        try:
+            await get_report_korean(report_id)
+        except Exception as e:
+            logger.warning(f"[ReportTranslator] Eager translation failed for {report_id[:8]}: {str(e)[:100]}")
+
+    task = asyncio.create_task(_precompute())
+    _background.add(task)
+    task.add_done_callback(_background.discard)
@@ -1,18 +1,36 @@
+import asyncio
 import json
 import logging
 import time
 import uuid
 from datetime import datetime, timedelta, timezone
 
+from config import (
+    DEDUP_REUSE_ENABLED,
+    DEDUP_CLONE_REPORT,
+    SPECULATIVE_RAG_ENABLED,
+    SPECULATIVE_RAG_BORDERLINE,
+    PIPELINE_CONCURRENCY,
+    INTENT_KEYWORDS_MODE,
+    INTENT_LOCAL_SKIP_MAX_CHARS,
+)
+from services import metrics
+from services.pipeline_scheduler import get_scheduler, JobPriority
 from services.supabase_client import get_supabase
+from services.dedup import compute_content_hash
 from agents.translator import translate_to_korean
 from agents.cta_analyzer import analyze_cta
 from agents.intent_extractor import extract_intent
 from agents.classifier import classify_consultation
 from agents.validator import validate_classification
-from agents.rag_agent import search_relevant_faq
+from agents.rag_agent import search_relevant_faq, search_incremental, embed_keywords, SpeculativeSearch
+from agents.keyword_extractor import (
+    extract_keywords, merge_keywords, is_simple_consultation, build_local_intent,
+)
 from agents.report_writer import write_report
 from agents.report_reviewer import review_report
+from agents.korean_translator import schedule_report_translation
+from agents.batch_agents import translate_batch, extract_intent_batch, classify_batch, validate_batch
 
 logger = logging.getLogger(__name__)
 
@@ -45,7 +63,218 @@ async def _update_consultation(consultation_id: str, data: dict):
     db.table("consultations").update(data).eq("id", consultation_id).execute()
 
 
-async def run_pipeline(consultation_id: str):
+# ========================================
+# 단계별 결과 저장 (단건/일괄 파이프라인 공용)
+# ========================================
+async def _save_translation(consultation_id: str, translated_text: str, input_lang: str, duration: int, batch_size: int | None = None):
+    input_data = {"input_lang": input_lang}
+    if batch_size:
+        input_data["batch_size"] = batch_size
+    await _log_agent(consultation_id, "translator", input_data, {"translated_text": translated_text[:200]}, duration, "success")
+    await _update_consultation(consultation_id, {
+        "translated_text": translated_text,
+        "input_language": input_lang,
+    })
+
+
+async def _save_cta(consultation_id: str, cta_result: dict, duration: int):
+    await _log_agent(consultation_id, "cta_analyzer", None, cta_result, duration, "success")
+    await _update_consultation(consultation_id, {
+        "speaker_segments": cta_result.get("speaker_segments"),
+        "customer_utterances": cta_result.get("customer_utterances", ""),
+        "cta_level": cta_result.get("cta_level", "cool"),
+        "cta_signals": cta_result.get("cta_signals"),
+    })
+
+
+async def _save_intent(consultation_id: str, intent: dict, duration: int, batch_size: int | None = None):
+    input_data = {"batch_size": batch_size} if batch_size else None
+    await _log_agent(consultation_id, "intent_extractor", input_data, intent, duration, "success")
+    await _update_consultation(consultation_id, {"intent_extraction": intent})
+
+
+async def _save_validation(consultation_id: str, validation: dict, duration: int, batch_size: int | None = None) -> str:
+    """검증 결과 저장 후 최종 분류 반환"""
+    input_data = {"batch_size": batch_size} if batch_size else None
+    await _log_agent(consultation_id, "validator", input_data, validation, duration, "success")
+    final_classification = validation.get("classification", "unclassified")
+    await _update_consultation(consultation_id, {
+        "classification": final_classification,
+        "classification_confidence": validation.get("confidence", 0.0),
+        "classification_reason": validation.get("reason", ""),
+        "classification_method": validation.get("method", "llm"),
+    })
+    return final_classification
+
+
+def _local_keywords(translated_text: str) -> dict | None:
+    """로컬 키워드 추출 (INTENT_KEYWORDS_MODE=llm이거나 실패하면 None)"""
+    if INTENT_KEYWORDS_MODE == "llm":
+        return None
+    try:
+        return extract_keywords(translated_text)
+    except Exception as e:
+        logger.warning(f"[Pipeline] Local keyword extraction failed: {str(e)[:100]}")
+        return None
+
+
+def _apply_local_keywords(intent: dict, local: dict | None, early: bool = False) -> dict:
+    """LLM 의도 추출 결과에 로컬 키워드 반영. early면 검색 키워드를 로컬 키워드로 고정
+    (미리 시작한 임베딩을 그대로 쓰기 위해)"""
+    if not local:
+        return intent
+    llm_keywords = intent.get("keywords") or []
+    if not llm_keywords:
+        metrics.incr("intent_local.llm_empty")
+    intent["llm_keywords"] = llm_keywords
+    intent["local_keywords"] = local["keywords"]
+    if early and local["keywords"]:
+        intent["keywords"] = local["keywords"]
+    else:
+        intent["keywords"] = merge_keywords(llm_keywords, local["keywords"])
+    return intent
+
+
+async def _extract_intent(translated_text: str) -> tuple[dict, asyncio.Task | None]:
+    """의도 추출 + 로컬 키워드. early 모드면 로컬 키워드 임베딩 태스크를 함께 반환"""
+    local = _local_keywords(translated_text)
+    if local and INTENT_LOCAL_SKIP_MAX_CHARS and is_simple_consultation(
+        translated_text, local, INTENT_LOCAL_SKIP_MAX_CHARS,
+    ):
+        metrics.incr("intent_local.skip")
+        return build_local_intent(local), None
+
+    early = INTENT_KEYWORDS_MODE == "early" and bool(local and local["keywords"])
+    keyword_embedding = asyncio.create_task(embed_keywords(local["keywords"])) if early else None
+    try:
+        intent = await extract_intent(translated_text)
+    except Exception:
+        _discard_task(keyword_embedding)
+        raise
+    return _apply_local_keywords(intent, local, early=early), keyword_embedding
+
+
+def _discard_task(task: asyncio.Task | None):
+    """쓰지 않게 된 태스크 정리 (예외가 "never retrieved" 경고로 남지 않도록 소비)"""
+    if task is None:
+        return
+    if not task.done():
+        task.cancel()
+    elif not task.cancelled():
+        task.exception()
+
+
+# 결과를 재사용할 수 있는 상담 상태 (파이프라인이 정상 종료된 경우만. 처리 중/실패 제외)
+_REUSABLE_STATUSES = ["classification_pending", "report_ready", "report_approved", "report_sent"]
+# 복제할 수 있는 리포트 상태 (반려된 리포트 제외)
+_CLONEABLE_REPORT_STATUSES = ["draft", "approved", "sent"]
+
+
+def _find_reusable_consultation(consultation_id: str, content_hash: str) -> dict | None:
+    """같은 원문 해시를 가진, 파이프라인이 정상 종료된 다른 상담을 조회"""
+    db = get_supabase()
+    result = (
+        db.table("consultations")
+        .select("*")
+        .eq("content_hash", content_hash)
+        .neq("id", consultation_id)
+        .in_("status", _REUSABLE_STATUSES)
+        .not_.is_("translated_text", "null")
+        .not_.is_("intent_extraction", "null")
+        .not_.is_("classification", "null")
+        .order("updated_at", desc=True)
+        .limit(1)
+        .execute()
+    )
+    return result.data[0] if result.data else None
+
+
+async def _reuse_consultation_results(consultation: dict, donor: dict):
+    """동일 원문 상담의 번역/CTA/의도/분류 결과를 복사 (LLM 호출 없음)"""
+    db = get_supabase()
+    consultation_id = consultation["id"]
+    donor_id = donor["id"]
+
+    logger.info(f"[Pipeline:{consultation_id[:8]}] Exact duplicate of {donor_id[:8]} — reusing results")
+    start = time.time()
+
+    intent = donor["intent_extraction"]
+    if isinstance(intent, list):
+        intent = intent[0] if intent else {}
+    classification = donor["classification"]
+    input_lang = donor.get("input_language", "ja")
+
+    await _update_consultation(consultation_id, {
+        "translated_text": donor["translated_text"],
+        "input_language": input_lang,
+        "speaker_segments": donor.get("speaker_segments"),
+        "customer_utterances": donor.get("customer_utterances", ""),
+        "cta_level": donor.get("cta_level") or "cool",
+        "cta_signals": donor.get("cta_signals"),
+        "intent_extraction": intent,
+        "classification": classification,
+        "classification_confidence": donor.get("classification_confidence"),
+        "classification_reason": donor.get("classification_reason"),
+        "classification_method": donor.get("classification_method"),
+        "is_manually_classified": donor.get("is_manually_classified", False),
+        "reused_from": donor_id,
+    })
+
+    # 리포트 복제: 고객명이 같을 때만 (리포트 제목/본문에 고객명이 들어가므로).
+    # 반려된 리포트뿐이면 복제하지 않고 새로 생성
+    donor_report = None
+    if DEDUP_CLONE_REPORT and classification != "unclassified" and donor.get("customer_name") == consultation.get("customer_name"):
+        report_result = (
+            db.table("reports")
+            .select("report_data, rag_context, rag_query_terms, review_count, review_passed")
+            .eq("consultation_id", donor_id)
+            .in_("status", _CLONEABLE_REPORT_STATUSES)
+            .order("created_at", desc=True)
+            .limit(1)
+            .execute()
+        )
+        donor_report = report_result.data[0] if report_result.data else None
+
+    duration = int((time.time() - start) * 1000)
+    await _log_agent(
+        consultation_id, "dedup_reuse", {"reused_from": donor_id},
+        {"classification": classification, "report_cloned": donor_report is not None},
+        duration, "success",
+    )
+
+    if classification == "unclassified":
+        await _update_consultation(consultation_id, {"status": "classification_pending"})
+        return
+
+    if donor_report:
+        now = datetime.now(timezone.utc)
+        inserted = db.table("reports").insert(
+            {
+                "consultation_id": consultation_id,
+                "report_data": donor_report["report_data"],
+                "rag_context": donor_report.get("rag_context"),
+                "rag_query_terms": donor_report.get("rag_query_terms"),
+                "review_count": donor_report.get("review_count", 0),
+                "review_passed": donor_report.get("review_passed", False),
+                "access_token": uuid.uuid4().hex,
+                "access_expires_at": (now + timedelta(days=30)).isoformat(),
+                "status": "draft",
+            }
+        ).execute()
+        await _update_consultation(consultation_id, {"status": "report_ready"})
+        schedule_report_translation(inserted.data[0]["id"])
+        return
+
+    await _generate_report(
+        consultation_id, consultation["original_text"], donor["translated_text"],
+        intent, classification, consultation["customer_name"],
+        input_lang=input_lang,
+    )
+
+
+async def run_pipeline(consultation_id: str, resume: bool = False):
+    """상담 1건 전체 파이프라인.
+    resume=True: 다른 인스턴스에서 중단된 상담을 이어받은 경우로, 이미 저장된 단계 결과를 재사용"""
     db = get_supabase()
 
     # 상담 데이터 조회
@@ -55,50 +284,89 @@ async def run_pipeline(consultation_id: str):
     original_text = consultation["original_text"]
     customer_name = consultation["customer_name"]
 
+    # 추측 RAG 검색: 결과를 쓰지 않고 끝나는 모든 경로(예외 포함)에서 finally로 취소
+    speculative = None
     try:
+        if resume:
+            # 리포트 저장 직후 중단된 경우: 상태만 마무리
+            existing = db.table("reports").select("id").eq("consultation_id", consultation_id).limit(1).execute()
+            if existing.data:
+                logger.info(f"[Pipeline:{consultation_id[:8]}] Resume: report already saved")
+                await _update_consultation(consultation_id, {"status": "report_ready"})
+                return
+
+        # ========================================
+        # Step 0: 동일 원문 중복 확인 (처리된 결과 재사용)
+        # ========================================
+        content_hash = consultation.get("content_hash")
+        if not content_hash:
+            content_hash = compute_content_hash(original_text)
+            await _update_consultation(consultation_id, {"content_hash": content_hash})
+
+        if DEDUP_REUSE_ENABLED:
+            donor = _find_reusable_consultation(consultation_id, content_hash)
+            if donor:
+                await _reuse_consultation_results(consultation, donor)
+                return
+
         # ========================================
         # Step 1: 언어 감지 + 번역 (한국어면 스킵)
         # ========================================
-        logger.info(f"[Pipeline:{consultation_id[:8]}] Step 1: Translation start")
-        start = time.time()
-        translated_text, input_lang = await translate_to_korean(original_text)
-        duration = int((time.time() - start) * 1000)
-        logger.info(f"[Pipeline:{consultation_id[:8]}] Step 1: Translation done ({duration}ms, lang={input_lang})")
+        if resume and consultation.get("translated_text"):
+            translated_text = consultation["translated_text"]
+            input_lang = consultation.get("input_language") or "ja"
+            logger.info(f"[Pipeline:{consultation_id[:8]}] Step 1: Translation restored from checkpoint")
+        else:
+            logger.info(f"[Pipeline:{consultation_id[:8]}] Step 1: Translation start")
+            start = time.time()
+            translated_text, input_lang = await translate_to_korean(original_text)
+            duration = int((time.time() - start) * 1000)
+            logger.info(f"[Pipeline:{consultation_id[:8]}] Step 1: Translation done ({duration}ms, lang={input_lang})")
 
-        await _log_agent(consultation_id, "translator", {"input_lang": input_lang}, {"translated_text": translated_text[:200]}, duration, "success")
-        await _update_consultation(consultation_id, {
-            "translated_text": translated_text,
-            "input_language": input_lang,
-        })
+            await _save_translation(consultation_id, translated_text, input_lang, duration)
 
         # ========================================
         # Step 2: 화자 분리 + CTA 분석
         # ========================================
-        logger.info(f"[Pipeline:{consultation_id[:8]}] Step 2: CTA analysis start")
-        start = time.time()
-        cta_result = await analyze_cta(original_text, translated_text, input_lang=input_lang)
-        duration = int((time.time() - start) * 1000)
-        logger.info(f"[Pipeline:{consultation_id[:8]}] Step 2: CTA done ({duration}ms)")
+        if resume and consultation.get("cta_level"):
+            logger.info(f"[Pipeline:{consultation_id[:8]}] Step 2: CTA restored from checkpoint")
+        else:
+            logger.info(f"[Pipeline:{consultation_id[:8]}] Step 2: CTA analysis start")
+            start = time.time()
+            cta_result = await analyze_cta(original_text, translated_text, input_lang=input_lang)
+            duration = int((time.time() - start) * 1000)
+            logger.info(f"[Pipeline:{consultation_id[:8]}] Step 2: CTA done ({duration}ms)")
 
-        await _log_agent(consultation_id, "cta_analyzer", None, cta_result, duration, "success")
-        await _update_consultation(consultation_id, {
-            "speaker_segments": cta_result.get("speaker_segments"),
-            "customer_utterances": cta_result.get("customer_utterances", ""),
-            "cta_level": cta_result.get("cta_level", "cool"),
-            "cta_signals": cta_result.get("cta_signals"),
-        })
+            await _save_cta(consultation_id, cta_result, duration)
 
         # ========================================
         # Step 3: 의도 추출 (한국어 텍스트 사용)
         # ========================================
-        logger.info(f"[Pipeline:{consultation_id[:8]}] Step 3: Intent extraction start")
-        start = time.time()
-        intent = await extract_intent(translated_text)
-        duration = int((time.time() - start) * 1000)
-        logger.info(f"[Pipeline:{consultation_id[:8]}] Step 3: Intent done ({duration}ms)")
+        intent = consultation.get("intent_extraction") if resume else None
+        if isinstance(intent, list):
+            intent = intent[0] if intent else None
+        keyword_embedding = None
+        if intent:
+            logger.info(f"[Pipeline:{consultation_id[:8]}] Step 3: Intent restored from checkpoint")
+        else:
+            logger.info(f"[Pipeline:{consultation_id[:8]}] Step 3: Intent extraction start")
+            start = time.time()
+            intent, keyword_embedding = await _extract_intent(translated_text)
+            duration = int((time.time() - start) * 1000)
+            logger.info(f"[Pipeline:{consultation_id[:8]}] Step 3: Intent done ({duration}ms)")
 
-        await _log_agent(consultation_id, "intent_extractor", None, intent, duration, "success")
-        await _update_consultation(consultation_id, {"intent_extraction": intent})
+            await _save_intent(consultation_id, intent, duration)
+
+        # 분류까지 저장된 뒤 중단된 경우: 리포트 생성부터 재개
+        if resume and consultation.get("classification") in ("dermatology", "plastic_surgery"):
+            logger.info(f"[Pipeline:{consultation_id[:8]}] Step 4-5: Classification restored from checkpoint")
+            await _generate_report(
+                consultation_id, original_text, translated_text,
+                intent, consultation["classification"], customer_name,
+                input_lang=input_lang,
+                keyword_embedding=keyword_embedding,
+            )
+            return
 
         # ========================================
         # Step 4: 분류
@@ -111,6 +379,15 @@ async def run_pipeline(consultation_id: str):
 
         await _log_agent(consultation_id, "classifier", None, classification_result, duration, "success")
 
+        # 추측 RAG: 검증이 끝나기 전에 예측 카테고리(경계 신뢰도면 양쪽)로 검색 시작
+        if SPECULATIVE_RAG_ENABLED:
+            speculative = SpeculativeSearch(
+                intent.get("keywords", []),
+                _speculative_categories(classification_result),
+                embedding=keyword_embedding,
+                procedures=intent.get("mentioned_procedures"),
+            )
+
         # ========================================
         # Step 5: 검증
         # ========================================
@@ -120,19 +397,14 @@ async def run_pipeline(consultation_id: str):
         duration = int((time.time() - start) * 1000)
         logger.info(f"[Pipeline:{consultation_id[:8]}] Step 5: Validation done ({duration}ms)")
 
-        final_classification = validation.get("classification", "unclassified")
-        confidence = validation.get("confidence", 0.0)
-        reason = validation.get("reason", "")
-
-        await _log_agent(consultation_id, "validator", None, validation, duration, "success")
-        await _update_consultation(consultation_id, {
-            "classification": final_classification,
-            "classification_confidence": confidence,
-            "classification_reason": reason,
-        })
+        final_classification = await _save_validation(consultation_id, validation, duration)
 
         # 미분류면 파이프라인 중단
         if final_classification == "unclassified":
+            if speculative:
+                speculative.cancel()
+                metrics.incr("speculative_rag.miss")
+            _discard_task(keyword_embedding)
             await _update_consultation(consultation_id, {"status": "classification_pending"})
             return
 
@@ -143,6 +415,8 @@ async def run_pipeline(consultation_id: str):
             consultation_id, original_text, translated_text,
             intent, final_classification, customer_name,
             input_lang=input_lang,
+            speculative=speculative,
+            keyword_embedding=keyword_embedding,
         )
 
     except Exception as e:
@@ -152,6 +426,178 @@ async def run_pipeline(consultation_id: str):
             "error_message": str(e),
         })
         await _log_agent(consultation_id, "pipeline", None, None, 0, "failed", str(e))
+    finally:
+        # take()로 이미 사용했거나 취소된 경우 아무 일도 하지 않음
+        if speculative:
+            speculative.cancel()
+
+
+def _speculative_categories(classification_result: dict) -> list[str]:
+    """추측 검색 대상 카테고리: 신뢰도가 충분하면 예측 카테고리만, 경계 구간이면 양쪽 모두"""
+    if isinstance(classification_result, list):
+        classification_result = classification_result[0] if classification_result else {}
+    predicted = classification_result.get("classification", "unclassified")
+    confidence = classification_result.get("confidence", 0.0) or 0.0
+
+    if predicted in ("dermatology", "plastic_surgery") and confidence >= SPECULATIVE_RAG_BORDERLINE:
+        return [predicted]
+    return ["dermatology", "plastic_surgery"]
+
+
+async def run_pipeline_batch(consultation_ids: list[str]):
+    """일괄 실행: 번역/의도 추출/분류/검증을 여러 상담 묶음 호출로 처리.
+    리포트 생성은 상담별 BULK 작업으로 스케줄러에 등록한다."""
+    db = get_supabase()
+    scheduler = get_scheduler()
+
+    rows = db.table("consultations").select("*").in_("id", consultation_ids).execute().data
+    consultations = {}
+    for c in rows:
+        content_hash = c.get("content_hash")
+        if not content_hash:
+            content_hash = compute_content_hash(c["original_text"])
+            await _update_consultation(c["id"], {"content_hash": content_hash})
+        # 동일 원문 재사용 대상은 단건 파이프라인이 처리 (LLM 호출 없음)
+        if DEDUP_REUSE_ENABLED and _find_reusable_consultation(c["id"], content_hash):
+            scheduler.submit("pipeline", lambda cid=c["id"]: run_pipeline(cid), JobPriority.BULK, consultation_id=c["id"])
+        else:
+            consultations[c["id"]] = c
+
+    if not consultations:
+        return
+
+    try:
+        await _run_batched_steps(consultations)
+    except Exception as e:
+        # 예기치 못한 오류: 아직 처리 중으로 남은 상담만 실패 처리
+        logger.error(f"[PipelineBatch:{len(consultations)}] FAILED: {str(e)}", exc_info=True)
+        db.table("consultations").update({
+            "status": "report_failed",
+            "error_message": str(e),
+        }).in_("id", list(consultations)).eq("status", "processing").execute()
+
+
+async def _run_batched_steps(consultations: dict[str, dict]):
+    scheduler = get_scheduler()
+    batch_size = len(consultations)
+    tag = f"[PipelineBatch:{batch_size}]"
+
+    async def _fail(cid: str, error: BaseException):
+        logger.error(f"[Pipeline:{cid[:8]}] FAILED (batch): {str(error)}")
+        await _update_consultation(cid, {"status": "report_failed", "error_message": str(error)})
+        await _log_agent(cid, "pipeline", None, None, 0, "failed", str(error))
+
+    async def _drop_failures(results: dict) -> dict:
+        ok = {}
+        for cid, value in results.items():
+            if isinstance(value, BaseException):
+                await _fail(cid, value)
+            else:
+                ok[cid] = value
+        return ok
+
+    # Step 1: 번역 (번역 메모리 + 짧은 상담끼리 묶음 번역, 긴 상담은 상담별 청크 번역)
+    logger.info(f"{tag} Step 1: Translation start")
+    start = time.time()
+    translations = await _drop_failures(
+        await translate_batch({cid: c["original_text"] for cid, c in consultations.items()})
+    )
+    duration = int((time.time() - start) * 1000)
+    for cid, (translated_text, input_lang) in translations.items():
+        await _save_translation(cid, translated_text, input_lang, duration, batch_size=batch_size)
+
+    # Step 2: 화자 분리 + CTA (출력이 길어 상담별 호출, 동시성 제한)
+    logger.info(f"{tag} Step 2: CTA analysis start")
+    semaphore = asyncio.Semaphore(PIPELINE_CONCURRENCY)
+
+    async def _cta(cid: str):
+        async with semaphore:
+            step_start = time.time()
+            translated_text, input_lang = translations[cid]
+            cta_result = await analyze_cta(consultations[cid]["original_text"], translated_text, input_lang=input_lang)
+            return cta_result, int((time.time() - step_start) * 1000)
+
+    cta_ids = list(translations)
+    cta_results = await _drop_failures(
+        dict(zip(cta_ids, await asyncio.gather(*[_cta(cid) for cid in cta_ids], return_exceptions=True)))
+    )
+    for cid, (cta_result, cta_duration) in cta_results.items():
+        await _save_cta(cid, cta_result, cta_duration)
+
+    # Step 3: 의도 추출 (묶음)
+    logger.info(f"{tag} Step 3: Intent extraction start")
+    start = time.time()
+    intents = await _drop_failures(
+        await extract_intent_batch({cid: translations[cid][0] for cid in cta_results})
+    )
+    duration = int((time.time() - start) * 1000)
+    for cid, intent in intents.items():
+        # 묶음 실행은 추측 검색이 없으므로 early도 병합(augment)으로 처리
+        _apply_local_keywords(intent, _local_keywords(translations[cid][0]))
+        await _save_intent(cid, intent, duration, batch_size=batch_size)
+
+    # Step 4: 분류 (묶음)
+    logger.info(f"{tag} Step 4: Classification start")
+    start = time.time()
+    classifications = await _drop_failures(
+        await classify_batch({cid: (translations[cid][0], intents[cid]) for cid in intents})
+    )
+    duration = int((time.time() - start) * 1000)
+    for cid, classification_result in classifications.items():
+        await _log_agent(cid, "classifier", {"batch_size": batch_size}, classification_result, duration, "success")
+
+    # Step 5: 검증 (묶음, 고신뢰 항목은 LLM 없이 확정)
+    logger.info(f"{tag} Step 5: Validation start")
+    start = time.time()
+    validations = await _drop_failures(
+        await validate_batch({
+            cid: (classification_result, translations[cid][0], intents[cid])
+            for cid, classification_result in classifications.items()
+        })
+    )
+    duration = int((time.time() - start) * 1000)
+
+    for cid, validation in validations.items():
+        final_classification = await _save_validation(cid, validation, duration, batch_size=batch_size)
+        if final_classification == "unclassified":
+            await _update_consultation(cid, {"status": "classification_pending"})
+            continue
+
+        # Step 6~: 리포트 생성은 상담별 작업으로 분리
+        translated_text, input_lang = translations[cid]
+        scheduler.submit(
+            "report",
+            lambda cid=cid, t=translated_text, lang=input_lang, cls=final_classification: _run_report_step(
+                cid, consultations[cid], t, intents[cid], cls, lang,
+            ),
+            JobPriority.BULK,
+            consultation_id=cid,
+        )
+
+    logger.info(f"{tag} Batched steps done")
+
+
+async def _run_report_step(
+    consultation_id: str,
+    consultation: dict,
+    translated_text: str,
+    intent: dict,
+    classification: str,
+    input_lang: str,
+):
+    try:
+        await _generate_report(
+            consultation_id, consultation["original_text"], translated_text,
+            intent, classification, consultation["customer_name"],
+            input_lang=input_lang,
+        )
+    except Exception as e:
+        logger.error(f"[Pipeline:{consultation_id[:8]}] FAILED: {str(e)}", exc_info=True)
+        await _update_consultation(consultation_id, {
+            "status": "report_failed",
+            "error_message": str(e),
+        })
+        await _log_agent(consultation_id, "pipeline", None, None, 0, "failed", str(e))
 
 
 async def resume_pipeline(consultation_id: str, classification: str):
@@ -173,6 +619,7 @@ async def resume_pipeline(consultation_id: str, classification: str):
     await _update_consultation(consultation_id, {
         "classification": classification,
         "is_manually_classified": True,
+        "classification_method": "manual",
         "status": "report_generating",
     })
 
@@ -197,6 +644,8 @@ async def _generate_report(
     classification: str,
     customer_name: str,
     input_lang: str = "ja",
+    speculative: SpeculativeSearch | None = None,
+    keyword_embedding: asyncio.Task | None = None,
 ):
     db = get_supabase()
 
@@ -208,13 +657,42 @@ async def _generate_report(
     logger.info(f"[Pipeline:{consultation_id[:8]}] Step 6: RAG search start")
     start = time.time()
     keywords = intent.get("keywords", [])
-    rag_results = await search_relevant_faq(keywords, classification)
+    rag_results = None
+    rag_output = {}
+
+    if speculative and speculative.covers(keywords, classification):
+        try:
+            rag_results, wait_ms, saved_ms = await speculative.take(classification)
+            metrics.incr("speculative_rag.hit")
+            metrics.observe("speculative_rag.saved", saved_ms)
+            rag_output = {"speculative": "hit", "wait_ms": wait_ms, "saved_ms": saved_ms}
+        except Exception as e:
+            logger.warning(f"[Pipeline:{consultation_id[:8]}] Speculative RAG failed, searching again: {str(e)[:100]}")
+            metrics.incr("speculative_rag.error")
+    elif speculative:
+        speculative.cancel()
+        metrics.incr("speculative_rag.miss")
+        rag_output = {"speculative": "miss", "speculated": speculative.categories}
+
+    if rag_results is None:
+        # early 모드: 의도 추출과 동시에 시작한 로컬 키워드 임베딩 재사용
+        embeddings = None
+        if keyword_embedding is not None:
+            try:
+                embeddings = await keyword_embedding
+                rag_output["early_embedding"] = True
+            except Exception as e:
+                logger.warning(f"[Pipeline:{consultation_id[:8]}] Early embedding failed: {str(e)[:100]}")
+        rag_results = await search_relevant_faq(
+            keywords, classification, embeddings=embeddings,
+            procedures=intent.get("mentioned_procedures"),
+        )
     duration = int((time.time() - start) * 1000)
     logger.info(f"[Pipeline:{consultation_id[:8]}] Step 6: RAG done ({duration}ms, {len(rag_results)} results)")
 
     await _log_agent(
         consultation_id, "rag_agent", {"keywords": keywords, "category": classification},
-        {"result_count": len(rag_results)}, duration, "success",
+        {"result_count": len(rag_results), **rag_output}, duration, "success",
     )
 
     # ========================================
@@ -266,11 +744,12 @@ async def _generate_report(
     now = datetime.now(timezone.utc)
     expires_at = now + timedelta(days=30)
 
-    db.table("reports").insert(
+    inserted = db.table("reports").insert(
         {
             "consultation_id": consultation_id,
             "report_data": report_data,
             "rag_context": rag_results,
+            "rag_query_terms": keywords,
             "review_count": review_count,
             "review_passed": review_count <= max_retries,
             "access_token": access_token,
@@ -280,6 +759,7 @@ async def _generate_report(
     ).execute()
 
     await _update_consultation(consultation_id, {"status": "report_ready"})
+    schedule_report_translation(inserted.data[0]["id"])
 
 
 async def regenerate_report(report_id: str, direction: str):
@@ -310,19 +790,22 @@ async def regenerate_report(report_id: str, direction: str):
     await _update_consultation(consultation_id, {"status": "report_generating"})
 
     try:
-        # 2. RAG 재검색: 기존 키워드 + 관리자 방향에서 추출한 키워드
+        # 2. RAG: 기존 검색 결과(rag_context) 재사용, 지시문의 새 단어만 추가 검색
         existing_keywords = intent.get("keywords", []) if intent else []
-        direction_keywords = direction.split()
-        combined_keywords = list(set(existing_keywords + direction_keywords))
 
         start = time.time()
-        rag_results = await search_relevant_faq(combined_keywords, classification)
+        rag_results, rag_info = await search_incremental(
+            direction, existing_keywords, classification,
+            report.get("rag_context"), report.get("rag_query_terms"),
+        )
         duration = int((time.time() - start) * 1000)
+        metrics.incr(f"regen_rag.{rag_info['mode']}")
+        logger.info(f"[Regen:{consultation_id[:8]}] RAG {rag_info['mode']} ({duration}ms, {len(rag_results)} results)")
 
         await _log_agent(
             consultation_id, "rag_agent_regen",
-            {"keywords": combined_keywords, "direction": direction},
-            {"result_count": len(rag_results)},
+            {"keywords": existing_keywords, "direction": direction},
+            {"result_count": len(rag_results), **rag_info},
             duration, "success",
         )
 
@@ -372,6 +855,7 @@ async def regenerate_report(report_id: str, direction: str):
             "report_data": report_data,
             "report_data_ko": None,  # 한국어 캐시 초기화
             "rag_context": rag_results,
+            "rag_query_terms": rag_info["query_terms"],
             "review_count": review_count,
             "review_passed": review_count <= max_retries,
             "access_token": access_token,
@@ -380,6 +864,7 @@ async def regenerate_report(report_id: str, direction: str):
         }).eq("id", report_id).execute()
 
         await _update_consultation(consultation_id, {"status": "report_ready"})
+        schedule_report_translation(report_id)
 
     except Exception as e:
         await _update_consultation(consultation_id, {
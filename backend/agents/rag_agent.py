@@ -1,64 +1,489 @@
-from services.gemini_client import get_query_embedding
+import asyncio
+import logging
+import re
+import time
+
+import numpy as np
+
+from config import (
+    RAG_MAX_QUERIES,
+    RAG_RRF_K,
+    RAG_HYBRID_ENABLED,
+    RAG_VECTOR_WEIGHT,
+    RAG_LEXICAL_WEIGHT,
+    RAG_LEXICAL_THRESHOLD,
+    FAQ_INDEX_ENABLED,
+    RAG_MMR_ENABLED,
+    RAG_MMR_LAMBDA,
+    RAG_MMR_OVERFETCH,
+    RAG_MMR_SOURCE_CAP,
+    RAG_MMR_DUP_THRESHOLD,
+    RAG_CACHE_ENABLED,
+    RAG_PREFILTER_ENABLED,
+    RAG_PREFILTER_MIN_RESULTS,
+    VECTOR_INDEX_TYPE,
+    VECTOR_EF_SEARCH,
+    VECTOR_IVFFLAT_PROBES,
+    VECTOR_RERANK_FACTOR,
+)
+from services import metrics, rag_cache
+from services.faq_index import get_faq_index, index_version
+from services.korean_text import content_stem
+from services.procedure_taxonomy import resolve_procedure_ids
+from services.gemini_client import get_query_embeddings
 from services.supabase_client import get_supabase
 
+logger = logging.getLogger(__name__)
+
+
+def build_queries(keywords: list[str], max_queries: int = RAG_MAX_QUERIES) -> list[str]:
+    """검색 쿼리 목록: 키워드 전체를 결합한 쿼리 + 상위 키워드별 개별 쿼리"""
+    keywords = [k.strip() for k in keywords if isinstance(k, str) and k.strip()]
+    if not keywords:
+        return []
+    queries = [" ".join(keywords)]
+    if len(keywords) > 1:
+        queries += keywords[: max(0, max_queries - 1)]
+    return list(dict.fromkeys(queries))
+
+
+async def embed_keywords(keywords: list[str]) -> list[list[float]]:
+    # 쿼리별 임베딩을 한 번의 호출로 계산
+    return await get_query_embeddings(build_queries(keywords))
+
+
+def reciprocal_rank_fusion(rows: list[dict], k: int = RAG_RRF_K) -> list[dict]:
+    """쿼리별 순위 목록을 RRF(Σ 1/(k+rank))로 융합. 같은 문서는 가장 높은 유사도를 유지"""
+    fused: dict[str, dict] = {}
+    for row in rows:
+        faq_id = row["id"]
+        entry = fused.get(faq_id)
+        if entry is None:
+            entry = {key: value for key, value in row.items() if key not in ("query_index", "rank")}
+            entry["rrf_score"] = 0.0
+            fused[faq_id] = entry
+        entry["rrf_score"] += 1.0 / (k + row["rank"])
+        entry["similarity"] = max(entry.get("similarity") or 0.0, row.get("similarity") or 0.0)
+    return sorted(fused.values(), key=lambda r: (-r["rrf_score"], -(r.get("similarity") or 0.0)))
+
+
+def _tag_source(faq: dict) -> dict:
+    # source_type 태깅: PubMed vs YouTube 구분
+    url = faq.get("youtube_url", "") or ""
+    if "pubmed.ncbi.nlm.nih.gov" in url:
+        faq["source_type"] = "pubmed"
+        faq["paper_title"] = faq.get("youtube_title", "")
+        faq["pmid"] = faq.get("youtube_video_id", "")
+    else:
+        faq["source_type"] = "youtube"
+    return faq
+
+
+def _source_key(faq: dict) -> str:
+    return faq.get("youtube_video_id") or faq.get("youtube_url") or faq["id"]
+
+
+def _relevance(faq: dict) -> float:
+    return faq.get("score") if faq.get("score") is not None else (faq.get("similarity") or 0.0)
+
+
+def mmr_rerank(
+    candidates: list[dict],
+    vectors: np.ndarray | None,
+    k: int,
+    lambda_: float = RAG_MMR_LAMBDA,
+    source_cap: int = RAG_MMR_SOURCE_CAP,
+    dup_threshold: float = RAG_MMR_DUP_THRESHOLD,
+) -> list[dict]:
+    """MMR(최대 한계 관련도) 재정렬 + 출처(영상/논문)별 최대 건수 제한.
+    점수 = λ·관련도(하이브리드 점수 또는 유사도) - (1-λ)·이미 고른 문서와의 최대 유사도.
+    고른 문서와 dup_threshold 이상 유사한 후보는 중복으로 보고 제외한다.
+    vectors(후보 순서의 단위 벡터)가 없으면 관련도 순서에 출처 제한만 적용"""
+    if not candidates:
+        return []
+    n = len(candidates)
+    relevance = np.array([_relevance(faq) for faq in candidates], dtype=np.float32)
+    pairwise = vectors @ vectors.T if vectors is not None else None
+
+    selected: list[int] = []
+    per_source: dict[str, int] = {}
+    available = np.ones(n, dtype=bool)
+    max_sim = np.zeros(n, dtype=np.float32)
+    while len(selected) < k and available.any():
+        if pairwise is not None and selected:
+            scores = lambda_ * relevance - (1 - lambda_) * max_sim
+        else:
+            scores = relevance.copy()
+        scores[~available] = -np.inf
+        best = int(scores.argmax())
+        available[best] = False
+
+        source = _source_key(candidates[best])
+        if per_source.get(source, 0) >= source_cap:
+            continue
+        per_source[source] = per_source.get(source, 0) + 1
+        selected.append(best)
+
+        if pairwise is not None:
+            max_sim = np.maximum(max_sim, pairwise[best])
+            available &= max_sim < dup_threshold
+    return [candidates[i] for i in selected]
+
+
+def _text_chars(rows: list[dict]) -> int:
+    return sum(len(r.get("question") or "") + len(r.get("answer") or "") for r in rows)
+
+
+def _diversify(rows: list[dict], category: str, match_count: int) -> list[dict]:
+    """과다 조회한 후보에서 MMR로 match_count건 선택. 임베딩은 프로세스 내 인덱스에서 가져오고,
+    없으면(RPC 폴백) 출처 제한만 적용. 관련도 순 상위 match_count건 대비 절감된 본문 글자 수를 기록"""
+    start = time.perf_counter()
+    vectors = get_faq_index().vectors(category, [r["id"] for r in rows]) if FAQ_INDEX_ENABLED else None
+    selected = mmr_rerank(rows, vectors, match_count)
+
+    baseline = rows[:match_count]
+    metrics.observe("rag_mmr.rerank", (time.perf_counter() - start) * 1000)
+    metrics.incr("rag_mmr.chars_saved", _text_chars(baseline) - _text_chars(selected))
+    metrics.incr("rag_mmr.replaced", len({r["id"] for r in baseline} - {r["id"] for r in selected}))
+    metrics.incr("rag_mmr.with_vectors" if vectors is not None else "rag_mmr.caps_only")
+    return selected
+
 
 async def search_relevant_faq(
     keywords: list[str],
     category: str,
     match_threshold: float = 0.65,
     match_count: int = 8,
+    embeddings: list[list[float]] | None = None,
+    procedures: list[str] | None = None,
 ) -> list[dict]:
-    db = get_supabase()
+    """키워드별 다중 쿼리 검색. embeddings는 embed_keywords(keywords) 결과를 재사용할 때 전달.
+    RAG_HYBRID_ENABLED면 어휘(trigram) 점수와 벡터 유사도 가중합, 아니면 벡터 검색 결과를 RRF로 융합.
+    procedures(의도 추출의 시술명)가 표준 시술로 매핑되면 해당 시술 FAQ만 먼저 검색하고,
+    결과가 RAG_PREFILTER_MIN_RESULTS건 미만일 때만 카테고리 전체 검색으로 넓힌다"""
+    procedure_ids = _resolve_procedures(procedures)
+
+    cache_key = None
+    if RAG_CACHE_ENABLED:
+        settings = {**_search_settings(), "procedures": procedure_ids}
+        cache_key = rag_cache.make_key(keywords, category, match_threshold, match_count, settings)
+        try:
+            cached = await asyncio.to_thread(rag_cache.get, cache_key)
+        except Exception as e:
+            logger.warning(f"[RAG] Cache lookup failed: {str(e)[:100]}")
+            cached = None
+        if cached is not None:
+            return cached
 
-    # 키워드를 하나의 검색 쿼리로 결합
-    query_text = " ".join(keywords)
-    embedding = await get_query_embedding(query_text)
-
-    # Supabase RPC로 벡터 검색
-    result = db.rpc(
-        "search_faq",
-        {
-            "query_embedding": embedding,
-            "target_category": category,
-            "match_threshold": match_threshold,
-            "match_count": match_count,
-        },
-    ).execute()
-
-    if not result.data:
+    source_version = index_version()
+    if embeddings is None:
+        embeddings = await embed_keywords(keywords)
+    if not embeddings:
         return []
 
-    # RPC 결과에 youtube_title, youtube_video_id가 없을 수 있으므로
-    # id 목록으로 추가 정보 조회
-    faq_ids = [faq["id"] for faq in result.data]
-    extra_result = db.table("faq_vectors").select(
-        "id, youtube_title, youtube_video_id, youtube_url"
-    ).in_("id", faq_ids).execute()
+    # MMR 재정렬용으로 후보를 더 많이 조회
+    fetch_count = match_count * RAG_MMR_OVERFETCH if RAG_MMR_ENABLED else match_count
+    terms = [k.strip() for k in keywords if isinstance(k, str) and k.strip()]
+    rows = []
+    if procedure_ids:
+        rows = await _search_prefiltered(embeddings, procedure_ids, category, match_threshold, fetch_count)
+        metrics.incr("rag_prefilter.used")
+    if not procedure_ids or len(rows) < RAG_PREFILTER_MIN_RESULTS:
+        if procedure_ids:
+            metrics.incr("rag_prefilter.widened")
+        seen = {r["id"] for r in rows}
+        rows += [
+            r for r in await _search_category(embeddings, terms, category, match_threshold, fetch_count)
+            if r["id"] not in seen
+        ]
 
-    extra_map = {}
-    if extra_result.data:
-        for row in extra_result.data:
-            extra_map[row["id"]] = row
+    if RAG_MMR_ENABLED:
+        rows = _diversify(rows, category, match_count)
+    else:
+        rows = rows[:match_count]
 
-    # source_type 태깅: PubMed vs YouTube 구분
-    tagged_results = []
-    for faq in result.data:
-        faq_id = faq["id"]
-        extra = extra_map.get(faq_id, {})
-
-        # RPC에 없는 필드를 추가 조회에서 병합
-        if "youtube_title" not in faq:
-            faq["youtube_title"] = extra.get("youtube_title", "")
-        if "youtube_video_id" not in faq:
-            faq["youtube_video_id"] = extra.get("youtube_video_id", "")
-
-        url = faq.get("youtube_url", "") or ""
-        if "pubmed.ncbi.nlm.nih.gov" in url:
-            faq["source_type"] = "pubmed"
-            faq["paper_title"] = faq.get("youtube_title", "")
-            faq["pmid"] = faq.get("youtube_video_id", "")
+    if RAG_HYBRID_ENABLED:
+        # 벡터 임계값 아래였지만 어휘 일치로 포함된 결과 수 (하이브리드 효과 추적)
+        metrics.incr("rag.lexical_only", sum(1 for faq in rows if (faq.get("similarity") or 0.0) <= match_threshold))
+    results = [_tag_source(faq) for faq in rows]
+
+    if cache_key:
+        try:
+            # 인덱스가 코퍼스보다 뒤처져 있으면 저장하지 않음 (검색 전에 읽은 버전 기준)
+            await asyncio.to_thread(rag_cache.put, cache_key, results, source_version)
+        except Exception as e:
+            logger.warning(f"[RAG] Cache store failed: {str(e)[:100]}")
+    return results
+
+
+def _search_settings() -> dict:
+    """검색 결과에 영향을 주는 설정 (캐시 키에 포함)"""
+    return {
+        "queries": RAG_MAX_QUERIES,
+        "hybrid": [RAG_VECTOR_WEIGHT, RAG_LEXICAL_WEIGHT, RAG_LEXICAL_THRESHOLD] if RAG_HYBRID_ENABLED else None,
+        "rrf_k": None if RAG_HYBRID_ENABLED else RAG_RRF_K,
+        "mmr": [RAG_MMR_LAMBDA, RAG_MMR_OVERFETCH, RAG_MMR_SOURCE_CAP, RAG_MMR_DUP_THRESHOLD] if RAG_MMR_ENABLED else None,
+        "ann": vector_search_params(),
+    }
+
+
+def vector_search_params(
+    index_type: str = VECTOR_INDEX_TYPE,
+    ef_search: int = VECTOR_EF_SEARCH,
+    probes: int = VECTOR_IVFFLAT_PROBES,
+    rerank_factor: int = VECTOR_RERANK_FACTOR,
+) -> dict:
+    """DB 벡터 검색 RPC의 인덱스 선택/탐색 파라미터 (search_faq, search_faq_batch, search_faq_hybrid)"""
+    return {
+        "index_type": index_type,
+        "ef_search": ef_search if index_type in ("hnsw", "halfvec", "binary", "matryoshka") else None,
+        "probes": probes if index_type == "ivfflat" else None,
+        "rerank_factor": rerank_factor,
+    }
+
+
+def _resolve_procedures(procedures: list[str] | None) -> list[int]:
+    if not RAG_PREFILTER_ENABLED or not procedures:
+        return []
+    try:
+        return resolve_procedure_ids(procedures)
+    except Exception as e:
+        logger.warning(f"[RAG] Procedure taxonomy lookup failed: {str(e)[:100]}")
+        return []
+
+
+async def _search_category(
+    embeddings: list[list[float]], terms: list[str], category: str, match_threshold: float, match_count: int,
+) -> list[dict]:
+    """카테고리 전체 검색. 관련도 순으로 정렬된 결과 (하이브리드 점수 또는 RRF)"""
+    rows = _search_local(embeddings, terms, category, match_threshold, match_count) if FAQ_INDEX_ENABLED else None
+    if rows is None:
+        rows = await _search_rpc(embeddings, terms, category, match_threshold, match_count)
+    return rows if RAG_HYBRID_ENABLED else reciprocal_rank_fusion(rows)
+
+
+async def _search_prefiltered(
+    embeddings: list[list[float]], procedure_ids: list[int], category: str, match_threshold: float, match_count: int,
+) -> list[dict]:
+    """표준 시술로 후보를 좁힌 검색 (RRF 융합). 하이브리드 모드에서는 시술 일치를 어휘 일치(1.0)로 보고
+    카테고리 검색 결과와 같은 척도의 점수를 붙인다"""
+    rows = None
+    if FAQ_INDEX_ENABLED:
+        try:
+            rows = get_faq_index().search_batch(embeddings, category, match_threshold, match_count, procedure_ids)
+        except Exception as e:
+            logger.warning(f"[RAG] Local filtered search failed, using RPC: {str(e)[:100]}")
+    if rows is None:
+        db = get_supabase()
+        result = await asyncio.to_thread(
+            lambda: db.rpc(
+                "search_faq_filtered",
+                {
+                    "query_embeddings": embeddings,
+                    "procedure_ids": procedure_ids,
+                    "target_category": category,
+                    "match_threshold": match_threshold,
+                    "match_count": match_count,
+                },
+            ).execute()
+        )
+        rows = result.data or []
+
+    fused = reciprocal_rank_fusion(rows)
+    if RAG_HYBRID_ENABLED:
+        for row in fused:
+            row["lexical_score"] = 1.0
+            row["score"] = RAG_VECTOR_WEIGHT * row["similarity"] + RAG_LEXICAL_WEIGHT
+    return fused
+
+
+def _search_local(
+    embeddings: list[list[float]], terms: list[str], category: str, match_threshold: float, match_count: int,
+) -> list[dict] | None:
+    """프로세스 내 인덱스 검색. 인덱스가 준비되지 않았거나 실패하면 None (RPC로 검색)"""
+    index = get_faq_index()
+    start = time.perf_counter()
+    try:
+        if RAG_HYBRID_ENABLED:
+            rows = index.search_hybrid(
+                embeddings, terms, category, match_threshold, match_count,
+                RAG_VECTOR_WEIGHT, RAG_LEXICAL_WEIGHT, RAG_LEXICAL_THRESHOLD,
+            )
         else:
-            faq["source_type"] = "youtube"
-        tagged_results.append(faq)
+            rows = index.search_batch(embeddings, category, match_threshold, match_count)
+    except Exception as e:
+        logger.warning(f"[RAG] Local index search failed, using RPC: {str(e)[:100]}")
+        rows = None
+
+    if rows is None:
+        metrics.incr("faq_index.fallback")
+        return None
+    metrics.incr("faq_index.local")
+    metrics.observe("faq_index.search", (time.perf_counter() - start) * 1000)
+    return rows
+
+
+async def _search_rpc(
+    embeddings: list[list[float]], terms: list[str], category: str, match_threshold: float, match_count: int,
+) -> list[dict]:
+    # 모든 쿼리를 한 번의 RPC로 검색 (동기 클라이언트이므로 스레드 풀에서 실행)
+    db = get_supabase()
+    if RAG_HYBRID_ENABLED:
+        result = await asyncio.to_thread(
+            lambda: db.rpc(
+                "search_faq_hybrid",
+                {
+                    "query_embeddings": embeddings,
+                    "query_terms": terms,
+                    "target_category": category,
+                    "match_threshold": match_threshold,
+                    "match_count": match_count,
+                    "vector_weight": RAG_VECTOR_WEIGHT,
+                    "lexical_weight": RAG_LEXICAL_WEIGHT,
+                    "lexical_threshold": RAG_LEXICAL_THRESHOLD,
+                    **vector_search_params(),
+                },
+            ).execute()
+        )
+    else:
+        result = await asyncio.to_thread(
+            lambda: db.rpc(
+                "search_faq_batch",
+                {
+                    "query_embeddings": embeddings,
+                    "target_category": category,
+                    "match_threshold": match_threshold,
+                    "match_count": match_count,
+                    **vector_search_params(),
+                },
+            ).execute()
+        )
+    return result.data or []
+
+
+# ========================================
+# 재생성용 증분 검색
+# ========================================
+# 관리자 지시문에 자주 나오지만 검색 근거와 무관한 단어
+_DIRECTION_STOPWORDS = {
+    "리포트", "보고서", "내용", "부분", "설명", "문장", "표현", "톤", "말투", "어조", "전체", "전반",
+    "추가", "수정", "변경", "강조", "삭제", "보완", "정리", "작성", "반영", "언급", "다시",
+    "좀", "더", "조금", "약간", "많이", "너무", "자세히", "간단히", "짧게", "길게", "쉽게", "부드럽게",
+    "친절", "정중", "자연스럽", "그리고", "하지만", "또한", "대해", "대한", "관련", "위주", "중심",
+    "고객", "환자", "시술", "치료", "효과", "정보", "넣어", "넣고", "빼고", "빼서", "없이",
+}
+
+
+def extract_direction_terms(direction: str) -> list[str]:
+    """관리자 재생성 지시문에서 검색에 쓸 수 있는 내용어만 추출 (조사/어미/지시어 제거)"""
+    terms = []
+    for token in re.findall(r"[가-힣A-Za-z0-9]+|[\u3040-\u30ff\u4e00-\u9fff]+", direction):
+        token = content_stem(token)
+        if token is None or len(token) < 2 or token.isdigit() or token in _DIRECTION_STOPWORDS:
+            continue
+        terms.append(token)
+    return list(dict.fromkeys(terms))
+
+
+def find_new_terms(terms: list[str], query_terms: list[str]) -> list[str]:
+    """이전 검색에 이미 사용한 검색어를 제외한, 새 근거가 필요한 단어.
+    FAQ 본문에 우연히 포함된 단어도 검색어가 아니었다면 새 단어로 본다"""
+    known = {t.strip().lower() for t in query_terms if isinstance(t, str)}
+    return [t for t in terms if t.lower() not in known]
+
+
+async def search_incremental(
+    direction: str,
+    keywords: list[str],
+    category: str,
+    previous_results: list[dict] | None,
+    previous_terms: list[str] | None = None,
+    match_count: int = 4,
+    top_k: int = 8,
+) -> tuple[list[dict], dict]:
+    """이전 검색 결과를 재사용하고, 지시문의 새 단어에 대해서만 추가 검색해 병합.
+    previous_terms: 이전 결과를 만든 검색어 (저장되지 않은 이전 리포트는 keywords로 대체).
+    병합 결과는 일반 검색과 같은 top_k건으로 자르되, 새로 찾은 결과 자리를 먼저 확보한다.
+    (results, 로그용 정보) 반환. 로그용 정보의 query_terms는 다음 재생성을 위해 저장한다.
+    이전 결과가 없으면 기존 방식대로 전체 재검색"""
+    direction_terms = extract_direction_terms(direction)
+
+    if previous_results is None:
+        combined = list(dict.fromkeys(keywords + direction_terms))
+        results = await search_relevant_faq(combined, category, match_count=top_k)
+        return results, {"mode": "full", "keywords": combined, "query_terms": combined}
+
+    query_terms = list(previous_terms) if previous_terms is not None else list(keywords)
+    new_terms = find_new_terms(direction_terms, query_terms)
+    if not new_terms:
+        return list(previous_results)[:top_k], {
+            "mode": "reused",
+            "direction_terms": direction_terms,
+            "query_terms": query_terms,
+        }
+
+    delta = await search_relevant_faq(new_terms, category, match_count=match_count)
+    seen = {faq.get("id") for faq in previous_results}
+    added = [faq for faq in delta if faq.get("id") not in seen][:top_k]
+    kept = list(previous_results)[:top_k - len(added)]
+    return kept + added, {
+        "mode": "incremental",
+        "new_terms": new_terms,
+        "added": len(added),
+        "dropped": len(previous_results) - len(kept),
+        "query_terms": query_terms + new_terms,
+    }
+
+
+class SpeculativeSearch:
+    """분류 검증이 끝나기 전에 예측 카테고리로 미리 시작하는 RAG 검색.
+
+    쿼리 임베딩은 한 번만 계산해 카테고리별 검색에 공유한다.
+    최종 카테고리/키워드가 일치하면 take()로 결과를 사용하고, 아니면 cancel()로 버린다."""
+
+    def __init__(
+        self,
+        keywords: list[str],
+        categories: list[str],
+        embedding: asyncio.Task | None = None,
+        procedures: list[str] | None = None,
+    ):
+        self.keywords = list(keywords)
+        self.procedures = procedures
+        self.categories = list(categories)
+        self.started_at = time.time()
+        self._finished_at: dict[str, float] = {}
+        # 외부에서 미리 시작한 임베딩 태스크는 공유하므로 cancel()에서 취소하지 않음
+        self._owns_embedding = embedding is None
+        self._embedding = embedding or asyncio.create_task(embed_keywords(self.keywords))
+        self._searches = {c: asyncio.create_task(self._search(c)) for c in self.categories}
+
+    async def _search(self, category: str) -> list[dict]:
+        embeddings = await self._embedding
+        results = await search_relevant_faq(self.keywords, category, embeddings=embeddings, procedures=self.procedures)
+        self._finished_at[category] = time.time()
+        return results
+
+    def covers(self, keywords: list[str], category: str) -> bool:
+        return category in self._searches and list(keywords) == self.keywords
+
+    async def take(self, category: str) -> tuple[list[dict], int, int]:
+        """추측 검색 결과를 사용. (results, 대기 시간 ms, 절약 시간 ms) 반환.
+        절약 시간 = 검색 전체 소요 - 검증 이후 실제로 기다린 시간"""
+        wait_start = time.time()
+        results = await self._searches[category]
+        now = time.time()
+        wait_ms = int((now - wait_start) * 1000)
+        search_ms = int((self._finished_at.get(category, now) - self.started_at) * 1000)
+        self.cancel()
+        return results, wait_ms, max(0, search_ms - wait_ms)
 
-    return tagged_results
+    def cancel(self):
+        tasks = [self._embedding] if self._owns_embedding else []
+        for task in [*tasks, *self._searches.values()]:
+            if not task.done():
+                task.cancel()
+            else:
+                # 결과를 쓰지 않는 태스크의 예외가 "never retrieved" 경고로 남지 않도록 소비
+                if not task.cancelled():
+                    task.exception()
@@ -0,0 +1,110 @@
+"""인스턴스 종료/비정상 종료로 멈춘 파이프라인 복구.
+
+- 종료 시: 실행 중인 작업에 유예 시간을 주고, 끝내지 못한 상담은 needs_requeue로 표시해 인계
+- 실행 중: 점유한 상담의 claimed_at을 주기적으로 갱신 (heartbeat)
+- 주기적으로: 인계됐거나 점유 갱신이 PIPELINE_LEASE_SECONDS 이상 끊긴 상담을 가져와
+  점유 시 저장한 작업 정보(pipeline_job)대로 다시 등록. 저장된 단계 결과는 재사용한다"""
+import asyncio
+import logging
+
+from config import PIPELINE_RECOVERY_INTERVAL
+from services import metrics
+from services.supabase_client import get_supabase
+from services.pipeline_scheduler import get_scheduler, JobPriority
+from services.consultation_lock import (
+    IN_FLIGHT_STATUSES,
+    lease_cutoff,
+    reclaim_consultation,
+    renew_claims,
+    release_claims,
+    stale_claim_filter,
+)
+from agents.pipeline import run_pipeline, resume_pipeline, regenerate_report
+
+logger = logging.getLogger(__name__)
+
+
+def recover_stalled_pipelines() -> list[str]:
+    """인계/멈춘 상담을 이 인스턴스에 다시 등록하고 ID 목록 반환"""
+    db = get_supabase()
+    cutoff = lease_cutoff()
+    rows = (
+        db.table("consultations")
+        .select("id, status, claimed_by, pipeline_job")
+        .in_("status", IN_FLIGHT_STATUSES)
+        .or_(stale_claim_filter(cutoff))
+        .execute()
+    ).data or []
+
+    scheduler = get_scheduler()
+    recovered = []
+    for row in rows:
+        # 다른 인스턴스가 먼저 가져갔으면 건너뜀
+        if not reclaim_consultation(row, cutoff):
+            continue
+        job = row.get("pipeline_job") or {"kind": "pipeline"}
+        _resubmit(scheduler, row["id"], job)
+        recovered.append(row["id"])
+
+    if recovered:
+        logger.info(f"[Recovery] Re-queued {len(recovered)} stalled consultations")
+        metrics.incr("pipeline.recovered", len(recovered))
+    return recovered
+
+
+def _resubmit(scheduler, consultation_id: str, job: dict):
+    kind = job.get("kind", "pipeline")
+    if kind == "regenerate":
+        scheduler.submit(
+            "regenerate",
+            lambda: regenerate_report(job["report_id"], job["direction"]),
+            JobPriority.REGENERATION,
+            consultation_id=consultation_id,
+        )
+    elif kind == "resume":
+        scheduler.submit(
+            "resume",
+            lambda: _resume_manual(consultation_id, job["classification"]),
+            JobPriority.MANUAL,
+            consultation_id=consultation_id,
+        )
+    else:
+        scheduler.submit(
+            "pipeline",
+            lambda: run_pipeline(consultation_id, resume=True),
+            JobPriority.BULK,
+            consultation_id=consultation_id,
+        )
+
+
+async def _resume_manual(consultation_id: str, classification: str):
+    # 리포트 저장 후 중단됐으면 중복 생성하지 않음
+    db = get_supabase()
+    existing = db.table("reports").select("id").eq("consultation_id", consultation_id).limit(1).execute()
+    if existing.data:
+        db.table("consultations").update({"status": "report_ready"}).eq("id", consultation_id).execute()
+        return
+    await resume_pipeline(consultation_id, classification)
+
+
+async def recovery_loop():
+    """점유 갱신 + 멈춘 상담 복구를 PIPELINE_RECOVERY_INTERVAL 주기로 반복"""
+    while True:
+        try:
+            await asyncio.to_thread(renew_claims, get_scheduler().active_consultation_ids())
+            if not get_scheduler().draining:
+                await asyncio.to_thread(recover_stalled_pipelines)
+        except Exception as e:
+            logger.error(f"[Recovery] Loop iteration failed: {str(e)[:200]}")
+        await asyncio.sleep(PIPELINE_RECOVERY_INTERVAL)
+
+
+async def drain_and_handoff(timeout: float) -> list[str]:
+    """종료 처리: 유예 시간 동안 실행 중인 작업을 마무리하고, 남은 상담은 다른 인스턴스로 인계"""
+    unfinished = await get_scheduler().drain(timeout)
+    released = await asyncio.to_thread(release_claims)
+    logger.info(
+        f"[Recovery] Shutdown: {len(unfinished)} unfinished jobs, "
+        f"{len(released)} consultations handed off"
+    )
+    return released
@@ -0,0 +1,126 @@
+"""규칙 기반 화자 분리 (상담사 / 고객).
+
+형식이 허용하는 경우에만 결정적으로 분리하고, 애매하면 None을 반환해 LLM 분리로 넘긴다.
+- labels: 줄 앞 화자 라벨 ("お客様：", "상담사:", "Customer -" 등)
+- alternating: 라벨 없이 한 줄씩 번갈아 말하는 대화. 짝수/홀수 줄의 말투(상담사 존댓말·안내 표현
+  vs 고객의 희망·고민·질문 표현) 점수 차가 충분할 때만 역할을 배정한다"""
+import re
+from dataclasses import dataclass
+
+# 줄 맨 앞 화자 라벨
+_SPEAKER_LABEL_RE = re.compile(
+    r"^\s*[\[【(（]?\s*(?P<label>"
+    r"相談者|カウンセラー|スタッフ|医師|先生|担当|コーディネーター|"
+    r"お客様|お客さま|患者|顧客|客|"
+    r"상담사|상담실장|실장|원장|의사|코디네이터|"
+    r"고객|환자|내담자|"
+    r"counselor|staff|doctor|customer|client|patient"
+    r")\s*(?:様|さん|님)?\s*[\]】)）]?\s*[:：\-－]\s*",
+    re.IGNORECASE,
+)
+_CUSTOMER_LABELS = {"お客様", "お客さま", "患者", "顧客", "客", "고객", "환자", "내담자", "customer", "client", "patient"}
+
+_COUNSELOR_MARKERS = re.compile(
+    r"ございます|いたします|致します|でしょうか|いかがですか|当院|当クリニック|ご案内|ご説明|"
+    r"お客様|させていただ|ご希望|ご予算|になります|"
+    r"드립니다|드릴게요|드릴까요|저희 (병원|클리닉)|고객님|안내|설명드|하시나요|원하시|시겠어요|되십니다"
+)
+_CUSTOMER_MARKERS = re.compile(
+    r"したい|したくて|気になって|悩んで|悩み|私|自分|できますか|ほしい|欲しい|怖い|不安|"
+    r"하고 싶|싶어요|궁금|고민|제가|저는|걱정|무서|가능한가요|얼마예요|될까요"
+)
+
+_MIN_ALTERNATING_LINES = 4
+
+
+@dataclass
+class Segmentation:
+    segments: list[dict]          # [{"speaker": "counselor"|"customer", "text": ...}]
+    line_map: list[list[int]]     # 발화별 원문 줄 번호 (빈 줄 제외 기준)
+    line_count: int
+    method: str
+
+    def customer_texts(self) -> list[str]:
+        return [s["text"] for s in self.segments if s["speaker"] == "customer"]
+
+    def project(self, text: str) -> list[dict] | None:
+        """줄 구조가 같은 다른 텍스트(번역문)에 같은 화자 분리를 적용. 줄 수가 다르면 None"""
+        lines = _nonempty_lines(text)
+        if len(lines) != self.line_count:
+            return None
+        return [
+            {
+                "speaker": segment["speaker"],
+                "text": "\n".join(_strip_label(lines[i]) for i in indices),
+            }
+            for segment, indices in zip(self.segments, self.line_map)
+        ]
+
+
+def _nonempty_lines(text: str) -> list[str]:
+    return [line for line in (text or "").splitlines() if line.strip()]
+
+
+def _strip_label(line: str) -> str:
+    m = _SPEAKER_LABEL_RE.match(line)
+    return (line[m.end():] if m else line).strip()
+
+
+def _split_labeled(lines: list[str]) -> Segmentation | None:
+    segments: list[dict] = []
+    line_map: list[list[int]] = []
+    labeled = 0
+    for i, line in enumerate(lines):
+        m = _SPEAKER_LABEL_RE.match(line)
+        if m:
+            labeled += 1
+            speaker = "customer" if m.group("label").lower() in _CUSTOMER_LABELS else "counselor"
+            segments.append({"speaker": speaker, "text": line[m.end():].strip()})
+            line_map.append([i])
+        elif segments:
+            # 라벨 없는 줄은 직전 화자의 발화로 이어 붙임
+            segments[-1]["text"] += "\n" + line.strip()
+            line_map[-1].append(i)
+        else:
+            return None
+
+    if labeled < 2 or not any(s["speaker"] == "customer" for s in segments):
+        return None
+    return Segmentation(segments, line_map, len(lines), "labels")
+
+
+def _role_score(line: str) -> int:
+    """양수: 상담사 말투, 음수: 고객 말투"""
+    return len(_COUNSELOR_MARKERS.findall(line)) - len(_CUSTOMER_MARKERS.findall(line))
+
+
+def _split_alternating(lines: list[str]) -> Segmentation | None:
+    if len(lines) < _MIN_ALTERNATING_LINES or any(_SPEAKER_LABEL_RE.match(line) for line in lines):
+        return None
+
+    scores = [_role_score(line) for line in lines]
+    even = sum(scores[0::2])
+    odd = sum(scores[1::2])
+    if abs(even - odd) < max(2, len(lines) // 4):
+        return None
+    counselor_parity = 0 if even > odd else 1
+
+    # 말투 단서가 있는 줄의 대부분이 배정된 역할과 맞아야 함
+    signed = [(i, s) for i, s in enumerate(scores) if s != 0]
+    consistent = sum(1 for i, s in signed if (s > 0) == (i % 2 == counselor_parity))
+    if not signed or consistent / len(signed) < 0.75:
+        return None
+
+    segments = [
+        {"speaker": "counselor" if i % 2 == counselor_parity else "customer", "text": line.strip()}
+        for i, line in enumerate(lines)
+    ]
+    return Segmentation(segments, [[i] for i in range(len(lines))], len(lines), "alternating")
+
+
+def segment_speakers(text: str) -> Segmentation | None:
+    """화자 분리. 형식상 확실하지 않으면 None"""
+    lines = _nonempty_lines(text)
+    if not lines:
+        return None
+    return _split_labeled(lines) or _split_alternating(lines)
@@ -1,6 +1,18 @@
+import asyncio
+import json
 import logging
+from dataclasses import dataclass
 
+from config import TRANSLATION_MEMORY_ENABLED, TRANSLATION_CHUNK_CHARS, TRANSLATION_CONCURRENCY
+from services import metrics
 from services.gemini_client import generate_json, safe_parse_json
+from services.translation_memory import (
+    split_segments,
+    is_translatable,
+    normalize_segment,
+    lookup_segments,
+    store_segments,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -13,31 +25,43 @@ SYSTEM_INSTRUCTION = """あなたは医療通訳の専門家です。日本語
 - 自然な韓国語にすること"""
 
 
-def detect_language(text: str) -> str:
-    """히라가나/가타카나 존재 여부로 일본어 감지. 없으면 한국어로 간주."""
-    japanese_chars = sum(
-        1 for c in text
-        if ('\u3040' <= c <= '\u309F')   # 히라가나
-        or ('\u30A0' <= c <= '\u30FF')   # 가타카나
-    )
-    result = "ja" if japanese_chars >= 10 else "ko"
-    logger.info(f"[Language] Detected '{result}' (japanese_chars={japanese_chars})")
-    return result
-
-
 async def translate_to_korean(text: str) -> tuple[str, str]:
-    """번역 + 언어 감지. 한국어 입력이면 번역 스킵.
+    """번역 + 언어 감지. 발화 줄마다 언어를 판정해 일본어 줄만 번역하고,
+    일본어 줄이 하나도 없으면 번역 없이 한국어 입력으로 처리.
 
     Returns:
         (translated_text, detected_language)
     """
-    lang = detect_language(text)
-
-    if lang == "ko":
-        logger.info("[Translator] Korean input detected — skipping translation")
+    plan = plan_translation(text)
+    if not plan.segments:
+        logger.info("[Translator] No Japanese lines — skipping translation")
         return text, "ko"
 
-    # 기존 일본어 → 한국어 번역
+    try:
+        return await _translate_chunked(plan), "ja"
+    except Exception as e:
+        logger.warning(f"[Translator] Chunked translation failed, translating whole text: {str(e)[:100]}")
+
+    return await _translate_whole(text), "ja"
+
+
+def detect_chunk_language(text: str) -> str | None:
+    """청크(발화 줄) 단위 언어 판정: 한글이 더 많으면 "ko", 가나/한자가 있으면 "ja",
+    둘 다 없으면(숫자/기호/화자 라벨만) None"""
+    hangul = sum(1 for c in text if '\uAC00' <= c <= '\uD7A3')
+    japanese = sum(
+        1 for c in text
+        if ('\u3040' <= c <= '\u30FF') or ('\u4E00' <= c <= '\u9FFF')
+    )
+    if hangul and hangul >= japanese:
+        return "ko"
+    if japanese:
+        return "ja"
+    return None
+
+
+async def _translate_whole(text: str) -> str:
+    """상담 전체를 한 번에 번역 (청크 번역 실패 시)"""
     prompt = f"""以下の日本語テキストを韓国語に翻訳してください。
 
 JSON形式で返してください:
@@ -50,4 +74,198 @@ JSON形式で返してください:
     data = safe_parse_json(result)
     if isinstance(data, list):
         data = data[0] if data else {}
-    return data.get("translated_text", ""), "ja"
+    return data.get("translated_text", "")
+
+
+def _split_lines(pieces: list[str]) -> list[list[int]]:
+    """문장 조각을 발화 줄(줄바꿈 사이) 단위 인덱스 묶음으로"""
+    lines, current = [], []
+    for i, piece in enumerate(pieces):
+        if piece.startswith("\n"):
+            if current:
+                lines.append(current)
+            current = []
+        else:
+            current.append(i)
+    if current:
+        lines.append(current)
+    return lines
+
+
+def _build_chunks(segments: list[str]) -> list[list[str]]:
+    """번역할 문장을 원문 순서대로 TRANSLATION_CHUNK_CHARS 이내 묶음으로"""
+    chunks, current, size = [], [], 0
+    for segment in segments:
+        if current and size + len(segment) > TRANSLATION_CHUNK_CHARS:
+            chunks.append(current)
+            current, size = [], 0
+        current.append(segment)
+        size += len(segment)
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+@dataclass
+class TranslationPlan:
+    """원문을 문장 조각으로 나누고 번역할 일본어 문장을 표시한 결과.
+    normalized[i]: 번역할 조각의 정규화 문장 (한국어 줄/줄바꿈/기호는 None → 원문 유지)"""
+    pieces: list[str]
+    normalized: list[str | None]
+
+    @property
+    def segments(self) -> list[str]:
+        """번역할 일본어 문장 (중복 제거, 원문 순서)"""
+        return list(dict.fromkeys(n for n in self.normalized if n))
+
+    def assemble(self, translations: dict[str, str]) -> str:
+        """번역문으로 원래 순서대로 재조립.
+        일본어는 문장 사이에 공백이 없으므로 번역된 문장이 이어질 때 띄어쓰기를 넣음"""
+        output = []
+        for i, (piece, n) in enumerate(zip(self.pieces, self.normalized)):
+            if not n:
+                output.append(piece)
+                continue
+            if i > 0 and self.normalized[i - 1]:
+                output.append(" ")
+            output.append(translations[n])
+        return "".join(output)
+
+
+def plan_translation(text: str) -> TranslationPlan:
+    """줄마다 언어를 판정해 일본어 줄의 문장만 번역 대상으로 표시 (한일 혼용 상담)"""
+    pieces = split_segments(text)
+    normalized: list[str | None] = [None] * len(pieces)
+    for line in _split_lines(pieces):
+        if detect_chunk_language("".join(pieces[i] for i in line)) != "ja":
+            continue
+        for i in line:
+            if is_translatable(pieces[i]):
+                normalized[i] = normalize_segment(pieces[i])
+    return TranslationPlan(pieces, normalized)
+
+
+async def lookup_memory(segments: list[str]) -> tuple[dict[str, str], dict[str, tuple[str, str]]]:
+    """번역 메모리 조회 → (정확 일치 {문장: 번역문}, 유사 일치 {문장: (유사 원문, 그 번역문)}).
+    조회 실패 시 빈 결과 (전부 새로 번역)"""
+    if not TRANSLATION_MEMORY_ENABLED or not segments:
+        return {}, {}
+    translations, references = {}, {}
+    try:
+        translations, references = await asyncio.to_thread(lookup_segments, segments)
+    except Exception as e:
+        logger.warning(f"[Translator] Translation memory lookup failed: {str(e)[:100]}")
+    metrics.incr("translation_memory.hit", len(translations))
+    metrics.incr("translation_memory.fuzzy", len(references))
+    metrics.incr("translation_memory.miss", len(segments) - len(translations))
+    return translations, references
+
+
+async def store_memory(new_translations: dict[str, str]):
+    """새로 번역한 문장을 번역 메모리에 저장 (실패해도 번역 결과에는 영향 없음)"""
+    if not TRANSLATION_MEMORY_ENABLED or not new_translations:
+        return
+    try:
+        await asyncio.to_thread(store_segments, new_translations)
+    except Exception as e:
+        logger.warning(f"[Translator] Translation memory store failed: {str(e)[:100]}")
+
+
+async def translate_missing(segments: list[str], references: dict[str, tuple[str, str]]) -> dict[str, str]:
+    """문장들을 원문 순서대로 TRANSLATION_CHUNK_CHARS 이내 청크로 묶어 동시에 번역"""
+    semaphore = asyncio.Semaphore(TRANSLATION_CONCURRENCY)
+
+    async def _run(chunk: list[str]) -> dict[str, str]:
+        async with semaphore:
+            return await translate_segments(chunk, references)
+
+    translations = {}
+    for result in await asyncio.gather(*[_run(chunk) for chunk in _build_chunks(segments)]):
+        translations.update(result)
+    return translations
+
+
+async def _translate_chunked(plan: TranslationPlan) -> str:
+    """일본어 문장만 번역하고 원래 순서대로 재조립.
+    번역 메모리에 정확히 있는 문장은 재사용하고, 없는 문장만 청크로 묶어 동시에 번역
+    (유사 문장의 번역은 해당 문장의 참고 번역으로 함께 전달)"""
+    segments = plan.segments
+    translations, references = await lookup_memory(segments)
+    missing = [n for n in segments if n not in translations]
+    logger.info(
+        f"[Translator] {len(segments)} Japanese segments: {len(translations)} from memory, "
+        f"{len(missing)} to translate ({len(references)} with reference)"
+    )
+
+    new_translations = await translate_missing(missing, references)
+    await store_memory(new_translations)
+    return plan.assemble({**translations, **new_translations})
+
+
+def segment_payload(segments: list[str], references: dict[str, tuple[str, str]] | None = None) -> list[dict]:
+    """번역 요청 항목 [{"i", "text", "reference"?}] (reference: 번역 메모리 유사 일치)"""
+    references = references or {}
+    payload = []
+    for i, segment in enumerate(segments):
+        item = {"i": i, "text": segment}
+        if segment in references:
+            source, translated = references[segment]
+            item["reference"] = {"similar_source": source, "translation": translated}
+        payload.append(item)
+    return payload
+
+
+def parse_segment_translations(items, segments: list[str]) -> dict[str, str]:
+    """[{"i", "translated_text"}] 응답 → {문장: 번역문}. 범위를 벗어난 i/빈 번역은 버림"""
+    translated = {}
+    for item in items if isinstance(items, list) else []:
+        if not isinstance(item, dict):
+            continue
+        i = item.get("i")
+        if isinstance(i, int) and 0 <= i < len(segments) and item.get("translated_text"):
+            translated[segments[i]] = item["translated_text"]
+    return translated
+
+
+async def translate_segments(
+    segments: list[str], references: dict[str, tuple[str, str]] | None = None,
+) -> dict[str, str]:
+    """문장 묶음 번역. references: {문장: (유사 원문, 그 번역문)} 번역 메모리 유사 일치 (참고용).
+    응답에서 빠진 문장이 있으면 절반씩 나눠 재시도하고, 한 문장도 번역되지 않으면 예외 (전체 번역으로 대체)"""
+    if not segments:
+        return {}
+    prompt = f"""以下は1件の相談内容から抜き出した文です（順番どおり）。
+前後の文脈を考慮しつつ、各文を韓国語に翻訳してください。
+"reference"は類似文の過去の翻訳です。用語や言い回しの参考にしてよいですが、原文との違い
+（否定、薬剤名・施術名、数値など）は必ず原文どおりに翻訳してください。
+
+JSON形式で返してください:
+{{"translations": [{{"i": 入力のi, "translated_text": "翻訳結果"}}]}}
+
+入力:
+{json.dumps(segment_payload(segments, references), ensure_ascii=False, indent=2)}"""
+
+    translated = {}
+    try:
+        result = await generate_json(prompt, SYSTEM_INSTRUCTION)
+        data = safe_parse_json(result)
+        if isinstance(data, dict):
+            data = data.get("translations", [])
+        translated = parse_segment_translations(data, segments)
+    except Exception as e:
+        if len(segments) == 1:
+            raise
+        logger.warning(f"[Translator] Chunk of {len(segments)} segments failed: {str(e)[:100]}")
+
+    missing = [segment for segment in segments if segment not in translated]
+    if not missing:
+        return translated
+    if len(segments) == 1:
+        raise ValueError("segment translation returned no result")
+
+    half = (len(missing) + 1) // 2
+    for part in await asyncio.gather(
+        translate_segments(missing[:half], references), translate_segments(missing[half:], references),
+    ):
+        translated.update(part)
+    return translated
@@ -10,6 +10,23 @@ SYSTEM_INSTRUCTION = """당신은 의료 상담 분류 검증 전문가입니다
 - 재검토 후에도 불확실 → unclassified"""
 
 
+def confirm_if_confident(classification_result: dict) -> dict | None:
+    """높은 신뢰도이고 unclassified가 아니면 LLM 없이 바로 확정. 아니면 None"""
+    confidence = classification_result.get("confidence", 0.0)
+    classification = classification_result.get("classification", "unclassified")
+
+    if confidence >= 0.85 and classification != "unclassified":
+        return {
+            "classification": classification,
+            "confidence": confidence,
+            "reason": classification_result.get("reason", ""),
+            "validated": True,
+            # 최종 분류 출처 (키워드 사전/학습 모델 예측은 재학습 라벨에서 제외)
+            "method": classification_result.get("method", "llm"),
+        }
+    return None
+
+
 async def validate_classification(
     classification_result: dict,
     translated_text: str,
@@ -21,13 +38,9 @@ async def validate_classification(
     classification = classification_result.get("classification", "unclassified")
 
     # 높은 신뢰도이고 unclassified가 아니면 바로 확정
-    if confidence >= 0.85 and classification != "unclassified":
-        return {
-            "classification": classification,
-            "confidence": confidence,
-            "reason": classification_result.get("reason", ""),
-            "validated": True,
-        }
+    confirmed = confirm_if_confident(classification_result)
+    if confirmed:
+        return confirmed
 
     # 낮은 신뢰도이거나 경계 시술 → LLM에 재검증 요청
     prompt = f"""이전 분류 결과를 검증해주세요.
@@ -1,46 +1,86 @@
-import asyncio
-from fastapi import APIRouter, BackgroundTasks, HTTPException, Query
+from fastapi import APIRouter, Header, HTTPException, Query
 from typing import Optional
 from models.schemas import ConsultationCreate, ConsultationBulkCreate, ClassifyRequest, CTAUpdateRequest, GenerateReportsRequest, ConsultationUpdateRequest
 from services.supabase_client import get_supabase
-from agents.pipeline import run_pipeline, resume_pipeline
-
-
-async def _run_pipelines_parallel(consultation_ids: list[str], concurrency: int = 5):
-    """파이프라인을 동시성 제한하여 병렬 실행"""
-    semaphore = asyncio.Semaphore(concurrency)
-
-    async def _run_one(cid: str):
-        async with semaphore:
-            await run_pipeline(cid)
-
-    await asyncio.gather(*[_run_one(cid) for cid in consultation_ids], return_exceptions=True)
+from services.dedup import (
+    compute_content_hash,
+    compute_minhash,
+    find_near_duplicate,
+    index_consultation,
+    is_foreign_key_violation,
+    unindex_consultation,
+)
+from services.pipeline_scheduler import get_scheduler, JobPriority
+from services.consultation_lock import claim_consultations, claim_consultation
+from services.idempotency import run_idempotent
+from config import BULK_BATCHING_ENABLED, BATCH_PROMPT_SIZE
+from agents.pipeline import run_pipeline, run_pipeline_batch, resume_pipeline
 
 router = APIRouter(prefix="/api/consultations", tags=["consultations"])
 
 
 @router.post("")
-async def create_consultation(data: ConsultationCreate):
+async def create_consultation(
+    data: ConsultationCreate,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+):
+    return await run_idempotent(
+        "consultations.create", idempotency_key, data.model_dump(),
+        lambda: _create_consultation(data),
+    )
+
+
+async def _create_consultation(data: ConsultationCreate) -> dict:
     db = get_supabase()
 
-    result = db.table("consultations").insert(
-        {
-            "customer_id": data.customer_id,
-            "customer_name": data.customer_name,
-            "customer_email": data.customer_email,
-            "customer_line_id": data.customer_line_id,
-            "original_text": data.original_text,
-            "status": "registered",
-        }
-    ).execute()
+    signature = compute_minhash(data.original_text)
+    near_duplicate = find_near_duplicate(signature)
+
+    row = {
+        "customer_id": data.customer_id,
+        "customer_name": data.customer_name,
+        "customer_email": data.customer_email,
+        "customer_line_id": data.customer_line_id,
+        "original_text": data.original_text,
+        "content_hash": compute_content_hash(data.original_text),
+        "minhash_signature": signature,
+        "near_duplicate_of": near_duplicate[0] if near_duplicate else None,
+        "near_duplicate_score": near_duplicate[1] if near_duplicate else None,
+        "status": "registered",
+    }
+    try:
+        result = db.table("consultations").insert(row).execute()
+    except Exception as e:
+        if not (near_duplicate and is_foreign_key_violation(e)):
+            raise
+        # 확인 직후 유사 중복 원본이 삭제됨: 인덱스에서 빼고 표시 없이 등록
+        unindex_consultation(near_duplicate[0])
+        row.update({"near_duplicate_of": None, "near_duplicate_score": None})
+        result = db.table("consultations").insert(row).execute()
 
     consultation = result.data[0]
+    index_consultation(consultation["id"], signature)
 
-    return {"id": consultation["id"], "status": "registered"}
+    return {
+        "id": consultation["id"],
+        "status": "registered",
+        "near_duplicate_of": consultation["near_duplicate_of"],
+        "near_duplicate_score": consultation["near_duplicate_score"],
+    }
 
 
 @router.post("/bulk")
-async def create_consultations_bulk(data: ConsultationBulkCreate):
+async def create_consultations_bulk(
+    data: ConsultationBulkCreate,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+):
+    return await run_idempotent(
+        "consultations.bulk", idempotency_key, data.model_dump(),
+        lambda: _create_consultations_bulk(data),
+    )
+
+
+async def _create_consultations_bulk(data: ConsultationBulkCreate) -> dict:
     if len(data.consultations) > 100:
         raise HTTPException(status_code=400, detail="최대 100건까지 일괄 등록 가능합니다")
 
@@ -55,6 +95,8 @@ async def create_consultations_bulk(data: ConsultationBulkCreate):
             "customer_email": c.customer_email,
             "customer_line_id": c.customer_line_id,
             "original_text": c.original_text,
+            "content_hash": compute_content_hash(c.original_text),
+            "minhash_signature": compute_minhash(c.original_text),
             "status": "registered",
         }
         for c in data.consultations
@@ -64,17 +106,58 @@ async def create_consultations_bulk(data: ConsultationBulkCreate):
 
     created_ids = [consultation["id"] for consultation in result.data]
 
-    return {"created": len(created_ids), "ids": created_ids}
+    # 유사 중복 표시: 기존 상담 + 같은 배치의 앞선 상담과 비교
+    near_duplicates = []
+    for consultation in result.data:
+        signature = consultation["minhash_signature"]
+        near_duplicate = find_near_duplicate(signature, exclude_id=consultation["id"])
+        if near_duplicate:
+            try:
+                db.table("consultations").update({
+                    "near_duplicate_of": near_duplicate[0],
+                    "near_duplicate_score": near_duplicate[1],
+                }).eq("id", consultation["id"]).execute()
+            except Exception as e:
+                if not is_foreign_key_violation(e):
+                    raise
+                unindex_consultation(near_duplicate[0])
+                near_duplicate = None
+        if near_duplicate:
+            near_duplicates.append({
+                "id": consultation["id"],
+                "near_duplicate_of": near_duplicate[0],
+                "near_duplicate_score": near_duplicate[1],
+            })
+        index_consultation(consultation["id"], signature)
+
+    return {"created": len(created_ids), "ids": created_ids, "near_duplicates": near_duplicates}
+
+
+def _ensure_accepting_work():
+    """종료 중인 인스턴스는 새 파이프라인 작업을 받지 않음 (클라이언트 재시도 → 다른 인스턴스)"""
+    if get_scheduler().draining:
+        raise HTTPException(status_code=503, detail="서버가 종료 중입니다. 잠시 후 다시 시도해주세요")
 
 
 @router.post("/generate-reports")
-async def generate_reports(data: GenerateReportsRequest, background_tasks: BackgroundTasks):
+async def generate_reports(
+    data: GenerateReportsRequest,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+):
     """선택한 상담건에 대해 AI 리포트 생성 파이프라인 실행"""
+    return await run_idempotent(
+        "consultations.generate_reports", idempotency_key, data.model_dump(),
+        lambda: _generate_reports(data),
+    )
+
+
+async def _generate_reports(data: GenerateReportsRequest) -> dict:
     if len(data.consultation_ids) == 0:
         raise HTTPException(status_code=400, detail="생성할 상담 ID가 없습니다")
     if len(data.consultation_ids) > 50:
         raise HTTPException(status_code=400, detail="최대 50건까지 일괄 생성 가능합니다")
 
+    _ensure_accepting_work()
     db = get_supabase()
 
     result = db.table("consultations").select("id, status").in_("id", data.consultation_ids).execute()
@@ -87,29 +170,56 @@ async def generate_reports(data: GenerateReportsRequest, background_tasks: Backg
     if missing:
         raise HTTPException(status_code=404, detail=f"찾을 수 없는 상담 ID: {list(missing)}")
 
-    valid_statuses = {"registered", "report_failed"}
-    triggered_ids = []
+    # 조건부 UPDATE 한 번으로 점유: 동시에 들어온 다른 요청/인스턴스가 점유한 상담은 제외됨
+    valid_statuses = ["registered", "report_failed"]
+    claimed = set(claim_consultations(data.consultation_ids, valid_statuses, "processing"))
+    triggered_ids = [cid for cid in dict.fromkeys(data.consultation_ids) if cid in claimed]
+    # 점유하지 못한 상담의 상태는 점유 이후에 다시 조회 (점유 경쟁에서 진 상담은 위 조회 결과가 이미 낡음)
+    unclaimed = [cid for cid in dict.fromkeys(data.consultation_ids) if cid not in claimed]
     skipped = []
-
-    for row in result.data:
-        if row["status"] in valid_statuses:
-            db.table("consultations").update({"status": "processing"}).eq("id", row["id"]).execute()
-            triggered_ids.append(row["id"])
-        else:
-            skipped.append({
-                "id": row["id"],
-                "status": row["status"],
+    if unclaimed:
+        current = db.table("consultations").select("id, status").in_("id", unclaimed).execute()
+        statuses = {row["id"]: row["status"] for row in current.data}
+        skipped = [
+            {
+                "id": cid,
+                "status": statuses.get(cid),
                 "reason": "이미 처리 중이거나 완료된 상담입니다",
-            })
-
-    # 병렬 실행 (최대 5건 동시)
-    if triggered_ids:
-        background_tasks.add_task(_run_pipelines_parallel, triggered_ids, 5)
+            }
+            for cid in unclaimed
+        ]
+
+    if not triggered_ids:
+        return {"triggered": 0, "triggered_ids": [], "skipped": skipped, "jobs": []}
+
+    # 스케줄러에 등록: 단건은 수동 작업, 여러 건은 일괄 백로그 우선순위
+    scheduler = get_scheduler()
+    if len(triggered_ids) == 1:
+        jobs = [scheduler.submit(
+            "pipeline", lambda cid=triggered_ids[0]: run_pipeline(cid), JobPriority.MANUAL,
+            consultation_id=triggered_ids[0],
+        )]
+    elif BULK_BATCHING_ENABLED:
+        # 묶음 단위 작업: 에이전트별 호출을 상담 수 → 묶음 수로 줄임
+        groups = [triggered_ids[i:i + BATCH_PROMPT_SIZE] for i in range(0, len(triggered_ids), BATCH_PROMPT_SIZE)]
+        jobs = [
+            scheduler.submit(
+                "pipeline_batch", lambda ids=ids: run_pipeline_batch(ids), JobPriority.BULK,
+                consultation_ids=ids,
+            )
+            for ids in groups
+        ]
+    else:
+        jobs = [
+            scheduler.submit("pipeline", lambda cid=cid: run_pipeline(cid), JobPriority.BULK, consultation_id=cid)
+            for cid in triggered_ids
+        ]
 
     return {
         "triggered": len(triggered_ids),
         "triggered_ids": triggered_ids,
         "skipped": skipped,
+        "jobs": [job.to_dict() for job in jobs],
     }
 
 
@@ -117,16 +227,24 @@ async def generate_reports(data: GenerateReportsRequest, background_tasks: Backg
 async def list_consultations(
     classification: Optional[str] = Query(None),
     status: Optional[str] = Query(None),
+    near_duplicate: Optional[bool] = Query(None),
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
 ):
     db = get_supabase()
-    query = db.table("consultations").select("*", count="exact")
+    query = db.table("consultations").select(
+        "*, near_duplicate:consultations!near_duplicate_of(id, customer_name, status)",
+        count="exact",
+    )
 
     if classification:
         query = query.eq("classification", classification)
     if status:
         query = query.eq("status", status)
+    if near_duplicate is True:
+        query = query.not_.is_("near_duplicate_of", "null")
+    elif near_duplicate is False:
+        query = query.is_("near_duplicate_of", "null")
 
     offset = (page - 1) * page_size
     query = query.order("created_at", desc=True).range(offset, offset + page_size - 1)
@@ -181,7 +299,6 @@ async def update_consultation(consultation_id: str, data: ConsultationUpdateRequ
 async def classify_consultation(
     consultation_id: str,
     data: ClassifyRequest,
-    background_tasks: BackgroundTasks,
 ):
     db = get_supabase()
 
@@ -193,10 +310,22 @@ async def classify_consultation(
     if consultation.data["status"] != "classification_pending":
         raise HTTPException(status_code=400, detail="Consultation is not pending classification")
 
-    # 수동 분류 후 파이프라인 재개
-    background_tasks.add_task(resume_pipeline, consultation_id, data.classification)
+    _ensure_accepting_work()
+
+    # 더블 클릭/동시 요청 방지: 분류 대기 상태일 때만 점유
+    job_info = {"kind": "resume", "classification": data.classification}
+    if not claim_consultation(consultation_id, ["classification_pending"], "report_generating", job_info):
+        raise HTTPException(status_code=409, detail="이미 리포트 생성이 시작된 상담입니다")
+
+    # 수동 분류 후 파이프라인 재개 (최우선 순위)
+    job = get_scheduler().submit(
+        "resume",
+        lambda: resume_pipeline(consultation_id, data.classification),
+        JobPriority.MANUAL,
+        consultation_id=consultation_id,
+    )
 
-    return {"id": consultation_id, "status": "report_generating"}
+    return {"id": consultation_id, "status": "report_generating", "job": job.to_dict()}
 
 
 @router.post("/delete")
@@ -217,6 +346,8 @@ async def delete_consultations_post(data: GenerateReportsRequest):
 
     # consultations 삭제
     result = db.table("consultations").delete().in_("id", data.consultation_ids).execute()
+    for row in result.data:
+        unindex_consultation(row["id"])
 
     return {"deleted": len(result.data), "ids": [r["id"] for r in result.data]}
 
@@ -225,6 +356,10 @@ async def delete_consultations_post(data: GenerateReportsRequest):
 async def update_cta(consultation_id: str, data: CTAUpdateRequest):
     db = get_supabase()
 
+    previous = db.table("consultations").select("cta_level").eq("id", consultation_id).execute()
+    if not previous.data:
+        raise HTTPException(status_code=404, detail="Consultation not found")
+
     result = db.table("consultations").update(
         {"cta_level": data.cta_level}
     ).eq("id", consultation_id).execute()
@@ -232,4 +367,16 @@ async def update_cta(consultation_id: str, data: CTAUpdateRequest):
     if not result.data:
         raise HTTPException(status_code=404, detail="Consultation not found")
 
+    # 관리자 수정 이력 (자동 판정 정확도 추적용)
+    previous_level = previous.data[0].get("cta_level")
+    if previous_level != data.cta_level:
+        db.table("agent_logs").insert({
+            "consultation_id": consultation_id,
+            "agent_name": "cta_override",
+            "input_data": {"previous": previous_level},
+            "output_data": {"cta_level": data.cta_level},
+            "duration_ms": 0,
+            "status": "success",
+        }).execute()
+
     return {"id": consultation_id, "cta_level": data.cta_level}
@@ -1,5 +1,9 @@
-from fastapi import APIRouter
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+from fastapi import APIRouter, Query
 from services.supabase_client import get_supabase
+from services.metrics import snapshot
 
 router = APIRouter(prefix="/api/dashboard", tags=["dashboard"])
 
@@ -81,3 +85,68 @@ async def get_dashboard_stats():
         "cta_cool": cta_cool,
         "recent_consultations": recent,
     }
+
+
+@router.get("/metrics")
+async def get_pipeline_metrics():
+    """인스턴스 단위 파이프라인 지표 (캐시 적중률, 추측 실행 효과 등)"""
+    return snapshot()
+
+
+@router.get("/cta-agreement")
+async def get_cta_agreement(days: int = Query(30, ge=1, le=180)):
+    """일자별 CTA 판정 추적: 로컬 점수 vs LLM 일치율, 판정 방식별 관리자 수정 비율"""
+    db = get_supabase()
+    since = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
+
+    logs = []
+    offset = 0
+    while True:
+        page = (
+            db.table("agent_logs")
+            .select("consultation_id, agent_name, output_data, created_at")
+            .in_("agent_name", ["cta_analyzer", "cta_override"])
+            .gte("created_at", since)
+            .order("created_at")
+            .range(offset, offset + 999)
+            .execute()
+        )
+        logs.extend(page.data)
+        if len(page.data) < 1000:
+            break
+        offset += 1000
+
+    overridden = {log["consultation_id"] for log in logs if log["agent_name"] == "cta_override"}
+    daily = defaultdict(lambda: {
+        "judged": 0, "lexicon": 0, "llm": 0,
+        "compared": 0, "agreed": 0,
+        "overridden_lexicon": 0, "overridden_llm": 0,
+    })
+    for log in logs:
+        if log["agent_name"] != "cta_analyzer":
+            continue
+        output = log.get("output_data") or {}
+        day = daily[log["created_at"][:10]]
+        method = "lexicon" if output.get("method") == "lexicon" else "llm"
+        day["judged"] += 1
+        day[method] += 1
+        if log["consultation_id"] in overridden:
+            day[f"overridden_{method}"] += 1
+
+        # 불확실 판정(LLM 사용) 또는 확실 판정의 샘플 LLM 비교
+        other = (output.get("local_cta") or {}).get("cta_level") if method == "llm" else output.get("shadow_llm_cta")
+        if other:
+            day["compared"] += 1
+            day["agreed"] += other == output.get("cta_level")
+
+    return {
+        "days": days,
+        "daily": [
+            {
+                "date": date,
+                **counts,
+                "agreement_rate": round(counts["agreed"] / counts["compared"], 3) if counts["compared"] else None,
+            }
+            for date, counts in sorted(daily.items())
+        ],
+    }
@@ -0,0 +1,15 @@
+from fastapi import APIRouter
+from services.pipeline_scheduler import get_scheduler
+
+router = APIRouter(prefix="/api/jobs", tags=["jobs"])
+
+
+@router.get("")
+async def list_jobs():
+    """파이프라인 작업 목록 (실행 중 / 대기 중(실효 우선순위 순) / 최근 완료)"""
+    return get_scheduler().list_jobs()
+
+
+@router.get("/consultation/{consultation_id}")
+async def list_consultation_jobs(consultation_id: str):
+    return {"data": get_scheduler().jobs_for_consultation(consultation_id)}
@@ -1,7 +1,7 @@
 from datetime import datetime, timezone
 from typing import List
 from pydantic import BaseModel
-from fastapi import APIRouter, BackgroundTasks, HTTPException
+from fastapi import APIRouter, HTTPException
 from models.schemas import ReportEditRequest, ReportRegenerateRequest, BulkApproveRequest
 
 
@@ -9,7 +9,9 @@ class DeleteReportsRequest(BaseModel):
     report_ids: List[str]
 from services.supabase_client import get_supabase
 from services.email_service import send_report_email
-from agents.korean_translator import translate_report_to_korean
+from services.pipeline_scheduler import get_scheduler, JobPriority
+from services.consultation_lock import claim_consultation
+from agents.korean_translator import get_report_korean, schedule_report_translation
 from agents.pipeline import regenerate_report
 
 router = APIRouter(prefix="/api/reports", tags=["reports"])
@@ -203,7 +205,6 @@ async def reject_report(report_id: str):
 async def regenerate_report_endpoint(
     report_id: str,
     data: ReportRegenerateRequest,
-    background_tasks: BackgroundTasks,
 ):
     """관리자 피드백 기반 리포트 재생성"""
     db = get_supabase()
@@ -229,18 +230,29 @@ async def regenerate_report_endpoint(
     if not data.direction or not data.direction.strip():
         raise HTTPException(status_code=400, detail="재생성 방향을 입력해주세요")
 
-    # 상태를 재생성 중으로 변경
+    if get_scheduler().draining:
+        raise HTTPException(status_code=503, detail="서버가 종료 중입니다. 잠시 후 다시 시도해주세요")
+
+    # 상태를 재생성 중으로 변경 (이미 생성/재생성 중인 상담은 점유 실패)
+    direction = data.direction.strip()
+    claimable = ["report_ready", "report_approved", "report_sent", "report_failed"]
+    job_info = {"kind": "regenerate", "report_id": report_id, "direction": direction}
+    if not claim_consultation(report.data["consultation_id"], claimable, "report_generating", job_info):
+        raise HTTPException(status_code=409, detail="이미 리포트를 생성 중인 상담입니다")
     db.table("reports").update({"status": "draft"}).eq("id", report_id).execute()
-    db.table("consultations").update(
-        {"status": "report_generating"}
-    ).eq("id", report.data["consultation_id"]).execute()
 
-    background_tasks.add_task(regenerate_report, report_id, data.direction.strip())
+    job = get_scheduler().submit(
+        "regenerate",
+        lambda: regenerate_report(report_id, direction),
+        JobPriority.REGENERATION,
+        consultation_id=report.data["consultation_id"],
+    )
 
     return {
         "id": report_id,
         "status": "regenerating",
         "message": "리포트 재생성이 시작되었습니다",
+        "job": job.to_dict(),
     }
 
 
@@ -250,33 +262,21 @@ async def edit_report(report_id: str, data: ReportEditRequest):
 
     result = db.table("reports").update({
         "report_data": data.report_data,
+        "report_data_ko": None,  # 바뀐 섹션만 다시 번역 (섹션 캐시)
     }).eq("id", report_id).execute()
 
     if not result.data:
         raise HTTPException(status_code=404, detail="Report not found")
 
+    schedule_report_translation(report_id)
     return {"id": report_id, "updated": True}
 
 
 @router.get("/{report_id}/translate")
 async def translate_report(report_id: str):
-    db = get_supabase()
-
-    report = db.table("reports").select("report_data, report_data_ko").eq("id", report_id).single().execute()
-
-    if not report.data:
+    try:
+        report_data_ko, cached = await get_report_korean(report_id)
+    except LookupError:
         raise HTTPException(status_code=404, detail="Report not found")
 
-    # 캐시 확인
-    if report.data.get("report_data_ko"):
-        return {"report_data_ko": report.data["report_data_ko"], "cached": True}
-
-    # LLM 번역
-    report_data_ko = await translate_report_to_korean(report.data["report_data"])
-
-    # 캐시 저장
-    db.table("reports").update({
-        "report_data_ko": report_data_ko,
-    }).eq("id", report_id).execute()
-
-    return {"report_data_ko": report_data_ko, "cached": False}
+    return {"report_data_ko": report_data_ko, "cached": cached}
@@ -2,6 +2,8 @@ from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
 from typing import List, Optional
 from services.supabase_client import get_supabase
+from services.faq_index import get_faq_index
+from services import rag_cache
 
 router = APIRouter(prefix="/api/vectors", tags=["vectors"])
 
@@ -53,6 +55,8 @@ async def delete_vector(vector_id: str):
         raise HTTPException(status_code=404, detail="벡터를 찾을 수 없습니다")
 
     db.table("faq_vectors").delete().eq("id", vector_id).execute()
+    get_faq_index().remove([vector_id])
+    rag_cache.invalidate()
     return {"deleted": True, "id": vector_id}
 
 
@@ -65,4 +69,6 @@ async def bulk_delete_vectors(data: BulkDeleteRequest):
 
     db = get_supabase()
     db.table("faq_vectors").delete().in_("id", data.ids).execute()
+    get_faq_index().remove(data.ids)
+    rag_cache.invalidate()
     return {"deleted": len(data.ids), "ids": data.ids}
@@ -17,6 +17,140 @@ NCBI_API_KEY = os.getenv("NCBI_API_KEY", "")
 NCBI_EMAIL = os.getenv("NCBI_EMAIL", "bsyoo1974@gamil.com")
 NCBI_TOOL = os.getenv("NCBI_TOOL", "ADC-GenAI-Platform")
 
+# 중복 상담 처리
+# 동일 원문(content_hash)이 이미 처리된 경우 번역/CTA/의도/분류 결과를 재사용
+DEDUP_REUSE_ENABLED = os.getenv("DEDUP_REUSE_ENABLED", "true").lower() == "true"
+# 재사용 시 원본 상담의 리포트까지 복제 (고객명이 같을 때만)
+DEDUP_CLONE_REPORT = os.getenv("DEDUP_CLONE_REPORT", "false").lower() == "true"
+# MinHash 유사도(자카드 추정치) 이 값 이상이면 유사 중복으로 표시
+NEAR_DUP_THRESHOLD = float(os.getenv("NEAR_DUP_THRESHOLD", "0.8"))
+
+# 추측 RAG: 분류 검증과 병렬로 벡터 검색을 미리 시작
+SPECULATIVE_RAG_ENABLED = os.getenv("SPECULATIVE_RAG_ENABLED", "true").lower() == "true"
+# 분류 신뢰도가 이 값 미만이면 두 카테고리 모두 추측 검색
+SPECULATIVE_RAG_BORDERLINE = float(os.getenv("SPECULATIVE_RAG_BORDERLINE", "0.7"))
+
+# 파이프라인 스케줄러 (services/pipeline_scheduler.py)
+PIPELINE_CONCURRENCY = int(os.getenv("PIPELINE_CONCURRENCY", "5"))
+# 일괄 작업이 사용할 수 없는 슬롯 수 (수동 분류/재생성 전용)
+PIPELINE_RESERVED_SLOTS = int(os.getenv("PIPELINE_RESERVED_SLOTS", "1"))
+# 이 시간(초)만큼 대기할 때마다 우선순위가 한 단계 올라감
+PIPELINE_AGING_SECONDS = float(os.getenv("PIPELINE_AGING_SECONDS", "60"))
+
+# 일괄 실행 시 짧은 에이전트 호출(번역/의도/분류/검증)을 여러 상담 묶음으로 요청
+BULK_BATCHING_ENABLED = os.getenv("BULK_BATCHING_ENABLED", "true").lower() == "true"
+# 묶음 1회당 최대 상담 수 / 최대 입력 글자 수
+BATCH_PROMPT_SIZE = int(os.getenv("BATCH_PROMPT_SIZE", "8"))
+BATCH_PROMPT_MAX_CHARS = int(os.getenv("BATCH_PROMPT_MAX_CHARS", "20000"))
+
+# Idempotency-Key 보관 시간 (이후 같은 키는 새 요청으로 처리)
+IDEMPOTENCY_TTL_HOURS = int(os.getenv("IDEMPOTENCY_TTL_HOURS", "24"))
+
+# 종료(SIGTERM) 시 실행 중인 파이프라인에 주는 유예 시간 (Cloud Run 기본 10초 이내)
+PIPELINE_SHUTDOWN_GRACE_SECONDS = float(os.getenv("PIPELINE_SHUTDOWN_GRACE_SECONDS", "8"))
+# 점유 갱신(heartbeat)이 이 시간 이상 끊긴 상담은 다른 인스턴스가 이어받음
+PIPELINE_LEASE_SECONDS = int(os.getenv("PIPELINE_LEASE_SECONDS", "300"))
+# 점유 갱신 + 멈춘 상담 복구 주기
+PIPELINE_RECOVERY_INTERVAL = int(os.getenv("PIPELINE_RECOVERY_INTERVAL", "30"))
+
+# 번역 메모리: 이전에 번역한 문장 재사용 (정확 일치 + 유사 일치)
+TRANSLATION_MEMORY_ENABLED = os.getenv("TRANSLATION_MEMORY_ENABLED", "true").lower() == "true"
+# 유사 일치 최소 점수 (문자 bigram Dice) / 메모리에 저장할 최소 문장 길이
+TM_FUZZY_THRESHOLD = float(os.getenv("TM_FUZZY_THRESHOLD", "0.92"))
+TM_MIN_SEGMENT_CHARS = int(os.getenv("TM_MIN_SEGMENT_CHARS", "4"))
+
+# 번역 청크 최대 글자 수 / 상담 1건 내 동시 번역 호출 수
+TRANSLATION_CHUNK_CHARS = int(os.getenv("TRANSLATION_CHUNK_CHARS", "1500"))
+TRANSLATION_CONCURRENCY = int(os.getenv("TRANSLATION_CONCURRENCY", "4"))
+
+# 키워드 사전만으로 분류가 명확하면 LLM 분류 생략 (명확 키워드 최소 개수)
+CLASSIFIER_LOCAL_ENABLED = os.getenv("CLASSIFIER_LOCAL_ENABLED", "true").lower() == "true"
+CLASSIFIER_LOCAL_MIN_HITS = int(os.getenv("CLASSIFIER_LOCAL_MIN_HITS", "2"))
+# 분류 키워드 사전 캐시 버전 확인 주기 (초)
+KEYWORD_CACHE_CHECK_SECONDS = int(os.getenv("KEYWORD_CACHE_CHECK_SECONDS", "60"))
+
+# 학습된 로컬 분류 모델: 보정 확률이 임계값 이상이면 LLM 분류/검증 생략
+# (검증 에이전트의 자동 확정 기준 0.85 이상으로 설정해야 검증 호출도 생략됨)
+LOCAL_CLASSIFIER_ENABLED = os.getenv("LOCAL_CLASSIFIER_ENABLED", "true").lower() == "true"
+LOCAL_CLASSIFIER_THRESHOLD = float(os.getenv("LOCAL_CLASSIFIER_THRESHOLD", "0.9"))
+
+# 고객 발화 사전 기반 CTA 판정이 확실하면 LLM 호출 생략.
+# 기본 비활성: scripts/evaluate_cta_lexicon.py로 과거 cta_level 라벨과의 일치율을 확인한 뒤 켠다
+# (비활성이어도 로컬 점수는 계산해 LLM 판정과의 일치율을 기록)
+CTA_LOCAL_ENABLED = os.getenv("CTA_LOCAL_ENABLED", "false").lower() == "true"
+# 로컬 확실 판정 중 LLM으로도 함께 판정해 일치율을 추적할 비율
+CTA_SHADOW_SAMPLE_RATE = float(os.getenv("CTA_SHADOW_SAMPLE_RATE", "0.05"))
+
+# 리포트 한국어 번역: 섹션별 동시 번역 수 / report_ready 시 미리 번역
+REPORT_TRANSLATION_CONCURRENCY = int(os.getenv("REPORT_TRANSLATION_CONCURRENCY", "4"))
+REPORT_TRANSLATION_EAGER = os.getenv("REPORT_TRANSLATION_EAGER", "true").lower() == "true"
+
+# 로컬 키워드 추출(형태소 분석 + 시술/부위 사전)로 의도 추출 키워드 보완
+# llm: LLM 키워드만 / augment: LLM 키워드 + 로컬 키워드 병합
+# early: 로컬 키워드로 RAG 임베딩을 의도 추출과 동시에 시작 (검색 키워드 = 로컬 키워드)
+INTENT_KEYWORDS_MODE = os.getenv("INTENT_KEYWORDS_MODE", "augment")
+# 이 글자 수 이하이고 시술명이 검출된 상담은 LLM 의도 추출 생략 (0이면 사용 안 함)
+INTENT_LOCAL_SKIP_MAX_CHARS = int(os.getenv("INTENT_LOCAL_SKIP_MAX_CHARS", "0"))
+# 시술명 사전(faq_vectors.procedure_name) 재구성 주기 (초)
+GAZETTEER_REFRESH_SECONDS = int(os.getenv("GAZETTEER_REFRESH_SECONDS", "3600"))
+# 시술명 사전 버전 확인/재구성 최소 간격 (초). 재구성은 백그라운드에서 하고 그동안 기존 사전 사용
+GAZETTEER_MIN_REBUILD_SECONDS = int(os.getenv("GAZETTEER_MIN_REBUILD_SECONDS", "300"))
+
+# RAG 다중 쿼리 검색: 결합 쿼리 포함 최대 쿼리 수 / RRF 상수 k
+RAG_MAX_QUERIES = int(os.getenv("RAG_MAX_QUERIES", "4"))
+RAG_RRF_K = int(os.getenv("RAG_RRF_K", "60"))
+# 하이브리드 검색 (trigram 어휘 점수 + 벡터 유사도 가중합, 016_hybrid_search.sql)
+RAG_HYBRID_ENABLED = os.getenv("RAG_HYBRID_ENABLED", "true").lower() == "true"
+RAG_VECTOR_WEIGHT = float(os.getenv("RAG_VECTOR_WEIGHT", "0.7"))
+RAG_LEXICAL_WEIGHT = float(os.getenv("RAG_LEXICAL_WEIGHT", "0.3"))
+# 이 값 이상이면 벡터 유사도가 낮아도 결과에 포함 (pg_trgm word_similarity)
+RAG_LEXICAL_THRESHOLD = float(os.getenv("RAG_LEXICAL_THRESHOLD", "0.6"))
+
+# 프로세스 내 FAQ 벡터 인덱스 (services/faq_index.py). 준비 전에는 RPC 검색 사용
+FAQ_INDEX_ENABLED = os.getenv("FAQ_INDEX_ENABLED", "true").lower() == "true"
+# 증분 동기화 주기 (초) / 삭제 대조 주기 (동기화 N회마다)
+FAQ_INDEX_SYNC_SECONDS = int(os.getenv("FAQ_INDEX_SYNC_SECONDS", "60"))
+FAQ_INDEX_RECONCILE_EVERY = int(os.getenv("FAQ_INDEX_RECONCILE_EVERY", "10"))
+# HNSW 검색 폭 (hnswlib 사용 시)
+FAQ_INDEX_EF = int(os.getenv("FAQ_INDEX_EF", "64"))
+# NumPy 전수 검색 Matryoshka 1차 후보용 앞 차원 수 (0이면 768차원 단일 단계, 후보 배수는 VECTOR_RERANK_FACTOR)
+FAQ_INDEX_PREFIX_DIM = int(os.getenv("FAQ_INDEX_PREFIX_DIM", "0"))
+
+# RAG 결과 다양화 (MMR 재정렬 + 출처별 최대 건수)
+RAG_MMR_ENABLED = os.getenv("RAG_MMR_ENABLED", "true").lower() == "true"
+# λ: 1에 가까울수록 관련도 우선, 0에 가까울수록 다양성 우선
+RAG_MMR_LAMBDA = float(os.getenv("RAG_MMR_LAMBDA", "0.7"))
+# 최종 건수 대비 후보 조회 배수 / 같은 영상·논문에서 고르는 최대 건수
+RAG_MMR_OVERFETCH = int(os.getenv("RAG_MMR_OVERFETCH", "3"))
+RAG_MMR_SOURCE_CAP = int(os.getenv("RAG_MMR_SOURCE_CAP", "2"))
+# 이미 고른 FAQ와 이 값 이상 유사하면 중복으로 제외
+RAG_MMR_DUP_THRESHOLD = float(os.getenv("RAG_MMR_DUP_THRESHOLD", "0.95"))
+
+# RAG 검색 결과 캐시 (faq_vectors 코퍼스 버전이 바뀌면 무효화)
+RAG_CACHE_ENABLED = os.getenv("RAG_CACHE_ENABLED", "true").lower() == "true"
+RAG_CACHE_SIZE = int(os.getenv("RAG_CACHE_SIZE", "512"))
+RAG_CACHE_TTL_SECONDS = int(os.getenv("RAG_CACHE_TTL_SECONDS", "86400"))
+# rag_result_cache 테이블에도 저장 (재시작/인스턴스 간 공유)
+RAG_CACHE_PERSIST = os.getenv("RAG_CACHE_PERSIST", "false").lower() == "true"
+# 코퍼스 버전 확인 주기 (초)
+RAG_CACHE_VERSION_CHECK_SECONDS = int(os.getenv("RAG_CACHE_VERSION_CHECK_SECONDS", "30"))
+
+# 의도 추출 시술명 → 표준 시술(procedures)로 후보를 먼저 좁혀 검색
+RAG_PREFILTER_ENABLED = os.getenv("RAG_PREFILTER_ENABLED", "true").lower() == "true"
+# 좁힌 검색 결과가 이 건수 미만이면 카테고리 전체 검색 결과로 보충
+RAG_PREFILTER_MIN_RESULTS = int(os.getenv("RAG_PREFILTER_MIN_RESULTS", "4"))
+
+# DB 벡터 검색 방식: hnsw(내적, 020) | halfvec / binary(압축 인덱스 + 원본 재정렬, 021)
+#   | matryoshka(앞 256차원 1차 후보 + 원본 재정렬, 022) | ivfflat(코사인) | exact(인덱스 미사용)
+# hnsw 외의 HNSW 계열은 인덱스를 자동으로 만들지 않으므로 바꾸기 전에 SELECT use_vector_index('<방식>') 실행
+VECTOR_INDEX_TYPE = os.getenv("VECTOR_INDEX_TYPE", "hnsw")
+# HNSW 탐색 후보 수. 카테고리 조건이 탐색 후 적용되므로 조회 건수의 몇 배로 설정
+VECTOR_EF_SEARCH = int(os.getenv("VECTOR_EF_SEARCH", "100"))
+# ivfflat 탐색 리스트 수 (lists = 100 중)
+VECTOR_IVFFLAT_PROBES = int(os.getenv("VECTOR_IVFFLAT_PROBES", "10"))
+# 압축/prefix 인덱스(halfvec/binary/matryoshka) 1차 후보 배수 (조회 건수 × 배수를 원본 벡터로 재정렬)
+VECTOR_RERANK_FACTOR = int(os.getenv("VECTOR_RERANK_FACTOR", "4"))
+
 # 벡터DB 구축 대상 YouTube 채널 (피부과 5 + 성형외과 6)
 TARGET_CHANNELS = [
     # 피부과
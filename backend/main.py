@@ -1,5 +1,7 @@
+import asyncio
 import logging
 import sys
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -23,11 +25,42 @@ from api.dashboard import router as dashboard_router
 from api.public_report import router as public_report_router
 from api.admin import router as admin_router
 from api.vectors import router as vectors_router
+from api.jobs import router as jobs_router
+from services.dedup import rebuild_near_duplicate_index
+from services.translation_memory import load_translation_memory
+from services.model_registry import load_local_models
+from agents.keyword_extractor import load_gazetteer
+from services.faq_index import faq_index_loop
+from agents.recovery import recovery_loop, drain_and_handoff
+from config import PIPELINE_SHUTDOWN_GRACE_SECONDS
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 유사 중복 LSH 인덱스 재구축 (기동 지연 방지를 위해 백그라운드 실행)
+    app.state.dedup_index_task = asyncio.create_task(asyncio.to_thread(rebuild_near_duplicate_index))
+    # 번역 메모리 유사 일치 인덱스 적재
+    app.state.translation_memory_task = asyncio.create_task(asyncio.to_thread(load_translation_memory))
+    # 학습된 로컬 모델(분류 등) 적재
+    app.state.local_models_task = asyncio.create_task(asyncio.to_thread(load_local_models))
+    # 로컬 키워드 추출용 시술명/부위 사전 구성
+    app.state.gazetteer_task = asyncio.create_task(asyncio.to_thread(load_gazetteer))
+    # FAQ 벡터 인덱스 적재 + 증분 동기화
+    app.state.faq_index_task = asyncio.create_task(faq_index_loop())
+    # 점유 갱신 + 다른 인스턴스에서 멈춘 파이프라인 복구
+    app.state.recovery_task = asyncio.create_task(recovery_loop())
+    yield
+    # 종료(SIGTERM): 새 작업 중단 → 유예 시간 후 남은 상담을 다른 인스턴스로 인계
+    app.state.recovery_task.cancel()
+    app.state.faq_index_task.cancel()
+    await drain_and_handoff(PIPELINE_SHUTDOWN_GRACE_SECONDS)
+
 
 app = FastAPI(
     title="MediHim Ippeo API",
     description="AI 상담 리포트 시스템 백엔드",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # CORS 설정
@@ -55,6 +88,7 @@ app.include_router(dashboard_router)
 app.include_router(public_report_router)
 app.include_router(admin_router)
 app.include_router(vectors_router)
+app.include_router(jobs_router)
 
 
 @app.get("/")
@@ -0,0 +1,40 @@
+"""
+consultations.content_hash 백필 스크립트 (migration 007 이후 1회 실행).
+
+사용법:
+  cd backend
+  python -m scripts.backfill_content_hash
+"""
+from services.supabase_client import get_supabase
+from services.dedup import compute_content_hash
+
+
+def backfill_content_hash():
+    db = get_supabase()
+    updated = 0
+
+    while True:
+        # 해시가 채워진 행은 다음 조회에서 빠지므로 항상 첫 페이지를 조회
+        page = (
+            db.table("consultations")
+            .select("id, original_text")
+            .is_("content_hash", "null")
+            .limit(500)
+            .execute()
+        )
+        if not page.data:
+            break
+
+        for row in page.data:
+            db.table("consultations").update(
+                {"content_hash": compute_content_hash(row["original_text"])}
+            ).eq("id", row["id"]).execute()
+            updated += 1
+
+        print(f"  {updated} rows updated...", flush=True)
+
+    print(f"\n  content_hash backfill done: {updated} rows")
+
+
+if __name__ == "__main__":
+    backfill_content_hash()
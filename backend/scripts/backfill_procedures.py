@@ -0,0 +1,160 @@
+"""
+표준 시술 분류(procedures) 구성 + faq_vectors.procedure_id 백필.
+
+1. 기본 동의어 사전(_SEED_SYNONYMS)의 표준 시술을 등록 (이미 있으면 별칭만 추가)
+2. faq_vectors.procedure_name을 정규화해, 기존 별칭과 매핑되지 않으면서 --min-count건 이상
+   나온 이름을 새 표준 시술로 등록
+3. 모든 행의 procedure_id를 갱신 (정확 일치 → 가장 긴 포함 별칭)
+
+새로 저장되는 FAQ는 DB 트리거가 정확 일치 별칭만 매핑하므로, 수집 후 주기적으로 다시 실행한다.
+
+사용법:
+  cd backend
+  python -m scripts.backfill_procedures --dry-run
+  python -m scripts.backfill_procedures
+  python -m scripts.backfill_procedures --min-count 5
+"""
+import argparse
+from collections import Counter, defaultdict
+
+from services.supabase_client import get_supabase
+from services.procedure_taxonomy import Taxonomy, normalize_procedure_name
+
+# 표준 시술명 → (카테고리, 별칭). 별칭은 저장 시 정규화됨
+_SEED_SYNONYMS: dict[str, tuple[str, list[str]]] = {
+    "보톡스": ("dermatology", ["보톡스", "보톡", "botox", "보툴리눔톡신", "톡신", "ボトックス"]),
+    "필러": ("dermatology", ["필러", "filler", "히알루론산필러", "ヒアルロン酸"]),
+    "울쎄라": ("dermatology", ["울쎄라", "울세라", "ulthera", "ultherapy", "ウルセラ"]),
+    "써마지": ("dermatology", ["써마지", "서마지", "thermage", "サーマクール"]),
+    "리쥬란": ("dermatology", ["리쥬란", "rejuran", "リジュラン"]),
+    "스컬트라": ("dermatology", ["스컬트라", "sculptra", "スカルプトラ"]),
+    "레이저 토닝": ("dermatology", ["레이저토닝", "토닝", "toning"]),
+    "실리프팅": ("boundary", ["실리프팅", "실리프트", "threadlift", "糸リフト"]),
+    "쌍꺼풀 수술": ("plastic_surgery", ["쌍꺼풀수술", "쌍꺼풀", "쌍커풀", "쌍수", "매몰법", "절개법", "二重整形", "二重"]),
+    "코성형": ("plastic_surgery", ["코성형", "rhinoplasty", "鼻整形", "隆鼻"]),
+    "안면윤곽": ("plastic_surgery", ["안면윤곽", "사각턱수술", "광대축소", "輪郭形成"]),
+    "지방흡입": ("plastic_surgery", ["지방흡입", "liposuction", "脂肪吸引"]),
+    "지방이식": ("plastic_surgery", ["지방이식", "脂肪注入"]),
+    "가슴성형": ("plastic_surgery", ["가슴성형", "가슴확대", "豊胸"]),
+}
+
+
+def _fetch_faq_rows(db) -> list[dict]:
+    rows, offset = [], 0
+    while True:
+        page = (
+            db.table("faq_vectors")
+            .select("id, category, procedure_name, procedure_id")
+            .order("id")
+            .range(offset, offset + 999)
+            .execute()
+        )
+        rows.extend(page.data)
+        if len(page.data) < 1000:
+            break
+        offset += 1000
+    return rows
+
+
+def _load_taxonomy(db) -> Taxonomy:
+    return Taxonomy(db.table("procedures").select("id, canonical_name, category, aliases").execute().data)
+
+
+def _seed(db, taxonomy: Taxonomy, dry_run: bool) -> int:
+    """기본 동의어 등록. 추가/갱신된 표준 시술 수 반환"""
+    changed = 0
+    existing = {row["canonical_name"]: row for row in taxonomy.rows}
+    for canonical, (category, aliases) in _SEED_SYNONYMS.items():
+        normalized = sorted({normalize_procedure_name(a) for a in aliases + [canonical]} - {""})
+        row = existing.get(canonical)
+        if row is None:
+            changed += 1
+            if not dry_run:
+                db.table("procedures").insert(
+                    {"canonical_name": canonical, "category": category, "aliases": normalized}
+                ).execute()
+        elif not set(normalized) <= set(row.get("aliases") or []):
+            changed += 1
+            if not dry_run:
+                merged = sorted(set(row.get("aliases") or []) | set(normalized))
+                db.table("procedures").update({"aliases": merged}).eq("id", row["id"]).execute()
+    return changed
+
+
+def _discover(db, taxonomy: Taxonomy, rows: list[dict], min_count: int, dry_run: bool) -> list[str]:
+    """기존 별칭으로 매핑되지 않는 자주 나오는 이름을 새 표준 시술로 등록"""
+    counts: Counter = Counter()
+    raw_forms: dict[str, Counter] = defaultdict(Counter)
+    categories: dict[str, Counter] = defaultdict(Counter)
+    for row in rows:
+        name = row.get("procedure_name")
+        normalized = normalize_procedure_name(name)
+        if len(normalized) < 2 or taxonomy.match(name) is not None:
+            continue
+        counts[normalized] += 1
+        raw_forms[normalized][name.split("(")[0].strip()] += 1
+        categories[normalized][row["category"]] += 1
+
+    created = []
+    for normalized, count in counts.most_common():
+        if count < min_count:
+            break
+        canonical = raw_forms[normalized].most_common(1)[0][0] or normalized
+        category = categories[normalized].most_common(1)[0][0]
+        created.append(f"{canonical} ({category}, {count})")
+        if not dry_run:
+            db.table("procedures").upsert(
+                {"canonical_name": canonical, "category": category, "aliases": [normalized]},
+                on_conflict="canonical_name",
+            ).execute()
+    return created
+
+
+def backfill(min_count: int = 3, dry_run: bool = False):
+    db = get_supabase()
+    rows = _fetch_faq_rows(db)
+    print(f"  faq_vectors: {len(rows)} rows ({sum(1 for r in rows if r.get('procedure_name'))} with procedure_name)")
+
+    seeded = _seed(db, _load_taxonomy(db), dry_run)
+    print(f"  Seed procedures added/updated: {seeded}")
+
+    taxonomy = _load_taxonomy(db)
+    created = _discover(db, taxonomy, rows, min_count, dry_run)
+    print(f"  New procedures from faq_vectors: {len(created)}")
+    for line in created[:30]:
+        print(f"    + {line}")
+
+    taxonomy = _load_taxonomy(db)
+    updates: dict[int | None, list[str]] = defaultdict(list)
+    unmapped: Counter = Counter()
+    mapped = 0
+    for row in rows:
+        procedure_id = taxonomy.match(row.get("procedure_name")) if row.get("procedure_name") else None
+        if procedure_id is not None:
+            mapped += 1
+        elif row.get("procedure_name"):
+            unmapped[row["procedure_name"]] += 1
+        if procedure_id != row.get("procedure_id"):
+            updates[procedure_id].append(row["id"])
+
+    named = sum(1 for r in rows if r.get("procedure_name"))
+    print(f"  Mapped: {mapped}/{named} ({mapped / named:.1%})" if named else "  Mapped: 0")
+    print(f"  Rows to update: {sum(len(ids) for ids in updates.values())}")
+    for name, count in unmapped.most_common(15):
+        print(f"    ? {name} ({count})")
+
+    if dry_run:
+        return
+    for procedure_id, ids in updates.items():
+        for i in range(0, len(ids), 200):
+            db.table("faq_vectors").update({"procedure_id": procedure_id}).in_("id", ids[i:i + 200]).execute()
+    print("  Done")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="표준 시술 분류 구성 + faq_vectors.procedure_id 백필")
+    parser.add_argument("--min-count", type=int, default=3, help="새 표준 시술로 등록할 최소 등장 횟수")
+    parser.add_argument("--dry-run", action="store_true", help="변경 없이 매핑 결과만 출력")
+    args = parser.parse_args()
+
+    backfill(min_count=args.min_count, dry_run=args.dry_run)
@@ -0,0 +1,115 @@
+"""
+로컬 분류 모델 vs 기존 LLM 2회 호출(분류 + 검증) 경로 오프라인 평가 및 지연 시간 비교.
+
+활성 모델이 학습된 이후 등록된 상담(학습에 쓰이지 않은 데이터)을 기본 평가 대상으로 한다.
+LLM 경로는 비용이 들기 때문에 --llm-sample 건만 호출한다.
+
+사용법:
+  cd backend
+  python -m scripts.benchmark_classifier
+  python -m scripts.benchmark_classifier --since 2026-01-01 --limit 500 --llm-sample 30
+"""
+import argparse
+import asyncio
+import time
+
+import numpy as np
+
+from config import LOCAL_CLASSIFIER_THRESHOLD
+from services.supabase_client import get_supabase
+from services.model_registry import load_model
+from agents.classifier import classify_with_llm
+from agents.validator import validate_classification
+from scripts.train_classifier import LABEL_FILTER, LABELS, evaluate, print_metrics
+
+
+def _percentiles(values: list[float]) -> dict:
+    if not values:
+        return {"p50_ms": None, "p95_ms": None}
+    return {
+        "p50_ms": round(float(np.percentile(values, 50)), 2),
+        "p95_ms": round(float(np.percentile(values, 95)), 2),
+    }
+
+
+def fetch_eval_rows(since: str | None, limit: int) -> list[dict]:
+    db = get_supabase()
+    if since is None:
+        active = (
+            db.table("ml_models").select("created_at")
+            .eq("name", "classifier").eq("is_active", True).limit(1).execute()
+        )
+        since = active.data[0]["created_at"] if active.data else None
+    query = (
+        db.table("consultations")
+        .select("id, translated_text, intent_extraction, classification")
+        .in_("classification", LABELS)
+        .not_.is_("translated_text", "null")
+        .or_(LABEL_FILTER)
+    )
+    if since:
+        query = query.gte("created_at", since)
+    return query.order("created_at", desc=True).limit(limit).execute().data
+
+
+async def _llm_two_call(text: str, intent: dict) -> tuple[str, float]:
+    start = time.perf_counter()
+    classification_result = await classify_with_llm(text, intent)
+    validation = await validate_classification(classification_result, text, intent)
+    return validation.get("classification", "unclassified"), (time.perf_counter() - start) * 1000
+
+
+async def benchmark(since: str | None, limit: int, llm_sample: int):
+    loaded = load_model("classifier")
+    if not loaded:
+        print("  No active classifier model")
+        return
+    model, version = loaded
+    rows = fetch_eval_rows(since, limit)
+    print(f"  Model {version}, {len(rows)} evaluation rows (since={since or 'model training'})")
+    if not rows:
+        return
+
+    texts = [r["translated_text"] for r in rows]
+    labels = [r["classification"] for r in rows]
+    print_metrics("Local model (offline evaluation)", evaluate(model, texts, labels))
+
+    # 단건 지연 (파이프라인에서의 호출 방식)
+    local_ms = []
+    for text in texts:
+        start = time.perf_counter()
+        model.predict_proba([text])
+        local_ms.append((time.perf_counter() - start) * 1000)
+
+    llm_ms, llm_correct, agree = [], 0, 0
+    for row in rows[:llm_sample]:
+        intent = row.get("intent_extraction") or {}
+        if isinstance(intent, list):
+            intent = intent[0] if intent else {}
+        predicted, elapsed = await _llm_two_call(row["translated_text"], intent)
+        llm_ms.append(elapsed)
+        llm_correct += predicted == row["classification"]
+        local_label = model.classes_[model.predict_proba([row["translated_text"]])[0].argmax()]
+        agree += predicted == local_label
+
+    n_llm = len(llm_ms)
+    print_metrics("Latency / agreement", {
+        "local_" + k: v for k, v in _percentiles(local_ms).items()
+    } | {
+        "llm_two_call_" + k: v for k, v in _percentiles(llm_ms).items()
+    } | {
+        "llm_rows": n_llm,
+        "llm_accuracy": round(llm_correct / n_llm, 4) if n_llm else None,
+        "local_llm_agreement": round(agree / n_llm, 4) if n_llm else None,
+        "threshold": LOCAL_CLASSIFIER_THRESHOLD,
+    })
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="로컬 분류 모델 평가 + 지연 시간 비교")
+    parser.add_argument("--since", help="평가 대상 상담 등록일 하한 (기본: 활성 모델 학습 시각)")
+    parser.add_argument("--limit", type=int, default=500, help="평가 대상 최대 건수")
+    parser.add_argument("--llm-sample", type=int, default=20, help="LLM 경로로 비교할 건수")
+    args = parser.parse_args()
+
+    asyncio.run(benchmark(args.since, args.limit, args.llm_sample))
@@ -0,0 +1,221 @@
+"""
+pgvector 인덱스 설정별 FAQ 벡터 검색 재현율/지연 시간 비교.
+
+정확 검색(index_type=exact) 상위 k건을 정답으로 두고 HNSW ef_search, ivfflat probes,
+2단계 검색(halfvec / binary / matryoshka 1차 후보 + 원본 재정렬, 재정렬 배수) 설정별 recall@k,
+결과 부족 비율(카테고리 조건 사후 적용으로 k건 미만 반환), RPC 지연 p50/p99를 출력한다.
+마지막에 벡터 인덱스별 크기(벡터당 바이트)를 출력한다.
+압축/prefix 인덱스는 use_vector_index()로 만든 방식만 인덱스를 타므로, 비교할 방식을 차례로 만들어 가며 실행한다.
+지연은 클라이언트에서 잰 RPC 왕복 시간이라 네트워크 지연이 포함된다 (exact 행과 비교해서 해석).
+
+--local: DB 대신 프로세스 내 인덱스(services.faq_index)의 NumPy 전수 검색과
+         Matryoshka 2단계 검색(--prefix-dims × --rerank)을 같은 방식으로 비교
+
+쿼리: 최근 상담의 의도 키워드로 만든 검색 쿼리 (임베딩 API 호출)
+      --from-faq: 저장된 FAQ 임베딩 (API 호출 없음, 자기 자신은 결과에서 제외)
+
+사용법:
+  cd backend
+  python -m scripts.benchmark_vector_search
+  python -m scripts.benchmark_vector_search --k 10 --ef 40,64,100,200 --probes 1,10,20
+  python -m scripts.benchmark_vector_search --two-stage binary,matryoshka --rerank 2,4,8
+  python -m scripts.benchmark_vector_search --local --from-faq --prefix-dims 128,256
+  python -m scripts.benchmark_vector_search --from-faq --queries 200
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import numpy as np
+
+from services.supabase_client import get_supabase
+from services.faq_index import get_faq_index, normalize_embedding
+from agents.rag_agent import build_queries, embed_keywords, vector_search_params
+
+CATEGORIES = ["dermatology", "plastic_surgery", "boundary"]
+
+
+def _percentiles(values: list[float]) -> dict:
+    if not values:
+        return {"p50_ms": None, "p99_ms": None}
+    return {
+        "p50_ms": round(float(np.percentile(values, 50)), 1),
+        "p99_ms": round(float(np.percentile(values, 99)), 1),
+    }
+
+
+async def _consultation_queries(limit: int) -> list[dict]:
+    """최근 상담 의도 키워드 → (카테고리, 쿼리 임베딩) 목록"""
+    rows = (
+        get_supabase().table("consultations")
+        .select("classification, intent_extraction")
+        .in_("classification", CATEGORIES)
+        .not_.is_("intent_extraction", "null")
+        .order("created_at", desc=True)
+        .limit(limit)
+        .execute()
+        .data
+    )
+    queries = []
+    for row in rows:
+        keywords = (row.get("intent_extraction") or {}).get("keywords") or []
+        if not build_queries(keywords):
+            continue
+        for embedding in await embed_keywords(keywords):
+            queries.append({"category": row["classification"], "embedding": embedding, "exclude": None})
+    return queries[:limit]
+
+
+def _faq_queries(limit: int) -> list[dict]:
+    """저장된 FAQ 임베딩을 쿼리로 사용 (id 기준 무작위 표본)"""
+    db = get_supabase()
+    ids = [row["id"] for row in db.table("faq_vectors").select("id").limit(5000).execute().data]
+    sample = random.sample(ids, min(limit, len(ids)))
+    queries = []
+    for i in range(0, len(sample), 100):
+        rows = db.table("faq_vectors").select("id, category, embedding").in_("id", sample[i:i + 100]).execute().data
+        for row in rows:
+            embedding = row["embedding"]
+            if isinstance(embedding, str):
+                embedding = json.loads(embedding)
+            queries.append({"category": row["category"], "embedding": embedding, "exclude": row["id"]})
+    return queries
+
+
+def _search(db, query: dict, k: int, params: dict) -> tuple[list[str], float]:
+    start = time.perf_counter()
+    rows = db.rpc(
+        "search_faq",
+        {
+            "query_embedding": query["embedding"],
+            "target_category": query["category"],
+            "match_threshold": -1.0,
+            "match_count": k + (1 if query["exclude"] else 0),
+            **params,
+        },
+    ).execute().data
+    elapsed = (time.perf_counter() - start) * 1000
+    ids = [row["id"] for row in rows if row["id"] != query["exclude"]]
+    return ids[:k], elapsed
+
+
+def _configs(
+    ef_values: list[int], probe_values: list[int], two_stage: list[str], rerank_values: list[int],
+) -> list[tuple[str, dict]]:
+    configs = [("exact", vector_search_params("exact"))]
+    configs += [(f"hnsw ef_search={ef}", vector_search_params("hnsw", ef_search=ef)) for ef in ef_values]
+    configs += [(f"ivfflat probes={p}", vector_search_params("ivfflat", probes=p)) for p in probe_values]
+    configs += [
+        (f"{index_type} rerank={r}", vector_search_params(index_type, rerank_factor=r))
+        for index_type in two_stage
+        for r in rerank_values
+    ]
+    return configs
+
+
+def print_index_sizes():
+    rows = get_supabase().rpc("faq_vector_index_sizes", {}).execute().data
+    print(f"\n  {'index':<36} {'size_mb':>9} {'bytes/vector':>13}")
+    for row in sorted(rows, key=lambda r: r["index_name"]):
+        per_vector = row["size_bytes"] / row["row_count"] if row["row_count"] else 0
+        print(f"  {row['index_name']:<36} {row['size_bytes'] / 1e6:>9.1f} {per_vector:>13.0f}")
+
+
+def _run(name: str, queries: list[dict], search, warmup: int, truth: list[list[str]] | None) -> list[list[str]]:
+    """search(query) → (ids, ms). truth가 None이면 이 설정 결과를 정답으로 사용"""
+    for query in queries[:warmup]:
+        search(query)
+
+    results, latencies = [], []
+    for query in queries:
+        ids, elapsed = search(query)
+        results.append(ids)
+        latencies.append(elapsed)
+    truth = results if truth is None else truth
+
+    recalls = [len(set(found) & set(expected)) / len(expected) for found, expected in zip(results, truth) if expected]
+    short = sum(1 for found, expected in zip(results, truth) if len(found) < len(expected)) / len(queries)
+    stats = _percentiles(latencies)
+    print(
+        f"  {name:<24} {float(np.mean(recalls)) if recalls else 0.0:>9.3f} {short:>7.1%} "
+        f"{stats['p50_ms']:>8} {stats['p99_ms']:>8}"
+    )
+    return truth
+
+
+def _header(k: int):
+    print(f"\n  {'config':<24} {'recall@' + str(k):>9} {'short':>7} {'p50_ms':>8} {'p99_ms':>8}")
+
+
+def benchmark(
+    queries: list[dict], k: int, ef_values: list[int], probe_values: list[int],
+    two_stage: list[str], rerank_values: list[int], warmup: int,
+):
+    db = get_supabase()
+    truth = None
+    _header(k)
+    for name, params in _configs(ef_values, probe_values, two_stage, rerank_values):
+        truth = _run(name, queries, lambda query: _search(db, query, k, params), warmup, truth)
+
+
+def benchmark_local(queries: list[dict], k: int, prefix_dims: list[int], rerank_values: list[int], warmup: int):
+    """프로세스 내 인덱스: 768차원 전수 검색 vs Matryoshka 2단계 (검색 파이프라인처럼 쿼리 1건씩)"""
+    index = get_faq_index()
+    index.load()
+    print(f"  Local index: { {c: len(i) for c, i in index.categories.items()} }")
+
+    def local_search(method):
+        def search(query: dict) -> tuple[list[str], float]:
+            category = index.categories.get(query["category"])
+            if category is None or len(category) == 0:
+                return [], 0.0
+            vector = normalize_embedding(query["embedding"])[None, :]
+            start = time.perf_counter()
+            hits = method(category, vector, k + (1 if query["exclude"] else 0))[0]
+            elapsed = (time.perf_counter() - start) * 1000
+            return [faq_id for faq_id, _ in hits if faq_id != query["exclude"]][:k], elapsed
+        return search
+
+    _header(k)
+    truth = _run("numpy 768d", queries, local_search(lambda c, q, n: c.knn_exact(q, n)), warmup, None)
+    for dim in prefix_dims:
+        for factor in rerank_values:
+            method = local_search(lambda c, q, n, d=dim, f=factor: c.knn_two_stage(q, n, d, f))
+            _run(f"matryoshka {dim}d x{factor}", queries, method, warmup, truth)
+
+
+def _int_list(value: str) -> list[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="pgvector 인덱스 설정별 재현율/지연 비교")
+    parser.add_argument("--queries", type=int, default=100, help="쿼리 수")
+    parser.add_argument("--k", type=int, default=10, help="recall@k의 k")
+    parser.add_argument("--ef", type=_int_list, default=[40, 64, 100, 200], help="HNSW ef_search 목록 (쉼표 구분)")
+    parser.add_argument("--probes", type=_int_list, default=[1, 5, 10, 20], help="ivfflat probes 목록 (쉼표 구분)")
+    parser.add_argument(
+        "--two-stage", type=lambda v: [t for t in v.split(",") if t], default=["halfvec", "binary", "matryoshka"],
+        help="2단계 검색 방식 목록 (halfvec,binary,matryoshka)",
+    )
+    parser.add_argument("--rerank", type=_int_list, default=[2, 4, 8], help="2단계 검색 재정렬 배수 목록")
+    parser.add_argument("--local", action="store_true", help="프로세스 내 인덱스 비교 (DB 인덱스 대신)")
+    parser.add_argument("--prefix-dims", type=_int_list, default=[128, 256], help="--local Matryoshka 앞 차원 목록")
+    parser.add_argument("--warmup", type=int, default=5, help="설정별 측정 전 워밍업 쿼리 수")
+    parser.add_argument("--from-faq", action="store_true", help="저장된 FAQ 임베딩을 쿼리로 사용")
+    args = parser.parse_args()
+
+    if args.from_faq:
+        query_set = _faq_queries(args.queries)
+    else:
+        query_set = asyncio.run(_consultation_queries(args.queries))
+    print(f"  {len(query_set)} queries ({'faq' if args.from_faq else 'consultations'}), k={args.k}")
+    if args.local:
+        if query_set:
+            benchmark_local(query_set, args.k, args.prefix_dims, args.rerank, args.warmup)
+    else:
+        if query_set:
+            benchmark(query_set, args.k, args.ef, args.probes, args.two_stage, args.rerank, args.warmup)
+        print_index_sizes()
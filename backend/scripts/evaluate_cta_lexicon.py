@@ -0,0 +1,122 @@
+"""
+로컬 CTA 사전(agents/cta_scorer) vs 과거 cta_level 라벨 오프라인 평가.
+
+규칙 기반 화자 분리가 되는 상담의 고객 발화로 로컬 점수를 계산하고,
+확실 판정 비율(커버리지)과 확실 판정의 라벨 일치율을 레벨별로 출력한다.
+관리자가 수정한 CTA(cta_override 로그)는 별도로 집계한다.
+CTA_LOCAL_ENABLED를 켜기 전에 확실 판정 정확도가 LLM 수준인지 확인하는 용도.
+
+사용법:
+  cd backend
+  python -m scripts.evaluate_cta_lexicon
+  python -m scripts.evaluate_cta_lexicon --limit 2000 --show-errors 20
+"""
+import argparse
+from collections import Counter
+
+from services.supabase_client import get_supabase
+from agents.cta_scorer import score_cta
+from agents.speaker_segmenter import segment_speakers
+
+LEVELS = ["hot", "warm", "cool"]
+PAGE_SIZE = 500
+
+
+def fetch_labeled_rows(limit: int) -> list[dict]:
+    db = get_supabase()
+    rows = []
+    while len(rows) < limit:
+        page = (
+            db.table("consultations")
+            .select("id, original_text, input_language, cta_level")
+            .in_("cta_level", LEVELS)
+            .order("created_at", desc=True)
+            .order("id")
+            .range(len(rows), min(len(rows) + PAGE_SIZE, limit) - 1)
+            .execute()
+        ).data
+        rows += page
+        if len(page) < PAGE_SIZE:
+            break
+    return rows
+
+
+def fetch_overridden_ids() -> set[str]:
+    db = get_supabase()
+    logs = db.table("agent_logs").select("consultation_id").eq("agent_name", "cta_override").execute()
+    return {log["consultation_id"] for log in logs.data}
+
+
+def evaluate(rows: list[dict], overridden: set[str]) -> dict:
+    """{"summary": 전체 지표, "levels": 레벨별 지표, "errors": 확실 판정 오답 목록}"""
+    segmented = certain = correct = 0
+    override_certain = override_correct = 0
+    predicted = Counter()
+    hits = Counter()
+    labels = Counter()
+    errors = []
+    for row in rows:
+        segmentation = segment_speakers(row.get("original_text") or "")
+        if segmentation is None:
+            continue
+        segmented += 1
+        score = score_cta(segmentation.customer_texts(), row.get("input_language") or "ja")
+        if score.uncertain:
+            continue
+        certain += 1
+        label = row["cta_level"]
+        labels[label] += 1
+        predicted[score.cta_level] += 1
+        ok = score.cta_level == label
+        correct += ok
+        hits[score.cta_level] += ok
+        if row["id"] in overridden:
+            override_certain += 1
+            override_correct += ok
+        if not ok:
+            errors.append({"id": row["id"], "label": label, "local": score.cta_level, "spans": score.spans})
+
+    def ratio(a: int, b: int):
+        return round(a / b, 4) if b else None
+
+    return {
+        "summary": {
+            "rows": len(rows),
+            "segmented": segmented,
+            "certain": certain,
+            "coverage": ratio(certain, len(rows)),
+            "certain_accuracy": ratio(correct, certain),
+            "override_rows": override_certain,
+            "override_accuracy": ratio(override_correct, override_certain),
+        },
+        "levels": {
+            level: {
+                "predicted": predicted[level],
+                "precision": ratio(hits[level], predicted[level]),
+                "recall": ratio(hits[level], labels[level]),
+            }
+            for level in LEVELS
+        },
+        "errors": errors,
+    }
+
+
+def print_report(result: dict, show_errors: int):
+    print(f"\n{'=' * 50}\n  Local CTA lexicon vs historical labels\n{'=' * 50}")
+    for key, value in result["summary"].items():
+        print(f"  {key:<24} {value}")
+    for level, values in result["levels"].items():
+        print(f"  {level:<8} " + "  ".join(f"{k}={v}" for k, v in values.items()))
+    for error in result["errors"][:show_errors]:
+        matches = ", ".join(f"{s['signal']}:{s['match']}" for s in error["spans"])
+        print(f"  [{error['id'][:8]}] label={error['label']} local={error['local']} ({matches})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="로컬 CTA 사전 오프라인 평가")
+    parser.add_argument("--limit", type=int, default=1000, help="평가 대상 최대 건수 (최근 등록순)")
+    parser.add_argument("--show-errors", type=int, default=10, help="출력할 확실 판정 오답 수")
+    args = parser.parse_args()
+
+    rows = fetch_labeled_rows(args.limit)
+    print_report(evaluate(rows, fetch_overridden_ids()), args.show_errors)
@@ -0,0 +1,167 @@
+"""
+로컬 분류 모델 학습 (문자 n-gram TF-IDF + 보정된 로지스틱 회귀).
+
+최종 분류가 확정된 과거 상담(translated_text, classification)으로 학습한다.
+관리자가 수동 분류한 상담(is_manually_classified)은 가중치를 높여 반영한다.
+로컬 모델/키워드 사전이 스스로 낸 분류(classification_method = model/keyword)는
+자기 예측을 다시 학습하게 되므로 라벨에서 제외한다 (관리자가 수동 분류한 경우는 포함).
+홀드아웃 평가 결과를 출력하고, 전체 데이터로 다시 학습한 모델을 ml_models에 새 버전으로 저장한다.
+
+사용법:
+  cd backend
+  python -m scripts.train_classifier              # 평가 + 학습 + 저장(활성화)
+  python -m scripts.train_classifier --dry-run    # 평가만
+  python -m scripts.train_classifier --no-activate
+"""
+import argparse
+import time
+
+import numpy as np
+from sklearn.calibration import CalibratedClassifierCV
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, f1_score
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import Pipeline
+
+from config import LOCAL_CLASSIFIER_THRESHOLD
+from services.supabase_client import get_supabase
+from services.model_registry import save_model
+
+LABELS = ["dermatology", "plastic_surgery"]
+MANUAL_WEIGHT = 2.0
+# 학습 라벨로 쓰는 분류 출처 (NULL: 024 이전 LLM 분류)
+LABEL_FILTER = (
+    "is_manually_classified.eq.true,classification_method.is.null,"
+    "classification_method.eq.llm,classification_method.eq.manual"
+)
+
+
+def fetch_training_data() -> list[dict]:
+    db = get_supabase()
+    rows = []
+    offset = 0
+    while True:
+        page = (
+            db.table("consultations")
+            .select("id, translated_text, classification, is_manually_classified, created_at")
+            .in_("classification", LABELS)
+            .not_.is_("translated_text", "null")
+            .or_(LABEL_FILTER)
+            .order("created_at")
+            .order("id")
+            .range(offset, offset + 999)
+            .execute()
+        )
+        rows.extend(r for r in page.data if (r.get("translated_text") or "").strip())
+        if len(page.data) < 1000:
+            break
+        offset += 1000
+    return rows
+
+
+def build_pipeline(n_rows: int) -> Pipeline:
+    # 데이터가 적을 때는 isotonic 보정이 과적합되므로 sigmoid 사용
+    return Pipeline([
+        ("tfidf", TfidfVectorizer(
+            analyzer="char_wb", ngram_range=(2, 4), min_df=2,
+            max_features=50000, sublinear_tf=True,
+        )),
+        ("clf", CalibratedClassifierCV(
+            LogisticRegression(max_iter=2000, C=4.0, class_weight="balanced"),
+            method="isotonic" if n_rows >= 2000 else "sigmoid",
+            cv=5,
+        )),
+    ])
+
+
+def sample_weights(rows: list[dict]) -> np.ndarray:
+    return np.array([MANUAL_WEIGHT if r.get("is_manually_classified") else 1.0 for r in rows])
+
+
+def evaluate(model, texts: list[str], labels: list[str], threshold: float = LOCAL_CLASSIFIER_THRESHOLD) -> dict:
+    """정확도/F1 + 임계값 이상 예측의 커버리지·정확도 + 보정 오차(ECE) + 예측 지연"""
+    start = time.perf_counter()
+    probabilities = model.predict_proba(texts)
+    per_item_ms = (time.perf_counter() - start) * 1000 / max(len(texts), 1)
+
+    predicted = model.classes_[probabilities.argmax(axis=1)]
+    confidence = probabilities.max(axis=1)
+    labels = np.array(labels)
+    correct = predicted == labels
+    confident = confidence >= threshold
+
+    # 10구간 Expected Calibration Error
+    bins = np.linspace(0.5, 1.0, 11)
+    ece = 0.0
+    for low, high in zip(bins[:-1], bins[1:]):
+        in_bin = (confidence > low) & (confidence <= high)
+        if in_bin.any():
+            ece += in_bin.mean() * abs(correct[in_bin].mean() - confidence[in_bin].mean())
+
+    return {
+        "rows": int(len(labels)),
+        "accuracy": round(float(correct.mean()), 4),
+        "macro_f1": round(float(f1_score(labels, predicted, average="macro")), 4),
+        "threshold": threshold,
+        "coverage_at_threshold": round(float(confident.mean()), 4),
+        "accuracy_at_threshold": round(float(correct[confident].mean()), 4) if confident.any() else None,
+        "ece": round(float(ece), 4),
+        "predict_ms_per_item": round(per_item_ms, 3),
+    }
+
+
+def print_metrics(title: str, metrics: dict):
+    print(f"\n{'=' * 50}")
+    print(f"  {title}")
+    print(f"{'=' * 50}")
+    for key, value in metrics.items():
+        print(f"  {key:<24} {value}")
+
+
+def train(dry_run: bool = False, activate: bool = True, test_size: float = 0.2):
+    rows = fetch_training_data()
+    print(f"  Training rows: {len(rows)} ({sum(1 for r in rows if r.get('is_manually_classified'))} manual)")
+    if len(rows) < 50:
+        print("  Not enough labeled consultations (need at least 50)")
+        return
+
+    texts = [r["translated_text"] for r in rows]
+    labels = [r["classification"] for r in rows]
+    weights = sample_weights(rows)
+
+    # 1. 홀드아웃 평가
+    x_train, x_test, y_train, y_test, w_train, _ = train_test_split(
+        texts, labels, weights, test_size=test_size, stratify=labels, random_state=42,
+    )
+    start = time.time()
+    model = build_pipeline(len(x_train))
+    model.fit(x_train, y_train, clf__sample_weight=w_train)
+    train_seconds = round(time.time() - start, 1)
+    holdout = evaluate(model, x_test, y_test)
+    holdout["train_seconds"] = train_seconds
+    print_metrics("Holdout evaluation", holdout)
+
+    if dry_run:
+        return
+
+    # 2. 전체 데이터로 재학습 후 저장
+    final_model = build_pipeline(len(texts))
+    final_model.fit(texts, labels, clf__sample_weight=weights)
+    version = save_model(
+        "classifier", final_model,
+        metrics={"holdout": holdout, "label_counts": {l: labels.count(l) for l in LABELS}},
+        training_rows=len(rows), activate=activate,
+    )
+    print(f"\n  Saved model {version} (active={activate})")
+    print(f"  Accuracy on training data: {accuracy_score(labels, final_model.predict(texts)):.4f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="로컬 분류 모델 학습")
+    parser.add_argument("--dry-run", action="store_true", help="평가만 하고 저장하지 않음")
+    parser.add_argument("--no-activate", action="store_true", help="저장만 하고 활성화하지 않음")
+    parser.add_argument("--test-size", type=float, default=0.2, help="홀드아웃 비율")
+    args = parser.parse_args()
+
+    train(dry_run=args.dry_run, activate=not args.no_activate, test_size=args.test_size)
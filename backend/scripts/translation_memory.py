@@ -0,0 +1,75 @@
+"""
+번역 메모리(translation_memory) 내보내기 / 가져오기.
+
+내보낸 JSON의 translated_text를 고친 뒤 다시 가져오면 교정본이 source='manual'로 저장되어
+이후 파이프라인 번역에서 그대로 재사용된다 (LLM 번역으로 덮어쓰지 않음).
+가져오기는 현재 저장된 번역과 다른 행(교정한 행, 새 문장)만 저장하고, 고치지 않은 행은 건드리지 않는다.
+
+사용법:
+  cd backend
+  python -m scripts.translation_memory export tm.json
+  python -m scripts.translation_memory export tm.json --min-hits 3
+  python -m scripts.translation_memory import tm.json
+"""
+import argparse
+import json
+
+from services.supabase_client import get_supabase
+from services.translation_memory import fetch_translations, normalize_segment, segment_hash, store_segments
+
+
+def export_memory(path: str, min_hits: int = 0):
+    db = get_supabase()
+    rows = []
+    offset = 0
+    while True:
+        page = (
+            db.table("translation_memory")
+            .select("source_text, translated_text, source, hit_count")
+            .gte("hit_count", min_hits)
+            .order("hit_count", desc=True)
+            .range(offset, offset + 999)
+            .execute()
+        )
+        rows.extend(page.data)
+        if len(page.data) < 1000:
+            break
+        offset += 1000
+
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(rows, f, ensure_ascii=False, indent=2)
+    print(f"  {len(rows)} segments exported → {path}")
+
+
+def import_memory(path: str):
+    with open(path, encoding="utf-8") as f:
+        rows = json.load(f)
+
+    pairs = {
+        normalize_segment(row["source_text"]): row["translated_text"].strip()
+        for row in rows
+        if row.get("source_text") and row.get("translated_text")
+    }
+    current = fetch_translations([segment_hash(normalized) for normalized in pairs])
+    items = [
+        (normalized, translated) for normalized, translated in pairs.items()
+        if current.get(segment_hash(normalized)) != translated
+    ]
+    print(f"  {len(pairs) - len(items)} unchanged segments skipped")
+    for i in range(0, len(items), 500):
+        store_segments(dict(items[i:i + 500]), source="manual", overwrite=True)
+        print(f"  {min(i + 500, len(items))}/{len(items)} segments imported...", flush=True)
+    print(f"\n  translation memory import done: {len(items)} segments")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="번역 메모리 내보내기/가져오기")
+    parser.add_argument("command", choices=["export", "import"])
+    parser.add_argument("path", help="JSON 파일 경로")
+    parser.add_argument("--min-hits", type=int, default=0, help="내보낼 최소 재사용 횟수")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        export_memory(args.path, args.min_hits)
+    else:
+        import_memory(args.path)
@@ -0,0 +1,112 @@
+"""상담 단위 파이프라인 점유(claim).
+
+상태 조회 후 개별 UPDATE 하던 방식 대신, 허용 상태 조건을 건 UPDATE 한 번으로 점유한다.
+PostgreSQL은 행 잠금 후 WHERE 조건을 다시 평가하므로 동시에 들어온 두 요청 중
+하나만 행을 돌려받는다 (다른 인스턴스/더블 클릭 포함).
+
+점유 시 작업 정보(pipeline_job)를 함께 저장하고, 실행 중에는 claimed_at을 주기적으로 갱신한다.
+종료되는 인스턴스는 끝내지 못한 상담에 needs_requeue를 표시해 다른 인스턴스에 넘긴다."""
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from config import PIPELINE_LEASE_SECONDS
+from services.supabase_client import get_supabase
+
+# Cloud Run 리비전 + 프로세스별 고유 ID
+INSTANCE_ID = f"{os.getenv('K_REVISION', 'local')}-{uuid.uuid4().hex[:8]}"
+
+# 파이프라인이 점유 중인 상태 (인계/복구 대상)
+IN_FLIGHT_STATUSES = ["processing", "report_generating"]
+
+
+def claim_consultations(
+    consultation_ids: list[str],
+    from_statuses: list[str],
+    to_status: str,
+    job: dict | None = None,
+) -> list[str]:
+    """from_statuses 중 하나인 상담만 to_status로 전환하고, 실제로 점유한 ID 목록을 반환.
+    job: 인계 시 다른 인스턴스가 같은 작업을 다시 등록할 수 있도록 저장하는 작업 정보"""
+    if not consultation_ids:
+        return []
+    db = get_supabase()
+    result = (
+        db.table("consultations")
+        .update({
+            "status": to_status,
+            "claimed_by": INSTANCE_ID,
+            "claimed_at": _now(),
+            "pipeline_job": job or {"kind": "pipeline"},
+            "needs_requeue": False,
+        })
+        .in_("id", consultation_ids)
+        .in_("status", from_statuses)
+        .execute()
+    )
+    return [row["id"] for row in result.data]
+
+
+def claim_consultation(
+    consultation_id: str,
+    from_statuses: list[str],
+    to_status: str,
+    job: dict | None = None,
+) -> bool:
+    return bool(claim_consultations([consultation_id], from_statuses, to_status, job))
+
+
+def lease_cutoff() -> str:
+    """이 시각 이전에 마지막으로 갱신된 점유는 만료된 것으로 본다"""
+    return (datetime.now(timezone.utc) - timedelta(seconds=PIPELINE_LEASE_SECONDS)).isoformat()
+
+
+def stale_claim_filter(cutoff: str) -> str:
+    """인계됐거나 점유 갱신이 끊긴 상담 조건 (PostgREST or_ 표현식)"""
+    return f"needs_requeue.eq.true,claimed_at.is.null,claimed_at.lt.{cutoff}"
+
+
+def reclaim_consultation(row: dict, cutoff: str) -> bool:
+    """멈춘/인계된 상담을 이 인스턴스로 가져옴.
+    조회 시점의 claimed_by가 그대로이고 점유가 여전히 만료 상태일 때만 성공 (CAS).
+    조회와 UPDATE 사이에 원래 인스턴스가 점유를 갱신했으면 가져오지 않는다"""
+    db = get_supabase()
+    query = (
+        db.table("consultations")
+        .update({"claimed_by": INSTANCE_ID, "claimed_at": _now(), "needs_requeue": False})
+        .eq("id", row["id"])
+        .eq("status", row["status"])
+        .or_(stale_claim_filter(cutoff))
+    )
+    if row.get("claimed_by"):
+        query = query.eq("claimed_by", row["claimed_by"])
+    else:
+        query = query.is_("claimed_by", "null")
+    return bool(query.execute().data)
+
+
+def renew_claims(consultation_ids: list[str]):
+    """실행/대기 중인 상담의 점유 시각 갱신 (heartbeat)"""
+    if not consultation_ids:
+        return
+    db = get_supabase()
+    db.table("consultations").update({"claimed_at": _now()}).in_("id", consultation_ids).eq(
+        "claimed_by", INSTANCE_ID
+    ).in_("status", IN_FLIGHT_STATUSES).execute()
+
+
+def release_claims() -> list[str]:
+    """이 인스턴스가 점유한 처리 중 상담을 인계 대상으로 표시하고 ID 목록 반환"""
+    db = get_supabase()
+    result = (
+        db.table("consultations")
+        .update({"claimed_by": None, "needs_requeue": True})
+        .eq("claimed_by", INSTANCE_ID)
+        .in_("status", IN_FLIGHT_STATUSES)
+        .execute()
+    )
+    return [row["id"] for row in result.data]
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
@@ -0,0 +1,187 @@
+import hashlib
+import logging
+import re
+import threading
+import unicodedata
+
+import numpy as np
+
+from config import NEAR_DUP_THRESHOLD
+from services.supabase_client import get_supabase
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """중복 판정용 정규화: NFKC + 소문자화 + 공백 전체 제거.
+    복사/붙여넣기 과정에서 생기는 전각/반각, 줄바꿈 차이를 흡수한다."""
+    normalized = unicodedata.normalize("NFKC", text or "").casefold()
+    return _WHITESPACE_RE.sub("", normalized)
+
+
+def compute_content_hash(text: str) -> str:
+    """정규화된 상담 원문의 SHA-256 해시 (consultations.content_hash)"""
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+# ============================================
+# MinHash / LSH 유사 중복 탐지
+# ============================================
+MINHASH_PERMUTATIONS = 128
+_SHINGLE_SIZE = 5          # 일본어/한국어는 띄어쓰기가 불규칙하므로 문자 n-gram 사용
+_LSH_BANDS = 16            # 16 bands x 8 rows → 자카드 약 0.7 이상에서 후보 검출
+_LSH_ROWS = MINHASH_PERMUTATIONS // _LSH_BANDS
+_PRIME = np.uint64(4294967311)   # 2^32 보다 큰 소수 (a*x+b 가 uint64 범위 내)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+_rng = np.random.RandomState(20260218)
+_PERM_A = _rng.randint(1, 1 << 32, size=MINHASH_PERMUTATIONS, dtype=np.uint64)
+_PERM_B = _rng.randint(0, 1 << 32, size=MINHASH_PERMUTATIONS, dtype=np.uint64)
+
+
+def _shingles(text: str) -> set[str]:
+    normalized = normalize_text(text)
+    if len(normalized) <= _SHINGLE_SIZE:
+        return {normalized}
+    return {normalized[i:i + _SHINGLE_SIZE] for i in range(len(normalized) - _SHINGLE_SIZE + 1)}
+
+
+def compute_minhash(text: str) -> list[int]:
+    """문자 5-gram MinHash 서명 (128개 정수, consultations.minhash_signature)"""
+    hashes = np.fromiter(
+        (
+            int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "little")
+            for s in _shingles(text)
+        ),
+        dtype=np.uint64,
+    )
+    permuted = (np.outer(hashes, _PERM_A) + _PERM_B) % _PRIME & _MAX_HASH
+    return permuted.min(axis=0).tolist()
+
+
+def estimate_similarity(sig_a, sig_b) -> float:
+    """두 MinHash 서명의 일치 비율 = 자카드 유사도 추정치"""
+    return float(np.mean(np.asarray(sig_a, dtype=np.uint64) == np.asarray(sig_b, dtype=np.uint64)))
+
+
+class MinHashLSH:
+    """In-process LSH 인덱스 (band 해시 → 상담 ID 집합)"""
+
+    def __init__(self):
+        self._buckets: list[dict[bytes, set[str]]] = [{} for _ in range(_LSH_BANDS)]
+        self._signatures: dict[str, np.ndarray] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def _band_keys(self, sig: np.ndarray):
+        for band in range(_LSH_BANDS):
+            yield band, sig[band * _LSH_ROWS:(band + 1) * _LSH_ROWS].tobytes()
+
+    def insert(self, key: str, signature: list[int]):
+        sig = np.asarray(signature, dtype=np.uint64)
+        with self._lock:
+            self._signatures[key] = sig
+            for band, band_key in self._band_keys(sig):
+                self._buckets[band].setdefault(band_key, set()).add(key)
+
+    def remove(self, key: str):
+        with self._lock:
+            sig = self._signatures.pop(key, None)
+            if sig is None:
+                return
+            for band, band_key in self._band_keys(sig):
+                bucket = self._buckets[band].get(band_key)
+                if bucket:
+                    bucket.discard(key)
+                    if not bucket:
+                        del self._buckets[band][band_key]
+
+    def merge_missing(self, other: "MinHashLSH"):
+        """other에만 있는 항목을 복사 (재구축 중 새로 등록된 상담 보존)"""
+        with other._lock:
+            items = list(other._signatures.items())
+        for key, sig in items:
+            if key not in self._signatures:
+                self.insert(key, sig)
+
+    def query(self, signature: list[int], threshold: float) -> list[tuple[str, float]]:
+        """유사도 threshold 이상인 후보를 (id, score) 내림차순으로 반환"""
+        sig = np.asarray(signature, dtype=np.uint64)
+        with self._lock:
+            candidates = set()
+            for band, band_key in self._band_keys(sig):
+                candidates |= self._buckets[band].get(band_key, set())
+            scored = [(key, float(np.mean(self._signatures[key] == sig))) for key in candidates]
+        matches = [(key, score) for key, score in scored if score >= threshold]
+        matches.sort(key=lambda m: m[1], reverse=True)
+        return matches
+
+
+_lsh_index = MinHashLSH()
+
+
+def find_near_duplicate(signature: list[int], exclude_id: str | None = None) -> tuple[str, float] | None:
+    """가장 유사한 기존 상담 (id, score). 없으면 None.
+    인덱스는 이 인스턴스만 갱신하므로, 다른 인스턴스에서 삭제된 상담은 DB에서 확인 후 인덱스에서 제거"""
+    matches = [(key, score) for key, score in _lsh_index.query(signature, NEAR_DUP_THRESHOLD) if key != exclude_id]
+    if not matches:
+        return None
+    rows = get_supabase().table("consultations").select("id").in_("id", [key for key, _ in matches]).execute().data
+    existing = {row["id"] for row in rows or []}
+    for key, score in matches:
+        if key in existing:
+            return key, score
+        _lsh_index.remove(key)
+    return None
+
+
+def is_foreign_key_violation(error: Exception) -> bool:
+    """PostgREST APIError의 FK 위반 (확인 직후 유사 중복 원본이 삭제된 경우)"""
+    return getattr(error, "code", None) == "23503"
+
+
+def index_consultation(consultation_id: str, signature: list[int]):
+    _lsh_index.insert(consultation_id, signature)
+
+
+def unindex_consultation(consultation_id: str):
+    _lsh_index.remove(consultation_id)
+
+
+def rebuild_near_duplicate_index():
+    """DB의 minhash_signature로 LSH 인덱스를 재구축 (앱 기동 시 1회).
+    서명이 없는 과거 상담은 여기서 계산해 저장한다."""
+    global _lsh_index
+    db = get_supabase()
+    index = MinHashLSH()
+    offset = 0
+    backfilled = 0
+
+    while True:
+        page = (
+            db.table("consultations")
+            .select("id, minhash_signature, original_text")
+            .order("created_at")
+            .order("id")
+            .range(offset, offset + 999)
+            .execute()
+        )
+        for row in page.data:
+            signature = row.get("minhash_signature")
+            if not signature:
+                signature = compute_minhash(row.get("original_text") or "")
+                db.table("consultations").update({"minhash_signature": signature}).eq("id", row["id"]).execute()
+                backfilled += 1
+            index.insert(row["id"], signature)
+
+        if len(page.data) < 1000:
+            break
+        offset += 1000
+
+    index.merge_missing(_lsh_index)
+    _lsh_index = index
+    logger.info(f"[Dedup] LSH index rebuilt: {len(index)} consultations ({backfilled} signatures backfilled)")
@@ -0,0 +1,458 @@
+"""faq_vectors 프로세스 내 근사 최근접 검색 인덱스 (카테고리별).
+
+기동 시 전체 벡터를 적재하고, 이후 updated_at 기준 증분 동기화로 신규/수정 행을 반영한다.
+동기화 주기마다 data_versions('faq_vectors') 버전을 확인해 바뀌었을 때만 변경분 조회 + id 대조(삭제 반영)를
+수행하고, 반영한 버전을 version에 기록한다 (RAG 캐시는 이 버전이 최신일 때만 결과를 저장).
+이 인스턴스의 삭제 API는 remove()로 즉시 반영한다.
+hnswlib가 설치되어 있으면 HNSW(내적, 정규화 벡터), 없으면 NumPy 전수 내적 검색을 사용한다.
+NumPy 검색은 FAQ_INDEX_PREFIX_DIM이 설정되면 앞 차원(Matryoshka prefix)으로 후보를 뽑고 전체 차원으로 재정렬한다.
+적재 전이거나 적재에 실패한 경우 검색 함수는 None을 반환하고, 호출 측은 RPC로 검색한다.
+
+결과 형식은 search_faq_batch / search_faq_hybrid RPC와 같다. 하이브리드 어휘 점수는
+SQL의 trigram word_similarity 대신 시술명+질문에 검색어가 (공백 무시) 포함되면 1.0으로 근사한다."""
+import asyncio
+import bisect
+import json
+import logging
+import threading
+import time
+import unicodedata
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from config import (
+    FAQ_INDEX_SYNC_SECONDS,
+    FAQ_INDEX_RECONCILE_EVERY,
+    FAQ_INDEX_EF,
+    FAQ_INDEX_PREFIX_DIM,
+    FAQ_INDEX_ENABLED,
+    VECTOR_RERANK_FACTOR,
+)
+from services.rag_cache import fetch_corpus_version
+from services.supabase_client import get_supabase
+
+try:
+    import hnswlib
+except ImportError:
+    hnswlib = None
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_DIM = 768
+CATEGORIES = ("dermatology", "plastic_surgery")
+ROW_FIELDS = (
+    "id", "question", "answer", "procedure_name", "procedure_id", "youtube_url", "youtube_title", "youtube_video_id",
+)
+
+_PAGE_SIZE = 500
+# 증분 동기화 시 늦게 커밋된 행을 놓치지 않도록 겹쳐 읽는 구간
+_SYNC_OVERLAP = timedelta(seconds=60)
+
+
+def _compact(text: str) -> str:
+    return "".join(unicodedata.normalize("NFKC", text or "").casefold().split())
+
+
+def normalize_embedding(value) -> np.ndarray:
+    """PostgREST 응답("[0.1,...]" 문자열 또는 리스트) → 단위 벡터(float32)"""
+    if isinstance(value, str):
+        value = json.loads(value)
+    vector = np.asarray(value, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """점수 내림차순 상위 k개 위치"""
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top])]
+
+
+class CategoryIndex:
+    """카테고리 하나의 벡터 + 행 메타데이터"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.rows: dict[str, dict] = {}
+        self._vectors: dict[str, np.ndarray] = {}
+        self._by_procedure: dict[int, set[str]] = {}
+        self._dirty = True
+        # NumPy 전수 검색용 행렬 / 어휘 근사용 연결 문자열
+        self._ids: list[str] = []
+        self._matrix = np.zeros((0, EMBEDDING_DIM), dtype=np.float32)
+        # Matryoshka 1차 검색용 앞 차원 행렬 (차원 수 → 재정규화 행렬, 처음 사용할 때 구성)
+        self._prefixes: dict[int, np.ndarray] = {}
+        self._text = ""
+        self._offsets: list[int] = []
+        # HNSW: 문서 id ↔ 정수 label (수정/삭제된 label은 mark_deleted)
+        self._hnsw = None
+        self._labels: dict[str, int] = {}
+        self._label_ids: dict[int, str] = {}
+        self._next_label = 0
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def upsert(self, items: list[tuple[dict, np.ndarray]]):
+        with self._lock:
+            for row, vector in items:
+                faq_id = row["id"]
+                self._unlink_procedure(faq_id)
+                self.rows[faq_id] = {field: row.get(field) for field in ROW_FIELDS}
+                self._vectors[faq_id] = vector
+                if row.get("procedure_id") is not None:
+                    self._by_procedure.setdefault(row["procedure_id"], set()).add(faq_id)
+            if hnswlib is not None:
+                self._hnsw_add([row["id"] for row, _ in items])
+            self._dirty = True
+
+    def remove(self, ids: list[str]):
+        with self._lock:
+            for faq_id in ids:
+                self._unlink_procedure(faq_id)
+            removed = [faq_id for faq_id in ids if self.rows.pop(faq_id, None) is not None]
+            for faq_id in removed:
+                self._vectors.pop(faq_id, None)
+                label = self._labels.pop(faq_id, None)
+                if label is not None and self._hnsw is not None:
+                    self._hnsw.mark_deleted(label)
+                    self._label_ids.pop(label, None)
+            if removed:
+                self._dirty = True
+
+    def _unlink_procedure(self, faq_id: str):
+        row = self.rows.get(faq_id)
+        if row and row.get("procedure_id") is not None:
+            self._by_procedure.get(row["procedure_id"], set()).discard(faq_id)
+
+    def _hnsw_add(self, ids: list[str]):
+        if self._hnsw is None:
+            self._hnsw = hnswlib.Index(space="ip", dim=EMBEDDING_DIM)
+            self._hnsw.init_index(max_elements=max(1024, 2 * len(ids)), ef_construction=200, M=16)
+        for faq_id in ids:
+            old = self._labels.pop(faq_id, None)
+            if old is not None:
+                self._hnsw.mark_deleted(old)
+                self._label_ids.pop(old, None)
+        labels = np.arange(self._next_label, self._next_label + len(ids))
+        self._next_label += len(ids)
+        needed = self._next_label
+        if needed > self._hnsw.get_max_elements():
+            self._hnsw.resize_index(max(needed, 2 * self._hnsw.get_max_elements()))
+        self._hnsw.add_items(np.stack([self._vectors[faq_id] for faq_id in ids]), labels)
+        for faq_id, label in zip(ids, labels.tolist()):
+            self._labels[faq_id] = label
+            self._label_ids[label] = faq_id
+
+    def _refresh(self):
+        """변경 후 첫 검색 때 전수 검색 행렬과 어휘 근사용 문자열을 다시 구성"""
+        if not self._dirty:
+            return
+        self._ids = list(self.rows)
+        self._matrix = (
+            np.stack([self._vectors[faq_id] for faq_id in self._ids])
+            if self._ids else np.zeros((0, EMBEDDING_DIM), dtype=np.float32)
+        )
+        self._prefixes = {}
+        parts, offsets, position = [], [], 0
+        for faq_id in self._ids:
+            row = self.rows[faq_id]
+            text = _compact(f"{row.get('procedure_name') or ''} {row.get('question') or ''}") + "\n"
+            offsets.append(position)
+            parts.append(text)
+            position += len(text)
+        self._text = "".join(parts)
+        self._offsets = offsets
+        self._dirty = False
+
+    def knn(self, queries: np.ndarray, k: int) -> list[list[tuple[str, float]]]:
+        """쿼리별 (id, 내적 유사도) 상위 k개"""
+        with self._lock:
+            k = min(k, len(self.rows))
+            if k == 0:
+                return [[] for _ in range(len(queries))]
+            if self._hnsw is not None:
+                self._hnsw.set_ef(max(FAQ_INDEX_EF, k))
+                labels, distances = self._hnsw.knn_query(queries, k=k)
+                return [
+                    [(self._label_ids[int(label)], 1.0 - float(distance)) for label, distance in zip(row_l, row_d)]
+                    for row_l, row_d in zip(labels, distances)
+                ]
+
+            if FAQ_INDEX_PREFIX_DIM and len(self.rows) > k * VECTOR_RERANK_FACTOR:
+                return self.knn_two_stage(queries, k, FAQ_INDEX_PREFIX_DIM, VECTOR_RERANK_FACTOR)
+            return self.knn_exact(queries, k)
+
+    def knn_exact(self, queries: np.ndarray, k: int) -> list[list[tuple[str, float]]]:
+        """NumPy 전수 내적 검색"""
+        with self._lock:
+            self._refresh()
+            k = min(k, len(self._ids))
+            if k == 0:
+                return [[] for _ in range(len(queries))]
+            scores = queries @ self._matrix.T
+            return [[(self._ids[i], float(row[i])) for i in _top_k(row, k)] for row in scores]
+
+    def knn_two_stage(
+        self, queries: np.ndarray, k: int, prefix_dim: int, rerank_factor: int,
+    ) -> list[list[tuple[str, float]]]:
+        """앞 prefix_dim차원(재정규화)으로 k × rerank_factor개 후보 → 전체 차원 내적으로 상위 k개"""
+        with self._lock:
+            self._refresh()
+            k = min(k, len(self._ids))
+            if k == 0:
+                return [[] for _ in range(len(queries))]
+            prefix = self._prefixes.get(prefix_dim)
+            if prefix is None:
+                prefix = self._prefixes[prefix_dim] = _normalize_rows(self._matrix[:, :prefix_dim])
+            shortlist_size = min(len(self._ids), k * max(rerank_factor, 1))
+            coarse = _normalize_rows(queries[:, :prefix_dim]) @ prefix.T
+            results = []
+            for q, row in enumerate(coarse):
+                shortlist = np.argpartition(-row, shortlist_size - 1)[:shortlist_size]
+                exact = self._matrix[shortlist] @ queries[q]
+                results.append([(self._ids[shortlist[i]], float(exact[i])) for i in _top_k(exact, k)])
+            return results
+
+    def knn_filtered(self, queries: np.ndarray, procedure_ids: list[int], k: int) -> list[list[tuple[str, float]]]:
+        """표준 시술 id에 속한 문서만 대상으로 정확 검색 (후보 수백 건)"""
+        with self._lock:
+            ids = sorted(set().union(*(self._by_procedure.get(p, set()) for p in procedure_ids)))
+            if not ids:
+                return [[] for _ in range(len(queries))]
+            scores = queries @ np.stack([self._vectors[faq_id] for faq_id in ids]).T
+        k = min(k, len(ids))
+        return [[(ids[i], float(row[i])) for i in _top_k(row, k)] for row in scores]
+
+    def lexical_hits(self, terms: list[str]) -> set[str]:
+        """시술명/질문에 검색어가 포함된 문서 id"""
+        with self._lock:
+            self._refresh()
+            hits = set()
+            for term in terms:
+                needle = _compact(term)
+                if len(needle) < 2:
+                    continue
+                start = self._text.find(needle)
+                while start != -1:
+                    hits.add(self._ids[bisect.bisect_right(self._offsets, start) - 1])
+                    start = self._text.find(needle, start + 1)
+            return hits
+
+    def max_similarity(self, ids: list[str], queries: np.ndarray) -> dict[str, float]:
+        with self._lock:
+            if not ids:
+                return {}
+            vectors = np.stack([self._vectors[faq_id] for faq_id in ids])
+            return dict(zip(ids, (vectors @ queries.T).max(axis=1).tolist()))
+
+
+class FaqIndex:
+    def __init__(self):
+        self.categories = {category: CategoryIndex() for category in CATEGORIES}
+        self.ready = False
+        # 반영을 마친 코퍼스 버전 (조회 시작 전에 읽은 값이므로 실제 내용은 같거나 더 최신)
+        self.version: int | None = None
+        self._watermark: str | None = None
+        self._syncs = 0
+        self._lock = threading.Lock()
+
+    # ---------- 적재 / 동기화 ----------
+
+    def _fetch(self, since: str | None = None) -> list[dict]:
+        db = get_supabase()
+        rows, offset = [], 0
+        while True:
+            query = db.table("faq_vectors").select(", ".join((*ROW_FIELDS, "category", "embedding", "updated_at")))
+            if since:
+                query = query.gte("updated_at", since)
+            # updated_at이 같은 행(일괄 백필 등)이 많으므로 id까지 정렬해야 페이지 경계에서 누락/중복이 없음
+            page = query.order("updated_at").order("id").range(offset, offset + _PAGE_SIZE - 1).execute()
+            rows.extend(page.data)
+            if len(page.data) < _PAGE_SIZE:
+                return rows
+            offset += _PAGE_SIZE
+
+    def _apply(self, rows: list[dict]):
+        grouped: dict[str, list] = {category: [] for category in CATEGORIES}
+        for row in rows:
+            # 카테고리가 바뀐 행은 이전 카테고리 인덱스에서 제거
+            for category, index in self.categories.items():
+                if category != row.get("category") and row["id"] in index.rows:
+                    index.remove([row["id"]])
+            if row.get("category") in grouped and row.get("embedding"):
+                grouped[row["category"]].append((row, normalize_embedding(row["embedding"])))
+            if row.get("updated_at") and (self._watermark is None or row["updated_at"] > self._watermark):
+                self._watermark = row["updated_at"]
+        for category, items in grouped.items():
+            if items:
+                self.categories[category].upsert(items)
+
+    def load(self):
+        with self._lock:
+            start = time.time()
+            version = fetch_corpus_version()
+            self.categories = {category: CategoryIndex() for category in CATEGORIES}
+            self._watermark = None
+            self._apply(self._fetch())
+            self.version = version
+            self.ready = True
+            sizes = {category: len(index) for category, index in self.categories.items()}
+            logger.info(
+                f"[FaqIndex] Loaded {sizes} ({'hnsw' if hnswlib is not None else 'numpy'}, "
+                f"{time.time() - start:.1f}s)"
+            )
+
+    def sync(self):
+        """코퍼스 버전이 바뀌었으면 신규/수정 행 반영 + 삭제된 행 정리.
+        버전이 같아도 FAQ_INDEX_RECONCILE_EVERY회마다 삭제 대조 (버전 트리거 누락 대비)"""
+        with self._lock:
+            self._syncs += 1
+            version = fetch_corpus_version()
+            if version == self.version:
+                if self._syncs % FAQ_INDEX_RECONCILE_EVERY == 0:
+                    self._reconcile()
+                return
+            since = None
+            if self._watermark:
+                since = (datetime.fromisoformat(self._watermark) - _SYNC_OVERLAP).isoformat()
+            self._apply(self._fetch(since))
+            self._reconcile()
+            self.version = version
+
+    def _reconcile(self):
+        db = get_supabase()
+        live, offset = set(), 0
+        while True:
+            page = db.table("faq_vectors").select("id").order("id").range(offset, offset + 999).execute()
+            live.update(row["id"] for row in page.data)
+            if len(page.data) < 1000:
+                break
+            offset += 1000
+        for index in self.categories.values():
+            stale = [faq_id for faq_id in index.rows if faq_id not in live]
+            if stale:
+                index.remove(stale)
+                logger.info(f"[FaqIndex] Removed {len(stale)} deleted vectors")
+
+    def remove(self, ids: list[str]):
+        for index in self.categories.values():
+            index.remove(ids)
+
+    # ---------- 검색 (RPC와 같은 결과 형식) ----------
+
+    def _index(self, category: str) -> CategoryIndex | None:
+        index = self.categories.get(category)
+        if not self.ready or index is None or len(index) == 0:
+            return None
+        return index
+
+    def vectors(self, category: str, ids: list[str]) -> np.ndarray | None:
+        """문서 임베딩(단위 벡터) 행렬. 하나라도 인덱스에 없으면 None"""
+        index = self._index(category)
+        if index is None:
+            return None
+        with index._lock:
+            found = [index._vectors.get(faq_id) for faq_id in ids]
+        if not found or any(vector is None for vector in found):
+            return None
+        return np.stack(found)
+
+    def search_batch(
+        self,
+        embeddings: list[list[float]],
+        category: str,
+        match_threshold: float,
+        match_count: int,
+        procedure_ids: list[int] | None = None,
+    ) -> list[dict] | None:
+        """search_faq_batch와 같은 형식: 쿼리별 상위 match_count건 (query_index, rank 포함).
+        procedure_ids가 있으면 search_faq_filtered와 같이 해당 표준 시술 문서만 검색"""
+        index = self._index(category)
+        if index is None:
+            return None
+        queries = np.stack([normalize_embedding(e) for e in embeddings])
+        if procedure_ids:
+            hits_per_query = index.knn_filtered(queries, procedure_ids, match_count)
+        else:
+            hits_per_query = index.knn(queries, match_count)
+        rows = []
+        for query_index, hits in enumerate(hits_per_query):
+            for rank, (faq_id, similarity) in enumerate(hits, start=1):
+                if similarity > match_threshold:
+                    rows.append({
+                        "query_index": query_index, "rank": rank,
+                        **index.rows[faq_id], "similarity": similarity,
+                    })
+        return rows
+
+    def search_hybrid(
+        self,
+        embeddings: list[list[float]],
+        terms: list[str],
+        category: str,
+        match_threshold: float,
+        match_count: int,
+        vector_weight: float,
+        lexical_weight: float,
+        lexical_threshold: float,
+    ) -> list[dict] | None:
+        """search_faq_hybrid와 같은 형식: 벡터 후보 + 어휘 후보를 가중합 점수로 정렬"""
+        index = self._index(category)
+        if index is None:
+            return None
+        queries = np.stack([normalize_embedding(e) for e in embeddings])
+        candidates = {faq_id for hits in index.knn(queries, match_count) for faq_id, _ in hits}
+        lexical = index.lexical_hits(terms)
+        similarity = index.max_similarity(list(candidates | lexical), queries)
+        # 어휘 후보는 검색어별 RPC와 같이 벡터 유사도 상위 match_count건으로 제한
+        lexical = set(sorted(lexical, key=lambda faq_id: -similarity[faq_id])[:match_count])
+
+        rows = []
+        for faq_id in candidates | lexical:
+            vec_sim = similarity[faq_id]
+            lex = 1.0 if faq_id in lexical else 0.0
+            if vec_sim > match_threshold or lex >= lexical_threshold:
+                rows.append({
+                    **index.rows[faq_id],
+                    "similarity": vec_sim,
+                    "lexical_score": lex,
+                    "score": vector_weight * vec_sim + lexical_weight * lex,
+                })
+        rows.sort(key=lambda row: -row["score"])
+        return rows[:match_count]
+
+
+_index = FaqIndex()
+
+
+def get_faq_index() -> FaqIndex:
+    return _index
+
+
+def index_version() -> int | None:
+    """검색에 쓰이는 프로세스 내 인덱스의 반영 버전 (인덱스 미사용/미적재면 None)"""
+    return _index.version if FAQ_INDEX_ENABLED and _index.ready else None
+
+
+async def faq_index_loop():
+    """기동 시 전체 적재 후 FAQ_INDEX_SYNC_SECONDS마다 증분 동기화"""
+    while not _index.ready:
+        try:
+            await asyncio.to_thread(_index.load)
+        except Exception as e:
+            logger.warning(f"[FaqIndex] Load failed, retrying: {str(e)[:100]}")
+            await asyncio.sleep(FAQ_INDEX_SYNC_SECONDS)
+
+    while True:
+        await asyncio.sleep(FAQ_INDEX_SYNC_SECONDS)
+        try:
+            await asyncio.to_thread(_index.sync)
+        except Exception as e:
+            logger.warning(f"[FaqIndex] Sync failed: {str(e)[:100]}")
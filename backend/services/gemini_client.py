@@ -154,7 +154,7 @@ async def generate_json(prompt: str, system_instruction: str = "", max_retries:
     return repair_json(response.text)
 
 
-def _sync_embed_content(model_name: str, content: str, task_type: str, dims: int):
+def _sync_embed_content(model_name: str, content: str | list[str], task_type: str, dims: int):
     """동기 임베딩 호출 (스레드 풀에서 실행용)"""
     return genai.embed_content(
         model=model_name,
@@ -192,3 +192,21 @@ async def get_query_embedding(text: str) -> list[float]:
                 await asyncio.sleep(3 * (attempt + 1))
             else:
                 raise
+
+
+async def get_query_embeddings(texts: list[str]) -> list[list[float]]:
+    """여러 검색 쿼리를 한 번의 호출로 임베딩 (입력 순서대로 반환)"""
+    if not texts:
+        return []
+    for attempt in range(3):
+        try:
+            result = await asyncio.to_thread(
+                _sync_embed_content, _embedding_model, texts, "retrieval_query", 768
+            )
+            return result["embedding"]
+        except Exception as e:
+            if attempt < 2:
+                logger.warning(f"[Gemini Query Embedding] Batch retry {attempt + 1}: {str(e)[:100]}")
+                await asyncio.sleep(3 * (attempt + 1))
+            else:
+                raise
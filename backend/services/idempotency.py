@@ -0,0 +1,101 @@
+"""Idempotency-Key 헤더 처리.
+
+같은 (endpoint, key)로 재시도된 요청은 작업을 다시 하지 않고 최초 응답을 반환한다.
+- 처리 중인 키로 다시 요청 → 409
+- 같은 키에 다른 요청 본문 → 422"""
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable
+
+from fastapi import HTTPException
+
+from config import IDEMPOTENCY_TTL_HOURS
+from services.supabase_client import get_supabase
+
+logger = logging.getLogger(__name__)
+
+
+def _request_hash(payload) -> str:
+    return hashlib.sha256(
+        json.dumps(payload, ensure_ascii=False, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+
+
+def _is_expired(row: dict) -> bool:
+    created_at = row.get("created_at")
+    if not created_at:
+        return False
+    created = datetime.fromisoformat(created_at.replace("Z", "+00:00"))
+    return datetime.now(timezone.utc) - created > timedelta(hours=IDEMPOTENCY_TTL_HOURS)
+
+
+def _begin(endpoint: str, key: str, request_hash: str) -> dict | None:
+    """키 선점. 새 키면 None, 완료된 키면 저장된 응답 반환"""
+    db = get_supabase()
+    for _ in range(2):
+        inserted = (
+            db.table("idempotency_keys")
+            .upsert(
+                {"endpoint": endpoint, "key": key, "request_hash": request_hash},
+                on_conflict="endpoint,key",
+                ignore_duplicates=True,
+            )
+            .execute()
+        )
+        if inserted.data:
+            return None
+
+        existing = (
+            db.table("idempotency_keys")
+            .select("*")
+            .eq("endpoint", endpoint)
+            .eq("key", key)
+            .limit(1)
+            .execute()
+        )
+        if not existing.data:
+            continue  # 그 사이 삭제됨 → 다시 선점 시도
+        row = existing.data[0]
+
+        if _is_expired(row):
+            db.table("idempotency_keys").delete().eq("endpoint", endpoint).eq("key", key).execute()
+            continue
+        if row["request_hash"] != request_hash:
+            raise HTTPException(status_code=422, detail="같은 Idempotency-Key로 다른 요청이 전송되었습니다")
+        if row["status"] != "completed":
+            raise HTTPException(status_code=409, detail="같은 Idempotency-Key 요청이 처리 중입니다")
+        logger.info(f"[Idempotency] Replaying stored response for {endpoint} key={key[:16]}")
+        return row["response"]
+
+    raise HTTPException(status_code=409, detail="Idempotency-Key를 선점하지 못했습니다")
+
+
+async def run_idempotent(
+    endpoint: str,
+    key: str | None,
+    payload,
+    handler: Callable[[], Awaitable[dict]],
+) -> dict:
+    """key가 있으면 최초 1회만 handler를 실행하고 응답을 저장. 없으면 그대로 실행"""
+    if not key:
+        return await handler()
+
+    stored = _begin(endpoint, key, _request_hash(payload))
+    if stored is not None:
+        return stored
+
+    db = get_supabase()
+    try:
+        response = await handler()
+    except Exception:
+        # 실패한 요청은 같은 키로 재시도할 수 있도록 해제
+        db.table("idempotency_keys").delete().eq("endpoint", endpoint).eq("key", key).execute()
+        raise
+
+    db.table("idempotency_keys").update({
+        "status": "completed",
+        "response": response,
+    }).eq("endpoint", endpoint).eq("key", key).execute()
+    return response
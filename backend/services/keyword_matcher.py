@@ -0,0 +1,148 @@
+"""분류 키워드 사전(classification_keywords) 캐시 + Aho-Corasick 매칭.
+
+사전은 프로세스 내에 캐시하고, data_versions 테이블의 버전이 바뀌었을 때만 다시 읽는다
+(버전 확인은 KEYWORD_CACHE_CHECK_SECONDS 주기). 띄어쓰기 차이("코 성형"/"코성형")를
+흡수하기 위해 사전과 본문 모두 공백을 제거한 뒤 매칭한다."""
+import logging
+import threading
+import time
+import unicodedata
+from collections import deque
+from dataclasses import dataclass, field
+
+from config import KEYWORD_CACHE_CHECK_SECONDS
+from services.supabase_client import get_supabase
+
+logger = logging.getLogger(__name__)
+
+
+def _compact(text: str) -> str:
+    return "".join(unicodedata.normalize("NFKC", text or "").casefold().split())
+
+
+class AhoCorasick:
+    """다중 패턴 문자열 매칭 오토마톤 (본문 1회 순회로 모든 키워드 검출)"""
+
+    def __init__(self, patterns: list[str]):
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._output: list[list[str]] = [[]]
+        for pattern in patterns:
+            self._add(pattern)
+        self._build()
+
+    def _add(self, pattern: str):
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = nxt
+        self._output[state].append(pattern)
+
+    def _build(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._output[nxt] = self._output[nxt] + self._output[self._fail[nxt]]
+
+    def find_all(self, text: str) -> list[tuple[int, str]]:
+        """(끝 위치, 패턴) 목록"""
+        matches = []
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(ch, 0)
+            for pattern in self._output[state]:
+                matches.append((i, pattern))
+        return matches
+
+
+@dataclass
+class KeywordDictionary:
+    rows: list[dict]
+    version: int = 0
+    plastic: list[str] = field(default_factory=list)
+    dermatology: list[str] = field(default_factory=list)
+    boundary: dict[str, dict[str, list[str]]] = field(default_factory=dict)
+
+    def __post_init__(self):
+        self._category: dict[str, set[str]] = {}
+        for row in self.rows:
+            keyword, category = row["keyword"], row["category"]
+            if category == "plastic_surgery":
+                self.plastic.append(keyword)
+            elif category == "dermatology":
+                self.dermatology.append(keyword)
+            elif category == "boundary":
+                self.boundary[keyword] = row.get("context_keywords") or {}
+            self._category.setdefault(_compact(keyword), set()).add(category)
+
+        # 경계 시술의 동반 키워드도 같은 오토마톤에서 검출
+        self._context: dict[str, set[str]] = {}
+        for contexts in self.boundary.values():
+            for category, words in contexts.items():
+                for word in words:
+                    self._context.setdefault(_compact(word), set()).add(category)
+
+        self._automaton = AhoCorasick(sorted(set(self._category) | set(self._context)))
+        self._display = {_compact(r["keyword"]): r["keyword"] for r in self.rows}
+        for contexts in self.boundary.values():
+            for words in contexts.values():
+                for word in words:
+                    self._display.setdefault(_compact(word), word)
+
+    def match(self, text: str) -> dict:
+        """본문의 카테고리별 키워드 매칭 결과.
+        {"plastic_surgery": [...], "dermatology": [...], "boundary": [...], "context": {"plastic_surgery": [...], ...}}"""
+        hits = {"plastic_surgery": set(), "dermatology": set(), "boundary": set()}
+        context = {"plastic_surgery": set(), "dermatology": set()}
+        for _, pattern in self._automaton.find_all(_compact(text)):
+            word = self._display.get(pattern, pattern)
+            for category in self._category.get(pattern, ()):
+                hits[category].add(word)
+            for category in self._context.get(pattern, ()):
+                context[category].add(word)
+        return {
+            **{k: sorted(v) for k, v in hits.items()},
+            "context": {k: sorted(v) for k, v in context.items()},
+        }
+
+
+_dictionary: KeywordDictionary | None = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def _current_version(db) -> int:
+    result = db.table("data_versions").select("version").eq("name", "classification_keywords").execute()
+    return result.data[0]["version"] if result.data else 0
+
+
+def get_keyword_dictionary() -> KeywordDictionary:
+    """캐시된 사전 반환. 확인 주기가 지났으면 버전을 조회해 바뀐 경우에만 다시 적재"""
+    global _dictionary, _checked_at
+    with _lock:
+        now = time.time()
+        if _dictionary is not None and now - _checked_at < KEYWORD_CACHE_CHECK_SECONDS:
+            return _dictionary
+
+        db = get_supabase()
+        version = _current_version(db)
+        if _dictionary is None or version != _dictionary.version:
+            rows = db.table("classification_keywords").select("category, keyword, context_keywords").execute().data
+            _dictionary = KeywordDictionary(rows, version=version)
+            logger.info(f"[Keywords] Dictionary loaded: {len(rows)} keywords (version {version})")
+        _checked_at = now
+        return _dictionary
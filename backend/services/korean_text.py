@@ -0,0 +1,30 @@
+"""한국어 토큰 정리 공용 규칙 (조사/어미 제거).
+
+형태소 분석기 없이 정규식으로 나눈 토큰에서 검색에 쓸 내용어만 남길 때 사용한다.
+재생성 지시문 단어 추출(rag_agent)과 로컬 키워드 추출의 정규식 대체 경로(keyword_extractor)가 공유."""
+
+PARTICLE_SUFFIXES = (
+    "에서는", "으로는", "에게는", "까지는", "부터는",
+    "에서", "으로", "에게", "까지", "부터", "처럼", "보다", "만큼", "이나", "하고",
+    "은", "는", "이", "가", "을", "를", "에", "로", "와", "과", "도", "만", "의", "나",
+)
+VERB_SUFFIXES = (
+    "해주시기", "해주세요", "해주십시오", "했으면", "하였으면", "되도록", "되게",
+    "주세요", "해줘", "하세요", "해서", "하게", "하는", "하지", "해요", "합니다", "했다", "해",
+    "시켜", "되는", "된",
+)
+
+
+def strip_suffix(token: str, suffixes: tuple[str, ...]) -> str:
+    """앞에서부터 처음 일치하는 접미사 하나만 제거 (토큰 전체가 접미사면 그대로)"""
+    for suffix in suffixes:
+        if token.endswith(suffix) and len(token) > len(suffix):
+            return token[: -len(suffix)]
+    return token
+
+
+def content_stem(token: str) -> str | None:
+    """어미 → 조사 순으로 제거한 내용어. 토큰 자체가 용언 어미면 None"""
+    if token in VERB_SUFFIXES:
+        return None
+    return strip_suffix(strip_suffix(token, VERB_SUFFIXES), PARTICLE_SUFFIXES)
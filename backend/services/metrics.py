@@ -0,0 +1,43 @@
+"""In-process 운영 지표 (인스턴스 단위, 재시작 시 초기화).
+
+카운터 이름은 "<기능>.<이벤트>" 형식을 사용한다.
+같은 기능에 .hit / .miss 카운터가 모두 있으면 snapshot()에서 적중률을 계산한다."""
+import threading
+from collections import defaultdict
+
+_lock = threading.Lock()
+_counters: dict[str, float] = defaultdict(float)
+_timings: dict[str, dict] = {}
+
+
+def incr(name: str, value: float = 1):
+    with _lock:
+        _counters[name] += value
+
+
+def observe(name: str, value_ms: float):
+    """소요 시간(ms) 등 분포 지표 기록 (count / total / max)"""
+    with _lock:
+        t = _timings.setdefault(name, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+        t["count"] += 1
+        t["total_ms"] += value_ms
+        t["max_ms"] = max(t["max_ms"], value_ms)
+
+
+def snapshot() -> dict:
+    with _lock:
+        counters = dict(_counters)
+        timings = {
+            name: {**t, "avg_ms": round(t["total_ms"] / t["count"], 1) if t["count"] else 0.0}
+            for name, t in _timings.items()
+        }
+
+    hit_ratios = {}
+    for name in counters:
+        if name.endswith(".hit"):
+            prefix = name[: -len(".hit")]
+            hits = counters[name]
+            total = hits + counters.get(f"{prefix}.miss", 0)
+            hit_ratios[prefix] = round(hits / total, 4) if total else 0.0
+
+    return {"counters": counters, "timings": timings, "hit_ratios": hit_ratios}
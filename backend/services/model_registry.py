@@ -0,0 +1,93 @@
+"""로컬 모델 저장/적재 (ml_models 테이블).
+
+학습 스크립트가 joblib으로 직렬화한 모델을 버전과 평가 결과와 함께 저장하고,
+앱은 기동 시 name별 활성 버전을 메모리에 적재한다. scikit-learn이 설치되지 않은 환경이나
+활성 모델이 없으면 적재를 건너뛰고 기존(LLM) 경로를 그대로 사용한다."""
+import base64
+import io
+import logging
+from datetime import datetime, timezone
+
+from services.supabase_client import get_supabase
+
+logger = logging.getLogger(__name__)
+
+# 앱 기동 시 적재할 모델 이름
+LOCAL_MODEL_NAMES = ["classifier"]
+
+_loaded: dict[str, tuple[object, str]] = {}
+
+
+def _serialize(model) -> str:
+    import joblib
+
+    buffer = io.BytesIO()
+    joblib.dump(model, buffer, compress=3)
+    return base64.b64encode(buffer.getvalue()).decode("ascii")
+
+
+def _deserialize(artifact_b64: str):
+    import joblib
+
+    return joblib.load(io.BytesIO(base64.b64decode(artifact_b64)))
+
+
+def save_model(name: str, model, metrics: dict, training_rows: int, activate: bool = True) -> str:
+    """모델을 비활성 새 버전으로 저장한 뒤 버전 반환. activate=True면 저장 후 활성 버전 교체"""
+    db = get_supabase()
+    version = f"{name}-{datetime.now(timezone.utc).strftime('%Y%m%d-%H%M%S')}"
+    db.table("ml_models").insert({
+        "name": name,
+        "version": version,
+        "artifact_b64": _serialize(model),
+        "metrics": metrics,
+        "training_rows": training_rows,
+        "is_active": False,
+    }).execute()
+    if activate:
+        activate_model(name, version)
+    return version
+
+
+def activate_model(name: str, version: str):
+    """저장된 버전을 활성화. 기존 활성 버전 비활성화와 한 트랜잭션 (activate_ml_model RPC)"""
+    get_supabase().rpc("activate_ml_model", {"p_name": name, "p_version": version}).execute()
+
+
+def load_model(name: str) -> tuple[object, str] | None:
+    """활성 버전을 적재해 (model, version) 반환. 없거나 적재 실패 시 None"""
+    db = get_supabase()
+    result = (
+        db.table("ml_models")
+        .select("version, artifact_b64")
+        .eq("name", name)
+        .eq("is_active", True)
+        .limit(1)
+        .execute()
+    )
+    if not result.data:
+        logger.info(f"[Models] No active '{name}' model")
+        return None
+
+    row = result.data[0]
+    try:
+        model = _deserialize(row["artifact_b64"])
+    except ImportError:
+        logger.warning(f"[Models] scikit-learn not installed, skipping '{name}' model")
+        return None
+    _loaded[name] = (model, row["version"])
+    logger.info(f"[Models] Loaded '{name}' model {row['version']}")
+    return _loaded[name]
+
+
+def get_loaded_model(name: str) -> tuple[object, str] | None:
+    return _loaded.get(name)
+
+
+def load_local_models():
+    """앱 기동 시 로컬 모델 일괄 적재"""
+    for name in LOCAL_MODEL_NAMES:
+        try:
+            load_model(name)
+        except Exception as e:
+            logger.error(f"[Models] Failed to load '{name}' model: {str(e)[:200]}")
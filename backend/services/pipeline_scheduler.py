@@ -0,0 +1,180 @@
+"""파이프라인 작업 우선순위 스케줄러 (in-process).
+
+- 우선순위 클래스: 수동 작업(MANUAL) > 재생성(REGENERATION) > 일괄 백로그(BULK)
+- 에이징: 대기 시간이 길어질수록 실효 우선순위가 올라가 기아 상태를 방지
+- 예약 슬롯: BULK 작업은 전체 동시 실행 수 중 일부만 사용할 수 있어
+  대량 배치가 돌고 있어도 관리자 작업은 즉시 슬롯을 받는다
+- 종료(drain): 새 작업 실행을 멈추고 실행 중인 작업에 유예 시간을 준 뒤 남은 작업을 중단"""
+import asyncio
+import logging
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Awaitable, Callable
+
+from config import PIPELINE_CONCURRENCY, PIPELINE_RESERVED_SLOTS, PIPELINE_AGING_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+class JobPriority(IntEnum):
+    MANUAL = 0
+    REGENERATION = 1
+    BULK = 2
+
+
+@dataclass
+class PipelineJob:
+    kind: str
+    priority: JobPriority
+    factory: Callable[[], Awaitable]
+    consultation_id: str | None = None
+    consultation_ids: list[str] = field(default_factory=list)
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    enqueued_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    status: str = "queued"
+    error: str | None = None
+
+    def effective_priority(self, now: float) -> float:
+        return self.priority - (now - self.enqueued_at) / PIPELINE_AGING_SECONDS
+
+    def to_dict(self) -> dict:
+        now = time.time()
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "consultation_id": self.consultation_id,
+            "consultation_ids": self.consultation_ids or None,
+            "priority": self.priority.name.lower(),
+            "effective_priority": round(self.effective_priority(now), 2) if self.status == "queued" else None,
+            "status": self.status,
+            "wait_ms": int(((self.started_at or now) - self.enqueued_at) * 1000),
+            "run_ms": int(((self.finished_at or now) - self.started_at) * 1000) if self.started_at else None,
+            "error": self.error,
+        }
+
+
+class PipelineScheduler:
+    def __init__(self, concurrency: int, reserved_slots: int):
+        self.concurrency = concurrency
+        self.bulk_limit = max(1, concurrency - reserved_slots)
+        self._queued: list[PipelineJob] = []
+        self._running: dict[str, PipelineJob] = {}
+        self._finished: deque[PipelineJob] = deque(maxlen=200)
+        self._tasks: set[asyncio.Task] = set()
+        self.draining = False
+
+    def submit(
+        self,
+        kind: str,
+        factory: Callable[[], Awaitable],
+        priority: JobPriority,
+        consultation_id: str | None = None,
+        consultation_ids: list[str] | None = None,
+    ) -> PipelineJob:
+        job = PipelineJob(
+            kind=kind, priority=priority, factory=factory,
+            consultation_id=consultation_id, consultation_ids=consultation_ids or [],
+        )
+        self._queued.append(job)
+        logger.info(f"[Scheduler] Queued {kind} job {job.id[:8]} (priority={priority.name}, queued={len(self._queued)})")
+        self._dispatch()
+        return job
+
+    def _running_bulk(self) -> int:
+        return sum(1 for j in self._running.values() if j.priority == JobPriority.BULK)
+
+    def _dispatch(self):
+        # 종료 중에는 새 작업을 시작하지 않음 (대기 작업은 다른 인스턴스로 인계)
+        if self.draining:
+            return
+        while self._queued and len(self._running) < self.concurrency:
+            now = time.time()
+            bulk_allowed = self._running_bulk() < self.bulk_limit
+            eligible = [j for j in self._queued if bulk_allowed or j.priority != JobPriority.BULK]
+            if not eligible:
+                return
+            job = min(eligible, key=lambda j: (j.effective_priority(now), j.enqueued_at))
+            self._queued.remove(job)
+            self._running[job.id] = job
+            job.status = "running"
+            job.started_at = now
+            task = asyncio.create_task(self._run(job))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, job: PipelineJob):
+        try:
+            await job.factory()
+            job.status = "done"
+        except asyncio.CancelledError:
+            job.status = "interrupted"
+            logger.warning(f"[Scheduler] Job {job.id[:8]} ({job.kind}) interrupted")
+            raise
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)[:300]
+            logger.error(f"[Scheduler] Job {job.id[:8]} ({job.kind}) failed: {str(e)[:200]}")
+        finally:
+            job.finished_at = time.time()
+            self._running.pop(job.id, None)
+            self._finished.append(job)
+            self._dispatch()
+
+    async def drain(self, timeout: float) -> list[PipelineJob]:
+        """새 작업 실행을 멈추고 실행 중인 작업을 최대 timeout초 기다린 뒤 남은 작업은 취소.
+        끝내지 못한 작업(대기 + 중단) 목록 반환"""
+        self.draining = True
+        tasks = list(self._tasks)
+        logger.info(f"[Scheduler] Draining: {len(tasks)} running, {len(self._queued)} queued (grace {timeout}s)")
+        if tasks:
+            _, pending = await asyncio.wait(tasks, timeout=timeout)
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+        unfinished = list(self._queued) + [
+            j for j in self._finished if j.status == "interrupted"
+        ]
+        self._queued.clear()
+        return unfinished
+
+    def active_consultation_ids(self) -> list[str]:
+        """실행/대기 중인 작업이 다루는 상담 ID (점유 갱신 대상)"""
+        ids = []
+        for job in [*self._running.values(), *self._queued]:
+            if job.consultation_id:
+                ids.append(job.consultation_id)
+            ids.extend(job.consultation_ids)
+        return list(dict.fromkeys(ids))
+
+    def list_jobs(self) -> dict:
+        now = time.time()
+        queued = sorted(self._queued, key=lambda j: (j.effective_priority(now), j.enqueued_at))
+        return {
+            "running": [j.to_dict() for j in self._running.values()],
+            "queued": [j.to_dict() for j in queued],
+            "finished": [j.to_dict() for j in reversed(self._finished)],
+        }
+
+    def jobs_for_consultation(self, consultation_id: str) -> list[dict]:
+        jobs = [*self._running.values(), *self._queued, *self._finished]
+        return [
+            j.to_dict() for j in jobs
+            if j.consultation_id == consultation_id or consultation_id in j.consultation_ids
+        ]
+
+
+_scheduler: PipelineScheduler | None = None
+
+
+def get_scheduler() -> PipelineScheduler:
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = PipelineScheduler(PIPELINE_CONCURRENCY, PIPELINE_RESERVED_SLOTS)
+    return _scheduler
@@ -0,0 +1,88 @@
+"""표준 시술 분류(procedures) 캐시 + 시술명 → 표준 시술 id 매핑.
+
+faq_vectors.procedure_name(LLM 자유 텍스트)과 의도 추출의 mentioned_procedures를 같은 id로 맞춘다.
+매핑 순서: 정규화한 이름이 별칭과 정확히 일치 → 별칭을 포함하는 경우 가장 긴 별칭.
+분류 체계는 data_versions('procedures') 버전이 바뀌었을 때만 다시 읽는다."""
+import logging
+import re
+import threading
+import time
+import unicodedata
+from dataclasses import dataclass, field
+
+from config import KEYWORD_CACHE_CHECK_SECONDS
+from services.keyword_matcher import AhoCorasick
+from services.supabase_client import get_supabase
+
+logger = logging.getLogger(__name__)
+
+# SQL normalize_procedure_name()과 같은 규칙 (019_procedure_taxonomy.sql)
+_BRACKETED_RE = re.compile(r"[(\[][^)\]]*[)\]]")
+_NON_WORD_RE = re.compile(r"[\W_]")
+
+
+def normalize_procedure_name(name: str) -> str:
+    """NFKC → 소문자 → 괄호 안 내용 제거 → 문자/숫자 외 제거. 예: "보톡스 (사각턱)" → "보톡스" """
+    text = unicodedata.normalize("NFKC", name or "").lower()
+    return _NON_WORD_RE.sub("", _BRACKETED_RE.sub("", text))
+
+
+@dataclass
+class Taxonomy:
+    rows: list[dict]
+    version: int = 0
+    aliases: dict[str, int] = field(default_factory=dict)
+    names: dict[int, str] = field(default_factory=dict)
+
+    def __post_init__(self):
+        for row in self.rows:
+            self.names[row["id"]] = row["canonical_name"]
+            for alias in [normalize_procedure_name(row["canonical_name"]), *(row.get("aliases") or [])]:
+                if len(alias) >= 2:
+                    self.aliases.setdefault(alias, row["id"])
+        self._automaton = AhoCorasick(sorted(self.aliases))
+
+    def match(self, name: str) -> int | None:
+        normalized = normalize_procedure_name(name)
+        if not normalized:
+            return None
+        if normalized in self.aliases:
+            return self.aliases[normalized]
+        found = [pattern for _, pattern in self._automaton.find_all(normalized)]
+        if not found:
+            return None
+        return self.aliases[max(found, key=len)]
+
+
+_taxonomy: Taxonomy | None = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def _current_version(db) -> int:
+    result = db.table("data_versions").select("version").eq("name", "procedures").execute()
+    return result.data[0]["version"] if result.data else 0
+
+
+def get_taxonomy() -> Taxonomy:
+    global _taxonomy, _checked_at
+    with _lock:
+        now = time.time()
+        if _taxonomy is not None and now - _checked_at < KEYWORD_CACHE_CHECK_SECONDS:
+            return _taxonomy
+
+        db = get_supabase()
+        version = _current_version(db)
+        if _taxonomy is None or version != _taxonomy.version:
+            rows = db.table("procedures").select("id, canonical_name, category, aliases").execute().data
+            _taxonomy = Taxonomy(rows, version=version)
+            logger.info(f"[Taxonomy] Loaded {len(rows)} procedures, {len(_taxonomy.aliases)} aliases (version {version})")
+        _checked_at = now
+        return _taxonomy
+
+
+def resolve_procedure_ids(names: list[str]) -> list[int]:
+    """시술명 목록 → 표준 시술 id (중복 제거, 매핑되지 않는 이름은 무시)"""
+    taxonomy = get_taxonomy()
+    ids = [taxonomy.match(name) for name in names or [] if isinstance(name, str)]
+    return sorted({i for i in ids if i is not None})
@@ -0,0 +1,147 @@
+"""RAG 검색 결과 캐시 (프로세스 내 LRU + TTL, 선택적으로 rag_result_cache 테이블에 영속).
+
+같은 시술에 대한 상담은 (키워드, 카테고리, 임계값, 건수)가 같은 검색을 반복한다.
+캐시 항목은 저장 당시의 코퍼스 버전(data_versions.faq_vectors)을 함께 기록하고,
+faq_vectors가 바뀌어 버전이 올라가면 더 이상 사용하지 않는다.
+버전은 RAG_CACHE_VERSION_CHECK_SECONDS 주기로만 조회한다.
+프로세스 내 인덱스(faq_index)가 아직 현재 버전까지 동기화되지 않았으면 그 결과는 저장하지 않는다
+(오래된 인덱스의 결과가 새 버전 키로 TTL 동안 남는 것 방지)."""
+import hashlib
+import json
+import logging
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
+from config import (
+    RAG_CACHE_SIZE,
+    RAG_CACHE_TTL_SECONDS,
+    RAG_CACHE_PERSIST,
+    RAG_CACHE_VERSION_CHECK_SECONDS,
+)
+from services import metrics
+from services.supabase_client import get_supabase
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_entries: "OrderedDict[str, tuple[int, float, list[dict]]]" = OrderedDict()
+_version = 0
+_version_checked_at = 0.0
+
+
+def make_key(keywords: list[str], category: str, match_threshold: float, match_count: int, settings: dict) -> str:
+    """키워드는 정규화(NFKC, 소문자, 공백 제거) 후 정렬. settings는 결과에 영향을 주는 검색 설정"""
+    normalized = sorted({
+        "".join(unicodedata.normalize("NFKC", k).casefold().split())
+        for k in keywords if isinstance(k, str) and k.strip()
+    })
+    payload = json.dumps(
+        [normalized, category, round(match_threshold, 4), match_count, settings],
+        ensure_ascii=False, sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def fetch_corpus_version() -> int:
+    """data_versions의 현재 faq_vectors 버전 (캐시 없이 조회)"""
+    result = get_supabase().table("data_versions").select("version").eq("name", "faq_vectors").execute()
+    return result.data[0]["version"] if result.data else 0
+
+
+def corpus_version() -> int:
+    """faq_vectors 코퍼스 버전 (확인 주기 내에는 마지막 조회값). 버전이 바뀌면 메모리 캐시 비움"""
+    global _version, _version_checked_at
+    now = time.time()
+    if now - _version_checked_at < RAG_CACHE_VERSION_CHECK_SECONDS:
+        return _version
+    version = fetch_corpus_version()
+    with _lock:
+        if version != _version:
+            if _entries:
+                logger.info(f"[RAGCache] Corpus version {_version} → {version}, dropped {len(_entries)} entries")
+            _entries.clear()
+            _version = version
+        _version_checked_at = now
+    return version
+
+
+def invalidate():
+    """이 인스턴스에서 faq_vectors를 변경한 직후 호출 (다음 조회 때 버전 재확인)"""
+    global _version_checked_at
+    with _lock:
+        _entries.clear()
+        _version_checked_at = 0.0
+
+
+def get(key: str) -> list[dict] | None:
+    version = corpus_version()
+    now = time.time()
+    with _lock:
+        entry = _entries.get(key)
+        if entry is not None:
+            entry_version, expires_at, results = entry
+            if entry_version == version and expires_at > now:
+                _entries.move_to_end(key)
+                metrics.incr("rag_cache.hit")
+                return [dict(r) for r in results]
+            del _entries[key]
+
+    if RAG_CACHE_PERSIST:
+        results = _load_persisted(key, version)
+        if results is not None:
+            _remember(key, version, results)
+            metrics.incr("rag_cache.hit")
+            metrics.incr("rag_cache.persisted_hit")
+            return [dict(r) for r in results]
+
+    metrics.incr("rag_cache.miss")
+    return None
+
+
+def put(key: str, results: list[dict], source_version: int | None = None):
+    """source_version: 결과를 만든 프로세스 내 인덱스가 반영한 코퍼스 버전 (DB 검색만 썼으면 None).
+    현재 코퍼스 버전과 다르면 저장하지 않음"""
+    version = corpus_version()
+    if source_version is not None and source_version != version:
+        metrics.incr("rag_cache.stale_skip")
+        return
+    _remember(key, version, results)
+    if RAG_CACHE_PERSIST:
+        try:
+            get_supabase().table("rag_result_cache").upsert({
+                "cache_key": key,
+                "corpus_version": version,
+                "results": results,
+                "created_at": datetime.now(timezone.utc).isoformat(),
+            }, on_conflict="cache_key").execute()
+        except Exception as e:
+            logger.warning(f"[RAGCache] Persist failed: {str(e)[:100]}")
+
+
+def _remember(key: str, version: int, results: list[dict]):
+    with _lock:
+        _entries[key] = (version, time.time() + RAG_CACHE_TTL_SECONDS, [dict(r) for r in results])
+        _entries.move_to_end(key)
+        while len(_entries) > RAG_CACHE_SIZE:
+            _entries.popitem(last=False)
+
+
+def _load_persisted(key: str, version: int) -> list[dict] | None:
+    cutoff = (datetime.now(timezone.utc) - timedelta(seconds=RAG_CACHE_TTL_SECONDS)).isoformat()
+    try:
+        result = (
+            get_supabase().table("rag_result_cache")
+            .select("results")
+            .eq("cache_key", key)
+            .eq("corpus_version", version)
+            .gte("created_at", cutoff)
+            .limit(1)
+            .execute()
+        )
+    except Exception as e:
+        logger.warning(f"[RAGCache] Persisted lookup failed: {str(e)[:100]}")
+        return None
+    return result.data[0]["results"] if result.data else None
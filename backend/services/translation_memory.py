@@ -0,0 +1,186 @@
+"""일본어 → 한국어 문장 단위 번역 메모리 (translation_memory 테이블).
+
+상담마다 반복되는 인사/정형 질문/병원 안내 문장은 한 번 번역한 결과를 재사용한다.
+- 정확 일치: 정규화 문장의 SHA-256 (DB 조회) → 번역문을 그대로 재사용
+- 유사 일치: 문자 bigram Dice 계수 (기동 시 메모리에 적재한 인덱스) → 그대로 쓰지 않고
+  LLM 번역 시 참고 번역으로만 전달 (부정 한 글자, 약품명 차이로도 의미가 바뀌므로)
+  숫자가 다른 문장(횟수/가격/기간)은 참고 번역으로도 쓰지 않는다
+- source='manual' 항목(용어 교정/가져오기)은 LLM 번역으로 덮어쓰지 않는다"""
+import hashlib
+import logging
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+
+from config import TM_FUZZY_THRESHOLD, TM_MIN_SEGMENT_CHARS
+from services.supabase_client import get_supabase
+
+logger = logging.getLogger(__name__)
+
+# 문장 끝(。！？!?) 또는 줄바꿈 기준 분리. 구분자는 문장에 포함하고 줄바꿈은 그대로 보존
+_SEGMENT_RE = re.compile(r"[^。！？!?\n]+[。！？!?」』）)]*|[。！？!?]+|\n+")
+_WHITESPACE_RE = re.compile(r"\s+")
+_DIGITS_RE = re.compile(r"\d+")
+
+
+def split_segments(text: str) -> list[str]:
+    """원문을 문장/줄바꿈 조각으로 분리. "".join(조각) == 원문"""
+    pieces = _SEGMENT_RE.findall(text)
+    if "".join(pieces) != text:
+        # 정규식이 놓친 문자가 있으면 분리하지 않음 (재조립 보장)
+        return [text]
+    return pieces
+
+
+def is_translatable(piece: str) -> bool:
+    return bool(piece.strip()) and not piece.startswith("\n")
+
+
+def normalize_segment(segment: str) -> str:
+    """NFKC + 앞뒤/연속 공백 정리 (문장부호는 번역에 영향을 주므로 유지)"""
+    return _WHITESPACE_RE.sub(" ", unicodedata.normalize("NFKC", segment)).strip()
+
+
+def segment_hash(normalized: str) -> str:
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def _bigrams(text: str) -> set[str]:
+    compact = text.replace(" ", "")
+    return {compact[i:i + 2] for i in range(len(compact) - 1)} or {compact}
+
+
+class _FuzzyIndex:
+    """문자 bigram 역색인 기반 유사 문장 검색"""
+
+    def __init__(self):
+        self._entries: dict[str, tuple[str, str, int]] = {}  # hash -> (정규화 원문, 번역문, bigram 수)
+        self._postings: dict[str, set[str]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, normalized: str, translated: str):
+        key = segment_hash(normalized)
+        grams = _bigrams(normalized)
+        with self._lock:
+            for gram in grams:
+                self._postings[gram].add(key)
+            self._entries[key] = (normalized, translated, len(grams))
+
+    def lookup(self, normalized: str) -> tuple[str, str, float] | None:
+        """가장 유사한 (원문, 번역문, Dice 점수). TM_FUZZY_THRESHOLD 미만이면 None"""
+        grams = _bigrams(normalized)
+        digits = _DIGITS_RE.findall(normalized)
+        counts: dict[str, int] = defaultdict(int)
+        with self._lock:
+            for gram in grams:
+                for key in self._postings.get(gram, ()):
+                    counts[key] += 1
+            best, best_score = None, 0.0
+            for key, shared in counts.items():
+                source, translated, gram_count = self._entries[key]
+                score = 2 * shared / (len(grams) + gram_count)
+                if score > best_score and _DIGITS_RE.findall(source) == digits:
+                    best, best_score = (source, translated), score
+        if best is not None and best_score >= TM_FUZZY_THRESHOLD:
+            return best[0], best[1], best_score
+        return None
+
+
+_fuzzy_index = _FuzzyIndex()
+
+
+# source_hash IN (...) 조회 한 번에 넣는 해시 수 (PostgREST URL 길이 제한)
+_LOOKUP_BATCH = 200
+
+
+def fetch_translations(hashes: list[str]) -> dict[str, str]:
+    """{source_hash: 저장된 번역문}. 해시 목록은 _LOOKUP_BATCH개씩 나눠 조회"""
+    db = get_supabase()
+    found = {}
+    for i in range(0, len(hashes), _LOOKUP_BATCH):
+        rows = (
+            db.table("translation_memory")
+            .select("source_hash, translated_text")
+            .in_("source_hash", hashes[i:i + _LOOKUP_BATCH])
+            .execute()
+        ).data or []
+        found.update({row["source_hash"]: row["translated_text"] for row in rows})
+    return found
+
+
+def lookup_segments(segments: list[str]) -> tuple[dict[str, str], dict[str, tuple[str, str]]]:
+    """정규화 문장 목록 → (정확 일치 {문장: 번역문}, 유사 일치 {문장: (유사 원문, 그 번역문)}).
+    유사 일치는 재사용하지 않고 참고 번역으로만 쓴다"""
+    wanted = {n for n in segments if len(n) >= TM_MIN_SEGMENT_CHARS}
+    if not wanted:
+        return {}, {}
+
+    hashes = {segment_hash(n): n for n in wanted}
+    exact = {}
+    for source_hash, translated in fetch_translations(list(hashes)).items():
+        normalized = hashes[source_hash]
+        exact[normalized] = translated
+        _fuzzy_index.add(normalized, translated)
+
+    fuzzy = {}
+    for normalized in wanted - set(exact):
+        match = _fuzzy_index.lookup(normalized)
+        if match:
+            fuzzy[normalized] = (match[0], match[1])
+
+    if exact:
+        get_supabase().rpc("touch_translation_memory", {"hashes": [segment_hash(n) for n in exact]}).execute()
+    return exact, fuzzy
+
+
+def store_segments(pairs: dict[str, str], source: str = "llm", overwrite: bool = False):
+    """{정규화 원문: 번역문} 저장. 기본은 이미 있는 문장을 건드리지 않음 (수동 교정 보호).
+    overwrite=True: 용어 교정 가져오기 등 기존 번역을 교체할 때"""
+    rows = [
+        {
+            "source_hash": segment_hash(normalized),
+            "source_text": normalized,
+            "translated_text": translated,
+            "source": source,
+        }
+        for normalized, translated in pairs.items()
+        if len(normalized) >= TM_MIN_SEGMENT_CHARS and translated
+    ]
+    if not rows:
+        return
+    get_supabase().table("translation_memory").upsert(
+        rows, on_conflict="source_hash", ignore_duplicates=not overwrite,
+    ).execute()
+    for row in rows:
+        _fuzzy_index.add(row["source_text"], row["translated_text"])
+
+
+def load_translation_memory():
+    """유사 일치용 인덱스를 DB에서 적재 (앱 기동 시 1회)"""
+    global _fuzzy_index
+    db = get_supabase()
+    index = _FuzzyIndex()
+    offset = 0
+    while True:
+        page = (
+            db.table("translation_memory")
+            .select("source_text, translated_text")
+            .order("created_at")
+            .range(offset, offset + 999)
+            .execute()
+        )
+        for row in page.data:
+            index.add(row["source_text"], row["translated_text"])
+        if len(page.data) < 1000:
+            break
+        offset += 1000
+
+    # 적재 중 새로 저장된 항목 유지
+    for normalized, translated, _ in list(_fuzzy_index._entries.values()):
+        index.add(normalized, translated)
+    _fuzzy_index = index
+    logger.info(f"[TranslationMemory] Loaded {len(index)} segments")
@@ -0,0 +1,224 @@
+"""테스트 공용 설정.
+
+- 백엔드 모듈을 `cd backend` 없이도 import할 수 있도록 경로 추가 (scripts와 같은 import 경로)
+- db fixture: Supabase 클라이언트 대신 쓰는 메모리 테이블 (PostgREST 쿼리 빌더 중 백엔드가 쓰는 부분만)"""
+import os
+import random
+import sys
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _value(raw: str):
+    if raw == "null":
+        return None
+    if raw in ("true", "false"):
+        return raw == "true"
+    return raw
+
+
+def _compare(op: str, actual, expected) -> bool:
+    if op == "is":
+        return actual is expected if expected in (None, True, False) else actual == expected
+    if op == "eq":
+        return actual == expected
+    if op == "neq":
+        return actual != expected
+    if op == "in":
+        return actual in expected
+    if actual is None:
+        return False
+    return {
+        "lt": actual < expected, "lte": actual <= expected,
+        "gt": actual > expected, "gte": actual >= expected,
+    }[op]
+
+
+class FakeQuery:
+    def __init__(self, db: "FakeSupabase", table: str):
+        self._db = db
+        self._table = table
+        self._action = "select"
+        self._payload = None
+        self._on_conflict = None
+        self._ignore_duplicates = False
+        self._filters: list = []
+        self._negate = False
+        self._order: list[tuple[str, bool]] = []
+        self._range: tuple[int, int] | None = None
+        self._limit: int | None = None
+        self._single = False
+
+    # ---- 동작 ----
+    def select(self, columns: str = "*", count: str | None = None):
+        self._action = "select"
+        return self
+
+    def insert(self, payload):
+        self._action, self._payload = "insert", payload
+        return self
+
+    def upsert(self, payload, on_conflict: str = "id", ignore_duplicates: bool = False):
+        self._action, self._payload, self._on_conflict = "upsert", payload, on_conflict
+        self._ignore_duplicates = ignore_duplicates
+        return self
+
+    def update(self, payload: dict):
+        self._action, self._payload = "update", payload
+        return self
+
+    def delete(self):
+        self._action = "delete"
+        return self
+
+    # ---- 조건 ----
+    @property
+    def not_(self):
+        self._negate = True
+        return self
+
+    def _filter(self, op: str, column: str, expected):
+        negate, self._negate = self._negate, False
+        self._filters.append(lambda row: _compare(op, row.get(column), expected) != negate)
+        return self
+
+    def eq(self, column, value):
+        return self._filter("eq", column, value)
+
+    def neq(self, column, value):
+        return self._filter("neq", column, value)
+
+    def in_(self, column, values):
+        return self._filter("in", column, list(values))
+
+    def is_(self, column, value):
+        return self._filter("is", column, _value(value) if isinstance(value, str) else value)
+
+    def lt(self, column, value):
+        return self._filter("lt", column, value)
+
+    def lte(self, column, value):
+        return self._filter("lte", column, value)
+
+    def gt(self, column, value):
+        return self._filter("gt", column, value)
+
+    def gte(self, column, value):
+        return self._filter("gte", column, value)
+
+    def or_(self, expression: str):
+        """"a.eq.1,b.is.null" 형식 (중첩 and/or는 미지원)"""
+        parts = []
+        for clause in expression.split(","):
+            column, op, raw = clause.split(".", 2)
+            parts.append((column, op, _value(raw)))
+        self._filters.append(lambda row: any(_compare(op, row.get(c), v) for c, op, v in parts))
+        return self
+
+    def order(self, column: str, desc: bool = False):
+        self._order.append((column, desc))
+        return self
+
+    def range(self, start: int, end: int):
+        self._range = (start, end)
+        return self
+
+    def limit(self, count: int):
+        self._limit = count
+        return self
+
+    def single(self):
+        self._single = True
+        return self
+
+    # ---- 실행 ----
+    def _matches(self, row: dict) -> bool:
+        return all(f(row) for f in self._filters)
+
+    def _sorted(self, rows: list[dict]) -> list[dict]:
+        # 정렬 키가 같은 행의 순서는 PostgreSQL처럼 보장하지 않음 (조회마다 섞음)
+        rows = list(rows)
+        self._db.rng.shuffle(rows)
+        for column, desc in reversed(self._order):
+            rows.sort(key=lambda r: (r.get(column) is None, r.get(column)), reverse=desc)
+        return rows
+
+    def execute(self):
+        rows = self._db.tables.setdefault(self._table, [])
+        self._db.calls.append((self._table, self._action))
+        if self._action in ("insert", "upsert"):
+            data = self._write(rows)
+        elif self._action == "update":
+            data = []
+            for row in rows:
+                if self._matches(row):
+                    row.update(self._payload)
+                    data.append(dict(row))
+        elif self._action == "delete":
+            data = [dict(r) for r in rows if self._matches(r)]
+            rows[:] = [r for r in rows if not self._matches(r)]
+        else:
+            data = [dict(r) for r in self._sorted([r for r in rows if self._matches(r)])]
+            if self._range:
+                data = data[self._range[0]:self._range[1] + 1]
+            if self._limit is not None:
+                data = data[:self._limit]
+        if self._single:
+            data = data[0] if data else None
+        return SimpleNamespace(data=data, count=len(data) if isinstance(data, list) else None)
+
+    def _write(self, rows: list[dict]) -> list[dict]:
+        payload = self._payload if isinstance(self._payload, list) else [self._payload]
+        written = []
+        for item in payload:
+            check = self._db.checks.get(self._table)
+            if check:
+                check(item)
+            existing = None
+            if self._action == "upsert":
+                keys = self._on_conflict.split(",")
+                existing = next((r for r in rows if all(r.get(k) == item.get(k) for k in keys)), None)
+            if existing is not None:
+                if not self._ignore_duplicates:
+                    existing.update(item)
+                    written.append(dict(existing))
+            else:
+                row = {"id": str(uuid.uuid4()), **self._db.defaults.get(self._table, {}), **item}
+                rows.append(row)
+                written.append(dict(row))
+        return written
+
+
+class FakeSupabase:
+    """테이블 = dict 목록. rpc는 rpcs[name] = 함수(params) → data 로 등록"""
+
+    def __init__(self):
+        self.tables: dict[str, list[dict]] = {}
+        self.rpcs: dict[str, object] = {}
+        # 테이블별 컬럼 기본값 (insert/upsert 시 적용)
+        self.defaults: dict[str, dict] = {}
+        # 테이블별 insert/upsert 검사 (FK 위반 등 재현용, 예외를 던짐)
+        self.checks: dict[str, object] = {}
+        self.calls: list[tuple[str, str]] = []
+        self.rng = random.Random(0)
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self, name)
+
+    def rpc(self, name: str, params: dict):
+        self.calls.append((name, "rpc"))
+        data = self.rpcs[name](params)
+        return SimpleNamespace(execute=lambda: SimpleNamespace(data=data))
+
+
+@pytest.fixture
+def db(monkeypatch):
+    from services import supabase_client
+
+    fake = FakeSupabase()
+    monkeypatch.setattr(supabase_client, "_client", fake)
+    return fake
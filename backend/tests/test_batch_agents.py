@@ -0,0 +1,87 @@
+"""일괄 묶음 호출: 묶음 크기 제한, ID 역다중화, 누락 항목 단건 폴백"""
+import asyncio
+import json
+
+from agents import batch_agents, intent_extractor
+from agents.batch_agents import _chunks, _demux, _run_batched
+
+
+def test_chunks_respect_count_and_char_limits(monkeypatch):
+    monkeypatch.setattr(batch_agents, "BATCH_PROMPT_SIZE", 3)
+    monkeypatch.setattr(batch_agents, "BATCH_PROMPT_MAX_CHARS", 10)
+    items = {"a": "1234", "b": "1234", "c": "12", "d": "1", "e": "12345678901", "f": "1"}
+    # 한도를 넘는 단일 항목도 혼자 한 묶음
+    assert _chunks(items) == [["a", "b", "c"], ["d"], ["e"], ["f"]]
+
+    monkeypatch.setattr(batch_agents, "BATCH_PROMPT_MAX_CHARS", 100)
+    assert _chunks(items) == [["a", "b", "c"], ["d", "e", "f"]]
+
+
+def test_demux_keeps_only_requested_ids_with_required_key():
+    data = {"results": [
+        {"id": "a", "keywords": ["코"]},
+        {"id": "a", "keywords": ["중복"]},
+        {"id": "b", "keywords": []},
+        {"id": "c", "keywords": None},
+        {"id": "zzz", "keywords": ["입력에 없음"]},
+        "not a dict",
+    ]}
+    result = _demux(data, ["a", "b", "c"], "keywords")
+    assert result == {"a": {"id": "a", "keywords": ["코"]}, "b": {"id": "b", "keywords": []}}
+    assert _demux("oops", ["a"], "keywords") == {}
+
+
+def test_missing_items_fall_back_to_single_calls(monkeypatch):
+    prompts, singles = [], []
+
+    async def generate(prompt, system_instruction=""):
+        prompts.append(prompt)
+        return json.dumps({"results": [{"id": "a", "value": "batched-a"}]})
+
+    async def single_call(cid):
+        singles.append(cid)
+        if cid == "c":
+            raise RuntimeError("single failed")
+        return {"value": f"single-{cid}"}
+
+    monkeypatch.setattr(batch_agents, "generate_json", generate)
+    results = asyncio.run(_run_batched(
+        "test", {"a": "x", "b": "y", "c": "z"}, lambda ids: ",".join(ids), "", "value", single_call,
+    ))
+
+    assert prompts == ["a,b,c"]
+    assert sorted(singles) == ["b", "c"]
+    assert results["a"] == {"id": "a", "value": "batched-a"}
+    assert results["b"] == {"value": "single-b"}
+    assert isinstance(results["c"], RuntimeError)
+
+
+def test_single_item_skips_batch_prompt(monkeypatch):
+    async def generate(prompt, system_instruction=""):
+        raise AssertionError("batch prompt for a single item")
+
+    async def single_call(cid):
+        return {"value": cid}
+
+    monkeypatch.setattr(batch_agents, "generate_json", generate)
+    assert asyncio.run(_run_batched("test", {"a": "x"}, str, "", "value", single_call)) == {"a": {"value": "a"}}
+
+
+def test_extract_intent_batch_uses_one_call_and_strips_ids(monkeypatch):
+    prompts = []
+
+    async def generate(prompt, system_instruction=""):
+        prompts.append(prompt)
+        return json.dumps({"results": [
+            {"id": cid, "keywords": [f"kw-{cid}"], "main_concerns": []} for cid in ("1", "2", "3")
+        ]})
+
+    async def single(text):
+        raise AssertionError("single call not expected")
+
+    monkeypatch.setattr(batch_agents, "generate_json", generate)
+    monkeypatch.setattr(intent_extractor, "extract_intent", single)
+    results = asyncio.run(batch_agents.extract_intent_batch({"1": "가", "2": "나", "3": "다"}))
+
+    assert len(prompts) == 1
+    assert results == {cid: {"keywords": [f"kw-{cid}"], "main_concerns": []} for cid in ("1", "2", "3")}
@@ -0,0 +1,119 @@
+"""파이프라인 점유(claim)와 Idempotency-Key 처리"""
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from api import consultation as consultation_api
+from models.schemas import GenerateReportsRequest
+from services import idempotency
+from services.consultation_lock import INSTANCE_ID, claim_consultation, claim_consultations
+
+
+def test_claim_only_from_allowed_statuses_and_only_once(db):
+    db.tables["consultations"] = [
+        {"id": "a", "status": "registered"},
+        {"id": "b", "status": "report_failed"},
+        {"id": "c", "status": "report_ready"},
+    ]
+    claimed = claim_consultations(["a", "b", "c"], ["registered", "report_failed"], "processing")
+
+    assert sorted(claimed) == ["a", "b"]
+    assert {r["id"]: r["status"] for r in db.tables["consultations"]} == {
+        "a": "processing", "b": "processing", "c": "report_ready",
+    }
+    assert db.tables["consultations"][0]["claimed_by"] == INSTANCE_ID
+    # 같은 상담을 다시 점유하면 실패 (더블 클릭/다른 인스턴스)
+    assert claim_consultation("a", ["registered", "report_failed"], "processing") is False
+
+
+class _Scheduler:
+    draining = False
+
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, kind, factory, priority, consultation_id=None, consultation_ids=None):
+        self.submitted.append(consultation_id or consultation_ids)
+        return type("Job", (), {"to_dict": lambda self: {"kind": kind}})()
+
+
+def test_generate_reports_reports_current_status_of_rows_lost_to_another_claim(db, monkeypatch):
+    db.tables["consultations"] = [
+        {"id": "a", "status": "registered"},
+        {"id": "b", "status": "registered"},
+        {"id": "c", "status": "report_ready"},
+    ]
+    scheduler = _Scheduler()
+    real_claim = consultation_api.claim_consultations
+
+    def racing_claim(ids, from_statuses, to_status, job=None):
+        # 상태 조회 직후 다른 인스턴스가 b를 먼저 점유
+        db.tables["consultations"][1].update({"status": "processing", "claimed_by": "other"})
+        return real_claim(ids, from_statuses, to_status, job)
+
+    monkeypatch.setattr(consultation_api, "get_scheduler", lambda: scheduler)
+    monkeypatch.setattr(consultation_api, "claim_consultations", racing_claim)
+    monkeypatch.setattr(consultation_api, "BULK_BATCHING_ENABLED", False)
+
+    response = asyncio.run(consultation_api._generate_reports(GenerateReportsRequest(consultation_ids=["a", "b", "c"])))
+
+    assert response["triggered_ids"] == ["a"]
+    assert response["skipped"] == [
+        {"id": "b", "status": "processing", "reason": "이미 처리 중이거나 완료된 상담입니다"},
+        {"id": "c", "status": "report_ready", "reason": "이미 처리 중이거나 완료된 상담입니다"},
+    ]
+    assert scheduler.submitted == ["a"]
+
+
+@pytest.fixture
+def keys(db):
+    db.defaults["idempotency_keys"] = {"status": "in_progress", "response": None}
+    return db
+
+
+def test_idempotent_request_replays_first_response(keys):
+    calls = []
+
+    async def handler():
+        calls.append(1)
+        return {"id": len(calls)}
+
+    async def scenario():
+        first = await idempotency.run_idempotent("ep", "key-1", {"x": 1}, handler)
+        second = await idempotency.run_idempotent("ep", "key-1", {"x": 1}, handler)
+        return first, second
+
+    assert asyncio.run(scenario()) == ({"id": 1}, {"id": 1})
+    assert calls == [1]
+
+
+def test_idempotency_key_reused_with_different_body_is_rejected(keys):
+    async def handler():
+        return {"ok": True}
+
+    async def scenario():
+        await idempotency.run_idempotent("ep", "key-1", {"x": 1}, handler)
+        await idempotency.run_idempotent("ep", "key-1", {"x": 2}, handler)
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(scenario())
+    assert error.value.status_code == 422
+
+
+def test_failed_request_releases_key_for_retry(keys):
+    attempts = []
+
+    async def handler():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("boom")
+        return {"ok": True}
+
+    async def scenario():
+        with pytest.raises(RuntimeError):
+            await idempotency.run_idempotent("ep", "key-1", {}, handler)
+        return await idempotency.run_idempotent("ep", "key-1", {}, handler)
+
+    assert asyncio.run(scenario()) == {"ok": True}
+    assert len(attempts) == 2
@@ -0,0 +1,69 @@
+"""멈춘 상담 인계/복구 점유 (CAS + 점유 만료 재확인)"""
+from datetime import datetime, timedelta, timezone
+
+from services import consultation_lock
+from services.consultation_lock import (
+    INSTANCE_ID,
+    lease_cutoff,
+    reclaim_consultation,
+    release_claims,
+    renew_claims,
+)
+
+
+def _ago(seconds: int) -> str:
+    return (datetime.now(timezone.utc) - timedelta(seconds=seconds)).isoformat()
+
+
+def _row(**fields) -> dict:
+    return {"id": "c1", "status": "processing", "claimed_by": "other", "needs_requeue": False, **fields}
+
+
+def test_reclaims_expired_claim(db, monkeypatch):
+    monkeypatch.setattr(consultation_lock, "PIPELINE_LEASE_SECONDS", 300)
+    db.tables["consultations"] = [_row(claimed_at=_ago(600))]
+
+    assert reclaim_consultation(dict(db.tables["consultations"][0]), lease_cutoff()) is True
+    assert db.tables["consultations"][0]["claimed_by"] == INSTANCE_ID
+
+
+def test_does_not_reclaim_when_owner_renewed_after_lookup(db, monkeypatch):
+    monkeypatch.setattr(consultation_lock, "PIPELINE_LEASE_SECONDS", 300)
+    db.tables["consultations"] = [_row(claimed_at=_ago(600))]
+    cutoff = lease_cutoff()
+    looked_up = dict(db.tables["consultations"][0])
+    # 조회 직후 원래 인스턴스의 heartbeat (claimed_by는 그대로)
+    db.tables["consultations"][0]["claimed_at"] = _ago(0)
+
+    assert reclaim_consultation(looked_up, cutoff) is False
+    assert db.tables["consultations"][0]["claimed_by"] == "other"
+
+
+def test_reclaims_handed_off_row_regardless_of_claimed_at(db):
+    db.tables["consultations"] = [_row(claimed_by=None, needs_requeue=True, claimed_at=_ago(0))]
+
+    assert reclaim_consultation(dict(db.tables["consultations"][0]), lease_cutoff()) is True
+    assert db.tables["consultations"][0]["needs_requeue"] is False
+
+
+def test_reclaim_loses_to_another_instance(db):
+    db.tables["consultations"] = [_row(claimed_at=_ago(10_000))]
+    looked_up = dict(db.tables["consultations"][0])
+    db.tables["consultations"][0]["claimed_by"] = "third"
+
+    assert reclaim_consultation(looked_up, lease_cutoff()) is False
+
+
+def test_renew_and_release_only_touch_own_in_flight_rows(db):
+    old = _ago(600)
+    db.tables["consultations"] = [
+        {"id": "mine", "status": "processing", "claimed_by": INSTANCE_ID, "claimed_at": old},
+        {"id": "done", "status": "report_ready", "claimed_by": INSTANCE_ID, "claimed_at": old},
+        {"id": "theirs", "status": "processing", "claimed_by": "other", "claimed_at": old},
+    ]
+    renew_claims(["mine", "done", "theirs"])
+    assert [r["claimed_at"] > old for r in db.tables["consultations"]] == [True, False, False]
+
+    assert release_claims() == ["mine"]
+    assert db.tables["consultations"][0]["claimed_by"] is None
+    assert db.tables["consultations"][0]["needs_requeue"] is True
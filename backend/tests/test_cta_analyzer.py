@@ -0,0 +1,65 @@
+"""CTA 분석: 화자 분리 + 로컬 판정, 한국어 고객 발화 필드"""
+import asyncio
+import json
+
+import pytest
+
+from agents import cta_analyzer
+from agents.speaker_segmenter import segment_speakers
+
+ORIGINAL = "相談者：ご希望はございますか。\nお客様：7月に手術できますか？\n費用はいくらですか？"
+TRANSLATED = "상담사: 원하시는 게 있으신가요?\n고객: 7월에 수술 가능한가요?\n비용은 얼마인가요?"
+# 번역에서 줄이 합쳐져 원문과 줄 수가 다름
+TRANSLATED_MERGED = "상담사: 원하시는 게 있으신가요?\n고객: 7월에 수술 가능한가요? 비용은 얼마인가요?"
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    prompts = []
+    response = {"cta_level": "warm", "cta_signals": []}
+
+    async def generate_json(prompt, system_instruction=""):
+        prompts.append(prompt)
+        return json.dumps(response, ensure_ascii=False)
+
+    monkeypatch.setattr(cta_analyzer, "generate_json", generate_json)
+    monkeypatch.setattr(cta_analyzer, "CTA_LOCAL_ENABLED", True)
+    monkeypatch.setattr(cta_analyzer, "CTA_SHADOW_SAMPLE_RATE", 0.0)
+    return prompts, response
+
+
+def test_labeled_lines_are_split_and_projected_onto_translation():
+    segmentation = segment_speakers(ORIGINAL)
+    assert segmentation.method == "labels"
+    assert segmentation.customer_texts() == ["7月に手術できますか？\n費用はいくらですか？"]
+    projected = segmentation.project(TRANSLATED)
+    assert projected[1] == {"speaker": "customer", "text": "7월에 수술 가능한가요?\n비용은 얼마인가요?"}
+    assert segmentation.project(TRANSLATED_MERGED) is None
+
+
+def test_certain_local_verdict_uses_projected_korean_utterances(llm):
+    prompts, _ = llm
+    result = asyncio.run(cta_analyzer.analyze_cta(ORIGINAL, TRANSLATED, "ja"))
+
+    assert (result["method"], result["cta_level"]) == ("lexicon", "hot")
+    assert result["customer_utterances"] == "7월에 수술 가능한가요?\n비용은 얼마인가요?"
+    assert prompts == []
+
+
+def test_certain_verdict_without_projection_falls_back_to_translation_not_japanese(llm):
+    result = asyncio.run(cta_analyzer.analyze_cta(ORIGINAL, TRANSLATED_MERGED, "ja"))
+
+    assert result["method"] == "lexicon"
+    assert result["customer_utterances"] == TRANSLATED_MERGED
+
+
+def test_uncertain_verdict_asks_llm_for_korean_when_projection_fails(llm):
+    prompts, response = llm
+    response["customer_utterances"] = "고민 중이에요"
+    original = "相談者：ご希望はございますか。\nお客様：少し迷っています。"
+
+    result = asyncio.run(cta_analyzer.analyze_cta(original, "상담사: 원하시는 게 있으신가요? 고객: 조금 고민 중이에요", "ja"))
+
+    assert result["method"] == "llm"
+    assert result["customer_utterances"] == "고민 중이에요"
+    assert '"customer_utterances"' in prompts[0]
@@ -0,0 +1,65 @@
+"""로컬 CTA 점수: 신호 1종만으로는 확실 판정하지 않음, 부정 표현과 흔한 단어 오검출 방지"""
+import pytest
+
+from agents.cta_scorer import score_cta
+from scripts.evaluate_cta_lexicon import evaluate
+
+
+@pytest.mark.parametrize("utterance, lang", [
+    ("まだ予定はありません。", "ja"),
+    ("수술 후 얼마나 아파요?", "ko"),
+    ("카드 없어요, 아직 생각 중이에요", "ko"),
+])
+def test_reported_false_hot_utterances_are_not_hot(utterance, lang):
+    score = score_cta([utterance], lang)
+    assert score.scores["hot"] == 0
+    assert score.uncertain is True
+
+
+def test_single_hot_signal_is_left_to_the_llm():
+    score = score_cta(["費用はいくらですか?"], "ja")
+    assert score.cta_level == "hot"
+    assert score.uncertain is True
+
+
+def test_distinct_hot_signals_are_certain_with_spans():
+    utterance = "7月に手術できますか？費用はいくらですか？"
+    score = score_cta([utterance], "ja")
+
+    assert (score.cta_level, score.uncertain) == ("hot", False)
+    assert {span["signal"] for span in score.spans} == {"schedule", "price"}
+    for span in score.spans:
+        assert utterance[span["start"]:span["end"]] == span["match"]
+    assert score.signals == [utterance]
+
+
+def test_negation_only_cancels_its_own_clause():
+    score = score_cta(["予約はしないです、費用だけ知りたくて"], "ja")
+    assert [span["signal"] for span in score.spans] == ["price"]
+
+    score = score_cta(["카드 결제 되나요? 다음 달에 예약하고 싶어요"], "ko")
+    assert score.scores["hot"] == 3 and score.uncertain is False
+
+
+def test_bare_common_words_are_not_signals():
+    assert score_cta(["그냥 그래요", "3월에 친구 결혼식이 있어요"], "ko").scores["hot"] == 0
+    assert score_cta(["明日の予定は特にないです"], "ja").scores["hot"] == 0
+
+
+def test_evaluate_reports_coverage_and_accuracy_against_labels():
+    rows = [
+        {"id": "a", "original_text": "相談者：ご希望はございますか。\nお客様：7月に手術できますか？費用はいくらですか？",
+         "input_language": "ja", "cta_level": "hot"},
+        {"id": "b", "original_text": "상담사: 무엇을 도와드릴까요?\n고객: 비용이 얼마예요? 다음 달에 예약 가능할까요?",
+         "input_language": "ko", "cta_level": "warm"},
+        {"id": "c", "original_text": "相談者：どうされましたか。\nお客様：ちょっと気になって", "input_language": "ja", "cta_level": "cool"},
+        {"id": "d", "original_text": "라벨 없는 한 줄", "input_language": "ko", "cta_level": "cool"},
+    ]
+    result = evaluate(rows, overridden={"b"})
+
+    assert result["summary"]["segmented"] == 3
+    assert result["summary"]["certain"] == 2
+    assert result["summary"]["certain_accuracy"] == 0.5
+    assert result["summary"]["override_accuracy"] == 0.0
+    assert result["levels"]["hot"]["precision"] == 0.5
+    assert [error["id"] for error in result["errors"]] == ["b"]
@@ -0,0 +1,161 @@
+"""MinHash/LSH 유사 중복 탐지: 정규화, 유사도 추정, threshold 경계, 인덱스와 DB 정합성"""
+import asyncio
+
+import numpy as np
+import pytest
+
+from services import dedup
+from services.dedup import (
+    MinHashLSH,
+    _shingles,
+    compute_content_hash,
+    compute_minhash,
+    estimate_similarity,
+)
+
+BASE = (
+    "二重整形の相談です。目の腫れが気になっていて、埋没法と切開法のどちらが良いか迷っています。"
+    "ダウンタイムはどれくらいでしょうか。仕事があるので一週間以上休むのは難しいです。"
+    "費用の目安と、腫れが引くまでの期間も教えてください。"
+)
+UNRELATED = "ニキビ跡の治療について知りたいです。レーザーとピーリングの違いを教えてください。"
+
+
+def _jaccard(a: str, b: str) -> float:
+    sa, sb = _shingles(a), _shingles(b)
+    return len(sa & sb) / len(sa | sb)
+
+
+def test_normalization_ignores_whitespace_and_width():
+    variant = " ".join(BASE[i:i + 10] for i in range(0, len(BASE), 10)).replace("。", "。\n")
+    assert compute_content_hash(variant) == compute_content_hash(BASE)
+    assert compute_minhash(variant) == compute_minhash(BASE)
+    assert compute_minhash("ＡＢＣ１２３のご相談") == compute_minhash("abc123のご相談")
+
+
+def test_estimate_tracks_jaccard():
+    edited = BASE.replace("一週間以上", "十日以上").replace("費用の目安", "料金")
+    true = _jaccard(BASE, edited)
+    assert 0.5 < true < 1.0
+    # 128개 순열 → 표준오차 약 0.04
+    assert abs(estimate_similarity(compute_minhash(BASE), compute_minhash(edited)) - true) < 0.15
+
+
+def test_query_returns_near_duplicate_above_threshold():
+    index = MinHashLSH()
+    index.insert("base", compute_minhash(BASE))
+    index.insert("other", compute_minhash(UNRELATED))
+
+    near = BASE.replace("迷っています", "悩んでいます")
+    matches = index.query(compute_minhash(near), threshold=0.8)
+    assert [key for key, _ in matches] == ["base"]
+    assert matches[0][1] >= 0.8
+
+    assert index.query(compute_minhash(UNRELATED), threshold=0.8) == [("other", 1.0)]
+
+
+def test_threshold_is_inclusive_and_filters_candidates():
+    index = MinHashLSH()
+    sig = compute_minhash(BASE)
+    index.insert("base", sig)
+
+    # 8개 band 중 절반만 같은 서명: band 충돌로 후보는 되지만 점수는 0.5
+    half = np.asarray(sig, dtype=np.uint64)
+    half[64:] += 1
+    assert index.query(half.tolist(), threshold=0.5) == [("base", 0.5)]
+    assert index.query(half.tolist(), threshold=0.51) == []
+
+
+def test_no_shared_band_is_never_a_candidate():
+    index = MinHashLSH()
+    sig = np.asarray(compute_minhash(BASE), dtype=np.uint64)
+    index.insert("base", sig.tolist())
+
+    # 모든 band에서 한 값씩만 다르면 실제 일치율은 7/8이어도 LSH 후보가 아님
+    shifted = sig.copy()
+    shifted[::8] += 1
+    assert estimate_similarity(sig, shifted) == 0.875
+    assert index.query(shifted.tolist(), threshold=0.0) == []
+
+
+def test_results_sorted_and_remove():
+    index = MinHashLSH()
+    sig = np.asarray(compute_minhash(BASE), dtype=np.uint64)
+    close = sig.copy()
+    close[120:] += 1
+    far = sig.copy()
+    far[64:] += 1
+    index.insert("far", far.tolist())
+    index.insert("close", close.tolist())
+    index.insert("same", sig.tolist())
+
+    assert [key for key, _ in index.query(sig.tolist(), threshold=0.5)] == ["same", "close", "far"]
+
+    index.remove("same")
+    index.remove("missing")
+    assert len(index) == 2
+    assert [key for key, _ in index.query(sig.tolist(), threshold=0.5)] == ["close", "far"]
+
+
+# ============================================
+# 인덱스 ↔ DB 정합성 (다른 인스턴스에서 삭제된 상담)
+# ============================================
+class _ForeignKeyViolation(Exception):
+    code = "23503"
+
+
+@pytest.fixture
+def lsh(monkeypatch):
+    index = MinHashLSH()
+    monkeypatch.setattr(dedup, "_lsh_index", index)
+    return index
+
+
+def test_find_near_duplicate_prunes_deleted_consultations(db, lsh):
+    sig = compute_minhash(BASE)
+    lsh.insert("deleted", sig)
+    lsh.insert("alive", compute_minhash(BASE + "よろしくお願いします。"))
+    db.tables["consultations"] = [{"id": "alive"}]
+
+    key, score = dedup.find_near_duplicate(sig)
+    assert key == "alive" and score >= dedup.NEAR_DUP_THRESHOLD
+    assert len(lsh) == 1
+
+    db.tables["consultations"] = []
+    assert dedup.find_near_duplicate(sig) is None
+    assert len(lsh) == 0
+
+
+def test_create_retries_without_link_when_original_deleted_concurrently(db, lsh):
+    from api.consultation import _create_consultation
+    from models.schemas import ConsultationCreate
+
+    lsh.insert("gone", compute_minhash(BASE))
+    db.tables["consultations"] = [{"id": "gone"}]
+
+    def foreign_key(row):
+        # 유사 중복 확인 직후 원본이 삭제된 상황
+        if row.get("near_duplicate_of") == "gone":
+            raise _ForeignKeyViolation("violates foreign key constraint")
+
+    db.checks["consultations"] = foreign_key
+    data = ConsultationCreate(customer_name="山田", original_text=BASE)
+    created = asyncio.run(_create_consultation(data))
+
+    assert created["near_duplicate_of"] is None
+    assert "gone" not in {key for key, _ in lsh.query(compute_minhash(BASE), 0.0)}
+    assert created["id"] in {key for key, _ in lsh.query(compute_minhash(BASE), 0.0)}
+
+
+def test_rebuild_backfills_signatures_from_page_query(db, lsh):
+    db.tables["consultations"] = [
+        {"id": "a", "created_at": "2026-01-01", "original_text": BASE, "minhash_signature": None},
+        {"id": "b", "created_at": "2026-01-01", "original_text": UNRELATED,
+         "minhash_signature": compute_minhash(UNRELATED)},
+    ]
+    dedup.rebuild_near_duplicate_index()
+
+    assert db.tables["consultations"][0]["minhash_signature"] == compute_minhash(BASE)
+    # 페이지 조회 1회 + 서명 저장 1회 (행별 원문 재조회 없음)
+    assert db.calls == [("consultations", "select"), ("consultations", "update")]
+    assert dedup._lsh_index.query(compute_minhash(BASE), 0.9) == [("a", 1.0)]
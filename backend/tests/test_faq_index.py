@@ -0,0 +1,98 @@
+"""프로세스 내 FAQ 인덱스: 페이지 적재, 증분 동기화/삭제 반영, 전수 검색"""
+import numpy as np
+import pytest
+
+from services import faq_index
+from services.faq_index import EMBEDDING_DIM, CategoryIndex, FaqIndex
+
+
+def _embedding(i: int) -> list[float]:
+    vector = np.zeros(EMBEDDING_DIM, dtype=np.float32)
+    vector[i % EMBEDDING_DIM] = 1.0
+    return vector.tolist()
+
+
+def _row(i: int, updated_at: str = "2026-01-01T00:00:00+00:00", category: str = "dermatology") -> dict:
+    return {
+        "id": f"faq-{i:02d}", "question": f"질문 {i}", "answer": "", "procedure_name": None,
+        "category": category, "embedding": _embedding(i), "updated_at": updated_at,
+    }
+
+
+@pytest.fixture
+def corpus(db, monkeypatch):
+    version = {"value": 1}
+    monkeypatch.setattr(faq_index, "fetch_corpus_version", lambda: version["value"])
+    monkeypatch.setattr(faq_index, "_PAGE_SIZE", 3)
+    return version
+
+
+def test_load_pages_through_rows_with_identical_updated_at(db, corpus):
+    # 017 백필처럼 모든 행의 updated_at이 같음 (fake DB는 동점 행 순서를 조회마다 섞음)
+    db.tables["faq_vectors"] = [_row(i) for i in range(10)]
+
+    index = FaqIndex()
+    index.load()
+
+    assert sorted(index.categories["dermatology"].rows) == [f"faq-{i:02d}" for i in range(10)]
+    assert index.version == 1
+
+
+def test_sync_applies_changes_category_moves_and_deletions(db, corpus):
+    db.tables["faq_vectors"] = [_row(i) for i in range(4)]
+    index = FaqIndex()
+    index.load()
+
+    db.tables["faq_vectors"] = [r for r in db.tables["faq_vectors"] if r["id"] != "faq-00"]
+    db.tables["faq_vectors"][0].update(category="plastic_surgery", updated_at="2026-02-01T00:00:00+00:00")
+    db.tables["faq_vectors"].append(_row(9, "2026-02-01T00:00:00+00:00"))
+    corpus["value"] = 2
+    index.sync()
+
+    assert sorted(index.categories["dermatology"].rows) == ["faq-02", "faq-03", "faq-09"]
+    assert list(index.categories["plastic_surgery"].rows) == ["faq-01"]
+    assert index.version == 2
+
+
+def test_sync_skips_fetch_when_version_unchanged(db, corpus, monkeypatch):
+    monkeypatch.setattr(faq_index, "FAQ_INDEX_RECONCILE_EVERY", 1000)
+    db.tables["faq_vectors"] = [_row(0)]
+    index = FaqIndex()
+    index.load()
+    db.calls.clear()
+
+    index.sync()
+
+    assert db.calls == []
+
+
+def test_knn_exact_returns_top_k_by_inner_product():
+    index = CategoryIndex()
+    vectors = np.eye(4, EMBEDDING_DIM, dtype=np.float32)
+    vectors[1, 0] = 0.5
+    vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    index.upsert([({"id": f"d{i}"}, vectors[i]) for i in range(4)])
+
+    hits, = index.knn_exact(np.eye(1, EMBEDDING_DIM, dtype=np.float32), 2)
+
+    assert [faq_id for faq_id, _ in hits] == ["d0", "d1"]
+    assert hits[0][1] == pytest.approx(1.0)
+    assert hits[1][1] == pytest.approx(0.5 / np.sqrt(1.25))
+
+
+def test_knn_two_stage_matches_exact_with_full_shortlist():
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(20, EMBEDDING_DIM)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    queries = vectors[:3] + 0.1 * rng.normal(size=(3, EMBEDDING_DIM)).astype(np.float32)
+    index = CategoryIndex()
+    index.upsert([({"id": f"d{i}"}, vectors[i]) for i in range(20)])
+
+    # 후보가 전체를 덮으면 1차 prefix 순위와 무관하게 정확 검색과 같아야 함
+    two_stage = index.knn_two_stage(queries, 5, 256, 4)
+    exact = index.knn_exact(queries, 5)
+
+    for staged_hits, exact_hits in zip(two_stage, exact):
+        assert [faq_id for faq_id, _ in staged_hits] == [faq_id for faq_id, _ in exact_hits]
+        # 점수는 prefix가 아닌 전체 차원 내적
+        assert [s for _, s in staged_hits] == pytest.approx([s for _, s in exact_hits])
@@ -0,0 +1,78 @@
+"""하이브리드(어휘 + 벡터) FAQ 검색: RPC 파라미터, 프로세스 내 인덱스 점수"""
+import asyncio
+
+import numpy as np
+import pytest
+
+from agents import rag_agent
+from services.faq_index import EMBEDDING_DIM, FaqIndex
+
+
+def _vector(*weights: float) -> list[float]:
+    vector = np.zeros(EMBEDDING_DIM, dtype=np.float32)
+    vector[:len(weights)] = weights
+    return vector.tolist()
+
+
+@pytest.fixture
+def rpc_calls(db):
+    calls = []
+    for name in ("search_faq_hybrid", "search_faq_batch"):
+        db.rpcs[name] = lambda params, name=name: calls.append((name, params)) or []
+    return calls
+
+
+def test_hybrid_rpc_receives_configured_weights_and_terms(rpc_calls, monkeypatch):
+    monkeypatch.setattr(rag_agent, "RAG_HYBRID_ENABLED", True)
+    monkeypatch.setattr(rag_agent, "RAG_VECTOR_WEIGHT", 0.6)
+    monkeypatch.setattr(rag_agent, "RAG_LEXICAL_WEIGHT", 0.4)
+    monkeypatch.setattr(rag_agent, "RAG_LEXICAL_THRESHOLD", 0.5)
+
+    asyncio.run(rag_agent._search_rpc([_vector(1)], ["써마지"], "dermatology", 0.65, 8))
+
+    (name, params), = rpc_calls
+    assert name == "search_faq_hybrid"
+    assert params["query_terms"] == ["써마지"]
+    assert (params["vector_weight"], params["lexical_weight"], params["lexical_threshold"]) == (0.6, 0.4, 0.5)
+    assert (params["match_threshold"], params["match_count"]) == (0.65, 8)
+
+
+def test_vector_only_rpc_when_hybrid_disabled(rpc_calls, monkeypatch):
+    monkeypatch.setattr(rag_agent, "RAG_HYBRID_ENABLED", False)
+
+    asyncio.run(rag_agent._search_rpc([_vector(1)], ["써마지"], "dermatology", 0.65, 8))
+
+    assert [name for name, _ in rpc_calls] == ["search_faq_batch"]
+    assert "query_terms" not in rpc_calls[0][1]
+
+
+def _index() -> FaqIndex:
+    index = FaqIndex()
+    rows = [
+        ({"id": "close", "question": "피부 탄력 개선 방법", "procedure_name": "리프팅"}, _vector(1, 0.1)),
+        ({"id": "exact-name", "question": "시술 후 관리", "procedure_name": "써마지"}, _vector(0.3, 1)),
+        ({"id": "far", "question": "여드름 흉터", "procedure_name": "레이저"}, _vector(0, 0, 1)),
+    ]
+    index.categories["dermatology"].upsert([(row, np.asarray(v) / np.linalg.norm(v)) for row, v in rows])
+    index.ready = True
+    return index
+
+
+def test_exact_procedure_name_below_vector_threshold_is_kept_by_lexical_match():
+    rows = _index().search_hybrid([_vector(1)], ["써마지"], "dermatology", 0.65, 3, 0.7, 0.3, 0.6)
+
+    by_id = {row["id"]: row for row in rows}
+    assert set(by_id) == {"close", "exact-name"}
+    assert by_id["exact-name"]["similarity"] < 0.65
+    assert by_id["exact-name"]["lexical_score"] == 1.0
+    assert by_id["exact-name"]["score"] == pytest.approx(0.7 * by_id["exact-name"]["similarity"] + 0.3)
+    assert rows[0]["score"] >= rows[1]["score"]
+
+
+def test_lexical_weight_zero_ranks_by_vector_similarity():
+    rows = _index().search_hybrid([_vector(1)], ["써마지"], "dermatology", 0.65, 3, 1.0, 0.0, 0.6)
+    assert [row["id"] for row in rows] == ["close", "exact-name"]
+
+
+def test_search_returns_none_before_index_is_loaded():
+    assert FaqIndex().search_hybrid([_vector(1)], [], "dermatology", 0.65, 3, 0.7, 0.3, 0.6) is None
@@ -0,0 +1,84 @@
+"""로컬 키워드 추출: 사전 최장 일치, 백그라운드 사전 갱신, 조사/어미 제거"""
+import asyncio
+import threading
+
+import pytest
+
+from agents import keyword_extractor
+from agents.keyword_extractor import Gazetteer
+from services.korean_text import content_stem
+
+
+def test_gazetteer_drops_names_contained_in_longer_match():
+    gazetteer = Gazetteer(
+        {"보톡스": "보톡스", "사각턱보톡스": "사각턱 보톡스", "리프팅": "리프팅", "실리프팅": "실리프팅"},
+        {},
+    )
+    found = gazetteer.find_procedures("사각턱 보톡스랑 실리프팅, 그리고 이마 보톡스")
+    assert found == {"사각턱 보톡스": 1, "실리프팅": 1, "보톡스": 1}
+
+
+@pytest.mark.parametrize("token, stem", [
+    ("보톡스는", "보톡스"),
+    ("코필러에서", "코필러"),
+    ("강조해주세요", "강조"),
+    ("설명해", "설명"),
+    ("해주세요", None),
+    ("는", "는"),
+])
+def test_content_stem(token, stem):
+    assert content_stem(token) == stem
+
+
+@pytest.fixture
+def refresh_state(monkeypatch):
+    """사전 캐시 상태 초기화 + 재구성 호출 기록 (재구성은 release 전까지 대기)"""
+    old = Gazetteer({"보톡스": "보톡스"}, {})
+    new = Gazetteer({"보톡스": "보톡스", "울쎄라": "울쎄라"}, {})
+    builds = []
+    release = threading.Event()
+
+    def build():
+        builds.append(1)
+        release.wait(5)
+        return new
+
+    monkeypatch.setattr(keyword_extractor, "_gazetteer", old)
+    monkeypatch.setattr(keyword_extractor, "_loaded_at", 0.0)
+    monkeypatch.setattr(keyword_extractor, "_checked_at", 0.0)
+    monkeypatch.setattr(keyword_extractor, "_refreshing", False)
+    monkeypatch.setattr(keyword_extractor, "_is_stale", lambda gazetteer: True)
+    monkeypatch.setattr(keyword_extractor, "_build_gazetteer", build)
+    monkeypatch.setattr(keyword_extractor, "GAZETTEER_MIN_REBUILD_SECONDS", 60)
+    return old, new, builds, release
+
+
+def test_stale_gazetteer_is_served_while_rebuilding_in_background(refresh_state):
+    old, new, builds, release = refresh_state
+
+    async def scenario():
+        served = [keyword_extractor.get_gazetteer() for _ in range(3)]
+        await asyncio.sleep(0.05)
+        in_progress = list(builds)
+        release.set()
+        await asyncio.gather(*keyword_extractor._refresh_tasks)
+        return served, in_progress, keyword_extractor.get_gazetteer()
+
+    served, in_progress, after = asyncio.run(scenario())
+
+    # 재구성이 끝나기 전에도 기존 사전을 바로 반환, 재구성은 한 번만
+    assert served == [old, old, old]
+    assert in_progress == [1]
+    assert after is new
+    assert builds == [1]
+
+
+def test_rebuild_is_rate_limited_after_it_finishes(refresh_state):
+    _, new, builds, release = refresh_state
+    release.set()
+
+    keyword_extractor.get_gazetteer()
+    keyword_extractor.get_gazetteer()
+
+    assert builds == [1]
+    assert keyword_extractor.get_gazetteer() is new
@@ -0,0 +1,40 @@
+"""Aho-Corasick 다중 패턴 매칭: 겹치는/포함된 패턴, 공백 무시 사전 매칭"""
+from services.keyword_matcher import AhoCorasick, KeywordDictionary
+
+
+def test_reports_every_overlapping_match_with_end_position():
+    automaton = AhoCorasick(["코", "코성형", "성형", "성형수술", "수술"])
+    assert sorted(automaton.find_all("코성형수술")) == [
+        (0, "코"), (2, "성형"), (2, "코성형"), (4, "성형수술"), (4, "수술"),
+    ]
+
+
+def test_suffix_patterns_found_through_failure_links():
+    # "he"는 "she"의 접미사: 실패 링크의 출력까지 합쳐져야 함
+    automaton = AhoCorasick(["he", "she", "his", "hers"])
+    assert sorted(automaton.find_all("ushers")) == [(3, "he"), (3, "she"), (5, "hers")]
+
+
+def test_repeated_and_self_overlapping_patterns():
+    automaton = AhoCorasick(["aa", "aaa"])
+    assert automaton.find_all("aaaa") == [(1, "aa"), (2, "aaa"), (2, "aa"), (3, "aaa"), (3, "aa")]
+
+
+def test_no_patterns_or_no_match():
+    assert AhoCorasick([]).find_all("보톡스") == []
+    assert AhoCorasick(["필러"]).find_all("보톡스 상담") == []
+
+
+def test_dictionary_match_ignores_spacing_and_collects_context():
+    dictionary = KeywordDictionary([
+        {"keyword": "코성형", "category": "plastic_surgery"},
+        {"keyword": "코 필러", "category": "dermatology"},
+        {"keyword": "보톡스", "category": "boundary",
+         "context_keywords": {"plastic_surgery": ["사각턱"], "dermatology": ["주름"]}},
+    ])
+    result = dictionary.match("코 성형이랑 코필러 고민 중이고 사각 턱 보톡스도 문의")
+    assert result["plastic_surgery"] == ["코성형"]
+    assert result["dermatology"] == ["코 필러"]
+    assert result["boundary"] == ["보톡스"]
+    assert result["context"] == {"plastic_surgery": ["사각턱"], "dermatology": []}
+
@@ -0,0 +1,77 @@
+"""리포트 한국어 번역: 섹션 캐시, 동시 요청 합치기, 번역 중 수정 시 재번역"""
+import asyncio
+import json
+
+import pytest
+
+from agents import korean_translator
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    """섹션 값 앞에 "KO:"를 붙여 돌려주는 번역기. 호출된 섹션 키를 기록"""
+    calls = []
+
+    async def generate_json(prompt, system_instruction=""):
+        source = json.loads(prompt.split("원본 JSON:\n", 1)[1].split("\n\n", 1)[0])
+        (key, value), = source.items()
+        calls.append(key)
+        await asyncio.sleep(0)
+        return json.dumps({key: f"KO:{value}"}, ensure_ascii=False)
+
+    monkeypatch.setattr(korean_translator, "generate_json", generate_json)
+    return calls
+
+
+def _report(db, report_data: dict, updated_at: str = "t1") -> dict:
+    row = {"id": "r1", "report_data": report_data, "report_data_ko": None, "updated_at": updated_at}
+    db.tables["reports"] = [row]
+    return row
+
+
+def test_only_changed_sections_are_translated(db, llm):
+    first = {"summary": "要約", "advice": "助言"}
+    assert asyncio.run(korean_translator.translate_report_to_korean(first)) == {
+        "summary": "KO:要約", "advice": "KO:助言",
+    }
+
+    changed = {"summary": "要約", "advice": "新しい助言"}
+    assert asyncio.run(korean_translator.translate_report_to_korean(changed)) == {
+        "summary": "KO:要約", "advice": "KO:新しい助言",
+    }
+    assert llm == ["summary", "advice", "advice"]
+
+
+def test_concurrent_requests_share_one_translation(db, llm):
+    row = _report(db, {"summary": "要約"})
+
+    async def scenario():
+        return await asyncio.gather(*[korean_translator.get_report_korean("r1") for _ in range(3)])
+
+    results = asyncio.run(scenario())
+
+    assert results == [({"summary": "KO:要約"}, False)] * 3
+    assert llm == ["summary"]
+    assert row["report_data_ko"] == {"summary": "KO:要約"}
+    assert asyncio.run(korean_translator.get_report_korean("r1")) == ({"summary": "KO:要約"}, True)
+
+
+def test_report_edited_during_translation_is_translated_again(db, llm, monkeypatch):
+    row = _report(db, {"summary": "古い要約"})
+    original = korean_translator.generate_json
+
+    async def editing_generate_json(prompt, system_instruction=""):
+        result = await original(prompt, system_instruction)
+        if len(llm) == 1:
+            # 첫 번역 도중 관리자가 리포트를 수정
+            row.update({"report_data": {"summary": "新しい要約"}, "updated_at": "t2"})
+        return result
+
+    monkeypatch.setattr(korean_translator, "generate_json", editing_generate_json)
+
+    result = asyncio.run(korean_translator.get_report_korean("r1"))
+
+    assert result == ({"summary": "KO:新しい要約"}, False)
+    # 이전 내용의 번역은 저장되지 않음
+    assert row["report_data_ko"] == {"summary": "KO:新しい要約"}
+    assert llm == ["summary", "summary"]
@@ -0,0 +1,73 @@
+"""로컬 모델 버전 저장/전환 + 재학습 라벨 선별"""
+from agents.validator import confirm_if_confident
+from scripts.train_classifier import fetch_training_data
+from services import model_registry
+
+
+def _activate(db):
+    def activate(params):
+        # activate_ml_model: 한 트랜잭션에서 기존 활성 버전 해제 + 새 버전 활성화
+        for row in db.tables["ml_models"]:
+            if row["name"] == params["p_name"]:
+                row["is_active"] = row["version"] == params["p_version"]
+        return None
+
+    db.rpcs["activate_ml_model"] = activate
+
+
+def test_new_version_is_inserted_inactive_before_switching(db, monkeypatch):
+    monkeypatch.setattr(model_registry, "_serialize", lambda model: "artifact")
+    db.tables["ml_models"] = [{"name": "classifier", "version": "classifier-old", "is_active": True}]
+    _activate(db)
+
+    version = model_registry.save_model("classifier", object(), {}, 100)
+
+    assert db.calls == [("ml_models", "insert"), ("activate_ml_model", "rpc")]
+    assert {r["version"]: r["is_active"] for r in db.tables["ml_models"]} == {
+        "classifier-old": False, version: True,
+    }
+
+
+def test_failed_insert_keeps_current_model_active(db, monkeypatch):
+    monkeypatch.setattr(model_registry, "_serialize", lambda model: "artifact")
+    db.tables["ml_models"] = [{"name": "classifier", "version": "classifier-old", "is_active": True}]
+
+    def fail(row):
+        raise RuntimeError("insert failed")
+
+    db.checks["ml_models"] = fail
+    try:
+        model_registry.save_model("classifier", object(), {}, 100)
+    except RuntimeError:
+        pass
+
+    assert db.tables["ml_models"] == [{"name": "classifier", "version": "classifier-old", "is_active": True}]
+    assert ("activate_ml_model", "rpc") not in db.calls
+
+
+def test_no_activate_only_inserts(db, monkeypatch):
+    monkeypatch.setattr(model_registry, "_serialize", lambda model: "artifact")
+
+    model_registry.save_model("classifier", object(), {}, 100, activate=False)
+
+    assert db.calls == [("ml_models", "insert")]
+    assert db.tables["ml_models"][0]["is_active"] is False
+
+
+def test_confirmed_classification_keeps_its_source():
+    confirmed = confirm_if_confident({"classification": "dermatology", "confidence": 0.93, "method": "model"})
+    assert confirmed["method"] == "model"
+    assert confirm_if_confident({"classification": "dermatology", "confidence": 0.9})["method"] == "llm"
+
+
+def test_training_data_excludes_local_predictions(db):
+    base = {"classification": "dermatology", "translated_text": "보톡스 상담", "created_at": "2026-01-01"}
+    db.tables["consultations"] = [
+        {**base, "id": "llm", "classification_method": "llm", "is_manually_classified": False},
+        {**base, "id": "legacy", "classification_method": None, "is_manually_classified": False},
+        {**base, "id": "manual", "classification_method": "manual", "is_manually_classified": True},
+        {**base, "id": "model", "classification_method": "model", "is_manually_classified": False},
+        {**base, "id": "keyword", "classification_method": "keyword", "is_manually_classified": False},
+    ]
+
+    assert sorted(r["id"] for r in fetch_training_data()) == ["legacy", "llm", "manual"]
@@ -0,0 +1,83 @@
+"""동일 원문 재사용: 정상 종료된 상담만 재사용하고 반려된 리포트는 복제하지 않음"""
+import asyncio
+
+import pytest
+
+from agents import pipeline
+
+HASH = "a" * 64
+
+
+def _consultation(consultation_id: str, status: str, updated_at: str, **extra) -> dict:
+    return {
+        "id": consultation_id,
+        "status": status,
+        "content_hash": HASH,
+        "customer_name": "山田",
+        "original_text": "原文",
+        "translated_text": "번역문",
+        "input_language": "ja",
+        "intent_extraction": {"keywords": ["코성형"]},
+        "classification": "plastic_surgery",
+        "updated_at": updated_at,
+        **extra,
+    }
+
+
+def test_donor_must_have_finished_successfully(db):
+    db.tables["consultations"] = [
+        _consultation("failed", "report_failed", "2026-03-03"),
+        _consultation("running", "report_generating", "2026-03-02"),
+        _consultation("done", "report_ready", "2026-03-01"),
+        _consultation("self", "processing", "2026-03-04"),
+    ]
+    donor = pipeline._find_reusable_consultation("self", HASH)
+    assert donor["id"] == "done"
+
+    db.tables["consultations"] = [_consultation("failed", "report_failed", "2026-03-03")]
+    assert pipeline._find_reusable_consultation("self", HASH) is None
+
+
+@pytest.fixture
+def reuse(db, monkeypatch):
+    generated, translated = [], []
+
+    async def generate_report(consultation_id, *args, **kwargs):
+        generated.append(consultation_id)
+
+    monkeypatch.setattr(pipeline, "DEDUP_CLONE_REPORT", True)
+    monkeypatch.setattr(pipeline, "_generate_report", generate_report)
+    monkeypatch.setattr(pipeline, "schedule_report_translation", translated.append)
+    donor = _consultation("donor", "report_approved", "2026-03-01")
+    target = _consultation("new", "processing", "2026-03-05", translated_text=None)
+    db.tables["consultations"] = [donor, target]
+    return db, donor, target, generated
+
+
+def test_rejected_report_is_not_cloned(reuse):
+    db, donor, target, generated = reuse
+    db.tables["reports"] = [
+        {"id": "r1", "consultation_id": "donor", "status": "rejected", "created_at": "2026-03-02",
+         "report_data": {"title": "반려"}},
+    ]
+    asyncio.run(pipeline._reuse_consultation_results(target, donor))
+
+    assert generated == ["new"]
+    assert [r for r in db.tables["reports"] if r["consultation_id"] == "new"] == []
+
+
+def test_latest_usable_report_is_cloned(reuse):
+    db, donor, target, generated = reuse
+    db.tables["reports"] = [
+        {"id": "r1", "consultation_id": "donor", "status": "approved", "created_at": "2026-03-01",
+         "report_data": {"title": "승인"}},
+        {"id": "r2", "consultation_id": "donor", "status": "rejected", "created_at": "2026-03-02",
+         "report_data": {"title": "반려"}},
+    ]
+    asyncio.run(pipeline._reuse_consultation_results(target, donor))
+
+    cloned = [r for r in db.tables["reports"] if r["consultation_id"] == "new"]
+    assert generated == []
+    assert [r["report_data"]["title"] for r in cloned] == ["승인"]
+    assert cloned[0]["status"] == "draft"
+    assert db.tables["consultations"][1]["status"] == "report_ready"
@@ -0,0 +1,110 @@
+"""파이프라인 스케줄러: 우선순위 순서, 에이징(기아 방지), BULK 예약 슬롯"""
+import asyncio
+import time
+
+from services import pipeline_scheduler
+from services.pipeline_scheduler import JobPriority, PipelineScheduler
+
+
+def _recorder(order: list[str], name: str, gate: asyncio.Event | None = None):
+    async def run():
+        order.append(name)
+        if gate is not None:
+            await gate.wait()
+    return run
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_priority_order_when_slot_frees():
+    async def scenario():
+        scheduler = PipelineScheduler(concurrency=1, reserved_slots=0)
+        order: list[str] = []
+        gate = asyncio.Event()
+        scheduler.submit("blocker", _recorder(order, "blocker", gate), JobPriority.MANUAL)
+        scheduler.submit("bulk", _recorder(order, "bulk"), JobPriority.BULK)
+        scheduler.submit("regen", _recorder(order, "regen"), JobPriority.REGENERATION)
+        scheduler.submit("manual-1", _recorder(order, "manual-1"), JobPriority.MANUAL)
+        scheduler.submit("manual-2", _recorder(order, "manual-2"), JobPriority.MANUAL)
+        await _settle()
+        assert order == ["blocker"]
+        assert [j["kind"] for j in scheduler.list_jobs()["queued"]] == ["manual-1", "manual-2", "regen", "bulk"]
+
+        gate.set()
+        await _settle()
+        return order
+
+    # 같은 우선순위는 먼저 들어온 순서
+    assert asyncio.run(scenario()) == ["blocker", "manual-1", "manual-2", "regen", "bulk"]
+
+
+def test_aging_lets_old_bulk_job_overtake_new_manual(monkeypatch):
+    monkeypatch.setattr(pipeline_scheduler, "PIPELINE_AGING_SECONDS", 10.0)
+
+    async def scenario():
+        scheduler = PipelineScheduler(concurrency=1, reserved_slots=0)
+        order: list[str] = []
+        gate = asyncio.Event()
+        scheduler.submit("blocker", _recorder(order, "blocker", gate), JobPriority.MANUAL)
+        old_bulk = scheduler.submit("old-bulk", _recorder(order, "old-bulk"), JobPriority.BULK)
+        recent_bulk = scheduler.submit("recent-bulk", _recorder(order, "recent-bulk"), JobPriority.BULK)
+        scheduler.submit("manual", _recorder(order, "manual"), JobPriority.MANUAL)
+
+        # 30초 대기한 BULK: 2 - 30/10 = -1 < MANUAL(0)
+        old_bulk.enqueued_at = time.time() - 30
+        recent_bulk.enqueued_at = time.time() - 5
+        assert old_bulk.effective_priority(time.time()) < 0
+
+        gate.set()
+        await _settle()
+        return order
+
+    assert asyncio.run(scenario()) == ["blocker", "old-bulk", "manual", "recent-bulk"]
+
+
+def test_reserved_slots_keep_manual_jobs_from_waiting_behind_bulk():
+    async def scenario():
+        scheduler = PipelineScheduler(concurrency=3, reserved_slots=1)
+        order: list[str] = []
+        gate = asyncio.Event()
+        for i in range(4):
+            scheduler.submit(f"bulk-{i}", _recorder(order, f"bulk-{i}", gate), JobPriority.BULK)
+        await _settle()
+        # BULK는 concurrency - reserved_slots = 2개까지만 실행
+        assert order == ["bulk-0", "bulk-1"]
+        assert len(scheduler.list_jobs()["queued"]) == 2
+
+        scheduler.submit("manual", _recorder(order, "manual", gate), JobPriority.MANUAL)
+        await _settle()
+        assert order == ["bulk-0", "bulk-1", "manual"]
+
+        gate.set()
+        await _settle()
+        statuses = {j["kind"]: j["status"] for j in scheduler.list_jobs()["finished"]}
+        return order, statuses
+
+    order, statuses = asyncio.run(scenario())
+    assert order == ["bulk-0", "bulk-1", "manual", "bulk-2", "bulk-3"]
+    assert set(statuses.values()) == {"done"}
+
+
+def test_failed_job_frees_slot():
+    async def scenario():
+        scheduler = PipelineScheduler(concurrency=1, reserved_slots=0)
+        order: list[str] = []
+
+        async def fail():
+            order.append("fail")
+            raise RuntimeError("boom")
+
+        job = scheduler.submit("fail", fail, JobPriority.MANUAL)
+        scheduler.submit("next", _recorder(order, "next"), JobPriority.BULK)
+        await _settle()
+        return order, job
+
+    order, job = asyncio.run(scenario())
+    assert order == ["fail", "next"]
+    assert job.status == "failed" and job.error == "boom"
@@ -0,0 +1,53 @@
+"""시술명 정규화가 SQL normalize_procedure_name()(019_procedure_taxonomy.sql)과 같은 결과인지 + 별칭 매칭"""
+import pytest
+
+from services.procedure_taxonomy import Taxonomy, normalize_procedure_name
+
+
+# (입력, SQL normalize_procedure_name() 결과)
+# SQL: lower(normalize(name, NFKC)) → '[(\[][^)\]]*[)\]]' 제거 → '[^[:alnum:]가-힣]' 제거
+@pytest.mark.parametrize(
+    "name, expected",
+    [
+        ("보톡스 (사각턱)", "보톡스"),
+        ("보톡스[사각턱] 50유닛", "보톡스50유닛"),
+        ("Botox®", "botox"),
+        ("ＢＯＴＯＸ　リフト", "botoxリフト"),
+        ("울쎄라 · 써마지", "울쎄라써마지"),
+        ("필러_입술/팔자", "필러입술팔자"),
+        ("코성형(실리콘)(보형물)", "코성형"),
+        ("눈밑지방재배치 (", "눈밑지방재배치"),
+        ("", ""),
+        (None, ""),
+    ],
+)
+def test_normalize_matches_sql_rule(name, expected):
+    assert normalize_procedure_name(name) == expected
+
+
+@pytest.fixture
+def taxonomy():
+    return Taxonomy([
+        {"id": 1, "canonical_name": "보톡스", "aliases": ["보톡스", "botox"]},
+        {"id": 2, "canonical_name": "사각턱 보톡스", "aliases": ["사각턱보톡스"]},
+        {"id": 3, "canonical_name": "실리프팅", "aliases": ["실리프팅", "threadlift"]},
+        {"id": 4, "canonical_name": "코", "aliases": []},
+    ])
+
+
+def test_exact_alias_after_normalization(taxonomy):
+    assert taxonomy.match("Botox (이마)") == 1
+    assert taxonomy.match("사각턱 보톡스") == 2
+    assert taxonomy.match("Thread-Lift") == 3
+
+
+def test_longest_contained_alias_wins(taxonomy):
+    assert taxonomy.match("사각턱 보톡스 재시술") == 2
+    assert taxonomy.match("이마 보톡스 100유닛") == 1
+
+
+def test_unmatched_and_short_aliases(taxonomy):
+    # 한 글자 별칭("코")은 등록하지 않음
+    assert taxonomy.match("코") is None
+    assert taxonomy.match("레이저 토닝") is None
+    assert taxonomy.match("(괄호만)") is None
@@ -0,0 +1,76 @@
+"""RAG 결과 캐시: 키 정규화, 코퍼스 버전 무효화, 뒤처진 인덱스 결과 미저장, 영속 캐시"""
+from collections import OrderedDict
+
+import pytest
+
+from services import rag_cache
+
+
+@pytest.fixture
+def cache(db, monkeypatch):
+    db.tables["data_versions"] = [{"name": "faq_vectors", "version": 1}]
+    monkeypatch.setattr(rag_cache, "_entries", OrderedDict())
+    monkeypatch.setattr(rag_cache, "_version", 0)
+    monkeypatch.setattr(rag_cache, "_version_checked_at", 0.0)
+    # 매 조회마다 버전 확인
+    monkeypatch.setattr(rag_cache, "RAG_CACHE_VERSION_CHECK_SECONDS", 0)
+    monkeypatch.setattr(rag_cache, "RAG_CACHE_PERSIST", False)
+    return db
+
+
+def _bump(db):
+    db.tables["data_versions"][0]["version"] += 1
+
+
+def test_key_ignores_keyword_order_spacing_and_width():
+    settings = {"hybrid": [0.7, 0.3, 0.6]}
+    key = rag_cache.make_key(["코 필러", "ＨＩＦＵ"], "dermatology", 0.65, 8, settings)
+    assert key == rag_cache.make_key(["hifu", "코필러", " "], "dermatology", 0.65, 8, settings)
+    assert key != rag_cache.make_key(["hifu", "코필러"], "dermatology", 0.65, 8, {"hybrid": None})
+
+
+def test_entries_expire_when_corpus_version_changes(cache):
+    rag_cache.put("k", [{"id": "a"}])
+    assert rag_cache.get("k") == [{"id": "a"}]
+
+    _bump(cache)
+
+    assert rag_cache.get("k") is None
+
+
+def test_results_from_lagging_index_are_not_stored(cache):
+    _bump(cache)
+
+    rag_cache.put("k", [{"id": "old"}], source_version=1)
+    assert rag_cache.get("k") is None
+
+    rag_cache.put("k", [{"id": "new"}], source_version=2)
+    assert rag_cache.get("k") == [{"id": "new"}]
+
+
+def test_returned_results_are_copies(cache):
+    rag_cache.put("k", [{"id": "a"}])
+    rag_cache.get("k")[0]["id"] = "mutated"
+    assert rag_cache.get("k") == [{"id": "a"}]
+
+
+def test_lru_evicts_oldest(cache, monkeypatch):
+    monkeypatch.setattr(rag_cache, "RAG_CACHE_SIZE", 2)
+    rag_cache.put("a", [])
+    rag_cache.put("b", [])
+    rag_cache.get("a")
+    rag_cache.put("c", [])
+
+    assert list(rag_cache._entries) == ["a", "c"]
+
+
+def test_persisted_entry_is_shared_only_for_same_version(cache, monkeypatch):
+    monkeypatch.setattr(rag_cache, "RAG_CACHE_PERSIST", True)
+    rag_cache.put("k", [{"id": "a"}])
+    # 다른 인스턴스: 메모리 캐시 없음
+    rag_cache._entries.clear()
+    assert rag_cache.get("k") == [{"id": "a"}]
+
+    rag_cache._entries.clear()
+    _bump(cache)
+    assert rag_cache.get("k") is None
@@ -0,0 +1,63 @@
+"""재생성 시 RAG 증분 검색 (새 단어 판정, 병합 건수 제한)"""
+import asyncio
+
+from agents import rag_agent
+from agents.rag_agent import find_new_terms, search_incremental
+
+
+def _faq(i: int, text: str = "") -> dict:
+    return {"id": f"f{i}", "question": text, "answer": text}
+
+
+def test_term_found_only_in_faq_text_is_still_new():
+    # FAQ 본문에 '다운타임'이 나오지만 검색어로 쓴 적은 없으므로 새 단어
+    assert find_new_terms(["다운타임", "보톡스"], ["보톡스", "사각턱"]) == ["다운타임"]
+
+
+def test_known_terms_match_whole_terms_case_insensitively():
+    assert find_new_terms(["HIFU", "리프팅"], ["hifu", "리프팅효과"]) == ["리프팅"]
+
+
+def test_reuses_previous_results_when_direction_adds_nothing(monkeypatch):
+    async def search(*args, **kwargs):
+        raise AssertionError("검색하지 않아야 함")
+
+    monkeypatch.setattr(rag_agent, "search_relevant_faq", search)
+    previous = [_faq(i) for i in range(3)]
+
+    results, info = asyncio.run(search_incremental("보톡스 강조해주세요", ["보톡스"], "face", previous, ["보톡스"]))
+
+    assert results == previous
+    assert info["mode"] == "reused"
+
+
+def test_merged_results_are_capped_at_top_k_keeping_new_results(monkeypatch):
+    calls = []
+
+    async def search(keywords, category, match_count=8, **kwargs):
+        calls.append(keywords)
+        return [_faq(0), _faq(100), _faq(101)]
+
+    monkeypatch.setattr(rag_agent, "search_relevant_faq", search)
+    previous = [_faq(i, "다운타임 안내") for i in range(8)]
+
+    results, info = asyncio.run(
+        search_incremental("다운타임 설명 추가", ["보톡스"], "face", previous, ["보톡스"], top_k=8)
+    )
+
+    assert calls == [["다운타임"]]
+    assert [faq["id"] for faq in results] == ["f0", "f1", "f2", "f3", "f4", "f5", "f100", "f101"]
+    assert info["query_terms"] == ["보톡스", "다운타임"]
+    assert info["dropped"] == 2
+
+
+def test_falls_back_to_keywords_for_reports_without_stored_terms(monkeypatch):
+    async def search(keywords, category, match_count=8, **kwargs):
+        return []
+
+    monkeypatch.setattr(rag_agent, "search_relevant_faq", search)
+
+    _, info = asyncio.run(search_incremental("다운타임 추가", ["보톡스", "다운타임"], "face", [_faq(1)]))
+
+    assert info["mode"] == "reused"
+    assert info["query_terms"] == ["보톡스", "다운타임"]
@@ -0,0 +1,64 @@
+"""RAG 결과 순서: 다중 쿼리 RRF 융합, MMR 다양성 재정렬 + 출처 제한"""
+import numpy as np
+import pytest
+
+from agents.rag_agent import mmr_rerank, reciprocal_rank_fusion
+
+
+def _row(faq_id: str, query_index: int, rank: int, similarity: float) -> dict:
+    return {"id": faq_id, "query_index": query_index, "rank": rank, "similarity": similarity}
+
+
+def test_rrf_prefers_documents_found_by_several_queries():
+    rows = [
+        _row("a", 0, 1, 0.90), _row("b", 0, 2, 0.80), _row("c", 0, 3, 0.70),
+        _row("b", 1, 1, 0.85), _row("c", 1, 2, 0.75),
+        _row("c", 2, 1, 0.72),
+    ]
+    fused = reciprocal_rank_fusion(rows, k=60)
+
+    assert [r["id"] for r in fused] == ["c", "b", "a"]
+    assert fused[0]["rrf_score"] == pytest.approx(1 / 63 + 1 / 62 + 1 / 61)
+    # 같은 문서는 가장 높은 유사도 유지, 쿼리별 필드는 제거
+    assert fused[1]["similarity"] == 0.85
+    assert "rank" not in fused[0] and "query_index" not in fused[0]
+
+
+def test_rrf_ties_broken_by_similarity():
+    fused = reciprocal_rank_fusion([_row("low", 0, 1, 0.60), _row("high", 1, 1, 0.90)], k=60)
+    assert [r["id"] for r in fused] == ["high", "low"]
+
+
+def _faq(faq_id: str, score: float, video: str | None = None) -> dict:
+    return {"id": faq_id, "score": score, "youtube_video_id": video or faq_id}
+
+
+def _unit(*vectors) -> np.ndarray:
+    matrix = np.array(vectors, dtype=np.float32)
+    return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+
+def test_mmr_without_vectors_keeps_relevance_order_with_source_cap():
+    candidates = [_faq("a", 0.9, "v1"), _faq("b", 0.8, "v1"), _faq("c", 0.7, "v1"), _faq("d", 0.6, "v2")]
+    ranked = mmr_rerank(candidates, None, k=3, source_cap=2)
+    assert [r["id"] for r in ranked] == ["a", "b", "d"]
+
+
+def test_mmr_drops_near_duplicates_and_promotes_diverse_results():
+    candidates = [_faq("a", 0.90), _faq("a-dup", 0.89), _faq("a-close", 0.88), _faq("b", 0.80)]
+    vectors = _unit([1, 0, 0], [1, 0.01, 0], [1, 0.6, 0], [0, 1, 0])
+
+    ranked = mmr_rerank(candidates, vectors, k=3, lambda_=0.7, dup_threshold=0.95)
+    # a-dup는 a와 거의 같아 제외, a-close보다 덜 관련된 b가 다양성 점수로 먼저 선택
+    assert [r["id"] for r in ranked] == ["a", "b", "a-close"]
+
+
+def test_mmr_lambda_one_is_pure_relevance():
+    candidates = [_faq("a", 0.90), _faq("a-close", 0.88), _faq("b", 0.80)]
+    vectors = _unit([1, 0, 0], [1, 0.6, 0], [0, 1, 0])
+    ranked = mmr_rerank(candidates, vectors, k=3, lambda_=1.0, dup_threshold=1.01)
+    assert [r["id"] for r in ranked] == ["a", "a-close", "b"]
+
+
+def test_mmr_empty():
+    assert mmr_rerank([], None, k=5) == []
@@ -0,0 +1,101 @@
+"""추측 RAG 검색: 결과를 쓰지 않고 끝나는 경로(예외 포함)에서 검색 태스크가 취소되는지"""
+import asyncio
+
+import pytest
+
+from agents import pipeline, rag_agent
+from agents.rag_agent import SpeculativeSearch
+
+
+@pytest.fixture
+def searches(monkeypatch):
+    """임베딩/검색 호출을 기록하고, release 전까지 검색이 끝나지 않도록 막음"""
+    state = {"started": [], "cancelled": [], "release": None}
+
+    async def embed(keywords):
+        return [[1.0, 0.0]]
+
+    async def search(keywords, category, embeddings=None, procedures=None):
+        state["started"].append(category)
+        try:
+            await state["release"].wait()
+        except asyncio.CancelledError:
+            state["cancelled"].append(category)
+            raise
+        return [{"id": f"{category}-1"}]
+
+    monkeypatch.setattr(rag_agent, "embed_keywords", embed)
+    monkeypatch.setattr(rag_agent, "search_relevant_faq", search)
+    return state
+
+
+def test_take_uses_matching_category_and_cancels_the_rest(searches):
+    async def scenario():
+        searches["release"] = asyncio.Event()
+        speculative = SpeculativeSearch(["코성형"], ["plastic_surgery", "dermatology"])
+        await asyncio.sleep(0)
+        assert speculative.covers(["코성형"], "plastic_surgery")
+        assert not speculative.covers(["보톡스"], "plastic_surgery")
+        assert not speculative.covers(["코성형"], "boundary")
+
+        take = asyncio.create_task(speculative.take("plastic_surgery"))
+        await asyncio.sleep(0)
+        speculative._searches["dermatology"].cancel()
+        searches["release"].set()
+        results, _, _ = await take
+        speculative.cancel()  # 이미 사용한 뒤 다시 호출해도 무해
+        return results
+
+    assert asyncio.run(scenario()) == [{"id": "plastic_surgery-1"}]
+
+
+def test_pipeline_cancels_speculation_when_validation_save_fails(db, searches, monkeypatch):
+    db.tables["consultations"] = [{
+        "id": "c1", "original_text": "鼻の整形", "customer_name": "山田", "content_hash": "h",
+    }]
+
+    async def translate(text):
+        return "코 성형", "ja"
+
+    async def cta(*args, **kwargs):
+        return {"cta_level": "warm"}
+
+    async def intent(text):
+        return {"keywords": ["코성형"]}, None
+
+    async def classify(text, intent):
+        return {"classification": "plastic_surgery", "confidence": 0.9}
+
+    async def validate(*args):
+        # 검증 LLM 호출 동안 추측 검색이 시작됨
+        for _ in range(3):
+            await asyncio.sleep(0)
+        return {"classification": "plastic_surgery", "confidence": 0.9}
+
+    async def save_validation(*args):
+        raise RuntimeError("db down")
+
+    async def noop(*args, **kwargs):
+        return None
+
+    monkeypatch.setattr(pipeline, "DEDUP_REUSE_ENABLED", False)
+    monkeypatch.setattr(pipeline, "SPECULATIVE_RAG_ENABLED", True)
+    monkeypatch.setattr(pipeline, "translate_to_korean", translate)
+    monkeypatch.setattr(pipeline, "analyze_cta", cta)
+    monkeypatch.setattr(pipeline, "_save_cta", noop)
+    monkeypatch.setattr(pipeline, "_extract_intent", intent)
+    monkeypatch.setattr(pipeline, "classify_consultation", classify)
+    monkeypatch.setattr(pipeline, "validate_classification", validate)
+    monkeypatch.setattr(pipeline, "_save_validation", save_validation)
+
+    async def scenario():
+        searches["release"] = asyncio.Event()
+        await pipeline.run_pipeline("c1")
+        await asyncio.sleep(0)
+        # 이벤트 루프 종료 시의 일괄 취소가 아니라 파이프라인이 직접 취소했는지 확인
+        return list(searches["started"]), list(searches["cancelled"])
+
+    started, cancelled = asyncio.run(scenario())
+    assert started == ["plastic_surgery"]
+    assert cancelled == ["plastic_surgery"]
+    assert db.tables["consultations"][0]["status"] == "report_failed"
@@ -0,0 +1,82 @@
+"""번역 메모리: 정확 일치만 재사용하고 유사 일치는 참고 번역으로만 반환"""
+import pytest
+
+from services import translation_memory as tm
+from services.translation_memory import _FuzzyIndex, normalize_segment, segment_hash, split_segments
+
+SOURCE = "施術後の腫れは三日ほどで引きますか。"
+SIMILAR = "施術後の腫れは三日ほどで引きますか?"
+NEGATED = "施術後の腫れは三日ほどで引きませんか。"
+
+
+@pytest.fixture
+def fuzzy(monkeypatch):
+    index = _FuzzyIndex()
+    monkeypatch.setattr(tm, "_fuzzy_index", index)
+    monkeypatch.setattr(tm, "TM_FUZZY_THRESHOLD", 0.85)
+    return index
+
+
+@pytest.fixture
+def stored(monkeypatch):
+    """DB 대신 {source_hash: 번역문} 사전으로 조회, touch 호출은 기록"""
+    rows: dict[str, str] = {}
+    touched: list[list[str]] = []
+
+    class _Rpc:
+        def __init__(self, params):
+            touched.append(params["hashes"])
+
+        def execute(self):
+            return self
+
+    class _Db:
+        def rpc(self, name, params):
+            assert name == "touch_translation_memory"
+            return _Rpc(params)
+
+    monkeypatch.setattr(tm, "fetch_translations", lambda hashes: {h: rows[h] for h in hashes if h in rows})
+    monkeypatch.setattr(tm, "get_supabase", lambda: _Db())
+    return rows, touched
+
+
+def test_split_segments_round_trips():
+    text = "こんにちは。目の整形について!\n\n費用は?ありがとう"
+    pieces = split_segments(text)
+    assert "".join(pieces) == text
+    assert pieces == ["こんにちは。", "目の整形について!", "\n\n", "費用は?", "ありがとう"]
+
+
+def test_fuzzy_lookup_exact_and_near(fuzzy):
+    fuzzy.add(normalize_segment(SOURCE), "시술 후 붓기는 3일 정도면 빠지나요?")
+
+    source, translated, score = fuzzy.lookup(normalize_segment(SOURCE))
+    assert (source, score) == (SOURCE, 1.0)
+
+    source, translated, score = fuzzy.lookup(normalize_segment(SIMILAR))
+    assert source == SOURCE and translated == "시술 후 붓기는 3일 정도면 빠지나요?"
+    assert 0.85 <= score < 1.0
+
+
+def test_fuzzy_lookup_rejects_low_score_and_different_numbers(fuzzy):
+    fuzzy.add("費用は10万円ですか。", "비용은 10만 엔인가요?")
+    assert fuzzy.lookup("費用は20万円ですか。") is None
+    assert fuzzy.lookup("ダウンタイムはどれくらいですか。") is None
+
+
+def test_lookup_segments_reuses_only_exact_hits(fuzzy, stored):
+    rows, touched = stored
+    translated = "시술 후 붓기는 3일 정도면 빠지나요?"
+    rows[segment_hash(normalize_segment(SOURCE))] = translated
+
+    exact, near = tm.lookup_segments([SOURCE, SIMILAR, NEGATED, "はい"])
+
+    assert exact == {SOURCE: translated}
+    # 부정형/문장부호만 다른 문장은 번역을 그대로 쓰지 않고 참고로만
+    assert near == {SIMILAR: (SOURCE, translated), NEGATED: (SOURCE, translated)}
+    assert touched == [[segment_hash(SOURCE)]]
+
+
+def test_lookup_segments_skips_short_segments(fuzzy, stored):
+    assert tm.lookup_segments(["はい", "え?"]) == ({}, {})
+    assert stored[1] == []
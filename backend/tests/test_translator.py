@@ -0,0 +1,130 @@
+"""청크 번역: 발화 줄 단위 언어 판정, 번역 메모리 재사용, 짧은 상담 묶음 번역"""
+import asyncio
+import json
+
+import pytest
+
+from agents import batch_agents, translator
+
+
+class FakeLLM:
+    """프롬프트의 "入力:" JSON을 읽어 각 문장을 "KO<문장>"으로 번역.
+    drop: 처음 drop_calls번의 호출 응답에서 뺄 문장 (응답 누락 재현)"""
+
+    def __init__(self):
+        self.prompts: list[str] = []
+        self.drop: set[str] = set()
+        self.drop_calls = 0
+
+    async def __call__(self, prompt: str, system_instruction: str = "") -> str:
+        self.prompts.append(prompt)
+        payload = json.loads(prompt.split("入力:\n", 1)[1])
+        drop = self.drop if len(self.prompts) <= self.drop_calls else set()
+
+        def translate(items):
+            return [
+                {"i": item["i"], "translated_text": f"KO<{item['text']}>"}
+                for item in items if item["text"] not in drop
+            ]
+
+        if payload and "id" in payload[0]:
+            return json.dumps({"results": [
+                {"id": item["id"], "translations": translate(item["segments"])} for item in payload
+            ]})
+        return json.dumps({"translations": translate(payload)})
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    fake = FakeLLM()
+    monkeypatch.setattr(translator, "generate_json", fake)
+    monkeypatch.setattr(batch_agents, "generate_json", fake)
+    monkeypatch.setattr(translator, "TRANSLATION_MEMORY_ENABLED", False)
+    return fake
+
+
+def test_korean_only_text_is_not_translated(llm):
+    text = "코 성형 상담입니다.\n비용이 궁금해요."
+    assert asyncio.run(translator.translate_to_korean(text)) == (text, "ko")
+    assert llm.prompts == []
+
+
+def test_short_japanese_line_in_korean_text_is_translated(llm):
+    # 가나 10자 미만: 전체 텍스트 기준 판정이면 한국어로 보고 번역을 건너뛰던 입력
+    text = "상담사: 어떤 시술을 원하세요?\n고객: 鼻を高くしたい。\n상담사: 네, 알겠습니다."
+    translated, lang = asyncio.run(translator.translate_to_korean(text))
+
+    assert lang == "ja"
+    assert translated == "상담사: 어떤 시술을 원하세요?\nKO<고객: 鼻を高くしたい。>\n상담사: 네, 알겠습니다."
+
+
+def test_kanji_heavy_japanese_is_translated(llm):
+    text = "二重埋没法希望。費用確認。"
+    translated, lang = asyncio.run(translator.translate_to_korean(text))
+    assert lang == "ja"
+    assert translated == "KO<二重埋没法希望。> KO<費用確認。>"
+
+
+def test_long_text_split_into_chunks_and_missing_segments_retried(llm, monkeypatch):
+    monkeypatch.setattr(translator, "TRANSLATION_CHUNK_CHARS", 20)
+    sentences = [f"文{i}の内容です。" for i in range(6)]
+    llm.drop, llm.drop_calls = {sentences[1]}, 3
+
+    translated, _ = asyncio.run(translator.translate_to_korean("".join(sentences)))
+
+    assert translated == " ".join(f"KO<{s}>" for s in sentences)
+    # 20자 한도 → 3청크 + 빠진 문장 재시도 1회
+    assert len(llm.prompts) == 4
+
+
+def test_exact_memory_hits_skip_llm_and_new_segments_are_stored(llm, monkeypatch):
+    stored = {}
+    monkeypatch.setattr(translator, "TRANSLATION_MEMORY_ENABLED", True)
+    monkeypatch.setattr(
+        translator, "lookup_segments",
+        lambda segments: ({"腫れますか。": "붓나요?"}, {"痛いですか。": ("痛みますか。", "아픈가요?")}),
+    )
+    monkeypatch.setattr(translator, "store_segments", lambda pairs: stored.update(pairs))
+
+    translated, _ = asyncio.run(translator.translate_to_korean("腫れますか。痛いですか。"))
+
+    assert translated == "붓나요? KO<痛いですか。>"
+    payload = json.loads(llm.prompts[0].split("入力:\n", 1)[1])
+    assert payload == [{
+        "i": 0, "text": "痛いですか。",
+        "reference": {"similar_source": "痛みますか。", "translation": "아픈가요?"},
+    }]
+    assert stored == {"痛いですか。": "KO<痛いですか。>"}
+
+
+def test_batch_packs_short_consultations_into_one_call(llm, monkeypatch):
+    monkeypatch.setattr(batch_agents, "BATCH_PROMPT_SIZE", 8)
+    monkeypatch.setattr(batch_agents, "TRANSLATION_CHUNK_CHARS", 40)
+    monkeypatch.setattr(translator, "TRANSLATION_CHUNK_CHARS", 40)
+    texts = {
+        "a": "鼻を高くしたいです。",
+        "b": "상담: 가격 문의\n고객: 値段はいくらですか。",
+        "c": "한국어만 있는 상담입니다.",
+        "long": "".join(f"長い相談の文{i}です。" for i in range(8)),
+    }
+    results = asyncio.run(batch_agents.translate_batch(texts))
+
+    assert results["a"] == ("KO<鼻を高くしたいです。>", "ja")
+    assert results["b"] == ("상담: 가격 문의\nKO<고객: 値段はいくらですか。>", "ja")
+    assert results["c"] == (texts["c"], "ko")
+    assert results["long"][1] == "ja" and results["long"][0].count("KO<") == 8
+
+    packed = [p for p in llm.prompts if "複数件" in p]
+    assert len(packed) == 1
+    assert [item["id"] for item in json.loads(packed[0].split("入力:\n", 1)[1])] == ["a", "b"]
+
+
+def test_batch_translates_segments_missing_from_packed_response(llm):
+    llm.drop, llm.drop_calls = {"値段はいくらですか。"}, 1
+    texts = {"a": "鼻を高くしたいです。", "b": "値段はいくらですか。"}
+
+    results = asyncio.run(batch_agents.translate_batch(texts))
+
+    assert results == {"a": ("KO<鼻を高くしたいです。>", "ja"), "b": ("KO<値段はいくらですか。>", "ja")}
+    # 묶음 1회 + 빠진 상담만 상담별 번역 1회
+    assert len(llm.prompts) == 2 and "複数件" not in llm.prompts[1]
@@ -0,0 +1,66 @@
+"""DB 벡터 검색 RPC의 인덱스 선택/탐색 파라미터"""
+import asyncio
+import re
+from pathlib import Path
+
+import pytest
+
+from agents import rag_agent
+from agents.rag_agent import vector_search_params
+
+
+@pytest.mark.parametrize("index_type", ["hnsw", "halfvec", "binary", "matryoshka"])
+def test_hnsw_family_sends_ef_search_only(index_type):
+    assert vector_search_params(index_type, ef_search=64, probes=10, rerank_factor=4) == {
+        "index_type": index_type, "ef_search": 64, "probes": None, "rerank_factor": 4,
+    }
+
+
+def test_ivfflat_sends_probes_only():
+    assert vector_search_params("ivfflat", ef_search=64, probes=20, rerank_factor=4) == {
+        "index_type": "ivfflat", "ef_search": None, "probes": 20, "rerank_factor": 4,
+    }
+
+
+def test_exact_sends_neither():
+    params = vector_search_params("exact", ef_search=64, probes=20, rerank_factor=4)
+    assert (params["ef_search"], params["probes"]) == (None, None)
+
+
+def test_batch_rpc_includes_index_params(db, monkeypatch):
+    calls = []
+    db.rpcs["search_faq_batch"] = lambda params: calls.append(params) or []
+    monkeypatch.setattr(rag_agent, "RAG_HYBRID_ENABLED", False)
+    monkeypatch.setattr(rag_agent, "vector_search_params", lambda: vector_search_params("ivfflat", 100, 15, 4))
+
+    asyncio.run(rag_agent._search_rpc([[1.0]], [], "dermatology", 0.65, 8))
+
+    assert (calls[0]["index_type"], calls[0]["probes"], calls[0]["ef_search"]) == ("ivfflat", 15, None)
+
+
+def test_index_settings_are_part_of_the_cache_key_settings(monkeypatch):
+    monkeypatch.setattr(rag_agent, "vector_search_params", lambda: vector_search_params("binary", 100, 10, 8))
+    assert rag_agent._search_settings()["ann"]["index_type"] == "binary"
+    assert rag_agent._search_settings()["ann"]["rerank_factor"] == 8
+
+
+MIGRATIONS = Path(__file__).resolve().parents[2] / "supabase" / "migrations"
+
+
+def _top_level_sql(name: str) -> str:
+    """함수 본문($$ ... $$)과 주석을 뺀, 마이그레이션 적용 시 바로 실행되는 SQL"""
+    sql = re.sub(r"--[^\n]*", "", (MIGRATIONS / name).read_text(encoding="utf-8"))
+    return re.sub(r"\$\$.*?\$\$", "", sql, flags=re.S)
+
+
+def test_compressed_indexes_are_only_built_on_request():
+    sql = _top_level_sql("021_quantized_embeddings.sql")
+    assert "CREATE INDEX" not in sql
+    assert "use_vector_index" in (MIGRATIONS / "021_quantized_embeddings.sql").read_text(encoding="utf-8")
+
+
+def test_matryoshka_prefix_index_is_only_built_on_request():
+    sql = _top_level_sql("022_matryoshka_prefix.sql")
+    assert "CREATE INDEX" not in sql
+    assert "ADD COLUMN" not in sql
+    assert "'matryoshka'" in (MIGRATIONS / "022_matryoshka_prefix.sql").read_text(encoding="utf-8")
@@ -396,6 +396,17 @@ export default function ConsultationsPage() {
                             >
                               {item.customer_name}
                             </Link>
+                            {item.near_duplicate && (
+                              <Link
+                                href={`/admin/consultations/${item.near_duplicate.id}`}
+                                className="mt-1 flex w-fit items-center px-2 py-0.5 rounded-full text-[11px] font-medium bg-amber-50 text-amber-700 hover:bg-amber-100"
+                                onClick={(e) => e.stopPropagation()}
+                              >
+                                유사 중복: {item.near_duplicate.customer_name || "—"}
+                                {item.near_duplicate_score != null &&
+                                  ` (${Math.round(item.near_duplicate_score * 100)}%)`}
+                              </Link>
+                            )}
                           </td>
                           <td className="px-6 py-4 text-slate-500">
                             {item.customer_email}
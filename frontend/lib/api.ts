@@ -63,6 +63,10 @@ export interface Consultation {
   input_language: "ja" | "ko" | null;
   status: string;
   error_message: string | null;
+  reused_from: string | null;
+  near_duplicate_of: string | null;
+  near_duplicate_score: number | null;
+  near_duplicate?: { id: string; customer_name: string; status: string } | null;
   created_at: string;
   updated_at: string;
 }
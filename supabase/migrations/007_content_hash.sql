@@ -0,0 +1,16 @@
+-- ============================================
+-- 007: 상담 원문 해시 + 결과 재사용 표시
+-- 동일 원문 재등록 시 번역/CTA/의도/분류 결과를 재사용하기 위한 마이그레이션
+-- ============================================
+
+-- 정규화된 original_text의 SHA-256 (services/dedup.compute_content_hash)
+ALTER TABLE consultations ADD COLUMN IF NOT EXISTS content_hash TEXT;
+
+-- 결과를 복사해 온 원본 상담 (재사용된 경우에만 설정)
+ALTER TABLE consultations ADD COLUMN IF NOT EXISTS reused_from UUID
+    REFERENCES consultations(id) ON DELETE SET NULL;
+
+CREATE INDEX IF NOT EXISTS idx_consultations_content_hash ON consultations (content_hash);
+
+-- 기존 데이터는 scripts/backfill_content_hash.py 로 해시를 채운다
+-- (Python 정규화와 동일한 결과를 보장하기 위해 SQL에서 계산하지 않음)
@@ -0,0 +1,14 @@
+-- ============================================
+-- 008: 유사 중복(near-duplicate) 상담 표시
+-- MinHash 서명을 저장하고, 앱 기동 시 in-process LSH 인덱스를 재구축한다
+-- ============================================
+
+-- 문자 5-gram MinHash 서명 (정수 128개, services/dedup.compute_minhash)
+ALTER TABLE consultations ADD COLUMN IF NOT EXISTS minhash_signature JSONB;
+
+-- 등록 시점에 가장 유사했던 기존 상담과 유사도 (자카드 추정치)
+ALTER TABLE consultations ADD COLUMN IF NOT EXISTS near_duplicate_of UUID
+    REFERENCES consultations(id) ON DELETE SET NULL;
+ALTER TABLE consultations ADD COLUMN IF NOT EXISTS near_duplicate_score FLOAT;
+
+CREATE INDEX IF NOT EXISTS idx_consultations_near_duplicate_of ON consultations (near_duplicate_of);
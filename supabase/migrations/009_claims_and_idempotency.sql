@@ -0,0 +1,27 @@
+-- ============================================
+-- 009: 파이프라인 실행 점유(claim) + 멱등성 키
+-- 같은 상담에 대해 run_pipeline이 중복 실행되지 않도록 조건부 UPDATE로 점유하고,
+-- 재시도된 등록/생성 요청은 최초 응답을 그대로 돌려준다
+-- ============================================
+
+-- 1. 점유 정보: 어느 인스턴스가 언제 파이프라인을 시작했는지
+ALTER TABLE consultations ADD COLUMN IF NOT EXISTS claimed_by TEXT;
+ALTER TABLE consultations ADD COLUMN IF NOT EXISTS claimed_at TIMESTAMPTZ;
+
+-- 2. 멱등성 키 (Idempotency-Key 헤더)
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    endpoint TEXT NOT NULL,
+    key TEXT NOT NULL,
+    request_hash TEXT NOT NULL,
+    status TEXT DEFAULT 'in_progress' CHECK (status IN ('in_progress', 'completed')),
+    response JSONB,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (endpoint, key)
+);
+
+CREATE INDEX IF NOT EXISTS idx_idempotency_keys_created_at ON idempotency_keys (created_at);
+
+CREATE TRIGGER trigger_idempotency_keys_updated_at
+    BEFORE UPDATE ON idempotency_keys
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
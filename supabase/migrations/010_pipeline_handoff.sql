@@ -0,0 +1,17 @@
+-- ============================================
+-- 010: 종료 시 파이프라인 인계(hand-off)
+-- 인스턴스가 종료되며 끝내지 못한 상담을 다른 인스턴스가 이어서 처리할 수 있도록
+-- 점유 시점의 작업 정보와 재등록 요청 플래그를 저장한다
+-- ============================================
+
+-- 1. 점유한 작업 종류 ({"kind": "pipeline"} / {"kind": "resume", "classification": ...}
+--    / {"kind": "regenerate", "report_id": ..., "direction": ...})
+ALTER TABLE consultations ADD COLUMN IF NOT EXISTS pipeline_job JSONB;
+
+-- 2. 종료 중인 인스턴스가 인계한 상담 (다음 복구 주기에 즉시 재등록)
+ALTER TABLE consultations ADD COLUMN IF NOT EXISTS needs_requeue BOOLEAN DEFAULT FALSE;
+
+-- 3. 복구 대상 조회용 (처리 중 상태만)
+CREATE INDEX IF NOT EXISTS idx_consultations_in_flight
+    ON consultations (claimed_at)
+    WHERE status IN ('processing', 'report_generating');
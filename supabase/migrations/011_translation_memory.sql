@@ -0,0 +1,32 @@
+-- ============================================
+-- 011: 일본어 → 한국어 문장 단위 번역 메모리
+-- 상담에 반복되는 인사/정형 질문/병원 안내 문장의 번역을 재사용한다
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS translation_memory (
+    source_hash TEXT PRIMARY KEY,          -- 정규화 원문 SHA-256
+    source_text TEXT NOT NULL,             -- 정규화 원문 (NFKC + 공백 정리)
+    translated_text TEXT NOT NULL,
+    source TEXT DEFAULT 'llm' CHECK (source IN ('llm', 'manual')),
+    hit_count INTEGER DEFAULT 0,
+    last_used_at TIMESTAMPTZ,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_translation_memory_created_at ON translation_memory (created_at);
+
+CREATE TRIGGER trigger_translation_memory_updated_at
+    BEFORE UPDATE ON translation_memory
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+-- 재사용 횟수 기록 (정확 일치 조회 시)
+CREATE OR REPLACE FUNCTION touch_translation_memory(hashes TEXT[])
+RETURNS VOID
+LANGUAGE sql
+AS $$
+    UPDATE translation_memory
+    SET hit_count = hit_count + 1,
+        last_used_at = NOW()
+    WHERE source_hash = ANY(hashes);
+$$;
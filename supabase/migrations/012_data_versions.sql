@@ -0,0 +1,32 @@
+-- ============================================
+-- 012: 참조 데이터 버전 (프로세스 내 캐시 무효화용)
+-- 테이블이 바뀔 때마다 version이 증가하므로, 앱은 이 한 행만 조회해
+-- 캐시(분류 키워드 사전 등)를 다시 읽을지 판단한다
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS data_versions (
+    name TEXT PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 1,
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE OR REPLACE FUNCTION bump_data_version()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    INSERT INTO data_versions (name, version, updated_at)
+    VALUES (TG_ARGV[0], 1, NOW())
+    ON CONFLICT (name) DO UPDATE
+    SET version = data_versions.version + 1,
+        updated_at = NOW();
+    RETURN NULL;
+END;
+$$;
+
+-- 분류 키워드 사전
+INSERT INTO data_versions (name) VALUES ('classification_keywords') ON CONFLICT DO NOTHING;
+
+CREATE TRIGGER trigger_classification_keywords_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON classification_keywords
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version('classification_keywords');
@@ -0,0 +1,18 @@
+-- ============================================
+-- 013: 로컬 모델 저장소 (학습 스크립트가 저장, 앱 기동 시 적재)
+-- name별로 활성 버전은 1개. artifact는 joblib 직렬화 결과의 base64
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS ml_models (
+    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+    name TEXT NOT NULL,                    -- 'classifier' 등
+    version TEXT NOT NULL,                 -- 예: classifier-20260301-0930
+    artifact_b64 TEXT NOT NULL,
+    metrics JSONB,                         -- 오프라인 평가 결과
+    training_rows INTEGER,
+    is_active BOOLEAN DEFAULT FALSE,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    UNIQUE (name, version)
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_ml_models_active ON ml_models (name) WHERE is_active;
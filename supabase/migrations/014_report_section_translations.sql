@@ -0,0 +1,11 @@
+-- ============================================
+-- 014: 리포트 한국어 번역 섹션 캐시
+-- 섹션 내용(키 + JSON) 해시 단위로 번역을 저장해, 수정/재생성 시 바뀐 섹션만 다시 번역한다
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS report_section_translations (
+    section_hash TEXT PRIMARY KEY,         -- SHA-256(섹션 키 + 정규화 JSON)
+    section_key TEXT NOT NULL,
+    translated JSONB NOT NULL,
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
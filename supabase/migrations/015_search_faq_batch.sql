@@ -0,0 +1,57 @@
+-- ============================================
+-- search_faq_batch: 여러 쿼리 임베딩을 한 번의 RPC로 검색
+-- 쿼리별 상위 match_count건을 query_index, rank와 함께 반환
+-- (결과 융합(RRF)은 rag_agent에서 수행)
+-- query_embeddings: [[...768...], [...768...]] 형식의 JSON 배열
+-- ============================================
+
+CREATE OR REPLACE FUNCTION search_faq_batch(
+    query_embeddings JSONB,
+    target_category TEXT,
+    match_threshold FLOAT DEFAULT 0.65,
+    match_count INT DEFAULT 8
+)
+RETURNS TABLE (
+    query_index INT,
+    rank INT,
+    id UUID,
+    question TEXT,
+    answer TEXT,
+    procedure_name TEXT,
+    youtube_url TEXT,
+    youtube_title TEXT,
+    youtube_video_id TEXT,
+    similarity FLOAT
+)
+LANGUAGE sql STABLE
+AS $$
+    SELECT
+        (q.ordinality - 1)::INT AS query_index,
+        (ROW_NUMBER() OVER (PARTITION BY q.ordinality ORDER BY hit.distance))::INT AS rank,
+        hit.id,
+        hit.question,
+        hit.answer,
+        hit.procedure_name,
+        hit.youtube_url,
+        hit.youtube_title,
+        hit.youtube_video_id,
+        1 - hit.distance AS similarity
+    FROM jsonb_array_elements(query_embeddings) WITH ORDINALITY AS q(embedding, ordinality)
+    CROSS JOIN LATERAL (
+        SELECT
+            fv.id,
+            fv.question,
+            fv.answer,
+            fv.procedure_name,
+            fv.youtube_url,
+            fv.youtube_title,
+            fv.youtube_video_id,
+            fv.embedding <=> (q.embedding::TEXT)::vector(768) AS distance
+        FROM faq_vectors fv
+        WHERE fv.category = target_category
+        ORDER BY fv.embedding <=> (q.embedding::TEXT)::vector(768)
+        LIMIT match_count
+    ) hit
+    WHERE 1 - hit.distance > match_threshold
+    ORDER BY query_index, rank;
+$$;
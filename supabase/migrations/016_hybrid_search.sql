@@ -0,0 +1,116 @@
+-- ============================================
+-- 하이브리드 검색 (어휘 trigram + 벡터)
+-- 시술명(써마지, 리쥬란 등)이 정확히 들어간 FAQ가 코사인 임계값(0.65)에 걸려
+-- 누락되는 문제 보완
+-- ============================================
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- 어휘 검색 대상: 시술명 + 질문 + 답변
+ALTER TABLE faq_vectors ADD COLUMN IF NOT EXISTS search_text TEXT
+    GENERATED ALWAYS AS (
+        COALESCE(procedure_name, '') || ' ' || question || ' ' || answer
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_faq_vectors_search_text_trgm
+    ON faq_vectors USING gin (search_text gin_trgm_ops);
+
+-- ============================================
+-- search_faq_hybrid
+-- 후보: 쿼리 임베딩별 벡터 상위 match_count건 + 검색어별 trigram 상위 match_count건
+-- 점수: vector_weight * 최대 코사인 유사도 + lexical_weight * 최대 word_similarity
+-- 벡터 유사도가 match_threshold 이하여도 어휘 점수가 lexical_threshold 이상이면 포함
+-- ============================================
+
+CREATE OR REPLACE FUNCTION search_faq_hybrid(
+    query_embeddings JSONB,
+    query_terms TEXT[],
+    target_category TEXT,
+    match_threshold FLOAT DEFAULT 0.65,
+    match_count INT DEFAULT 8,
+    vector_weight FLOAT DEFAULT 0.7,
+    lexical_weight FLOAT DEFAULT 0.3,
+    lexical_threshold FLOAT DEFAULT 0.6
+)
+RETURNS TABLE (
+    id UUID,
+    question TEXT,
+    answer TEXT,
+    procedure_name TEXT,
+    youtube_url TEXT,
+    youtube_title TEXT,
+    youtube_video_id TEXT,
+    similarity FLOAT,
+    lexical_score FLOAT,
+    score FLOAT
+)
+LANGUAGE plpgsql
+AS $$
+#variable_conflict use_column
+BEGIN
+    -- <% 연산자(trigram 인덱스 사용)의 기준값
+    PERFORM set_config('pg_trgm.word_similarity_threshold', lexical_threshold::TEXT, true);
+
+    RETURN QUERY
+    WITH queries AS (
+        SELECT (q.embedding::TEXT)::vector(768) AS embedding
+        FROM jsonb_array_elements(query_embeddings) AS q(embedding)
+    ),
+    terms AS (
+        SELECT DISTINCT t.term
+        FROM unnest(COALESCE(query_terms, ARRAY[]::TEXT[])) AS t(term)
+        WHERE length(trim(t.term)) >= 2
+    ),
+    candidates AS (
+        SELECT hit.id
+        FROM queries
+        CROSS JOIN LATERAL (
+            SELECT fv.id
+            FROM faq_vectors fv
+            WHERE fv.category = target_category
+            ORDER BY fv.embedding <=> queries.embedding
+            LIMIT match_count
+        ) hit
+        UNION
+        SELECT hit.id
+        FROM terms
+        CROSS JOIN LATERAL (
+            SELECT fv.id
+            FROM faq_vectors fv
+            WHERE fv.category = target_category
+                AND terms.term <% fv.search_text
+            ORDER BY terms.term <<-> fv.search_text
+            LIMIT match_count
+        ) hit
+    ),
+    scored AS (
+        SELECT
+            fv.id,
+            fv.question,
+            fv.answer,
+            fv.procedure_name,
+            fv.youtube_url,
+            fv.youtube_title,
+            fv.youtube_video_id,
+            (SELECT MAX(1 - (fv.embedding <=> queries.embedding)) FROM queries) AS vec_sim,
+            COALESCE((SELECT MAX(word_similarity(terms.term, fv.search_text)) FROM terms), 0) AS lex
+        FROM candidates c
+        JOIN faq_vectors fv ON fv.id = c.id
+    )
+    SELECT
+        s.id,
+        s.question,
+        s.answer,
+        s.procedure_name,
+        s.youtube_url,
+        s.youtube_title,
+        s.youtube_video_id,
+        s.vec_sim::FLOAT,
+        s.lex::FLOAT,
+        (vector_weight * s.vec_sim + lexical_weight * s.lex)::FLOAT
+    FROM scored s
+    WHERE s.vec_sim > match_threshold OR s.lex >= lexical_threshold
+    ORDER BY vector_weight * s.vec_sim + lexical_weight * s.lex DESC
+    LIMIT match_count;
+END;
+$$;
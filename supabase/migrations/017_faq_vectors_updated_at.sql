@@ -0,0 +1,12 @@
+-- ============================================
+-- 017: faq_vectors 변경 시각 (프로세스 내 검색 인덱스 증분 동기화용)
+-- 기존 행은 마이그레이션 시각으로 채워짐
+-- ============================================
+
+ALTER TABLE faq_vectors ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ DEFAULT NOW();
+
+CREATE INDEX IF NOT EXISTS idx_faq_vectors_updated_at ON faq_vectors (updated_at);
+
+CREATE TRIGGER trigger_faq_vectors_updated_at
+    BEFORE UPDATE ON faq_vectors
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
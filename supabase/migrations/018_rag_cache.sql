@@ -0,0 +1,21 @@
+-- ============================================
+-- 018: RAG 검색 결과 캐시
+-- faq_vectors가 바뀔 때마다(수집 스크립트, 삭제 API 포함) 코퍼스 버전이 증가하고,
+-- 캐시 항목은 저장 당시 버전과 다르면 사용하지 않는다
+-- ============================================
+
+INSERT INTO data_versions (name) VALUES ('faq_vectors') ON CONFLICT DO NOTHING;
+
+CREATE TRIGGER trigger_faq_vectors_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON faq_vectors
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version('faq_vectors');
+
+-- 선택적 영속 캐시 (RAG_CACHE_PERSIST=true): 인스턴스 재시작/다른 인스턴스와 공유
+CREATE TABLE IF NOT EXISTS rag_result_cache (
+    cache_key TEXT PRIMARY KEY,            -- (키워드, 카테고리, 임계값, 건수, 검색 설정) SHA-256
+    corpus_version BIGINT NOT NULL,
+    results JSONB NOT NULL,
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_rag_result_cache_created_at ON rag_result_cache (created_at);
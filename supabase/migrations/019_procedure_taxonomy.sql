@@ -0,0 +1,121 @@
+-- ============================================
+-- 019: 표준 시술 분류(procedures) + faq_vectors.procedure_id
+-- procedure_name은 LLM이 만든 자유 텍스트(보톡스(사각턱), 보톡스 사각턱, Botox 등)이므로
+-- 표준 시술 id로 묶어 검색 전에 후보를 좁힌다
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS procedures (
+    id BIGSERIAL PRIMARY KEY,
+    canonical_name TEXT UNIQUE NOT NULL,
+    category TEXT CHECK (category IN ('dermatology', 'plastic_surgery', 'boundary')),
+    aliases TEXT[] NOT NULL DEFAULT '{}',   -- normalize_procedure_name() 적용된 별칭
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_procedures_aliases ON procedures USING gin (aliases);
+
+ALTER TABLE faq_vectors ADD COLUMN IF NOT EXISTS procedure_id BIGINT REFERENCES procedures(id) ON DELETE SET NULL;
+
+CREATE INDEX IF NOT EXISTS idx_faq_vectors_category_procedure ON faq_vectors (category, procedure_id);
+
+-- 시술명 정규화 (backend/services/procedure_taxonomy.py normalize_procedure_name과 동일 규칙)
+-- NFKC → 소문자 → 괄호 안 내용 제거 → 문자/숫자 외 제거
+CREATE OR REPLACE FUNCTION normalize_procedure_name(name TEXT)
+RETURNS TEXT
+LANGUAGE sql IMMUTABLE
+AS $$
+    SELECT regexp_replace(
+        regexp_replace(lower(normalize(COALESCE(name, ''), NFKC)), '[(\[][^)\]]*[)\]]', '', 'g'),
+        '[^[:alnum:]가-힣]', '', 'g'
+    );
+$$;
+
+-- 새 FAQ는 별칭과 정확히 일치하면 저장 시 바로 매핑 (부분 일치는 백필 스크립트에서 처리)
+CREATE OR REPLACE FUNCTION assign_procedure_id()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF NEW.procedure_id IS NULL AND NEW.procedure_name IS NOT NULL THEN
+        SELECT p.id INTO NEW.procedure_id
+        FROM procedures p
+        WHERE normalize_procedure_name(NEW.procedure_name) = ANY(p.aliases)
+        LIMIT 1;
+    END IF;
+    RETURN NEW;
+END;
+$$;
+
+CREATE TRIGGER trigger_faq_vectors_procedure_id
+    BEFORE INSERT OR UPDATE OF procedure_name ON faq_vectors
+    FOR EACH ROW EXECUTE FUNCTION assign_procedure_id();
+
+-- 분류 체계 캐시 무효화
+INSERT INTO data_versions (name) VALUES ('procedures') ON CONFLICT DO NOTHING;
+
+CREATE TRIGGER trigger_procedures_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON procedures
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version('procedures');
+
+-- ============================================
+-- search_faq_filtered: 표준 시술 id로 먼저 좁힌 뒤 벡터 검색
+-- 반환 형식은 search_faq_batch와 같음 (쿼리별 query_index, rank)
+-- ============================================
+
+CREATE OR REPLACE FUNCTION search_faq_filtered(
+    query_embeddings JSONB,
+    procedure_ids BIGINT[],
+    target_category TEXT,
+    match_threshold FLOAT DEFAULT 0.65,
+    match_count INT DEFAULT 8
+)
+RETURNS TABLE (
+    query_index INT,
+    rank INT,
+    id UUID,
+    question TEXT,
+    answer TEXT,
+    procedure_name TEXT,
+    procedure_id BIGINT,
+    youtube_url TEXT,
+    youtube_title TEXT,
+    youtube_video_id TEXT,
+    similarity FLOAT
+)
+LANGUAGE sql STABLE
+AS $$
+    SELECT
+        (q.ordinality - 1)::INT AS query_index,
+        (ROW_NUMBER() OVER (PARTITION BY q.ordinality ORDER BY hit.distance))::INT AS rank,
+        hit.id,
+        hit.question,
+        hit.answer,
+        hit.procedure_name,
+        hit.procedure_id,
+        hit.youtube_url,
+        hit.youtube_title,
+        hit.youtube_video_id,
+        1 - hit.distance AS similarity
+    FROM jsonb_array_elements(query_embeddings) WITH ORDINALITY AS q(embedding, ordinality)
+    CROSS JOIN LATERAL (
+        SELECT
+            fv.id,
+            fv.question,
+            fv.answer,
+            fv.procedure_name,
+            fv.procedure_id,
+            fv.youtube_url,
+            fv.youtube_title,
+            fv.youtube_video_id,
+            fv.embedding <=> (q.embedding::TEXT)::vector(768) AS distance
+        FROM faq_vectors fv
+        WHERE fv.category = target_category
+            AND fv.procedure_id = ANY(procedure_ids)
+        -- "+ 0": 근사 인덱스(ivfflat) 대신 필터된 후보만 정확히 정렬하도록 강제
+        --        (근사 인덱스 + 사후 필터는 결과가 모자랄 수 있음)
+        ORDER BY (fv.embedding <=> (q.embedding::TEXT)::vector(768)) + 0
+        LIMIT match_count
+    ) hit
+    WHERE 1 - hit.distance > match_threshold
+    ORDER BY query_index, rank;
+$$;
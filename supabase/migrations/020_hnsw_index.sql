@@ -0,0 +1,307 @@
+-- ============================================
+-- 020: HNSW 인덱스 (정규화 벡터 + 내적) + 검색별 ef_search / probes
+-- gemini-embedding-001의 768차원 출력은 단위 벡터가 아니므로 저장 시 정규화
+-- → 내적(<#>) 순서 = 코사인 순서, 유사도 값은 기존과 같음
+-- 기존 ivfflat(코사인) 인덱스는 비교/롤백용으로 유지. HNSW 재현율 확인 후 삭제:
+--   DROP INDEX idx_faq_vectors_embedding;
+-- 요구: pgvector 0.7.0 이상 (l2_normalize)
+-- ============================================
+
+-- 저장 시 정규화 (수집 스크립트 수정 불필요)
+CREATE OR REPLACE FUNCTION normalize_faq_embedding()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    NEW.embedding := l2_normalize(NEW.embedding);
+    RETURN NEW;
+END;
+$$;
+
+CREATE TRIGGER trigger_faq_vectors_normalize_embedding
+    BEFORE INSERT OR UPDATE OF embedding ON faq_vectors
+    FOR EACH ROW EXECUTE FUNCTION normalize_faq_embedding();
+
+-- 기존 행 정규화 (이미 단위 벡터인 행은 건너뜀)
+UPDATE faq_vectors
+SET embedding = l2_normalize(embedding)
+WHERE abs(vector_norm(embedding) - 1) > 1e-4;
+
+-- 빌드 메모리가 부족하면 같은 세션에서 먼저 실행: SET maintenance_work_mem = '512MB';
+CREATE INDEX IF NOT EXISTS idx_faq_vectors_embedding_hnsw
+    ON faq_vectors USING hnsw (embedding vector_ip_ops) WITH (m = 16, ef_construction = 64);
+
+-- ============================================
+-- 검색 방식별 정렬식 (동적 SQL에서 qv.embedding = 정규화된 쿼리 벡터)
+--   hnsw    : 내적 → idx_faq_vectors_embedding_hnsw
+--   ivfflat : 코사인 거리 → idx_faq_vectors_embedding
+--   exact   : "+ 0"으로 인덱스 사용을 막은 정확 검색 (벤치마크 기준값)
+-- 카테고리 조건은 인덱스 탐색 후 적용되므로 ef_search는 조회 건수의 몇 배로 설정
+-- ============================================
+
+CREATE OR REPLACE FUNCTION vector_order_expression(index_type TEXT)
+RETURNS TEXT
+LANGUAGE plpgsql IMMUTABLE
+AS $$
+BEGIN
+    CASE index_type
+        WHEN 'hnsw' THEN RETURN 'fv.embedding <#> qv.embedding';
+        WHEN 'ivfflat' THEN RETURN 'fv.embedding <=> qv.embedding';
+        WHEN 'exact' THEN RETURN '(fv.embedding <#> qv.embedding) + 0';
+        ELSE RAISE EXCEPTION 'unknown index_type: %', index_type;
+    END CASE;
+END;
+$$;
+
+-- 트랜잭션 범위 검색 파라미터 (NULL이면 서버 기본값)
+CREATE OR REPLACE FUNCTION set_vector_search_params(ef_search INT, probes INT)
+RETURNS VOID
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF ef_search IS NOT NULL THEN
+        PERFORM set_config('hnsw.ef_search', ef_search::TEXT, true);
+    END IF;
+    IF probes IS NOT NULL THEN
+        PERFORM set_config('ivfflat.probes', probes::TEXT, true);
+    END IF;
+END;
+$$;
+
+-- ============================================
+-- search_faq: 단일 쿼리 검색 (벤치마크/수동 확인용)
+-- ============================================
+
+DROP FUNCTION IF EXISTS search_faq(vector, TEXT, FLOAT, INT);
+
+CREATE OR REPLACE FUNCTION search_faq(
+    query_embedding vector(768),
+    target_category TEXT,
+    match_threshold FLOAT DEFAULT 0.7,
+    match_count INT DEFAULT 5,
+    index_type TEXT DEFAULT 'hnsw',
+    ef_search INT DEFAULT NULL,
+    probes INT DEFAULT NULL
+)
+RETURNS TABLE (
+    id UUID,
+    question TEXT,
+    answer TEXT,
+    procedure_name TEXT,
+    youtube_url TEXT,
+    youtube_title TEXT,
+    youtube_video_id TEXT,
+    similarity FLOAT
+)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    PERFORM set_vector_search_params(ef_search, probes);
+
+    RETURN QUERY EXECUTE format($sql$
+        SELECT
+            hit.id,
+            hit.question,
+            hit.answer,
+            hit.procedure_name,
+            hit.youtube_url,
+            hit.youtube_title,
+            hit.youtube_video_id,
+            (1 - hit.distance)::FLOAT
+        FROM (SELECT l2_normalize($1) AS embedding) qv
+        CROSS JOIN LATERAL (
+            SELECT
+                fv.id,
+                fv.question,
+                fv.answer,
+                fv.procedure_name,
+                fv.youtube_url,
+                fv.youtube_title,
+                fv.youtube_video_id,
+                fv.embedding <=> qv.embedding AS distance
+            FROM faq_vectors fv
+            WHERE fv.category = $2
+            ORDER BY %s
+            LIMIT $3
+        ) hit
+        WHERE 1 - hit.distance > $4
+        ORDER BY hit.distance
+    $sql$, vector_order_expression(index_type))
+    USING query_embedding, target_category, match_count, match_threshold;
+END;
+$$;
+
+-- ============================================
+-- search_faq_batch: 015와 같은 결과 형식 + 검색 방식/파라미터
+-- ============================================
+
+DROP FUNCTION IF EXISTS search_faq_batch(JSONB, TEXT, FLOAT, INT);
+
+CREATE OR REPLACE FUNCTION search_faq_batch(
+    query_embeddings JSONB,
+    target_category TEXT,
+    match_threshold FLOAT DEFAULT 0.65,
+    match_count INT DEFAULT 8,
+    index_type TEXT DEFAULT 'hnsw',
+    ef_search INT DEFAULT NULL,
+    probes INT DEFAULT NULL
+)
+RETURNS TABLE (
+    query_index INT,
+    rank INT,
+    id UUID,
+    question TEXT,
+    answer TEXT,
+    procedure_name TEXT,
+    youtube_url TEXT,
+    youtube_title TEXT,
+    youtube_video_id TEXT,
+    similarity FLOAT
+)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    PERFORM set_vector_search_params(ef_search, probes);
+
+    RETURN QUERY EXECUTE format($sql$
+        SELECT
+            (qv.ordinality - 1)::INT AS query_index,
+            (ROW_NUMBER() OVER (PARTITION BY qv.ordinality ORDER BY hit.distance))::INT AS rank,
+            hit.id,
+            hit.question,
+            hit.answer,
+            hit.procedure_name,
+            hit.youtube_url,
+            hit.youtube_title,
+            hit.youtube_video_id,
+            (1 - hit.distance)::FLOAT AS similarity
+        FROM (
+            SELECT q.ordinality, l2_normalize((q.embedding::TEXT)::vector(768)) AS embedding
+            FROM jsonb_array_elements($1) WITH ORDINALITY AS q(embedding, ordinality)
+        ) qv
+        CROSS JOIN LATERAL (
+            SELECT
+                fv.id,
+                fv.question,
+                fv.answer,
+                fv.procedure_name,
+                fv.youtube_url,
+                fv.youtube_title,
+                fv.youtube_video_id,
+                fv.embedding <=> qv.embedding AS distance
+            FROM faq_vectors fv
+            WHERE fv.category = $2
+            ORDER BY %s
+            LIMIT $3
+        ) hit
+        WHERE 1 - hit.distance > $4
+        ORDER BY query_index, rank
+    $sql$, vector_order_expression(index_type))
+    USING query_embeddings, target_category, match_count, match_threshold;
+END;
+$$;
+
+-- ============================================
+-- search_faq_hybrid: 016과 같은 점수 계산 + 벡터 후보 검색 방식/파라미터
+-- ============================================
+
+DROP FUNCTION IF EXISTS search_faq_hybrid(JSONB, TEXT[], TEXT, FLOAT, INT, FLOAT, FLOAT, FLOAT);
+
+CREATE OR REPLACE FUNCTION search_faq_hybrid(
+    query_embeddings JSONB,
+    query_terms TEXT[],
+    target_category TEXT,
+    match_threshold FLOAT DEFAULT 0.65,
+    match_count INT DEFAULT 8,
+    vector_weight FLOAT DEFAULT 0.7,
+    lexical_weight FLOAT DEFAULT 0.3,
+    lexical_threshold FLOAT DEFAULT 0.6,
+    index_type TEXT DEFAULT 'hnsw',
+    ef_search INT DEFAULT NULL,
+    probes INT DEFAULT NULL
+)
+RETURNS TABLE (
+    id UUID,
+    question TEXT,
+    answer TEXT,
+    procedure_name TEXT,
+    youtube_url TEXT,
+    youtube_title TEXT,
+    youtube_video_id TEXT,
+    similarity FLOAT,
+    lexical_score FLOAT,
+    score FLOAT
+)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    -- <% 연산자(trigram 인덱스 사용)의 기준값
+    PERFORM set_config('pg_trgm.word_similarity_threshold', lexical_threshold::TEXT, true);
+    PERFORM set_vector_search_params(ef_search, probes);
+
+    RETURN QUERY EXECUTE format($sql$
+        WITH queries AS (
+            SELECT l2_normalize((q.embedding::TEXT)::vector(768)) AS embedding
+            FROM jsonb_array_elements($1) AS q(embedding)
+        ),
+        terms AS (
+            SELECT DISTINCT t.term
+            FROM unnest(COALESCE($2, ARRAY[]::TEXT[])) AS t(term)
+            WHERE length(trim(t.term)) >= 2
+        ),
+        candidates AS (
+            SELECT hit.id
+            FROM queries qv
+            CROSS JOIN LATERAL (
+                SELECT fv.id
+                FROM faq_vectors fv
+                WHERE fv.category = $3
+                ORDER BY %s
+                LIMIT $4
+            ) hit
+            UNION
+            SELECT hit.id
+            FROM terms
+            CROSS JOIN LATERAL (
+                SELECT fv.id
+                FROM faq_vectors fv
+                WHERE fv.category = $3
+                    AND terms.term <%% fv.search_text
+                ORDER BY terms.term <<-> fv.search_text
+                LIMIT $4
+            ) hit
+        ),
+        scored AS (
+            SELECT
+                fv.id,
+                fv.question,
+                fv.answer,
+                fv.procedure_name,
+                fv.youtube_url,
+                fv.youtube_title,
+                fv.youtube_video_id,
+                (SELECT MAX(1 - (fv.embedding <=> queries.embedding)) FROM queries) AS vec_sim,
+                COALESCE((SELECT MAX(word_similarity(terms.term, fv.search_text)) FROM terms), 0) AS lex
+            FROM candidates c
+            JOIN faq_vectors fv ON fv.id = c.id
+        )
+        SELECT
+            s.id,
+            s.question,
+            s.answer,
+            s.procedure_name,
+            s.youtube_url,
+            s.youtube_title,
+            s.youtube_video_id,
+            s.vec_sim::FLOAT,
+            s.lex::FLOAT,
+            ($6 * s.vec_sim + $7 * s.lex)::FLOAT
+        FROM scored s
+        WHERE s.vec_sim > $5 OR s.lex >= $8
+        ORDER BY $6 * s.vec_sim + $7 * s.lex DESC
+        LIMIT $4
+    $sql$, vector_order_expression(index_type))
+    USING query_embeddings, query_terms, target_category, match_count,
+          match_threshold, vector_weight, lexical_weight, lexical_threshold;
+END;
+$$;
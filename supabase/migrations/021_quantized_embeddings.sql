@@ -0,0 +1,373 @@
+-- ============================================
+-- 021: 압축 벡터 인덱스 (halfvec / 이진 양자화) + 원본 벡터 재정렬
+-- float32 vector(768) = 3KB/벡터라 HNSW 인덱스 스캔이 메모리 대역폭에 묶임
+--   halfvec : float16 표현식 인덱스 (1.5KB/벡터)
+--   binary  : 부호 비트 표현식 인덱스 (96B/벡터, Hamming 거리) → 1차 후보
+-- 두 방식 모두 1차 후보를 match_count × rerank_factor건 뽑은 뒤 테이블의 원본(float32) 벡터
+-- 코사인 거리로 재정렬하므로 반환 유사도는 기존과 같다. 테이블 컬럼은 재정렬용으로 그대로 둔다.
+--
+-- 압축 인덱스는 자동으로 만들지 않는다 (배포마다 인덱스 하나만 유지해 메모리가 늘지 않도록).
+-- 배포에서 압축 인덱스를 쓰려면 SQL 편집기에서 먼저 실행한 뒤 VECTOR_INDEX_TYPE을 바꾼다:
+--   SET maintenance_work_mem = '512MB';   -- 빌드 메모리가 부족할 때
+--   SELECT use_vector_index('halfvec');   -- 또는 'binary'. 대체되는 HNSW 인덱스는 삭제됨
+-- 되돌릴 때: SELECT use_vector_index('hnsw');
+-- (이 파일의 이전 버전을 적용해 두 인덱스가 모두 있는 DB도 위 호출 한 번으로 정리된다)
+-- 요구: pgvector 0.7.0 이상 (halfvec, binary_quantize, bit_hamming_ops)
+-- ============================================
+
+-- 검색 방식별 HNSW 인덱스 (이름, 정의). ivfflat/exact는 별도 HNSW 인덱스 없음
+CREATE OR REPLACE FUNCTION vector_index_definition(index_type TEXT)
+RETURNS TEXT[]
+LANGUAGE plpgsql IMMUTABLE
+AS $$
+BEGIN
+    CASE index_type
+        WHEN 'hnsw' THEN RETURN ARRAY['idx_faq_vectors_embedding_hnsw',
+            'USING hnsw (embedding vector_ip_ops) WITH (m = 16, ef_construction = 64)'];
+        WHEN 'halfvec' THEN RETURN ARRAY['idx_faq_vectors_embedding_half',
+            'USING hnsw ((embedding::halfvec(768)) halfvec_ip_ops) WITH (m = 16, ef_construction = 64)'];
+        WHEN 'binary' THEN RETURN ARRAY['idx_faq_vectors_embedding_bit',
+            'USING hnsw ((binary_quantize(embedding)::bit(768)) bit_hamming_ops) WITH (m = 16, ef_construction = 64)'];
+        WHEN 'ivfflat', 'exact' THEN RETURN NULL;
+        ELSE RAISE EXCEPTION 'unknown index_type: %', index_type;
+    END CASE;
+END;
+$$;
+
+-- 선택한 검색 방식의 인덱스를 만들고, 서로 대체 관계인 다른 HNSW 인덱스는 삭제.
+-- 001의 ivfflat 인덱스는 020과 같이 롤백용으로 건드리지 않는다. 만든 인덱스 이름 반환
+CREATE OR REPLACE FUNCTION use_vector_index(index_type TEXT)
+RETURNS TEXT
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    target TEXT[] := vector_index_definition(index_type);
+    other_type TEXT;
+    other TEXT[];
+BEGIN
+    IF target IS NULL THEN
+        RAISE EXCEPTION 'index_type % has no HNSW index to build', index_type;
+    END IF;
+    EXECUTE format('CREATE INDEX IF NOT EXISTS %I ON faq_vectors %s', target[1], target[2]);
+
+    FOREACH other_type IN ARRAY ARRAY['hnsw', 'halfvec', 'binary'] LOOP
+        other := vector_index_definition(other_type);
+        IF other[1] <> target[1] THEN
+            EXECUTE format('DROP INDEX IF EXISTS %I', other[1]);
+        END IF;
+    END LOOP;
+    RETURN target[1];
+END;
+$$;
+
+-- 정렬식은 vector_index_definition의 표현식 인덱스 정의와 같아야 인덱스를 사용한다
+CREATE OR REPLACE FUNCTION vector_order_expression(index_type TEXT)
+RETURNS TEXT
+LANGUAGE plpgsql IMMUTABLE
+AS $$
+BEGIN
+    CASE index_type
+        WHEN 'hnsw' THEN RETURN 'fv.embedding <#> qv.embedding';
+        WHEN 'halfvec' THEN RETURN 'fv.embedding::halfvec(768) <#> qv.embedding::halfvec(768)';
+        WHEN 'binary' THEN RETURN 'binary_quantize(fv.embedding)::bit(768) <~> binary_quantize(qv.embedding)';
+        WHEN 'ivfflat' THEN RETURN 'fv.embedding <=> qv.embedding';
+        WHEN 'exact' THEN RETURN '(fv.embedding <#> qv.embedding) + 0';
+        ELSE RAISE EXCEPTION 'unknown index_type: %', index_type;
+    END CASE;
+END;
+$$;
+
+-- 1차 후보 수: 압축 인덱스는 재정렬을 위해 rerank_factor배
+CREATE OR REPLACE FUNCTION vector_candidate_count(index_type TEXT, match_count INT, rerank_factor INT)
+RETURNS INT
+LANGUAGE sql IMMUTABLE
+AS $$
+    SELECT CASE WHEN index_type IN ('halfvec', 'binary') THEN match_count * GREATEST(rerank_factor, 1)
+                ELSE match_count END;
+$$;
+
+-- HNSW는 ef_search보다 많은 후보를 돌려주지 않으므로 최소 candidate_count로 맞춤
+DROP FUNCTION IF EXISTS set_vector_search_params(INT, INT);
+
+CREATE OR REPLACE FUNCTION set_vector_search_params(ef_search INT, probes INT, candidate_count INT DEFAULT 0)
+RETURNS VOID
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    PERFORM set_config(
+        'hnsw.ef_search',
+        GREATEST(COALESCE(ef_search, current_setting('hnsw.ef_search', true)::INT, 40), candidate_count)::TEXT,
+        true
+    );
+    IF probes IS NOT NULL THEN
+        PERFORM set_config('ivfflat.probes', probes::TEXT, true);
+    END IF;
+END;
+$$;
+
+-- 벡터 인덱스 크기 (벤치마크에서 벡터당 메모리 비교용)
+CREATE OR REPLACE FUNCTION faq_vector_index_sizes()
+RETURNS TABLE (index_name TEXT, size_bytes BIGINT, row_count BIGINT)
+LANGUAGE sql STABLE
+AS $$
+    SELECT
+        i.indexrelname::TEXT,
+        pg_relation_size(i.indexrelid),
+        (SELECT COUNT(*) FROM faq_vectors)
+    FROM pg_stat_user_indexes i
+    WHERE i.relname = 'faq_vectors'
+        AND i.indexrelname LIKE 'idx_faq_vectors_embedding%';
+$$;
+
+-- ============================================
+-- search_faq: 단일 쿼리 검색 (벤치마크/수동 확인용)
+-- 1차 후보 candidate_count건 → 원본 벡터 코사인 거리로 상위 match_count건
+-- ============================================
+
+DROP FUNCTION IF EXISTS search_faq(vector, TEXT, FLOAT, INT, TEXT, INT, INT);
+
+CREATE OR REPLACE FUNCTION search_faq(
+    query_embedding vector(768),
+    target_category TEXT,
+    match_threshold FLOAT DEFAULT 0.7,
+    match_count INT DEFAULT 5,
+    index_type TEXT DEFAULT 'hnsw',
+    ef_search INT DEFAULT NULL,
+    probes INT DEFAULT NULL,
+    rerank_factor INT DEFAULT 4
+)
+RETURNS TABLE (
+    id UUID,
+    question TEXT,
+    answer TEXT,
+    procedure_name TEXT,
+    youtube_url TEXT,
+    youtube_title TEXT,
+    youtube_video_id TEXT,
+    similarity FLOAT
+)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    candidate_count INT := vector_candidate_count(index_type, match_count, rerank_factor);
+BEGIN
+    PERFORM set_vector_search_params(ef_search, probes, candidate_count);
+
+    RETURN QUERY EXECUTE format($sql$
+        SELECT
+            hit.id,
+            hit.question,
+            hit.answer,
+            hit.procedure_name,
+            hit.youtube_url,
+            hit.youtube_title,
+            hit.youtube_video_id,
+            (1 - hit.distance)::FLOAT
+        FROM (SELECT l2_normalize($1) AS embedding) qv
+        CROSS JOIN LATERAL (
+            SELECT
+                fv.id,
+                fv.question,
+                fv.answer,
+                fv.procedure_name,
+                fv.youtube_url,
+                fv.youtube_title,
+                fv.youtube_video_id,
+                fv.embedding <=> qv.embedding AS distance
+            FROM faq_vectors fv
+            WHERE fv.category = $2
+            ORDER BY %s
+            LIMIT $5
+        ) hit
+        WHERE 1 - hit.distance > $4
+        ORDER BY hit.distance
+        LIMIT $3
+    $sql$, vector_order_expression(index_type))
+    USING query_embedding, target_category, match_count, match_threshold, candidate_count;
+END;
+$$;
+
+-- ============================================
+-- search_faq_batch: 015와 같은 결과 형식. 쿼리별 1차 후보를 원본 벡터로 재정렬한 상위 match_count건
+-- ============================================
+
+DROP FUNCTION IF EXISTS search_faq_batch(JSONB, TEXT, FLOAT, INT, TEXT, INT, INT);
+
+CREATE OR REPLACE FUNCTION search_faq_batch(
+    query_embeddings JSONB,
+    target_category TEXT,
+    match_threshold FLOAT DEFAULT 0.65,
+    match_count INT DEFAULT 8,
+    index_type TEXT DEFAULT 'hnsw',
+    ef_search INT DEFAULT NULL,
+    probes INT DEFAULT NULL,
+    rerank_factor INT DEFAULT 4
+)
+RETURNS TABLE (
+    query_index INT,
+    rank INT,
+    id UUID,
+    question TEXT,
+    answer TEXT,
+    procedure_name TEXT,
+    youtube_url TEXT,
+    youtube_title TEXT,
+    youtube_video_id TEXT,
+    similarity FLOAT
+)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    candidate_count INT := vector_candidate_count(index_type, match_count, rerank_factor);
+BEGIN
+    PERFORM set_vector_search_params(ef_search, probes, candidate_count);
+
+    RETURN QUERY EXECUTE format($sql$
+        SELECT ranked.*
+        FROM (
+            SELECT
+                (qv.ordinality - 1)::INT AS query_index,
+                (ROW_NUMBER() OVER (PARTITION BY qv.ordinality ORDER BY hit.distance))::INT AS rank,
+                hit.id,
+                hit.question,
+                hit.answer,
+                hit.procedure_name,
+                hit.youtube_url,
+                hit.youtube_title,
+                hit.youtube_video_id,
+                (1 - hit.distance)::FLOAT AS similarity
+            FROM (
+                SELECT q.ordinality, l2_normalize((q.embedding::TEXT)::vector(768)) AS embedding
+                FROM jsonb_array_elements($1) WITH ORDINALITY AS q(embedding, ordinality)
+            ) qv
+            CROSS JOIN LATERAL (
+                SELECT
+                    fv.id,
+                    fv.question,
+                    fv.answer,
+                    fv.procedure_name,
+                    fv.youtube_url,
+                    fv.youtube_title,
+                    fv.youtube_video_id,
+                    fv.embedding <=> qv.embedding AS distance
+                FROM faq_vectors fv
+                WHERE fv.category = $2
+                ORDER BY %s
+                LIMIT $5
+            ) hit
+            WHERE 1 - hit.distance > $4
+        ) ranked
+        WHERE ranked.rank <= $3
+        ORDER BY ranked.query_index, ranked.rank
+    $sql$, vector_order_expression(index_type))
+    USING query_embeddings, target_category, match_count, match_threshold, candidate_count;
+END;
+$$;
+
+-- ============================================
+-- search_faq_hybrid: 016과 같은 점수 계산. 벡터 후보는 쿼리별 candidate_count건 (점수는 원본 벡터 기준)
+-- ============================================
+
+DROP FUNCTION IF EXISTS search_faq_hybrid(JSONB, TEXT[], TEXT, FLOAT, INT, FLOAT, FLOAT, FLOAT, TEXT, INT, INT);
+
+CREATE OR REPLACE FUNCTION search_faq_hybrid(
+    query_embeddings JSONB,
+    query_terms TEXT[],
+    target_category TEXT,
+    match_threshold FLOAT DEFAULT 0.65,
+    match_count INT DEFAULT 8,
+    vector_weight FLOAT DEFAULT 0.7,
+    lexical_weight FLOAT DEFAULT 0.3,
+    lexical_threshold FLOAT DEFAULT 0.6,
+    index_type TEXT DEFAULT 'hnsw',
+    ef_search INT DEFAULT NULL,
+    probes INT DEFAULT NULL,
+    rerank_factor INT DEFAULT 4
+)
+RETURNS TABLE (
+    id UUID,
+    question TEXT,
+    answer TEXT,
+    procedure_name TEXT,
+    youtube_url TEXT,
+    youtube_title TEXT,
+    youtube_video_id TEXT,
+    similarity FLOAT,
+    lexical_score FLOAT,
+    score FLOAT
+)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    candidate_count INT := vector_candidate_count(index_type, match_count, rerank_factor);
+BEGIN
+    -- <% 연산자(trigram 인덱스 사용)의 기준값
+    PERFORM set_config('pg_trgm.word_similarity_threshold', lexical_threshold::TEXT, true);
+    PERFORM set_vector_search_params(ef_search, probes, candidate_count);
+
+    RETURN QUERY EXECUTE format($sql$
+        WITH queries AS (
+            SELECT l2_normalize((q.embedding::TEXT)::vector(768)) AS embedding
+            FROM jsonb_array_elements($1) AS q(embedding)
+        ),
+        terms AS (
+            SELECT DISTINCT t.term
+            FROM unnest(COALESCE($2, ARRAY[]::TEXT[])) AS t(term)
+            WHERE length(trim(t.term)) >= 2
+        ),
+        candidates AS (
+            SELECT hit.id
+            FROM queries qv
+            CROSS JOIN LATERAL (
+                SELECT fv.id
+                FROM faq_vectors fv
+                WHERE fv.category = $3
+                ORDER BY %s
+                LIMIT $9
+            ) hit
+            UNION
+            SELECT hit.id
+            FROM terms
+            CROSS JOIN LATERAL (
+                SELECT fv.id
+                FROM faq_vectors fv
+                WHERE fv.category = $3
+                    AND terms.term <%% fv.search_text
+                ORDER BY terms.term <<-> fv.search_text
+                LIMIT $4
+            ) hit
+        ),
+        scored AS (
+            SELECT
+                fv.id,
+                fv.question,
+                fv.answer,
+                fv.procedure_name,
+                fv.youtube_url,
+                fv.youtube_title,
+                fv.youtube_video_id,
+                (SELECT MAX(1 - (fv.embedding <=> queries.embedding)) FROM queries) AS vec_sim,
+                COALESCE((SELECT MAX(word_similarity(terms.term, fv.search_text)) FROM terms), 0) AS lex
+            FROM candidates c
+            JOIN faq_vectors fv ON fv.id = c.id
+        )
+        SELECT
+            s.id,
+            s.question,
+            s.answer,
+            s.procedure_name,
+            s.youtube_url,
+            s.youtube_title,
+            s.youtube_video_id,
+            s.vec_sim::FLOAT,
+            s.lex::FLOAT,
+            ($6 * s.vec_sim + $7 * s.lex)::FLOAT
+        FROM scored s
+        WHERE s.vec_sim > $5 OR s.lex >= $8
+        ORDER BY $6 * s.vec_sim + $7 * s.lex DESC
+        LIMIT $4
+    $sql$, vector_order_expression(index_type))
+    USING query_embeddings, query_terms, target_category, match_count,
+          match_threshold, vector_weight, lexical_weight, lexical_threshold, candidate_count;
+END;
+$$;
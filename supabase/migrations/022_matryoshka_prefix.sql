@@ -0,0 +1,85 @@
+-- ============================================
+-- 022: Matryoshka 2단계 검색 (앞 256차원 prefix)
+-- gemini-embedding-001은 앞쪽 차원만으로도 검색에 쓸 수 있게 학습된 임베딩이라
+-- 앞 256차원(재정규화)으로 1차 후보를 뽑고 768차원 원본으로 재정렬한다.
+-- prefix는 embedding에서 계산하는 표현식 인덱스라 컬럼 추가/수집 스크립트 수정 불필요
+-- 검색: index_type = 'matryoshka' (VECTOR_INDEX_TYPE), 후보 수 = match_count × rerank_factor
+--
+-- 021과 같이 인덱스는 자동으로 만들지 않는다. 사용할 배포에서 먼저 실행:
+--   SELECT use_vector_index('matryoshka');   -- 대체되는 다른 HNSW 인덱스는 삭제됨
+-- (이 파일의 이전 버전이 추가한 embedding_short 생성 컬럼도 이 호출 또는 다른 방식 선택 시 삭제된다)
+-- 요구: pgvector 0.7.0 이상 (subvector, l2_normalize)
+-- ============================================
+
+CREATE OR REPLACE FUNCTION vector_index_definition(index_type TEXT)
+RETURNS TEXT[]
+LANGUAGE plpgsql IMMUTABLE
+AS $$
+BEGIN
+    CASE index_type
+        WHEN 'hnsw' THEN RETURN ARRAY['idx_faq_vectors_embedding_hnsw',
+            'USING hnsw (embedding vector_ip_ops) WITH (m = 16, ef_construction = 64)'];
+        WHEN 'halfvec' THEN RETURN ARRAY['idx_faq_vectors_embedding_half',
+            'USING hnsw ((embedding::halfvec(768)) halfvec_ip_ops) WITH (m = 16, ef_construction = 64)'];
+        WHEN 'binary' THEN RETURN ARRAY['idx_faq_vectors_embedding_bit',
+            'USING hnsw ((binary_quantize(embedding)::bit(768)) bit_hamming_ops) WITH (m = 16, ef_construction = 64)'];
+        WHEN 'matryoshka' THEN RETURN ARRAY['idx_faq_vectors_embedding_short',
+            'USING hnsw ((l2_normalize(subvector(embedding, 1, 256))::vector(256)) vector_ip_ops) WITH (m = 16, ef_construction = 64)'];
+        WHEN 'ivfflat', 'exact' THEN RETURN NULL;
+        ELSE RAISE EXCEPTION 'unknown index_type: %', index_type;
+    END CASE;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION use_vector_index(index_type TEXT)
+RETURNS TEXT
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    target TEXT[] := vector_index_definition(index_type);
+    other_type TEXT;
+    other TEXT[];
+BEGIN
+    IF target IS NULL THEN
+        RAISE EXCEPTION 'index_type % has no HNSW index to build', index_type;
+    END IF;
+    -- 이전 022의 생성 컬럼 (인덱스도 함께 삭제됨)
+    ALTER TABLE faq_vectors DROP COLUMN IF EXISTS embedding_short;
+    EXECUTE format('CREATE INDEX IF NOT EXISTS %I ON faq_vectors %s', target[1], target[2]);
+
+    FOREACH other_type IN ARRAY ARRAY['hnsw', 'halfvec', 'binary', 'matryoshka'] LOOP
+        other := vector_index_definition(other_type);
+        IF other[1] <> target[1] THEN
+            EXECUTE format('DROP INDEX IF EXISTS %I', other[1]);
+        END IF;
+    END LOOP;
+    RETURN target[1];
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION vector_order_expression(index_type TEXT)
+RETURNS TEXT
+LANGUAGE plpgsql IMMUTABLE
+AS $$
+BEGIN
+    CASE index_type
+        WHEN 'hnsw' THEN RETURN 'fv.embedding <#> qv.embedding';
+        WHEN 'halfvec' THEN RETURN 'fv.embedding::halfvec(768) <#> qv.embedding::halfvec(768)';
+        WHEN 'binary' THEN RETURN 'binary_quantize(fv.embedding)::bit(768) <~> binary_quantize(qv.embedding)';
+        WHEN 'matryoshka' THEN RETURN
+            'l2_normalize(subvector(fv.embedding, 1, 256))::vector(256) <#> l2_normalize(subvector(qv.embedding, 1, 256))::vector(256)';
+        WHEN 'ivfflat' THEN RETURN 'fv.embedding <=> qv.embedding';
+        WHEN 'exact' THEN RETURN '(fv.embedding <#> qv.embedding) + 0';
+        ELSE RAISE EXCEPTION 'unknown index_type: %', index_type;
+    END CASE;
+END;
+$$;
+
+-- 1차 후보 수: 압축/prefix 인덱스는 재정렬을 위해 rerank_factor배
+CREATE OR REPLACE FUNCTION vector_candidate_count(index_type TEXT, match_count INT, rerank_factor INT)
+RETURNS INT
+LANGUAGE sql IMMUTABLE
+AS $$
+    SELECT CASE WHEN index_type IN ('halfvec', 'binary', 'matryoshka') THEN match_count * GREATEST(rerank_factor, 1)
+                ELSE match_count END;
+$$;
@@ -0,0 +1,7 @@
+-- ============================================
+-- 023: 리포트 RAG 검색에 사용한 검색어 저장
+-- 재생성 시 지시문 단어가 이미 검색한 단어인지 FAQ 본문 대신 이 목록과 비교한다
+-- ============================================
+
+-- rag_context를 만든 검색어 목록 (JSON 문자열 배열). 이전 리포트는 NULL → 의도 추출 키워드로 대체
+ALTER TABLE reports ADD COLUMN IF NOT EXISTS rag_query_terms JSONB;
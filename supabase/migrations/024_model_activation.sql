@@ -0,0 +1,34 @@
+-- ============================================
+-- 024: 로컬 모델 버전 전환 + 분류 출처 기록
+-- 1. 새 버전을 먼저 저장한 뒤 활성 버전을 한 트랜잭션에서 교체 (중간에 활성 모델이 없는 구간 없음)
+-- 2. 최종 분류를 낸 경로를 저장해, 로컬 모델/키워드 사전이 스스로 낸 라벨을 재학습에서 제외
+-- ============================================
+
+CREATE OR REPLACE FUNCTION activate_ml_model(p_name TEXT, p_version TEXT)
+RETURNS VOID
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    -- 부분 유니크 인덱스(idx_ml_models_active) 때문에 기존 활성 버전을 먼저 내린다 (같은 트랜잭션)
+    UPDATE ml_models SET is_active = FALSE
+    WHERE name = p_name AND is_active AND version <> p_version;
+
+    UPDATE ml_models SET is_active = TRUE
+    WHERE name = p_name AND version = p_version;
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'ml_models %/% not found', p_name, p_version;
+    END IF;
+END;
+$$;
+
+-- 최종 분류 출처: keyword(사전) / model(학습 모델) / llm / manual(관리자)
+ALTER TABLE consultations ADD COLUMN IF NOT EXISTS classification_method TEXT;
+
+-- 기존 상담: 분류 근거 문구로 출처 복원 (confirm_if_confident가 근거를 그대로 저장)
+UPDATE consultations SET classification_method = CASE
+        WHEN is_manually_classified THEN 'manual'
+        WHEN classification_reason LIKE '키워드 사전 매칭:%' THEN 'keyword'
+        WHEN classification_reason LIKE '학습 분류 모델 예측%' THEN 'model'
+        ELSE 'llm'
+    END
+WHERE classification_method IS NULL AND classification IS NOT NULL;